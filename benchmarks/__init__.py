@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""英语词汇测试系统 - 性能基准测试"""
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词汇数据内存占用基准
+
+测量解析后的词汇条目（VocabEntry元组，含所有义项和词性）占用的内存和解析耗时，
+并与"每个条目一个字典、每个义项和例句一个字典"的展开布局比较:
+
+    entries             条目数
+    senses              义项总数
+    bytes/entry         VocabEntry元组中每个条目占用的字节数（tracemalloc）
+    dict bytes/entry    展开布局中每个条目占用的字节数
+    parse ms            parse_vocabulary的耗时（不开启tracemalloc，取最快一次）
+
+两种布局都直接引用json.load得到的字符串，因此只统计布局本身新分配的内存。
+
+用法:
+    python -m benchmarks.memory                          # json目录中的模块和合成词汇1万、10万条
+    python -m benchmarks.memory --sizes 1000000 --modules ""
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from benchmarks.run_benchmarks import vocabulary_file
+from vocabulary_store import get_shared_bank, parse_vocabulary
+
+DEFAULT_SIZES = (10000, 100000)
+DEFAULT_MODULES = ("1", "4", "7")
+
+
+def expanded_layout(raw):
+    """把原始条目转换为字典列表（每个义项和例句各一个字典），作为比较的参照"""
+    entries = []
+    for item in raw:
+        senses = [{'pos': t.get('type') or '', 'translation': t['translation']}
+                  for t in item.get('translations', []) if isinstance(t, dict) and t.get('translation')]
+        if not item.get('word') or not senses:
+            continue
+        entries.append({
+            'word': item['word'],
+            'definition': senses[0]['translation'],
+            'senses': senses,
+            'examples': [{'phrase': p.get('phrase', ''), 'translation': p.get('translation', '')}
+                         for p in item.get('phrases', [])[:3] if isinstance(p, dict)]
+        })
+    return entries
+
+
+def traced_size(build):
+    """
+    Returns:
+        tuple: (build()的结果, 构建过程中新分配且仍在使用的字节数)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def measure(raw, repeat=3):
+    """
+    Returns:
+        dict: entries、senses、bytes_per_entry、dict_bytes_per_entry、parse_ms
+    """
+    entries, size = traced_size(lambda: parse_vocabulary(raw))
+    expanded, dict_size = traced_size(lambda: expanded_layout(raw))
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_vocabulary(raw)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    count = max(len(entries), 1)
+    return {
+        "entries": len(entries),
+        "senses": sum(len(getattr(e, 'senses', (e.definition,))) for e in entries),
+        "bytes_per_entry": round(size / count, 1),
+        "dict_bytes_per_entry": round(dict_size / max(len(expanded), 1), 1),
+        "parse_ms": round(best * 1000, 2),
+    }
+
+
+def run_memory(modules=DEFAULT_MODULES, sizes=DEFAULT_SIZES, repeat=3, cache_dir=None):
+    """
+    Returns:
+        OrderedDict: 名称（module_<ID> 或 synthetic_<条目数>）-> measure的结果
+    """
+    bank = get_shared_bank()
+    sources = []
+    for module_id in modules:
+        path = bank.module_path(module_id)
+        if os.path.exists(path):
+            sources.append((f"module_{module_id}", path))
+    sources.extend((f"synthetic_{size}", vocabulary_file(size, cache_dir=cache_dir)) for size in sizes)
+
+    results = OrderedDict()
+    for name, path in sources:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        results[name] = measure(raw, repeat)
+    return results
+
+
+def format_table(results):
+    lines = [f"{'source':<20}{'entries':>10}{'senses':>10}{'bytes/entry':>14}{'dict bytes/entry':>18}{'parse ms':>11}"]
+    for name, r in results.items():
+        lines.append(f"{name:<20}{r['entries']:>10}{r['senses']:>10}{r['bytes_per_entry']:>14.1f}"
+                     f"{r['dict_bytes_per_entry']:>18.1f}{r['parse_ms']:>11.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="词汇数据内存占用基准")
+    parser.add_argument("--modules", default=",".join(DEFAULT_MODULES), help="要测量的模块ID，多个用逗号分隔")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="合成词汇的条目数，多个用逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="解析耗时的测量次数（默认3，取最快一次）")
+    parser.add_argument("--json", default=None, help="把结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()]
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run_memory(modules, sizes, args.repeat)
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+核心功能性能基准测试
+
+在不同规模的合成词汇文件上测量VocabularyTester各项核心操作的单次耗时（微秒），
+与保存的基准结果比较，超过阈值即视为性能退化。
+
+测试项目:
+    load_vocabulary            加载并解析词汇文件
+    generate_question          正常模式出题
+    generate_question_review   错题复习模式出题
+    evaluate_answer            判分（一半答对、一半答错）
+    save_wrong_answers         保存文本错题本
+    import_wrong_answers       从文本错题本导入错题（import_wrong_answers_from_file）
+    export_wrongbook           导出JSON错题本（与图形界面的导出按钮相同）
+    interactive_session        交互式测试流程中的一道题（模拟学生作答，含显示和统计，单位为每题）
+    fuzzy_search               容错查词（编辑距离 ≤ 2，对称删除索引，不含建立索引的时间）
+    grade_spelling             拼写模式判分（完全正确、拼写接近、答错各占三分之一，与所有可接受的写法比较）
+    reverse_lookup             中译英查词（完整词义和其中的两个字各占一半，不含建立索引的时间）
+    export_vocabulary          把整个模块导出为gzip压缩的CSV（单位为每条，不含解析词汇文件的时间）
+    incremental_reindex        词汇文件中修改一个条目、新增一个条目后增量重新加载，并更新单词、前缀、
+                               容错和词义索引（vocab_delta，不写回索引文件）
+
+用法:
+    python -m benchmarks.run_benchmarks                         # 默认规模 1k,10k,100k
+    python -m benchmarks.run_benchmarks --sizes 1000,1000000
+    python -m benchmarks.run_benchmarks --update-baseline       # 保存为新的基准
+    python -m benchmarks.run_benchmarks --check --threshold 0.3
+
+基准结果与机器有关，更换机器后应先用--update-baseline重新生成。
+同一台机器上的整体速度也会波动，因此退化判断使用相对于固定参考负载的耗时（见measure）。
+合成词汇文件缓存在data/benchmarks目录中，重复运行时不会重新生成。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from benchmarks.synthetic_vocab import write_vocabulary_file
+from fuzzy_search import FuzzyIndex, FuzzySearcher
+from gloss_index import GlossIndex
+from spelling import accepted_variants, grade_spelling
+from tester_io import ScriptedIO, SimulatedLearner
+from vocab_delta import apply_delta
+from vocab_export import export_vocabulary
+from vocabulary_store import VocabularyBank, make_wrong_info, make_wrongbook, split_glosses
+from vocabulary_tester import VocabularyTester
+from word_index import WordIndex
+from word_lookup import PrefixIndex
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_DIR, "data", "benchmarks")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# 相对耗时超过基准多少比例视为退化。在记录基准的共享测试机器上，同一份代码连续运行5次，
+# 各项目的相对耗时比基准最多高出61%，因此默认取75%；较安静的机器可以调低
+DEFAULT_THRESHOLD = 0.75
+
+BENCH_MODULE = "bench"
+
+# 文件读写类操作每轮的次数
+FILE_OPS = 10
+
+BENCHMARK_NAMES = ("load_vocabulary", "generate_question", "generate_question_review",
+                   "evaluate_answer", "save_wrong_answers", "import_wrong_answers", "export_wrongbook",
+                   "interactive_session", "fuzzy_search", "grade_spelling", "reverse_lookup",
+                   "export_vocabulary", "incremental_reindex")
+
+
+def vocabulary_file(size, seed=0, cache_dir=None):
+    """返回指定规模的合成词汇文件路径（不存在时生成）"""
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    path = os.path.join(cache_dir, f"synthetic_{size}_{seed}.json")
+    if not os.path.exists(path):
+        write_vocabulary_file(path, size, seed)
+    return path
+
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽被测代码的print输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _reference_workload():
+    table = {}
+    for i in range(50000):
+        table[str(i)] = i * 2
+    return sum(len(k) for k in table)
+
+
+def measure(fn, repeat):
+    """
+    多次运行取最快的一次
+
+    每次运行前先执行一个固定的参考负载，用"单次耗时 / 参考负载耗时"作为相对耗时，
+    以抵消机器整体速度的波动（CPU频率、其他进程），退化判断基于相对耗时。
+
+    Args:
+        fn: 被测函数，返回本次执行的操作次数
+        repeat: 运行次数
+
+    Returns:
+        dict: us为单次操作耗时（微秒），relative为相对耗时
+    """
+    best = best_relative = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _reference_workload()
+        reference = time.perf_counter() - started
+        started = time.perf_counter()
+        ops = fn()
+        elapsed = (time.perf_counter() - started) / ops
+        best = elapsed if best is None else min(best, elapsed)
+        relative = elapsed / reference
+        best_relative = relative if best_relative is None else min(best_relative, relative)
+    return {"us": round(best * 1e6, 3), "relative": round(best_relative, 8)}
+
+
+class CoreBenchmarks:
+    """
+    在一个合成词汇文件上运行所有测试项目
+
+    Args:
+        path: 合成词汇文件路径
+        work_dir: 保存错题本等输出文件的临时目录
+    """
+    def __init__(self, path, work_dir):
+        self.path = path
+        self.work_dir = work_dir
+        self.modules = {BENCH_MODULE: {"name": "bench", "file": os.path.basename(path)}}
+        self.tester = self.new_tester()
+        with quiet():
+            self.tester.load_vocabulary(BENCH_MODULE)
+        self.tester.test_mode = "chinese"
+        self.vocab = self.tester.vocab_data[BENCH_MODULE]
+        self.size = len(self.vocab)
+        # 出题类操作每轮的次数，词汇越多单次越慢，控制每轮总耗时
+        self.question_ops = max(20, min(2000, 2000000 // max(self.size, 1)))
+        step = max(1, self.size // 500)
+        self.wrong_items = [make_wrong_info(e['word'], e['definition'], "chinese", e['word'], "?")
+                            for e in self.vocab[::step][:500]]
+
+    def new_tester(self):
+        tester = VocabularyTester(VocabularyBank(os.path.dirname(self.path), self.modules))
+        tester.data_dir = self.work_dir
+        return tester
+
+    def bench_load_vocabulary(self):
+        def run():
+            with quiet():
+                self.new_tester().load_vocabulary(BENCH_MODULE)
+            return 1
+        return run
+
+    def bench_generate_question(self):
+        def run():
+            self.tester.review_mode = False
+            for _ in range(self.question_ops):
+                self.tester.generate_question()
+            return self.question_ops
+        return run
+
+    def bench_generate_question_review(self):
+        def run():
+            self.tester.review_mode = True
+            self.tester.wrong_answers = list(self.wrong_items[:50])
+            for _ in range(self.question_ops):
+                self.tester.generate_question()
+            self.tester.review_mode = False
+            return self.question_ops
+        return run
+
+    def bench_evaluate_answer(self):
+        self.tester.review_mode = False
+        questions = [self.tester.generate_question() for _ in range(2000)]
+        args = []
+        for i, q in enumerate(questions):
+            correct = q['correct_item']['word']
+            user = correct if i % 2 else q['options']['1'] + "?"
+            args.append((user, correct, q['correct_item']['word'], q['correct_item']['definition']))
+
+        def run():
+            self.tester.correct_answers = 0
+            self.tester.wrong_answers = []
+            self.tester.current_session_wrong_answers = []
+            for a in args:
+                self.tester.evaluate_answer(*a)
+            return len(args)
+        return run
+
+    def bench_save_wrong_answers(self):
+        def run():
+            self.tester.current_module = BENCH_MODULE
+            with quiet():
+                for _ in range(FILE_OPS):
+                    self.tester.wrong_answers = list(self.wrong_items)
+                    self.tester.save_wrong_answers()
+            return FILE_OPS
+        return run
+
+    def bench_import_wrong_answers(self):
+        self.tester.wrong_answers = list(self.wrong_items)
+        with quiet():
+            self.tester.save_wrong_answers()
+        path = max((os.path.join(self.work_dir, f) for f in os.listdir(self.work_dir) if f.endswith(".txt")),
+                   key=os.path.getmtime)
+
+        def run():
+            with quiet():
+                for _ in range(FILE_OPS):
+                    self.tester.wrong_answers = []
+                    self.tester.import_wrong_answers_from_file(path)
+            return FILE_OPS
+        return run
+
+    def bench_export_wrongbook(self):
+        path = os.path.join(self.work_dir, "wrong_book.json")
+
+        def run():
+            for _ in range(FILE_OPS):
+                content = make_wrongbook(self.wrong_items, BENCH_MODULE, "chinese")
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(content, f, ensure_ascii=False, indent=4)
+            return FILE_OPS
+        return run
+
+    def bench_interactive_session(self):
+        def run():
+            # 与self.tester共用已加载的词汇数据，只测量交互流程本身
+            learner = SimulatedLearner(module=BENCH_MODULE, questions=self.question_ops, seed=0)
+            VocabularyTester(self.tester.bank, ScriptedIO(learner)).start_test()
+            return self.question_ops
+        return run
+
+    def bench_fuzzy_search(self):
+        index = FuzzyIndex.build(entry['word'] for entry in self.vocab)
+        # 查询词: 随机单词各删掉一个字母再追加一个字母（编辑距离为1或2）
+        step = max(1, self.size // 200)
+        queries = [w[:len(w) // 2] + w[len(w) // 2 + 1:] + "e"
+                   for w in (entry['word'] for entry in self.vocab[::step][:200])]
+
+        def run():
+            for query in queries:
+                index.search(query)
+            return len(queries)
+        return run
+
+    def bench_grade_spelling(self):
+        step = max(1, self.size // 300)
+        cases = []
+        for i, entry in enumerate(self.vocab[::step][:300]):
+            word = entry['word']
+            answer = (word, word[:-1] + "e", word[::-1] + "x")[i % 3]
+            cases.append((answer, accepted_variants(word)))
+
+        def run():
+            for answer, variants in cases:
+                grade_spelling(answer, variants)
+            return len(cases)
+        return run
+
+    def bench_reverse_lookup(self):
+        word_index = WordIndex()
+        word_index.index_module(BENCH_MODULE, self.vocab)
+        index = GlossIndex.build(word_index, self.tester.bank, PrefixIndex.build(word_index, self.tester.bank))
+        step = max(1, self.size // 200)
+        queries = []
+        for i, entry in enumerate(self.vocab[::step][:200]):
+            gloss = split_glosses(entry['definition'])[-1]
+            queries.append(gloss if i % 2 else gloss[:2])
+
+        def run():
+            for query in queries:
+                index.search(query)
+            return len(queries)
+        return run
+
+    def bench_export_vocabulary(self):
+        path = os.path.join(self.work_dir, "export.csv.gz")
+
+        def run():
+            # 模块已加载，只测量转换、写出和压缩
+            return export_vocabulary(path, [BENCH_MODULE], "csv", self.tester.bank)
+        return run
+
+    def bench_incremental_reindex(self):
+        # 同一个模块的两个版本（中间的条目改了释义，末尾加了一个单词），用硬链接轮流替换词汇文件
+        with open(self.path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        directory = os.path.join(self.work_dir, "delta")
+        os.makedirs(directory, exist_ok=True)
+        versions = []
+        for version in range(2):
+            if version:
+                items[len(items) // 2]["translations"][0]["translation"] += "；新的词义"
+                items.append({"word": "zzincremental", "translations": [{"translation": "增量", "type": "n"}]})
+            path = os.path.join(directory, f"v{version}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("[\n" + ",\n".join(json.dumps(item, ensure_ascii=False) for item in items) + "\n]\n")
+            versions.append(path)
+        target = os.path.join(directory, "module.json")
+
+        def install(version):
+            tmp = target + ".tmp"
+            os.link(versions[version], tmp)
+            os.replace(tmp, target)
+
+        install(0)
+        bank = VocabularyBank(directory, {BENCH_MODULE: {"name": "bench", "file": "module.json"}})
+        word_index = WordIndex()
+        word_index.update(bank)
+        prefix_index = PrefixIndex.build(word_index, bank)
+        searcher = FuzzySearcher(word_index, prefix_index, os.path.join(directory, "fuzzy")).load_all()
+        gloss_index = GlossIndex.build(word_index, bank, prefix_index)
+        state = {"version": 0}
+
+        def run():
+            state["version"] ^= 1
+            install(state["version"])
+            delta = bank.reload_module(BENCH_MODULE)
+            apply_delta(delta, bank, word_index, prefix_index, searcher, gloss_index, save=False)
+            return 1
+        return run
+
+    def run(self, repeat=7, names=None):
+        """
+        运行测试项目
+
+        Args:
+            repeat: 每个项目的运行次数
+            names: 只运行这些项目，默认全部
+
+        Returns:
+            OrderedDict: 项目名称 -> measure的结果
+        """
+        results = OrderedDict()
+        for name in BENCHMARK_NAMES:
+            if names and name not in names:
+                continue
+            results[name] = measure(getattr(self, "bench_" + name)(), repeat)
+        return results
+
+
+def run_suite(sizes=DEFAULT_SIZES, repeat=7, names=None, cache_dir=None, seed=0):
+    """
+    在每种规模上运行所有测试项目
+
+    Returns:
+        OrderedDict: "项目@规模" -> measure的结果
+    """
+    results = OrderedDict()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            path = vocabulary_file(size, seed, cache_dir)
+            for name, value in CoreBenchmarks(path, work_dir).run(repeat, names).items():
+                results[f"{name}@{size}"] = value
+    return results
+
+
+def load_baseline(path=None):
+    """读取基准结果，不存在时返回空字典"""
+    path = path or DEFAULT_BASELINE
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def save_baseline(results, path=None):
+    """保存基准结果（与已有结果合并）"""
+    path = path or DEFAULT_BASELINE
+    merged = load_baseline(path)
+    merged.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": OrderedDict(sorted(merged.items()))
+        }, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    按相对耗时与基准结果比较
+
+    Returns:
+        list: (名称, 当前耗时, 基准耗时, 变化比例, 是否退化) 列表，耗时单位为微秒；
+              没有基准的项目基准耗时和变化比例为None
+    """
+    rows = []
+    for key, value in results.items():
+        base = baseline.get(key)
+        change = (value["relative"] - base["relative"]) / base["relative"] if base else None
+        rows.append((key, value["us"], base["us"] if base else None, change,
+                     change is not None and change > threshold))
+    return rows
+
+
+def format_table(rows):
+    lines = [f"{'benchmark':<36}{'us/op':>14}{'baseline':>14}{'change':>10}"]
+    for key, value, base, change, regressed in rows:
+        base_text = f"{base:>14.2f}" if base else f"{'-':>14}"
+        change_text = f"{change * 100:>+9.1f}%" if change is not None else f"{'-':>10}"
+        lines.append(f"{key:<36}{value:>14.2f}{base_text}{change_text}{'  退化' if regressed else ''}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="核心功能性能基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="合成词汇规模，多个用逗号分隔（默认1000,10000,100000）")
+    parser.add_argument("--repeat", type=int, default=7, help="每个项目的运行次数（默认7，取最快一次）")
+    parser.add_argument("--only", default="", help="只运行这些项目，多个用逗号分隔")
+    parser.add_argument("--baseline", default=None, help="基准结果文件（默认benchmarks/baselines.json）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="退化阈值，0.5表示比基准慢50%%以上视为退化（默认0.5）")
+    parser.add_argument("--check", action="store_true", help="有退化时以状态码1退出")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果保存为基准")
+    parser.add_argument("--json", default=None, help="把本次结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or None
+    results = run_suite(sizes, args.repeat, names)
+    rows = compare(results, load_baseline(args.baseline), args.threshold)
+    print(format_table(rows))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.update_baseline:
+        print(f"基准结果已保存: {save_baseline(results, args.baseline)}")
+    regressions = [r for r in rows if r[4]]
+    if regressions:
+        print(f"\n{len(regressions)} 个项目超过退化阈值（{args.threshold * 100:.0f}%）")
+        if args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动性能基准测试
+
+每次都在新的Python进程中测量（模块缓存不会影响结果），单位为微秒:
+    import_main         导入main.py（命令行和测试子进程的入口）
+    import_gui          导入gui.py
+    gui_first_paint     从进程开始到主窗口第一次绘制完成（含导入）
+    gui_ready           从进程开始到推迟的启动工作全部完成（读取数据文件、主题、发音服务、预启动子进程）
+
+没有图形显示环境（例如没有DISPLAY的服务器）时跳过gui_first_paint和gui_ready。
+结果与 benchmarks/baselines.json 中的基准比较，判断方法与run_benchmarks相同。
+
+用法:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --check
+    python -m benchmarks.startup --update-baseline
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+from benchmarks.run_benchmarks import (DEFAULT_THRESHOLD, PROJECT_DIR, _reference_workload, compare,
+                                       format_table, load_baseline, save_baseline)
+
+STARTUP_NAMES = ("import_main", "import_gui", "gui_first_paint", "gui_ready")
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import {module}
+print("import_{module}", time.perf_counter() - started)
+"""
+
+GUI_SNIPPET = """
+import time
+started = time.perf_counter()
+import tkinter as tk
+from gui import VocabularyTestGUI
+try:
+    root = tk.Tk()
+except tk.TclError:
+    raise SystemExit(0)
+app = VocabularyTestGUI(root)
+while not root.winfo_viewable():
+    root.update()
+root.update_idletasks()
+print("gui_first_paint", time.perf_counter() - started)
+while app.deferred_tasks:
+    root.update()
+print("gui_ready", time.perf_counter() - started)
+app.exit_program()
+"""
+
+
+def run_snippet(snippet):
+    """
+    在新的Python进程中运行测量代码
+
+    Returns:
+        dict: 项目名 -> 耗时（秒）；没有输出的项目（被跳过）不包含在内
+    """
+    env = dict(os.environ)
+    env.pop("VT_PROFILE", None)
+    env.pop("VT_METRICS", None)
+    result = subprocess.run([sys.executable, "-c", snippet], cwd=PROJECT_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"测量进程退出码 {result.returncode}")
+    timings = {}
+    for line in result.stdout.splitlines():
+        name, _, value = line.partition(" ")
+        if name in STARTUP_NAMES:
+            timings[name] = float(value)
+    return timings
+
+
+def run_startup(repeat=5, names=None):
+    """
+    多次测量取最快的一次（相对耗时的计算方法与run_benchmarks.measure相同）
+
+    Returns:
+        OrderedDict: "startup_项目" -> {"us": 微秒, "relative": 相对耗时}
+    """
+    names = names or STARTUP_NAMES
+    snippets = [IMPORT_SNIPPET.format(module=m) for m in ("main", "gui") if f"import_{m}" in names]
+    if "gui_first_paint" in names or "gui_ready" in names:
+        snippets.append(GUI_SNIPPET)
+
+    best = {}
+    for _ in range(repeat):
+        for snippet in snippets:
+            started = time.perf_counter()
+            _reference_workload()
+            reference = time.perf_counter() - started
+            for name, elapsed in run_snippet(snippet).items():
+                value = best.setdefault(name, [elapsed, elapsed / reference])
+                value[0] = min(value[0], elapsed)
+                value[1] = min(value[1], elapsed / reference)
+    return OrderedDict((f"startup_{name}", {"us": round(best[name][0] * 1e6, 3),
+                                            "relative": round(best[name][1], 8)})
+                       for name in STARTUP_NAMES if name in best and name in names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="启动性能基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个项目的运行次数（默认5，取最快一次）")
+    parser.add_argument("--only", default="", help="只运行这些项目，多个用逗号分隔")
+    parser.add_argument("--baseline", default=None, help="基准结果文件（默认benchmarks/baselines.json）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="退化阈值，0.5表示比基准慢50%%以上视为退化（默认0.5）")
+    parser.add_argument("--check", action="store_true", help="有退化时以状态码1退出")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果保存为基准")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or None
+    results = run_startup(args.repeat, names)
+    rows = compare(results, load_baseline(args.baseline), args.threshold)
+    print(format_table(rows))
+    if not any(key.startswith("startup_gui_") for key in results) and (names is None or "gui_first_paint" in names):
+        print("\n没有图形显示环境，已跳过gui_first_paint和gui_ready")
+
+    if args.update_baseline:
+        print(f"基准结果已保存: {save_baseline(results, args.baseline)}")
+    regressions = [r for r in rows if r[4]]
+    if regressions:
+        print(f"\n{len(regressions)} 个项目超过退化阈值（{args.threshold * 100:.0f}%）")
+        if args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
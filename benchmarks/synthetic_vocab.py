@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成词汇文件生成器
+
+生成与json/目录中词汇文件结构相同的合成数据（word / translations / phrases），
+用于在1千到1百万条的不同规模下做性能测试。相同的规模和种子总是生成相同的文件。
+
+用法:
+    python -m benchmarks.synthetic_vocab --size 100000 --output /tmp/vocab_100k.json
+"""
+import argparse
+import json
+import os
+import random
+import string
+
+# 生成释义用的常用汉字
+CHINESE_CHARS = ("的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说"
+                 "产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点"
+                 "从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又")
+POS_TAGS = ("n", "v", "adj", "adv", "prep", "conj")
+
+
+def _definition(rng):
+    parts = ["".join(rng.choice(CHINESE_CHARS) for _ in range(rng.randint(1, 4)))
+             for _ in range(rng.randint(1, 3))]
+    return "，".join(parts)
+
+
+def generate_entries(size, seed=0, max_phrases=16):
+    """
+    逐个生成合成词汇条目
+
+    Args:
+        size: 条目数量
+        seed: 随机数种子
+        max_phrases: 每个单词最多的短语数
+
+    Yields:
+        dict: 与词汇文件格式相同的原始条目
+    """
+    rng = random.Random(seed)
+    seen = set()
+    words = []
+    while len(seen) < size:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 12)))
+        if word in seen:
+            continue
+        seen.add(word)
+        words.append(word)
+        translations = [{"translation": _definition(rng), "type": rng.choice(POS_TAGS)}
+                        for _ in range(rng.randint(1, 3))]
+        phrases = []
+        for _ in range(rng.randint(0, max_phrases)):
+            other = rng.choice(words)
+            phrases.append({"phrase": f"{word} {other}" if rng.random() < 0.5 else f"{other} {word}",
+                            "translation": _definition(rng)})
+        yield {"word": word, "translations": translations, "phrases": phrases}
+
+
+def write_vocabulary_file(path, size, seed=0):
+    """
+    把合成词汇写入JSON文件（逐条写出，不在内存中构建整个列表）
+
+    Args:
+        path: 输出路径
+        size: 条目数量
+        seed: 随机数种子
+
+    Returns:
+        str: 输出路径
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, entry in enumerate(generate_entries(size, seed)):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(entry, ensure_ascii=False))
+        f.write("\n]\n")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成合成词汇文件")
+    parser.add_argument("--size", type=int, default=10000, help="条目数量（默认10000）")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子（默认0）")
+    parser.add_argument("--output", required=True, help="输出文件路径")
+    args = parser.parse_args(argv)
+    write_vocabulary_file(args.output, args.size, args.seed)
+    print(f"已生成 {args.size} 个条目: {args.output}（{os.path.getsize(args.output) / 1024 / 1024:.1f} MB）")
+
+
+if __name__ == "__main__":
+    main()
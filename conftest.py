@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试共用的夹具：在临时目录中写入两个小的词汇模块（a、b），并读取或建立它们的单词索引和前缀索引
+
+    def test_xxx(vocab_files):
+        vocab_files.write("a.json", ["abandon", vocab_item("able", "能够的", pos="adj")])
+        bank, index, prefix_index = vocab_files.indexes()
+
+直接运行测试脚本（不经过pytest）时用 VocabFiles(pathlib.Path(tempfile.mkdtemp())) 代替夹具。
+"""
+import json
+import os
+
+import pytest
+
+from vocabulary_store import VocabularyBank
+from word_index import load_word_index
+from word_lookup import load_prefix_index
+
+MODULES = {
+    "a": {"name": "A", "file": "a.json"},
+    "b": {"name": "B", "file": "b.json"},
+}
+
+
+def vocab_item(word, *senses, pos=""):
+    """
+    Returns:
+        dict: 词汇文件中的一个原始条目；没有给出义项时释义为"<单词>的释义"
+    """
+    senses = senses or (f"{word}的释义",)
+    return {"word": word, "translations": [{"translation": s, "type": pos} for s in senses]}
+
+
+class VocabFiles:
+    """
+    临时目录中的词汇文件（模块配置为MODULES）
+
+    Attributes:
+        directory: 词汇文件和索引文件所在的目录（pathlib.Path）
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, name):
+        return os.path.join(str(self.directory), name)
+
+    def write(self, name, items, mtime=1):
+        """
+        写入词汇文件并设置修改时间（使文件指纹可以预测）
+
+        Args:
+            name: 文件名
+            items: 单词（释义为"<单词>的释义"）或原始条目字典的列表
+            mtime: 修改时间（纳秒），None表示不修改
+
+        Returns:
+            str: 文件路径
+        """
+        path = self.path(name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([vocab_item(item) if isinstance(item, str) else item for item in items], f,
+                      ensure_ascii=False, indent=1)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+        return path
+
+    def bank(self):
+        """新的VocabularyBank（不共享已加载的数据）"""
+        return VocabularyBank(str(self.directory), MODULES)
+
+    def indexes(self, bank=None):
+        """
+        读取（或建立并保存）临时目录中的单词索引和前缀索引
+
+        Returns:
+            tuple: (VocabularyBank, WordIndex, PrefixIndex)
+        """
+        bank = bank or self.bank()
+        index_path = self.path("index.json")
+        index = load_word_index(index_path, bank)
+        return bank, index, load_prefix_index(self.path("prefix.json"), bank, index_path)
+
+
+@pytest.fixture
+def vocab_files(tmp_path):
+    return VocabFiles(tmp_path)
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 容错查词（编辑距离 ≤ 2）
+
+学生查词时经常拼错。逐个计算编辑距离在10万词上太慢，这里使用对称删除（symmetric delete）索引:
+两个单词的编辑距离不超过d时，各自删除至多d个字母后一定能得到相同的字符串。
+建立索引时为每个单词生成所有"删除至多d个字母"的变体；查询时只需对查询词生成变体并查表，
+得到的少量候选再用有界的编辑距离（相邻字母对调算一次编辑）确认和排序。
+
+索引按模块建立并保存在data/fuzzy/<模块ID>.idx中（词汇文件变化时只增删该模块中有变化的单词）:
+    变体用crc32压缩为32位，与单词下标拼成64位整数，排好序保存在array('Q')中，查询时二分查找；
+    哈希冲突只会多出几个候选，会在确认距离时被排除。
+
+    searcher = get_fuzzy_searcher()
+    searcher.search("abandn")
+    # -> [{"word": "abandon", "definition": "...", "modules": ["4", "7"], "distance": 1}, ...]
+
+命令行:
+    python fuzzy_search.py abandn recieve --top 5
+"""
+import argparse
+import bisect
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+
+from word_index import get_word_index, normalize_word
+from word_lookup import get_prefix_index
+
+# 索引目录
+DEFAULT_FUZZY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "fuzzy")
+
+# 默认最大编辑距离
+MAX_DISTANCE = 2
+
+# 文件格式: 魔数、版本、最大编辑距离、元数据(JSON)长度，之后是元数据和排好序的64位键
+FUZZY_MAGIC = b"VTFZ"
+FUZZY_VERSION = 2
+HEADER = struct.Struct("<4sHHI")
+
+# 增量更新后附加和删除的单词超过 max(COMPACT_MIN, 单词数 × COMPACT_RATIO) 时重新建立索引
+COMPACT_MIN = 64
+COMPACT_RATIO = 0.05
+
+DEFAULT_TOP = 10
+
+
+def deletes(word, max_distance=MAX_DISTANCE):
+    """
+    Returns:
+        set: 从word中删除至多max_distance个字母得到的所有字符串（含word本身）
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def _hash(text):
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def edit_distance(a, b, max_distance=MAX_DISTANCE):
+    """
+    有界的编辑距离（插入、删除、替换和相邻字母对调各算一次）
+
+    Returns:
+        int: 距离；超过max_distance时返回max_distance + 1
+    """
+    if a == b:
+        return 0
+    limit = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return limit
+    # 去掉相同的前缀和后缀，候选词通常只有中间几个字母不同
+    la, lb = len(a), len(b)
+    shorter = min(la, lb)
+    start = 0
+    while start < shorter and a[start] == b[start]:
+        start += 1
+    suffix = 0
+    while suffix < shorter - start and a[la - 1 - suffix] == b[lb - 1 - suffix]:
+        suffix += 1
+    a = a[start:la - suffix]
+    b = b[start:lb - suffix]
+    la, lb = len(a), len(b)
+    if not la or not lb:
+        return min(la + lb, limit)
+
+    # 只计算对角线附近 |i - j| <= max_distance 的格子，带外的格子视为超出距离
+    previous2 = None
+    previous = [j if j <= max_distance else limit for j in range(lb + 1)]
+    for i in range(1, la + 1):
+        current = [limit] * (lb + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(max(1, i - max_distance), min(lb, i + max_distance) + 1):
+            cb = b[j - 1]
+            value = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if previous2 is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb and \
+                    previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min >= limit:
+            return limit
+        previous2, previous = previous, current
+    return min(previous[lb], limit)
+
+
+class FuzzyIndex:
+    """
+    一个模块的对称删除索引
+
+    词汇文件变化时增量更新（apply）：新增的单词追加在words末尾，它们的变体保存在
+    附加表extra中；删除的单词只记录在removed中，查询时跳过。附加和删除的单词
+    超过COMPACT_RATIO时重新建立整个索引。
+    """
+    def __init__(self, words, keys, fingerprint=None, max_distance=MAX_DISTANCE, base=None, removed=()):
+        """
+        Args:
+            words: 模块中不重复的规范化单词
+            keys: 排好序的 (crc32(变体) << 32 | 单词下标)，只包含前base个单词
+            fingerprint: 词汇文件的指纹
+            max_distance: 建立索引时的最大编辑距离
+            base: keys中包含的单词数，默认为全部（之后的单词的变体放在附加表中）
+            removed: 已删除的单词下标
+        """
+        self.words = list(words)
+        self.keys = keys
+        self.fingerprint = fingerprint
+        self.max_distance = max_distance
+        self.base = len(self.words) if base is None else base
+        self.removed = set(removed)
+        self.positions = {word: position for position, word in enumerate(self.words)}
+        self.extra = {}
+        for position in range(self.base, len(self.words)):
+            self._add_variants(position)
+
+    @classmethod
+    def build(cls, words, fingerprint=None, max_distance=MAX_DISTANCE):
+        words = sorted(set(words))
+        keys = array("Q", sorted({(_hash(variant) << 32) | position
+                                  for position, word in enumerate(words)
+                                  for variant in deletes(word, max_distance)}))
+        return cls(words, keys, fingerprint, max_distance)
+
+    def _add_variants(self, position):
+        for variant in deletes(self.words[position], self.max_distance):
+            self.extra.setdefault(_hash(variant), []).append(position)
+
+    def live_words(self):
+        """
+        Returns:
+            set: 索引中（未删除的）单词
+        """
+        removed = self.removed
+        return {word for position, word in enumerate(self.words) if position not in removed}
+
+    def apply(self, added=(), removed=()):
+        """
+        增量更新索引
+
+        Args:
+            added: 新增的规范化单词
+            removed: 删除的规范化单词
+        """
+        for word in removed:
+            position = self.positions.get(word)
+            if position is not None:
+                self.removed.add(position)
+        for word in added:
+            position = self.positions.get(word)
+            if position is not None:
+                self.removed.discard(position)
+                continue
+            position = self.positions[word] = len(self.words)
+            self.words.append(word)
+            self._add_variants(position)
+        if len(self.words) - self.base + len(self.removed) > max(COMPACT_MIN, self.base * COMPACT_RATIO):
+            self.compact()
+
+    def compact(self):
+        """重新建立索引：附加表中的单词合并进keys，去掉已删除的单词"""
+        fresh = FuzzyIndex.build(self.live_words(), self.fingerprint, self.max_distance)
+        self.words, self.keys, self.base = fresh.words, fresh.keys, fresh.base
+        self.positions, self.extra, self.removed = fresh.positions, fresh.extra, fresh.removed
+
+    def update_words(self, words):
+        """
+        把索引更新为给定的单词集合（只增删有差别的单词）
+
+        Returns:
+            tuple: (新增的单词数, 删除的单词数)
+        """
+        words = set(words)
+        live = self.live_words()
+        added = words - live
+        removed = live - words
+        self.apply(added, removed)
+        return len(added), len(removed)
+
+    def candidates(self, variants):
+        """
+        Args:
+            variants: 查询词的删除变体
+
+        Returns:
+            set: 可能在距离内的单词下标
+        """
+        keys = self.keys
+        extra = self.extra
+        positions = set()
+        for variant in variants:
+            h = _hash(variant)
+            if extra:
+                positions.update(extra.get(h, ()))
+            h <<= 32
+            lo = bisect.bisect_left(keys, h)
+            hi = bisect.bisect_left(keys, h + (1 << 32), lo)
+            positions.update(key & 0xFFFFFFFF for key in keys[lo:hi])
+        if self.removed:
+            positions -= self.removed
+        return positions
+
+    def search(self, query, max_distance=MAX_DISTANCE, variants=None):
+        """
+        Returns:
+            list: (距离, 规范化单词) 列表
+        """
+        query = normalize_word(query)
+        max_distance = min(max_distance, self.max_distance)
+        if variants is None:
+            variants = deletes(query, max_distance)
+        results = []
+        for position in self.candidates(variants):
+            word = self.words[position]
+            distance = edit_distance(query, word, max_distance)
+            if distance <= max_distance:
+                results.append((distance, word))
+        return results
+
+    def save(self, path):
+        """写入索引文件（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        meta = json.dumps({"fingerprint": self.fingerprint, "words": self.words, "base": self.base,
+                           "removed": sorted(self.removed)},
+                          ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(FUZZY_MAGIC, FUZZY_VERSION, self.max_distance, len(meta)))
+            f.write(meta)
+            self.keys.tofile(f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Returns:
+            FuzzyIndex: 文件不存在或格式不对时返回None
+        """
+        try:
+            with open(path, "rb") as f:
+                magic, version, max_distance, meta_len = HEADER.unpack(f.read(HEADER.size))
+                if magic != FUZZY_MAGIC or version != FUZZY_VERSION:
+                    return None
+                meta = json.loads(f.read(meta_len).decode("utf-8"))
+                keys = array("Q")
+                keys.frombytes(f.read())
+        except (OSError, ValueError, struct.error):
+            return None
+        return cls(meta["words"], keys, meta["fingerprint"], max_distance, meta["base"], meta["removed"])
+
+
+class FuzzySearcher:
+    """
+    在所有模块中容错查词
+    """
+    def __init__(self, word_index, prefix_index, directory=None):
+        """
+        Args:
+            word_index: WordIndex（提供每个模块的单词和文件指纹）
+            prefix_index: PrefixIndex（提供原始拼写、释义和所在模块）
+            directory: 索引文件目录，默认为data/fuzzy
+        """
+        self.word_index = word_index
+        self.prefix_index = prefix_index
+        self.directory = directory or DEFAULT_FUZZY_DIR
+        self.indexes = {}
+        self._lock = threading.Lock()
+
+    def module_index(self, module_id):
+        """
+        返回模块的索引（读取保存的索引，与词汇文件不一致时重新建立并保存）
+
+        Returns:
+            FuzzyIndex
+        """
+        index = self.indexes.get(module_id)
+        if index is not None:
+            return index
+        with self._lock:
+            index = self.indexes.get(module_id)
+            if index is None:
+                info = self.word_index.modules[module_id]
+                path = os.path.join(self.directory, f"{module_id}.idx")
+                index = FuzzyIndex.load(path)
+                words = (self.word_index.word(i) for i in info["ids"])
+                if index is None or index.max_distance < MAX_DISTANCE:
+                    index = FuzzyIndex.build(words, info["fingerprint"])
+                elif index.fingerprint != info["fingerprint"]:
+                    # 词汇文件有变化：只增删有差别的单词
+                    index.update_words(words)
+                    index.fingerprint = info["fingerprint"]
+                else:
+                    path = None
+                if path is not None:
+                    try:
+                        index.save(path)
+                    except OSError:
+                        pass
+                self.indexes[module_id] = index
+        return index
+
+    def apply(self, module_id, word_ids):
+        """
+        词汇文件增量更新后，按受影响的单词更新已读取的模块索引（见vocab_delta）
+
+        Args:
+            module_id: 变化的模块
+            word_ids: 新增、删除或修改的单词ID（self.word_index已经应用了变化）
+        """
+        index = self.indexes.get(module_id)
+        info = self.word_index.modules.get(module_id)
+        if index is None or info is None:
+            return
+        added = []
+        removed = []
+        for word_id in word_ids:
+            word = self.word_index.word(word_id)
+            present = any(m == module_id for m, _ in self.word_index.postings.get(word_id, ()))
+            position = index.positions.get(word)
+            indexed = position is not None and position not in index.removed
+            if present and not indexed:
+                added.append(word)
+            elif indexed and not present:
+                removed.append(word)
+        with self._lock:
+            index.apply(added, removed)
+            index.fingerprint = info["fingerprint"]
+
+    def save(self, module_id):
+        """把已读取的模块索引写回文件"""
+        index = self.indexes.get(module_id)
+        if index is not None:
+            index.save(os.path.join(self.directory, f"{module_id}.idx"))
+
+    def load_all(self):
+        """读取（或建立）所有模块的索引，之后的查询不再有读文件的延迟"""
+        for module_id in list(self.word_index.modules):
+            self.module_index(module_id)
+        return self
+
+    def search(self, query, max_distance=MAX_DISTANCE, k=DEFAULT_TOP, modules=None):
+        """
+        容错查词
+
+        Args:
+            query: 查询的单词（可能拼错）
+            max_distance: 最大编辑距离（不超过2）
+            k: 最多返回的条数
+            modules: 只在这些模块中查找，默认为所有已索引的模块
+
+        Returns:
+            list: {"word", "definition", "modules", "distance"} 字典列表，
+                  按距离、所在模块数（常用程度）、长度差和字母顺序排序
+        """
+        query = normalize_word(query)
+        if not query:
+            return []
+        max_distance = min(max_distance, MAX_DISTANCE)
+        variants = deletes(query, max_distance)
+        best = {}
+        for module_id in (modules if modules is not None else list(self.word_index.modules)):
+            for distance, word in self.module_index(str(module_id)).search(query, max_distance, variants):
+                if distance < best.get(word, max_distance + 1):
+                    best[word] = distance
+        results = []
+        for word, distance in best.items():
+            item = self.prefix_index.lookup(word)
+            if item is not None:
+                item["distance"] = distance
+                results.append(item)
+        results.sort(key=lambda r: (r["distance"], -len(r["modules"]),
+                                    abs(len(r["word"]) - len(query)), r["word"].lower()))
+        return results[:k]
+
+
+_shared_searcher = None
+_shared_searcher_lock = threading.Lock()
+
+
+def get_fuzzy_searcher():
+    """
+    返回进程内共享的容错查词器
+
+    Returns:
+        FuzzySearcher: 共享实例
+    """
+    global _shared_searcher
+    if _shared_searcher is None:
+        with _shared_searcher_lock:
+            if _shared_searcher is None:
+                _shared_searcher = FuzzySearcher(get_word_index(), get_prefix_index())
+    return _shared_searcher
+
+
+def main(argv=None):
+    from word_lookup import format_results
+
+    parser = argparse.ArgumentParser(description="容错查词（编辑距离不超过2）")
+    parser.add_argument("words", nargs="+", help="要查询的单词（可以拼错）")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"最多显示的条数（默认{DEFAULT_TOP}）")
+    parser.add_argument("--distance", type=int, default=MAX_DISTANCE, choices=(0, 1, 2), help="最大编辑距离（默认2）")
+    args = parser.parse_args(argv)
+
+    searcher = get_fuzzy_searcher()
+    status = 0
+    for word in args.words:
+        results = searcher.search(word, args.distance, args.top)
+        if len(args.words) > 1:
+            print(f"== {word} ==")
+        if results:
+            print(format_results(results))
+        else:
+            print(f"没有与 {word} 相近的单词")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 中文释义倒排索引（中译英查词与按词义判分）
+
+每个条目的所有义项先按split_glosses拆成单个词义（"区别，辨别；有差别地对待" ->
+"区别"、"辨别"、"有差别地对待"），再用gloss_key去掉空白和括号中的注释作为键:
+
+    词义 -> 含有这个词义的单词        精确查找与判分
+    单字和双字片段 -> 含有它的词义     部分匹配（查询的片段命中一半以上的词义）
+
+中译英查词和判断输入的中文释义是否正确都只需要查表，不需要逐条扫描释义:
+
+    index = get_gloss_index()
+    index.search("歧视")                # -> [{"word": "discriminate", "definition": "...",
+                                       #       "modules": ["4"], "gloss": "歧视"}, ...]
+    index.matches("discriminate", "区别")   # -> True
+
+索引在第一次使用时从所有模块建立（只在内存中），词汇文件变化时只增删受影响单词的词义（见vocab_delta）。
+
+命令行:
+    python main.py lookup 歧视
+    python gloss_index.py 歧视 放弃 --top 5
+"""
+import argparse
+import bisect
+import heapq
+import re
+import sys
+import threading
+from array import array
+from collections import Counter
+
+from vocabulary_store import get_shared_bank, split_glosses
+from word_index import WordIndex, get_word_index, normalize_word
+from word_lookup import get_prefix_index
+
+# 字符n-gram的长度：索引同时保存单字和双字片段，一个字的查询使用单字，其余使用双字
+NGRAM = 2
+
+# 部分匹配时查询的n-gram至少要命中的比例
+MIN_OVERLAP = 0.5
+
+DEFAULT_TOP = 10
+
+# 括号中的注释，例如 "（使）变小"、"码（英制长度单位）"
+_NOTE_RE = re.compile(r"[（(\[〔【][^）)\]〕】]*[）)\]〕】]")
+_SPACE_RE = re.compile(r"\s+")
+_CJK_RE = re.compile("[㐀-鿿]")
+
+
+def gloss_key(gloss):
+    """
+    Returns:
+        str: 词义的索引键（去掉空白和括号中的注释；只有注释时保留注释本身）
+    """
+    key = _SPACE_RE.sub("", gloss)
+    stripped = _NOTE_RE.sub("", key)
+    return (stripped or key).lower()
+
+
+def ngrams(key, n=NGRAM):
+    """
+    Returns:
+        set: 键中所有长度为n的片段（键不足n个字时为键本身）
+    """
+    if len(key) <= n:
+        return {key} if key else set()
+    return {key[i:i + n] for i in range(len(key) - n + 1)}
+
+
+def query_grams(key):
+    """查询使用的片段：一个字的查询为这个字，否则为双字片段"""
+    return ngrams(key, 1 if len(key) == 1 else NGRAM)
+
+
+def entry_gloss_keys(entry):
+    """
+    Returns:
+        set: 条目所有义项中的词义键
+    """
+    keys = set()
+    for _, text in getattr(entry, 'senses', (('', entry['definition']),)):
+        keys.update(gloss_key(g) for g in split_glosses(text))
+    keys.discard("")
+    return keys
+
+
+def is_chinese_query(text):
+    """查询中含有汉字时按中文释义查找"""
+    return _CJK_RE.search(text) is not None
+
+
+class GlossIndex:
+    """
+    从词义和字符n-gram到单词的倒排索引
+
+    Attributes:
+        words: 单词下标 -> 规范化单词
+        gloss_keys: 词义下标 -> 词义键
+        gloss_words: 词义下标 -> 含有该词义的单词下标（升序array）
+        grams: 单字或双字片段 -> 含有它的词义下标（升序array）
+    """
+    def __init__(self, words, gloss_keys, gloss_words, grams, prefix_index=None):
+        self.words = list(words)
+        self.word_ids = {word: i for i, word in enumerate(self.words)}
+        self.gloss_keys = list(gloss_keys)
+        self.gloss_ids = {key: i for i, key in enumerate(self.gloss_keys)}
+        self.gloss_words = gloss_words
+        self.grams = grams
+        self.prefix_index = prefix_index
+
+    def __len__(self):
+        return len(self.gloss_keys)
+
+    @classmethod
+    def build(cls, word_index, bank=None, prefix_index=None):
+        """
+        从单词索引建立词义索引
+
+        Args:
+            word_index: WordIndex（提供每个单词在各模块中的出现位置）
+            bank: 读取义项的VocabularyBank，默认为共享实例
+            prefix_index: 提供查询结果中原始拼写、释义和所在模块的PrefixIndex
+        """
+        return cls._build(word_index, (bank or get_shared_bank()).get_module, prefix_index)
+
+    @classmethod
+    def from_entries(cls, entries, prefix_index=None):
+        """
+        只从一组词汇条目建立词义索引（例如测试器当前模块的词汇，用于判分时不需要建立所有模块的索引）
+
+        Args:
+            entries: 词汇条目序列
+            prefix_index: 同build
+        """
+        word_index = WordIndex()
+        word_index.index_module("", entries)
+        return cls._build(word_index, lambda module_id: entries, prefix_index)
+
+    @classmethod
+    def _build(cls, word_index, get_module, prefix_index):
+        words = []
+        postings = {}
+        for word_id, places in word_index.postings.items():
+            if not places:
+                continue
+            position = len(words)
+            words.append(word_index.word(word_id))
+            keys = set()
+            for module_id, i in places:
+                keys |= entry_gloss_keys(get_module(module_id)[i])
+            for key in keys:
+                postings.setdefault(key, []).append(position)
+
+        gloss_keys = sorted(postings)
+        gloss_words = [array("I", postings[key]) for key in gloss_keys]
+        grams = {}
+        for gloss_id, key in enumerate(gloss_keys):
+            for gram in ngrams(key, 1) | ngrams(key):
+                grams.setdefault(gram, array("I")).append(gloss_id)
+        return cls(words, gloss_keys, gloss_words, grams, prefix_index)
+
+    def apply(self, word_index, word_ids, bank=None, old_entries=()):
+        """
+        词汇文件增量更新后，增删受影响单词的词义（见vocab_delta）
+
+        Args:
+            word_index: 已经应用了变化的WordIndex
+            word_ids: 新增、删除或修改的单词ID
+            bank: 读取义项的VocabularyBank，默认为共享实例
+            old_entries: 被删除或修改的旧条目（提供这些单词原来的词义）
+        """
+        bank = bank or get_shared_bank()
+        old_by_word = {}
+        for entry in old_entries:
+            old_by_word.setdefault(normalize_word(entry['word']), []).append(entry)
+        for word_id in word_ids:
+            word = word_index.word(word_id)
+            keys = set()
+            for module_id, i in word_index.postings.get(word_id, ()):
+                keys |= entry_gloss_keys(bank.get_module(module_id)[i])
+            position = self.word_ids.get(word)
+            if position is None:
+                if not keys:
+                    continue
+                position = self.word_ids[word] = len(self.words)
+                self.words.append(word)
+            # 原来的词义来自旧条目和仍然存在的条目，只需要在这些词义中确认
+            old_keys = set()
+            for key in keys.union(*(entry_gloss_keys(e) for e in old_by_word.get(word, ()))):
+                gloss_id = self.gloss_ids.get(key)
+                if gloss_id is not None:
+                    ids = self.gloss_words[gloss_id]
+                    i = bisect.bisect_left(ids, position)
+                    if i < len(ids) and ids[i] == position:
+                        old_keys.add(key)
+            for key in old_keys - keys:
+                ids = self.gloss_words[self.gloss_ids[key]]
+                del ids[bisect.bisect_left(ids, position)]
+            for key in keys - old_keys:
+                gloss_id = self.gloss_ids.get(key)
+                if gloss_id is None:
+                    gloss_id = self.gloss_ids[key] = len(self.gloss_keys)
+                    self.gloss_keys.append(key)
+                    self.gloss_words.append(array("I"))
+                    for gram in ngrams(key, 1) | ngrams(key):
+                        self.grams.setdefault(gram, array("I")).append(gloss_id)
+                ids = self.gloss_words[gloss_id]
+                ids.insert(bisect.bisect_left(ids, position), position)
+
+    def word_ids_for(self, gloss):
+        """
+        Returns:
+            array: 含有这个词义的单词下标（升序）；没有时为空
+        """
+        gloss_id = self.gloss_ids.get(gloss_key(gloss))
+        return self.gloss_words[gloss_id] if gloss_id is not None else array("I")
+
+    def matches(self, word, answer):
+        """
+        按词义判分：answer中的任意一个词义是word的词义时算对
+
+        Args:
+            word: 单词
+            answer: 用户输入的中文释义（可以包含多个用，；分隔的词义）
+
+        Returns:
+            bool: 是否匹配
+        """
+        word_id = self.word_ids.get(normalize_word(word))
+        if word_id is None:
+            return False
+        for gloss in split_glosses(answer):
+            ids = self.word_ids_for(gloss)
+            i = bisect.bisect_left(ids, word_id)
+            if i < len(ids) and ids[i] == word_id:
+                return True
+        return False
+
+    def candidates(self, query):
+        """
+        Returns:
+            list: 按排序键排好序的 (排序键, 词义下标) 列表；排序键为
+                  (0表示词义完全相同、1表示部分匹配, -命中的片段数, 词义与查询的长度差)
+        """
+        key = gloss_key(query)
+        if not key:
+            return []
+        exact = self.gloss_ids.get(key)
+        grams = query_grams(key)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self.grams.get(gram, ()))
+        needed = max(1, round(len(grams) * MIN_OVERLAP))
+        gloss_keys = self.gloss_keys
+        results = [((gloss_id != exact, -count, abs(len(gloss_keys[gloss_id]) - len(key))), gloss_id)
+                   for gloss_id, count in hits.items() if count >= needed]
+        results.sort()
+        return results
+
+    def search(self, query, k=DEFAULT_TOP):
+        """
+        中译英查词
+
+        Args:
+            query: 中文释义或其中的一部分
+            k: 最多返回的条数
+
+        Returns:
+            list: {"word", "definition", "modules", "gloss"} 字典列表，
+                  词义完全相同的在前，之后按命中的片段数、长度差、所在模块数和单词排序
+        """
+        prefix_index = self.prefix_index or get_prefix_index()
+        # 按排序键从好到差处理词义，一组排序键相同的词义处理完后已有k个单词时，后面的都不会进入结果
+        ranked = []
+        seen = set()
+        last_rank = None
+        for rank, gloss_id in self.candidates(query):
+            if rank != last_rank:
+                if len(ranked) >= k:
+                    break
+                last_rank = rank
+            for word_id in self.gloss_words[gloss_id]:
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                i = prefix_index.position(self.words[word_id])
+                if i is not None:
+                    ranked.append(((rank, -len(prefix_index.modules[i]), len(prefix_index.keys[i]),
+                                    prefix_index.keys[i]), i, gloss_id))
+        results = []
+        for _, i, gloss_id in heapq.nsmallest(k, ranked):
+            item = prefix_index.result(i)
+            item["gloss"] = self.gloss_keys[gloss_id]
+            results.append(item)
+        return results
+
+
+_shared_gloss = None
+_shared_gloss_lock = threading.Lock()
+
+
+def get_gloss_index():
+    """
+    返回进程内共享的词义索引（第一次调用时从所有模块建立）
+
+    Returns:
+        GlossIndex: 共享实例
+    """
+    global _shared_gloss
+    if _shared_gloss is None:
+        with _shared_gloss_lock:
+            if _shared_gloss is None:
+                _shared_gloss = GlossIndex.build(get_word_index(), prefix_index=get_prefix_index())
+    return _shared_gloss
+
+
+def main(argv=None):
+    from word_lookup import format_results
+
+    parser = argparse.ArgumentParser(description="按中文释义查英文单词")
+    parser.add_argument("glosses", nargs="+", help="中文释义或其中的一部分")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"最多显示的条数（默认{DEFAULT_TOP}）")
+    args = parser.parse_args(argv)
+
+    index = get_gloss_index()
+    status = 0
+    for gloss in args.glosses:
+        results = index.search(gloss, args.top)
+        if len(args.glosses) > 1:
+            print(f"== {gloss} ==")
+        if results:
+            print(format_results(results))
+        else:
+            print(f"没有释义含有 {gloss} 的单词")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 批量批改纸质答卷
+
+老师先生成一份试卷（含答案），学生线下作答后把答案收集成CSV或JSONL，
+再用本工具并行批改:
+
+    python grade_answers.py make-paper --module 4 --count 50 --mode english --output paper.json
+    python grade_answers.py grade paper.json answers.csv --workers 4
+
+答卷格式（每个学生一行）:
+    CSV:   第一行为表头 student_id,<题号1>,<题号2>,...，之后每行一个学生的选项
+    JSONL: {"student_id": "20230101", "answers": {"1": "2", "2": "C"}}
+           answers也可以是按题目顺序排列的列表
+选项可以写成1-4或A-D，留空表示未作答。
+
+输出:
+    每个学生一份报告（data/wrong_book.json的格式，metadata中附带学号和得分），
+    逐行写入JSONL文件，也可以用--report-dir为每个学生单独写一个JSON文件；
+    全班汇总（每道题的错误率、各选项人数、得分分布）写入汇总JSON。
+
+答卷按批读取，同时在进程池中批改的批次数有上限，报告批改完就写出，
+因此内存占用与学生人数无关。
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime
+
+from vocabulary_store import build_question, find_correct_option, get_shared_bank, make_wrongbook
+
+# 默认输出目录
+DEFAULT_GRADING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "grading")
+
+# 每批学生数
+BATCH_SIZE = 200
+
+# 字母选项 -> 数字选项
+LETTER_OPTIONS = {"A": "1", "B": "2", "C": "3", "D": "4"}
+
+# 工作进程中的试卷
+_worker_paper = None
+
+
+def make_paper(module_id, count, test_mode="chinese", seed=None, bank=None):
+    """
+    从词汇模块随机生成一份试卷
+
+    Args:
+        module_id: 模块ID
+        count: 题目数量（超过模块中不同单词的个数时按单词个数出题）
+        test_mode: 'chinese' 或 'english'
+        seed: 随机数种子
+        bank: VocabularyBank，默认使用共享实例
+
+    Returns:
+        dict: 试卷（题目、选项和答案）
+    """
+    bank = bank or get_shared_bank()
+    vocab = bank.get_module(module_id)
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        questions = []
+        seen = set()
+        # 同一个单词可能有多个条目，题目数不能超过不同单词的个数
+        count = min(count, len({entry['word'] for entry in vocab}))
+        while len(questions) < count:
+            question = build_question(vocab, test_mode)
+            item = question['correct_item']
+            if item['word'] in seen:
+                continue
+            seen.add(item['word'])
+            questions.append({
+                "id": str(len(questions) + 1),
+                "word": item['word'],
+                "definition": item['definition'],
+                "question": question['question_text'],
+                "options": question['options'],
+                "answer": find_correct_option(question, test_mode)
+            })
+    finally:
+        random.setstate(state)
+    return {
+        "title": f"{bank.module_name(module_id)}词汇测验",
+        "module": str(module_id),
+        "test_mode": test_mode,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "questions": questions
+    }
+
+
+def load_paper(path):
+    """
+    读取试卷文件
+
+    Raises:
+        ValueError: 试卷格式不正确
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        paper = json.load(f)
+    if not isinstance(paper, dict) or not paper.get("questions"):
+        raise ValueError("试卷中没有题目")
+    for question in paper["questions"]:
+        if question.get("answer") not in question.get("options", {}):
+            raise ValueError(f"第{question.get('id')}题的答案不在选项中")
+    return paper
+
+
+def normalize_option(value):
+    """把学生填写的选项统一为"1"-"4"，未作答返回空字符串"""
+    value = str(value if value is not None else "").strip().upper()
+    return LETTER_OPTIONS.get(value, value)
+
+
+def read_responses(path):
+    """
+    逐个读取学生答卷
+
+    Yields:
+        tuple: (学号, {题号: 选项} 或 按题目顺序排列的选项列表)
+    """
+    if path.lower().endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                yield str(record.get("student_id", f"line{line_no}")), record.get("answers", {})
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return
+            question_ids = [h.strip() for h in header[1:]]
+            for row in reader:
+                if not row:
+                    continue
+                yield row[0].strip(), dict(zip(question_ids, row[1:]))
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def grade_student(paper, student_id, answers, timestamp):
+    """
+    批改一个学生的答卷
+
+    Returns:
+        tuple: (报告, 每题结果列表)，结果为(选项, 是否正确)，未作答时选项为空字符串
+    """
+    test_mode = paper.get("test_mode", "chinese")
+    results = []
+    wrong = []
+    correct_count = 0
+    for i, question in enumerate(paper["questions"]):
+        if isinstance(answers, list):
+            raw = answers[i] if i < len(answers) else ""
+        else:
+            raw = answers.get(question["id"], "")
+        option = normalize_option(raw)
+        correct = option == question["answer"]
+        results.append((option, correct))
+        if correct:
+            correct_count += 1
+            continue
+        wrong.append({
+            "word": question["word"],
+            "definition": question["definition"],
+            "question": question.get("question", question["word"] if test_mode == "english" else question["definition"]),
+            "correct_answer": question["options"][question["answer"]],
+            "user_answer": question["options"].get(option, "未作答")
+        })
+
+    total = len(paper["questions"])
+    report = make_wrongbook(wrong, paper.get("module"), test_mode, timestamp,
+                            student_id=student_id, total_questions=total,
+                            correct_answers=correct_count,
+                            accuracy=round(correct_count / total * 100, 1) if total else 0.0)
+    return report, results
+
+
+def grade_batch(paper, batch, timestamp):
+    """
+    批改一批答卷
+
+    Returns:
+        tuple: (报告列表, 每题选项计数列表, 每题错误数列表)
+    """
+    choices = [{} for _ in paper["questions"]]
+    misses = [0] * len(paper["questions"])
+    reports = []
+    for student_id, answers in batch:
+        report, results = grade_student(paper, student_id, answers, timestamp)
+        reports.append(report)
+        for i, (option, correct) in enumerate(results):
+            choices[i][option] = choices[i].get(option, 0) + 1
+            if not correct:
+                misses[i] += 1
+    return reports, choices, misses
+
+
+def _init_worker(paper):
+    global _worker_paper
+    _worker_paper = paper
+
+
+def _grade_batch_in_worker(args):
+    batch, timestamp = args
+    return grade_batch(_worker_paper, batch, timestamp)
+
+
+class ClassSummary:
+    """全班汇总，只保存每道题的计数，占用内存与学生人数无关"""
+    def __init__(self, paper):
+        self.paper = paper
+        self.students = 0
+        self.score_total = 0.0
+        # 得分分布：0-9%、10-19%、...、90-99%、100%
+        self.score_buckets = [0] * 11
+        self.choices = [{} for _ in paper["questions"]]
+        self.misses = [0] * len(paper["questions"])
+
+    def add(self, reports, choices, misses):
+        for report in reports:
+            accuracy = report["metadata"]["accuracy"]
+            self.students += 1
+            self.score_total += accuracy
+            self.score_buckets[min(10, int(accuracy // 10))] += 1
+        for i, counts in enumerate(choices):
+            for option, n in counts.items():
+                self.choices[i][option] = self.choices[i].get(option, 0) + n
+            self.misses[i] += misses[i]
+
+    def to_dict(self):
+        questions = []
+        for question, counts, missed in zip(self.paper["questions"], self.choices, self.misses):
+            questions.append({
+                "id": question["id"],
+                "word": question["word"],
+                "definition": question["definition"],
+                "answer": question["answer"],
+                "wrong": missed,
+                "blank": counts.get("", 0),
+                "miss_rate": round(missed / self.students * 100, 1) if self.students else 0.0,
+                "choices": {(option or "未作答"): n for option, n in sorted(counts.items())}
+            })
+        questions.sort(key=lambda q: q["miss_rate"], reverse=True)
+        return {
+            "title": self.paper.get("title"),
+            "module": self.paper.get("module"),
+            "test_mode": self.paper.get("test_mode"),
+            "students": self.students,
+            "average_accuracy": round(self.score_total / self.students, 1) if self.students else 0.0,
+            "score_distribution": {
+                (f"{i * 10}-{i * 10 + 9}" if i < 10 else "100"): n
+                for i, n in enumerate(self.score_buckets)
+            },
+            "questions": questions
+        }
+
+
+def _safe_filename(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', "_", name) or "unknown"
+
+
+def grade_responses(paper, responses, report_file, report_dir=None, workers=None, batch_size=BATCH_SIZE):
+    """
+    并行批改答卷并流式写出报告
+
+    Args:
+        paper: 试卷字典
+        responses: (学号, 答案) 的可迭代对象（通常来自read_responses）
+        report_file: 写入报告JSONL的文件对象
+        report_dir: 提供时为每个学生单独写一个JSON文件
+        workers: 进程数，1表示在当前进程中批改
+        batch_size: 每批学生数
+
+    Returns:
+        ClassSummary: 全班汇总
+    """
+    workers = workers or os.cpu_count() or 1
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary = ClassSummary(paper)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    def write(result):
+        reports, choices, misses = result
+        for report in reports:
+            report_file.write(json.dumps(report, ensure_ascii=False) + "\n")
+            if report_dir:
+                path = os.path.join(report_dir, _safe_filename(report["metadata"]["student_id"]) + ".json")
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(report, f, ensure_ascii=False, indent=4)
+        summary.add(reports, choices, misses)
+
+    batches = _batches(responses, batch_size)
+    if workers == 1:
+        for batch in batches:
+            write(grade_batch(paper, batch, timestamp))
+        return summary
+
+    # Pool.imap会一次读完整个输入，这里自己限制同时在批改中的批次数，保持内存占用恒定
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(paper,)) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(_grade_batch_in_worker, ((batch, timestamp),)))
+            if len(pending) >= workers * 2:
+                write(pending.popleft().get())
+        while pending:
+            write(pending.popleft().get())
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量批改纸质词汇测验答卷")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    make = commands.add_parser("make-paper", help="生成试卷（含答案）")
+    make.add_argument("--module", default="1", help="模块编号（默认1）")
+    make.add_argument("--count", type=int, default=50, help="题目数量（默认50）")
+    make.add_argument("--mode", choices=("chinese", "english"), default="chinese", help="测试模式")
+    make.add_argument("--seed", type=int, default=None, help="随机数种子")
+    make.add_argument("--output", required=True, help="试卷输出路径")
+
+    grade = commands.add_parser("grade", help="批改答卷")
+    grade.add_argument("paper", help="试卷文件")
+    grade.add_argument("responses", help="答卷文件（.csv 或 .jsonl）")
+    grade.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    grade.add_argument("--output", default=None, help="报告JSONL路径（默认data/grading/<答卷名>_reports.jsonl）")
+    grade.add_argument("--summary", default=None, help="汇总JSON路径（默认data/grading/<答卷名>_summary.json）")
+    grade.add_argument("--report-dir", default=None, help="为每个学生单独写报告的目录")
+    args = parser.parse_args(argv)
+
+    if args.command == "make-paper":
+        paper = make_paper(args.module, args.count, args.mode, args.seed)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(paper, f, ensure_ascii=False, indent=2)
+        print(f"试卷已生成: {args.output}（{len(paper['questions'])} 题）")
+        return paper
+
+    paper = load_paper(args.paper)
+    base = os.path.splitext(os.path.basename(args.responses))[0]
+    output = args.output or os.path.join(DEFAULT_GRADING_DIR, f"{base}_reports.jsonl")
+    summary_path = args.summary or os.path.join(DEFAULT_GRADING_DIR, f"{base}_summary.json")
+    for path in (output, summary_path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    started = time.perf_counter()
+    with open(output, "w", encoding="utf-8") as report_file:
+        summary = grade_responses(paper, read_responses(args.responses), report_file,
+                                  args.report_dir, args.workers)
+    elapsed = time.perf_counter() - started
+    result = summary.to_dict()
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print(f"共批改 {result['students']} 份答卷，平均正确率 {result['average_accuracy']}%，"
+          f"用时 {elapsed:.2f} 秒（{result['students'] / max(elapsed, 1e-9):.0f} 份/秒）")
+    print(f"学生报告: {output}")
+    print(f"全班汇总: {summary_path}")
+    for question in result["questions"][:5]:
+        print(f"  错误率 {question['miss_rate']:>5.1f}%  {question['word']}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -8,26 +8,27 @@
 日期: 2024-01-20
 
 此模块提供了英语词汇测试系统的图形用户界面，通过Tkinter实现。
-它通过子进程调用main.py来运行词汇测试的核心功能，并在GUI中展示输出和接收输入。
+它既可以在进程内直接驱动VocabularyTester，也可以通过子进程以JSON Lines协议
+（main.py --protocol jsonl）运行词汇测试的核心功能，并在GUI中展示输出和接收输入。
 """
 import tkinter as tk
 from tkinter import scrolledtext, ttk, messagebox, simpledialog, colorchooser
-from vocabulary_tester import VocabularyTester
+from ui_latency import LatencyTracker
+from vocabulary_store import (MODULES, WRONGBOOK_WRITE_SECONDS, WRONGBOOK_WRITES, get_shared_bank,
+                              make_wrongbook)
 import json
 from datetime import datetime
-import subprocess
 import os
-import sys
 import threading
 import queue
-import re
+import time
 
 class VocabularyTestGUI:
     """
     英语词汇测试图形用户界面类
     
     提供了一个基于Tkinter的图形界面，用于运行英语词汇测试系统。
-    通过子进程调用main.py来执行测试功能，并在GUI中显示输出和接收用户输入。
+    子进程模式下通过JSON Lines协议调用main.py来执行测试功能，并在GUI中显示输出和接收用户输入。
     """
     def __init__(self, root):
         """
@@ -187,10 +188,6 @@ class VocabularyTestGUI:
         self.options_inner_frame = self.answers_panel
         self.option_buttons = []
         
-        # 初始化解析状态变量
-        self.expect_question_text = False
-        self.collecting_options = False
-        
         # 显示欢迎信息和使用说明
         self.terminal.insert(tk.END, "欢迎！这是一个轻松好用的英语词汇练习工具。\n\n")
         self.terminal.insert(tk.END, "如何开始：\n")
@@ -261,21 +258,28 @@ class VocabularyTestGUI:
         self.control_frame.pack(fill=tk.X, padx=8, pady=4)
         
         # 在所有变量定义后再调用render_controls
+        self.module_buttons = {}
         self.render_controls()
         self.stats_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stats.json")
         self.favorites_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "favorites.json")
         self.wrongbook_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "wrong_book.json")
         self.ensure_data_dir()
-        self.load_preferences()
-        self.render_controls()
         
         # 初始化变量
         self.process = None
+        self.protocol_client = None
+        # 子进程模式使用的预启动进程池（第一次以子进程模式开始测试时创建）及当前占用的进程和读取线程
+        self.worker_pool = None
+        self.worker = None
+        self.output_thread = None
+        # 正在后台从进程池取出子进程（见start_test）
+        self.starting_test = False
+        self.test_started_at = None
         self.running = False
         self.queue = queue.Queue()
-        self.collecting_options = False
         self.parsed_options = {}
-        self.last_line = ""
+        # 子进程模式下每条协议消息的往返延迟（毫秒）
+        self.protocol_latencies = []
         self.current_theme = "Fluent"
         self.themes = {
             "Fluent": {
@@ -303,11 +307,28 @@ class VocabularyTestGUI:
                 "accent": "#00D1FF"
             }
         }
-        self.apply_theme()
         self.main_frame.bind("<Configure>", self.on_resize)
         self.root.bind("<Key>", self.on_key)
         self.current_question = None
+        # 预先生成的下一道题，用于提前合成发音
+        self.upcoming_question = None
+        # 发音服务在启动后空闲时创建（见start_speech）
+        self.speech = None
         self.timer_id = None
+        # 点击选项到下一题就绪的各阶段延迟统计（F12显示调试浮层）
+        self.latency = LatencyTracker()
+        self.latency_overlay = None
+        # 查词面板（F3打开），前缀索引在第一次打开时于后台加载
+        self.lookup_window = None
+        self.prefix_index = None
+        self.fuzzy_searcher = None
+        self.gloss_index = None
+        # 词汇文件热重载（见hot_reload）：每秒检查正在使用的模块的词汇文件，有变化时在后台重新加载
+        self.module_watcher = None
+        self.reloading_modules = False
+        # 查词面板正在后台读取或建立共享的查词索引（此时不能增量修改这些索引）
+        self.lookup_loading = False
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_program)
         
         # 启动消息处理线程
         self.message_thread = threading.Thread(target=self.process_messages, daemon=True)
@@ -316,6 +337,32 @@ class VocabularyTestGUI:
             self.ensure_controls_visible()
         except Exception:
             pass
+        
+        # 窗口先显示出来，其余启动工作在空闲时逐项完成（读取数据文件、主题、发音服务、词汇文件热重载）
+        self.deferred_tasks = [self.load_preferences, self.load_favorites, self.apply_theme,
+                               self.load_module_metadata, self.start_speech, self.start_module_watcher]
+        self.schedule_deferred_task()
+    
+    def schedule_deferred_task(self):
+        """
+        安排下一项推迟的启动工作
+        
+        先等待已排队的重绘完成（after_idle），再经过一次事件循环（after），
+        使各项工作之间能够及时处理窗口重绘和用户操作
+        """
+        self.root.after_idle(lambda: self.root.after(0, self.run_deferred_task))
+    
+    def run_deferred_task(self):
+        """执行一项推迟的启动工作，还有剩余工作时继续安排下一项"""
+        if not self.deferred_tasks:
+            return
+        task = self.deferred_tasks.pop(0)
+        try:
+            task()
+        except Exception as e:
+            self.append_text(f"启动时出错: {str(e)}\n")
+        if self.deferred_tasks:
+            self.schedule_deferred_task()
     
     def append_text(self, text):
         """
@@ -328,7 +375,6 @@ class VocabularyTestGUI:
         self.terminal.insert(tk.END, text)
         self.terminal.see(tk.END)
         self.terminal.config(state=tk.DISABLED)
-        self.try_parse_line(text)
     
     def clear_terminal(self):
         """
@@ -342,31 +388,53 @@ class VocabularyTestGUI:
         """
         启动词汇测试程序
         
-        创建一个子进程运行main.py，并启动输出读取线程
-        同时更新UI按钮状态
+        在后台线程中从预启动的进程池取出一个以JSON Lines协议运行的main.py子进程
+        （第一次开始测试时还要启动进程池并等待进程加载词汇），取到后回到界面线程
+        按当前选择的模块和模式发送start命令，并启动输出读取线程，同时更新UI按钮状态
         """
-        if self.running:
+        if self.running or self.starting_test:
             self.append_text("测试已经在运行中...\n")
             return
         
+        # 清空终端
+        self.clear_terminal()
+        self.append_text("正在启动词汇测试系统...\n\n")
+        self.test_started_at = time.perf_counter()
+        self.starting_test = True
+        self.start_button.config(state=tk.DISABLED)
+        
+        def acquire():
+            # 启动子进程、等待就绪可能需要数秒，不能阻塞界面线程
+            try:
+                self.start_worker_pool()
+                worker, error = self.worker_pool.acquire(), None
+            except Exception as e:
+                worker, error = None, e
+            try:
+                self.root.after(0, lambda: self.on_worker_acquired(worker, error))
+            except (RuntimeError, tk.TclError):
+                # 窗口已经关闭
+                if worker is not None:
+                    self.worker_pool.release(worker)
+        threading.Thread(target=acquire, daemon=True).start()
+    
+    def on_worker_acquired(self, worker, error):
+        """
+        进程池取出子进程后（界面线程）开始测试
+        
+        Args:
+            worker: 取出的子进程，失败时为None
+            error: 取出时发生的异常，没有时为None
+        """
+        self.starting_test = False
+        if worker is None:
+            self.start_button.config(state=tk.NORMAL)
+            self.append_text(f"启动错误: {error or '无法启动词汇测试子进程'}\n")
+            return
         try:
-            # 清空终端
-            self.clear_terminal()
-            self.append_text("正在启动词汇测试系统...\n\n")
-            
-            # 获取当前脚本所在目录
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            main_script = os.path.join(script_dir, "main.py")
-            
-            # 启动词汇测试程序
-            self.process = subprocess.Popen(
-                [sys.executable, main_script],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                cwd=script_dir
-            )
+            self.worker = worker
+            self.process = self.worker.process
+            self.protocol_client = self.worker.client
             
             self.running = True
             self.start_button.config(state=tk.DISABLED)
@@ -375,7 +443,7 @@ class VocabularyTestGUI:
             # 启动输出读取线程
             self.output_thread = threading.Thread(target=self.read_output, daemon=True)
             self.output_thread.start()
-            self.help_label.config(text="已启动：请按提示选择模块与模式；题目出现后点击下方选项按钮作答。按 Q 或点击停止退出。")
+            self.protocol_client.send("start", module=self.module_var.get(), mode=self.mode_var.get())
             
         except Exception as e:
             self.append_text(f"启动错误: {str(e)}\n")
@@ -384,19 +452,30 @@ class VocabularyTestGUI:
         """
         停止词汇测试程序
         
-        终止子进程，并更新UI按钮状态
+        将子进程归还给进程池，并更新UI按钮状态
         """
         if not self.running or not self.process:
             return
         
-        try:
-            # 发送终止信号
-            self.process.terminate()
-            self.process.wait(timeout=2)
-        except subprocess.TimeoutExpired:
-            self.process.kill()
-        
+        # 先停止读取线程，再把进程交还给进程池重置复用（异常退出的进程会被替换）；
+        # 读取线程退出前仍可能取走进程池等待的reset回复，因此要等它结束
         self.running = False
+        if self.output_thread is not None and self.output_thread is not threading.current_thread():
+            self.output_thread.join(timeout=2)
+        self.output_thread = None
+        if self.worker_pool and self.worker:
+            self.worker_pool.release(self.worker)
+        else:
+            import subprocess
+            try:
+                self.process.terminate()
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.worker = None
+        self.process = None
+        self.protocol_client = None
+        
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.append_text("\n词汇测试系统已停止\n")
@@ -415,9 +494,11 @@ class VocabularyTestGUI:
         user_input = self.input_var.get().strip()
         if user_input:
             try:
-                # 发送输入到程序
-                self.process.stdin.write(user_input + "\n")
-                self.process.stdin.flush()
+                # 发送输入到程序：q/quit退出，其余内容作为选项编号
+                if user_input.lower() in ("q", "quit"):
+                    self.protocol_client.send("quit")
+                else:
+                    self.protocol_client.send("answer", option=user_input)
                 
                 # 在终端中显示用户输入
                 self.append_text(f"> {user_input}\n")
@@ -431,14 +512,18 @@ class VocabularyTestGUI:
         """
         读取测试程序的输出
         
-        在单独的线程中运行，将程序输出放入消息队列
+        在单独的线程中运行，解码JSON消息后放入消息队列，UI线程无需再逐行解析
         """
+        worker = self.worker
         try:
-            while self.running and self.process:
-                line = self.process.stdout.readline()
-                if not line:
+            while self.running and worker is self.worker:
+                try:
+                    message = worker.get_message(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if message is None:
                     break
-                self.queue.put(line)
+                self.queue.put(message)
         except Exception as e:
             self.queue.put(f"读取输出错误: {str(e)}\n")
         finally:
@@ -455,18 +540,26 @@ class VocabularyTestGUI:
         while True:
             try:
                 message = self.queue.get(timeout=0.1)
-                self.root.after(0, lambda msg=message: self.append_text(msg))
+                if isinstance(message, dict):
+                    self.root.after(0, lambda msg=message: self.handle_protocol_message(msg))
+                else:
+                    self.root.after(0, lambda msg=message: self.append_text(msg))
                 self.queue.task_done()
             except queue.Empty:
                 pass
 
     def on_key(self, event):
         ch = event.char
-        if ch in ("q", "Q"):
+        # 在输入框（拼写答案、命令行输入）中输入q时不退出测试
+        if ch in ("q", "Q") and not isinstance(event.widget, tk.Entry):
             self.stop_internal_test()
         # 处理Ctrl+P快捷键实现重复发音
         elif event.state == 4 and event.keysym.lower() == "p":
             self.pronounce_current()
+        elif event.keysym == "F12":
+            self.toggle_latency_overlay()
+        elif event.keysym == "F3":
+            self.open_lookup()
     
     def update_ui_state(self):
         # 确保所有按钮都存在，避免引用不存在的属性
@@ -556,12 +649,150 @@ class VocabularyTestGUI:
         """
         退出整个应用程序
         
-        先停止测试进程（如果正在运行），然后销毁主窗口
+        先停止测试进程（如果正在运行）并关闭进程池，然后销毁主窗口
         """
         if self.running:
             self.stop_test()
+        if self.worker_pool:
+            self.worker_pool.shutdown()
+        try:
+            self.latency.dump()
+        except Exception:
+            pass
         self.root.destroy()
 
+    def toggle_latency_overlay(self):
+        """显示或隐藏界面延迟调试浮层"""
+        if self.latency_overlay is not None:
+            self.latency_overlay.destroy()
+            self.latency_overlay = None
+            return
+        self.latency_overlay = tk.Label(self.root, text="", font=("Courier New", 9), justify=tk.LEFT,
+                                        bg="#000000", fg="#00FF66", anchor="nw")
+        self.latency_overlay.place(relx=1.0, x=-8, y=8, anchor="ne")
+        self.refresh_latency_overlay()
+
+    def refresh_latency_overlay(self):
+        """每秒刷新一次调试浮层中的延迟分位数（毫秒）"""
+        if self.latency_overlay is None:
+            return
+        self.latency_overlay.config(text="点击→下一题延迟 (ms)\n" + self.latency.format_table())
+        self.latency_overlay.lift()
+        self.root.after(1000, self.refresh_latency_overlay)
+
+    def start_worker_pool(self):
+        """
+        创建并启动子进程池（已创建时不做任何操作）
+        
+        只在以子进程模式开始测试（start_test）时创建，进程内模式不需要启动子进程；
+        预加载当前选择的模块，停止测试后再次开始时第一道题几乎立即出现
+        """
+        if self.worker_pool is None:
+            from worker_pool import WorkerPool
+            self.worker_pool = WorkerPool(size=2, preload=[self.module_var.get()])
+            self.worker_pool.start()
+
+    def start_module_watcher(self):
+        """开始定期检查词汇文件（已开始时不做任何操作）"""
+        if self.module_watcher is None:
+            from hot_reload import ModuleWatcher
+            self.module_watcher = ModuleWatcher(get_shared_bank())
+            self.poll_vocabulary_files()
+
+    def poll_vocabulary_files(self):
+        """
+        检查当前测试的模块和选中的模块的词汇文件（每个文件一次stat）
+        
+        文件有变化时在后台线程中增量重新加载，同一时间只有一次重新加载
+        """
+        from hot_reload import POLL_INTERVAL
+        self.root.after(int(POLL_INTERVAL * 1000), self.poll_vocabulary_files)
+        if self.reloading_modules:
+            return
+        modules = {self.module_var.get()}
+        if self.tester and getattr(self.tester, 'current_module', None):
+            modules.add(self.tester.current_module)
+        changed = self.module_watcher.poll(sorted(modules))
+        if changed:
+            self.reloading_modules = True
+            threading.Thread(target=self.reload_modules, args=(changed, self.mode_var.get()),
+                             daemon=True).start()
+
+    def reload_modules(self, module_ids, mode):
+        """后台线程：增量重新加载模块，完成后回到界面线程替换数据"""
+        deltas = []
+        for module_id in module_ids:
+            try:
+                delta = self.module_watcher.reload(module_id)
+            except (OSError, ValueError) as e:
+                self.root.after(0, lambda m=module_id, e=e: self.append_text(
+                    f"重新加载 {self.get_module_name(m)} 词汇失败，继续使用原来的数据: {e}\n"))
+                continue
+            if delta is not None:
+                if mode == "phrase":
+                    # 短语索引按新的条目元组建立，替换数据后的第一道短语题不需要等待
+                    from phrases import get_phrase_index
+                    get_phrase_index(delta.entries)
+                deltas.append(delta)
+        if deltas:
+            self.root.after(0, lambda: self.on_modules_reloaded(deltas))
+        else:
+            self.reloading_modules = False
+
+    def on_modules_reloaded(self, deltas):
+        """
+        界面线程：更新查词索引，替换测试器的词汇数据，再在后台把索引写回缓存文件
+        
+        当前题目、错题和答题统计不变；预先生成的下一题来自被删除或修改的条目时重新生成
+        """
+        from vocab_delta import apply_delta, save_indexes
+        from word_index import normalize_word
+        if self.lookup_loading:
+            # 查词面板的加载线程还在读取共享索引，等它完成后再修改
+            self.root.after(100, lambda: self.on_modules_reloaded(deltas))
+            return
+        try:
+            for delta in deltas:
+                apply_delta(delta, self.module_watcher.bank, save=False)
+                if self.tester and self.tester.replace_module(delta.module_id, delta.entries) \
+                        and delta.module_id == self.tester.current_module and self.upcoming_question \
+                        and normalize_word(self.upcoming_question['correct_item']['word']) in delta.changed_words():
+                    self.upcoming_question = self.tester.generate_question()
+                    if self.upcoming_question:
+                        self.start_speech().prefetch([self.upcoming_question['correct_item']['word']])
+                if delta:
+                    self.append_text(f"词汇文件已更新，重新加载 {self.get_module_name(delta.module_id)}: "
+                                     f"{delta.summary()}\n")
+            if self.lookup_window is not None and self.lookup_window.winfo_exists():
+                self.refresh_lookup()
+        except Exception as e:
+            # 出错时也要结束这次重新加载，否则之后不会再检查词汇文件
+            self.reloading_modules = False
+            self.append_text(f"应用词汇文件的更新时出错: {str(e)}\n")
+            return
+
+        def save():
+            try:
+                for delta in deltas:
+                    save_indexes(delta.module_id)
+            except Exception:
+                pass
+            finally:
+                self.reloading_modules = False
+        threading.Thread(target=save, daemon=True).start()
+
+    def start_speech(self):
+        """
+        创建发音服务（已创建时不做任何操作）
+        
+        Returns:
+            SpeechService: 发音服务
+        """
+        if self.speech is None:
+            from tts import SpeechService
+            self.speech = SpeechService()
+        return self.speech
+
     def lower_widget(self, widget):
         try:
             widget.tk.call('lower', widget._w)
@@ -582,12 +813,22 @@ class VocabularyTestGUI:
                     self.mode_var.set(p.get("default_mode", "chinese"))
                     size = p.get("font_size", 16)
                     self.normal_font = (self.font_family, size)
+                    # 偏好设置在窗口显示后才读取，已经创建的控件要重新设置字体
+                    self.input_entry.config(font=self.normal_font)
                     self.time_limit_var.set(p.get("time_limit", 0))
                     if p.get("night_mode", False):
                         self.current_theme = "Dark"
         except Exception:
             pass
 
+    def load_favorites(self):
+        try:
+            if os.path.isfile(self.favorites_path):
+                with open(self.favorites_path, "r", encoding="utf-8") as f:
+                    self.favorites.update(json.load(f))
+        except Exception:
+            pass
+
     def save_preferences(self):
         try:
             data = {
@@ -645,6 +886,7 @@ class VocabularyTestGUI:
                              font=(self.font_family, 10),
                              bg=self.colors["surface_variant"])
             b.grid(row=row, column=col, sticky="w", padx=2, pady=0)
+            self.module_buttons[k] = b
         
         # 右侧：测试模式和限时设置 - 紧凑设计
         self.settings_frame = tk.Frame(self.config_frame, bg=self.colors["surface_variant"]) 
@@ -660,6 +902,10 @@ class VocabularyTestGUI:
                      value="chinese", font=(self.font_family, 10), bg=self.colors["surface_variant"]).pack(side=tk.LEFT, padx=4)
         tk.Radiobutton(mode_radio_frame, text="英文", variable=self.mode_var, 
                      value="english", font=(self.font_family, 10), bg=self.colors["surface_variant"]).pack(side=tk.LEFT, padx=4)
+        tk.Radiobutton(mode_radio_frame, text="拼写", variable=self.mode_var, 
+                     value="spelling", font=(self.font_family, 10), bg=self.colors["surface_variant"]).pack(side=tk.LEFT, padx=4)
+        tk.Radiobutton(mode_radio_frame, text="短语", variable=self.mode_var, 
+                     value="phrase", font=(self.font_family, 10), bg=self.colors["surface_variant"]).pack(side=tk.LEFT, padx=4)
         
         # 限时设置 - 紧凑设计
         time_frame = tk.Frame(self.settings_frame, bg=self.colors["surface_variant"]) 
@@ -682,7 +928,7 @@ class VocabularyTestGUI:
         all_buttons_frame.pack(fill=tk.X, pady=4)
         
         # 设置列权重，使按钮均匀分布
-        all_buttons_frame.grid_columnconfigure((0, 1, 2, 3, 4), weight=1, uniform="buttons")
+        all_buttons_frame.grid_columnconfigure((0, 1, 2, 3, 4, 5), weight=1, uniform="buttons")
         
         # 开始测试按钮 - 紧凑设计
         self.start_button = tk.Button(all_buttons_frame, text="开始测试", 
@@ -718,13 +964,22 @@ class VocabularyTestGUI:
         self.settings_button.grid(row=0, column=3, sticky="ew", padx=3, pady=2)
         self.apply_button_hover(self.settings_button)
         
+        # 查词按钮 - 紧凑设计
+        self.lookup_button = tk.Button(all_buttons_frame, text="查词", 
+                            font=self.button_font, 
+                            command=self.open_lookup, 
+                            padx=8, pady=6, relief=tk.FLAT, bd=0, cursor="hand2",
+                            bg=self.colors["surface"]) 
+        self.lookup_button.grid(row=0, column=4, sticky="ew", padx=3, pady=2)
+        self.apply_button_hover(self.lookup_button)
+        
         # 退出按钮 - 紧凑设计
         self.exit_button = tk.Button(all_buttons_frame, text="退出程序", 
                             font=self.button_font, 
                            bg=self.colors["warn"], fg=self.colors["text_inverse"],
                             command=self.exit_program, 
                            padx=8, pady=6, relief=tk.FLAT, bd=0, cursor="hand2")
-        self.exit_button.grid(row=0, column=4, sticky="ew", padx=3, pady=2)
+        self.exit_button.grid(row=0, column=5, sticky="ew", padx=3, pady=2)
         self.apply_button_hover(self.exit_button)
         
         # 显示提示信息确保所有按钮都能在测试模式下正常显示
@@ -734,12 +989,19 @@ class VocabularyTestGUI:
         self.append_text("\n提示：错题本将自动保存至data/wrong_book.json，也可手动点击导出错题按钮导出\n")
 
     def get_module_name(self, k):
-        m = VocabularyTester().modules
-        return m.get(k, {}).get("name", k)
+        return MODULES.get(k, {}).get("name", k)
+
+    def load_module_metadata(self):
+        """没有词汇文件的模块显示为不可选"""
+        bank = get_shared_bank()
+        for k, b in self.module_buttons.items():
+            if k in MODULES and not os.path.isfile(bank.module_path(k)):
+                b.config(state=tk.DISABLED)
 
     def start_internal_test(self):
         # 确保测试器已初始化
         if not self.tester:
+            from vocabulary_tester import VocabularyTester
             self.tester = VocabularyTester()
         
         # 重置测试器的统计信息，但保留复习模式下的错题列表
@@ -753,6 +1015,9 @@ class VocabularyTestGUI:
         if not is_review_mode:
             self.tester.wrong_answers = []
         
+        # 丢弃上一次测试预生成的题目
+        self.upcoming_question = None
+        
         # 加载选定的模块
         if not self.tester.load_vocabulary(self.module_var.get()):
             # 出错时也更新UI状态
@@ -761,6 +1026,9 @@ class VocabularyTestGUI:
         
         # 设置测试模式
         self.tester.test_mode = self.mode_var.get()
+        # 英文模式可以直接输入中文释义作答，提前建立词义索引
+        if self.tester.test_mode == "english":
+            self.tester.prepare_gloss_index()
         
         # 开始测试
         self.next_question()
@@ -800,6 +1068,7 @@ class VocabularyTestGUI:
                 pass
             self.timer_id = None
         self.tester = None
+        self.upcoming_question = None
         
         # 更新UI状态，确保按钮正确显示
         self.update_ui_state()
@@ -807,14 +1076,23 @@ class VocabularyTestGUI:
     def next_question(self):
         if not self.tester:
             return
-        q = self.tester.generate_question()
+        # 优先使用预先生成的题目，并立即生成再下一题
+        q = self.upcoming_question or self.tester.generate_question()
         if not q:
             return
         self.current_question = q
+        self.upcoming_question = self.tester.generate_question()
+        self.latency.mark("generate_question")
         
         # 优化问题标签的显示配置
         if self.tester.test_mode == "chinese":
             self.question_label.config(text=f"' {q['question_text']}' 的英文单词是什么？")
+        elif self.tester.test_mode == "spelling":
+            self.question_label.config(text=f"' {q['question_text']}' 的英文单词怎么拼写？")
+        elif self.tester.test_mode == "phrase" and q.get('kind') == "fill":
+            self.question_label.config(text=f"' {q['question_text']}' 横线处应填哪个单词？")
+        elif self.tester.test_mode == "phrase":
+            self.question_label.config(text=f"' {q['question_text']}' 的中文意思是什么？")
         else:
             self.question_label.config(text=f"' {q['question_text']}' 的中文释义是什么？")
         
@@ -822,11 +1100,25 @@ class VocabularyTestGUI:
         self.question_label.pack_configure(pady=(8, 12))
         
         self.parsed_options = q['options']
-        self.render_options_internal()
-        # 自动发音当前词汇 - 仅在英文模式下自动发音，中文模式下不自动发音
-        if self.tester.test_mode != "chinese":
+        if self.tester.test_mode == "spelling":
+            self.render_spelling_input(self.on_spelling_submit)
+        else:
+            self.render_options_internal()
+            if self.tester.test_mode == "english":
+                self.render_meaning_input(self.on_meaning_submit)
+        self.latency.mark("render_options")
+        # 自动发音当前词汇 - 仅在英文模式下自动发音，中文和拼写模式下不自动发音
+        if self.tester.test_mode == "english":
             self.pronounce_current()
+        # 提前合成下一题的发音，题目出现后即可立即播放
+        if self.upcoming_question:
+            self.start_speech().prefetch([self.upcoming_question['correct_item']['word']])
+        self.latency.mark("tts_dispatch")
+        self.tester.mark_question_shown()
         self.start_timer()
+        # 界面完成重绘后结束本次延迟统计
+        if self.latency.active:
+            self.root.after_idle(lambda: self.latency.end("idle_redraw"))
 
     def render_options_internal(self):
         self.clear_options()
@@ -861,6 +1153,59 @@ class VocabularyTestGUI:
                 self.option_buttons.append(b)
 
 
+    def render_spelling_input(self, submit):
+        """
+        拼写模式：在选项区域显示单词输入框和提交按钮
+        
+        Args:
+            submit: 提交时调用的函数 submit(输入的单词)
+        """
+        self.clear_options()
+        self.options_frame.pack_configure(pady=(5, 5))
+        entry = tk.Entry(self.options_frame, font=self.normal_font, relief=tk.FLAT,
+                         highlightthickness=1, highlightbackground=self.colors["primary"],
+                         bg=self.colors["surface"], fg=self.colors["text"])
+        entry.pack(fill=tk.X, padx=5, pady=4, ipady=6)
+        entry.bind("<Return>", lambda e: submit(entry.get()))
+        button = tk.Button(self.options_frame, text="提交", font=self.small_font,
+                           command=lambda: submit(entry.get()), relief=tk.FLAT,
+                           bg=self.colors["primary"], fg=self.colors["text_inverse"], cursor="hand2")
+        button.pack(anchor="e", padx=5, pady=4)
+        self.option_buttons.extend([entry, button])
+        entry.focus_set()
+
+    def render_meaning_input(self, submit):
+        """
+        英文模式：在选项按钮下方显示中文释义输入框（与命令行一样可以直接输入中文释义作答）
+        
+        Args:
+            submit: 提交时调用的函数 submit(输入的释义)
+        """
+        row = tk.Frame(self.options_frame, bg=self.options_frame.cget("bg"))
+        row.pack(fill=tk.X, padx=5, pady=4)
+        entry = tk.Entry(row, font=self.small_font, relief=tk.FLAT,
+                         highlightthickness=1, highlightbackground=self.colors["primary"],
+                         bg=self.colors["surface"], fg=self.colors["text"])
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=4)
+        entry.bind("<Return>", lambda e: submit(entry.get()))
+        button = tk.Button(row, text="按释义作答", font=self.small_font,
+                           command=lambda: submit(entry.get()), relief=tk.FLAT,
+                           bg=self.colors["primary"], fg=self.colors["text_inverse"], cursor="hand2")
+        button.pack(side=tk.LEFT, padx=(6, 0))
+        self.option_buttons.append(row)
+
+    def on_meaning_submit(self, text):
+        if not text.strip():
+            return
+        self.latency.begin()
+        self.evaluate_meaning(text.strip())
+
+    def on_spelling_submit(self, text):
+        if not text.strip():
+            return
+        self.latency.begin()
+        self.evaluate_answer(text)
+
     def apply_button_hover(self, btn):
         def enter(e):
             try:
@@ -908,45 +1253,25 @@ class VocabularyTestGUI:
         self.evaluate_answer(None)
 
     def on_option_click(self, num):
+        self.latency.begin()
         self.evaluate_answer(num)
 
     def evaluate_answer(self, num):
         if not self.tester or not self.current_question:
             return
+        if self.tester.test_mode == "spelling":
+            self.evaluate_spelling(num)
+            return
         try:
-            self.tester.total_questions += 1
-            target_word = self.current_question['correct_item']['word']
-            target_def = self.current_question['correct_item']['definition']
-            correct_option = None
-            for option, content in self.current_question['options'].items():
-                if self.tester.test_mode == "chinese":
-                    if content == target_word:
-                        correct_option = option
-                        break
-                else:
-                    if content == target_def:
-                        correct_option = option
-                        break
-            if correct_option is None:
-                # 兜底：根据题干匹配
-                for option, content in self.current_question['options'].items():
-                    if content == self.current_question['question_text']:
-                        correct_option = option
-                        break
-            if num == correct_option:
-                self.tester.correct_answers += 1
+            # 判分、答题统计、错题记录和运行指标与命令行、JSON Lines模式共用测试器的实现
+            result = self.tester.answer_question(self.current_question, num)
+            if result['correct']:
                 self.append_text("\n✅ 恭喜你回答正确！\n")
             else:
-                corr_text = self.current_question['options'].get(correct_option, '未知')
-                self.append_text(f"\n❌ 回答错误！正确答案是: {correct_option}. {corr_text}\n")
-                self.tester.wrong_answers.append({
-                    'question': self.current_question['question_text'],
-                    'user_answer': self.current_question['options'].get(str(num), '超时' if num is None else '未知'),
-                    'correct_answer': corr_text,
-                    'word': target_word,
-                    'definition': target_def
-                })
+                self.append_text(f"\n❌ 回答错误！正确答案是: {result['correct_option']}. "
+                                 f"{result['correct_answer']}\n")
                 
+            self.latency.mark("evaluate_answer")
             # 立即显示当前统计信息，确保每次回答后都显示
             self._display_current_statistics()
             
@@ -957,6 +1282,46 @@ class VocabularyTestGUI:
             except Exception:
                 pass
     
+    def evaluate_meaning(self, text):
+        """英文模式中直接输入中文释义作答（按词义判分）"""
+        if not self.tester or not self.current_question:
+            return
+        if not self.tester.is_meaning_answer(text):
+            self.append_text("\n请输入中文释义\n")
+            return
+        try:
+            result = self.tester.answer_meaning(self.current_question, text)
+            if result['correct']:
+                self.append_text("\n✅ 恭喜你回答正确！\n")
+            else:
+                self.append_text(f"\n❌ 回答错误！正确答案是: {result['correct_option']}. "
+                                 f"{result['correct_answer']}\n")
+            self.latency.mark("evaluate_answer")
+            self._display_current_statistics()
+        except Exception as e:
+            try:
+                self.append_text(f"\n处理答案时出现问题: {str(e)}\n")
+            except Exception:
+                pass
+
+    def evaluate_spelling(self, text):
+        """拼写模式判分（text为None表示超时）"""
+        try:
+            result = self.tester.answer_spelling(self.current_question, "超时" if text is None else text)
+            if result['correct']:
+                self.append_text("\n✅ 恭喜你拼写正确！\n")
+            elif result['grade'] == "near":
+                self.append_text(f"\n🟡 拼写接近（差 {result['distance']} 处）！正确拼写是: {result['correct_answer']}\n")
+            else:
+                self.append_text(f"\n❌ 回答错误！正确拼写是: {result['correct_answer']}\n")
+            self.latency.mark("evaluate_answer")
+            self._display_current_statistics()
+        except Exception as e:
+            try:
+                self.append_text(f"\n处理答案时出现问题: {str(e)}\n")
+            except Exception:
+                pass
+
     def _display_current_statistics(self):
         """显示当前的测试统计信息"""
         if not self.tester or self.tester.total_questions == 0:
@@ -992,6 +1357,7 @@ class VocabularyTestGUI:
             self.append_text(f"📚 当前模块总词汇量: {total_vocab}\n")
             self.append_text(f"🎯 估计掌握词汇个数: {estimated_knowledge} / {total_vocab}\n")
         self.append_text("="*60 + "\n")
+        self.latency.mark("display_statistics")
         
         self.current_question = None
         self.next_question()
@@ -1034,8 +1400,7 @@ class VocabularyTestGUI:
 
     def speak_text(self, text):
         try:
-            cmd = f"$s=New-Object -ComObject SAPI.SpVoice; $s.Speak(\"{text}\")"
-            subprocess.Popen(["powershell", "-Command", cmd])
+            self.start_speech().speak(text.strip())
         except Exception:
             pass
 
@@ -1058,45 +1423,17 @@ class VocabularyTestGUI:
             return
         try:
             # 创建带时间戳的错题记录，并去重（根据单词去重）
-            unique_wrong_answers = []
-            seen_words = set()
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            wrongbook_content = make_wrongbook(self.tester.wrong_answers,
+                                               getattr(self.tester, 'current_module', None),
+                                               getattr(self.tester, 'test_mode', None))
             
-            for item in self.tester.wrong_answers:
-                # 使用单词作为去重的唯一标识符
-                if item.get('word') not in seen_words:
-                    seen_words.add(item.get('word'))
-                    # 添加时间戳和更详细的结构
-                    enhanced_item = {
-                        "time": timestamp,
-                        "word_info": {
-                            "word": item.get('word', '未知单词'),
-                            "definition": item.get('definition', '无定义')
-                        },
-                        "question_info": {
-                            "question": item.get('question', '未知问题'),
-                            "your_answer": item.get('user_answer', '未作答'),
-                            "correct_answer": item.get('correct_answer', '未知正确答案')
-                        }
-                    }
-                    unique_wrong_answers.append(enhanced_item)
-            
-            # 创建包含元数据的错题本结构
-            wrongbook_content = {
-                "metadata": {
-                    "export_time": timestamp,
-                    "total_wrong_items": len(unique_wrong_answers),
-                    "module": getattr(self.tester, 'current_module', '未知模块'),
-                    "test_mode": getattr(self.tester, 'test_mode', '未知模式')
-                },
-                "wrong_answers": unique_wrong_answers
-            }
-            
-            with open(self.wrongbook_path, "w", encoding="utf-8") as f:
-                json.dump(wrongbook_content, f, ensure_ascii=False, indent=4)
+            with WRONGBOOK_WRITE_SECONDS.time(format="json"):
+                with open(self.wrongbook_path, "w", encoding="utf-8") as f:
+                    json.dump(wrongbook_content, f, ensure_ascii=False, indent=4)
+            WRONGBOOK_WRITES.inc(format="json")
             
             self.append_text(f"\n错题已导出: {self.wrongbook_path}\n")
-            self.append_text(f"共导出 {len(unique_wrong_answers)} 个不重复的错题\n")
+            self.append_text(f"共导出 {len(wrongbook_content['wrong_answers'])} 个不重复的错题\n")
             
         except Exception as e:
             try:
@@ -1163,32 +1500,60 @@ class VocabularyTestGUI:
 
 
 
-    def try_parse_line(self, text):
-        t = text.strip()
-        if t == "选项:":
-            self.collecting_options = True
-            self.parsed_options = {}
-            return
-        if self.collecting_options:
-            m = re.match(r"^(\d+)\.\s+(.*)$", t)
-            if m:
-                self.parsed_options[m.group(1)] = m.group(2)
-                if len(self.parsed_options) >= 4:
-                    self.collecting_options = False
-                    self.render_options()
-                    return
-        if t.startswith("问题:"):
+    def handle_protocol_message(self, message):
+        """
+        处理子进程发来的一条JSON Lines协议消息
+        
+        Args:
+            message: 已解码的消息字典
+        """
+        if "latency_ms" in message:
+            self.protocol_latencies.append(message["latency_ms"])
+            if len(self.protocol_latencies) > 1000:
+                del self.protocol_latencies[:-1000]
+        msg_type = message.get("type")
+        if msg_type == "question":
+            if self.test_started_at is not None:
+                elapsed_ms = (time.perf_counter() - self.test_started_at) * 1000
+                self.append_text(f"首题就绪耗时: {elapsed_ms:.1f} ms\n")
+                self.test_started_at = None
+            self.clear_options()
+            if message.get("mode") == "chinese":
+                self.question_label.config(text=f"' {message.get('text', '')}' 的英文单词是什么？")
+            elif message.get("mode") == "spelling":
+                self.question_label.config(text=f"' {message.get('text', '')}' 的英文单词怎么拼写？")
+            elif message.get("mode") == "phrase" and message.get("kind") == "fill":
+                self.question_label.config(text=f"' {message.get('text', '')}' 横线处应填哪个单词？")
+            elif message.get("mode") == "phrase":
+                self.question_label.config(text=f"' {message.get('text', '')}' 的中文意思是什么？")
+            else:
+                self.question_label.config(text=f"' {message.get('text', '')}' 的中文释义是什么？")
+            self.parsed_options = message.get("options", {})
+            if message.get("mode") == "spelling":
+                self.render_spelling_input(self.send_spelling)
+            else:
+                self.render_options()
+                if message.get("mode") == "english":
+                    self.render_meaning_input(self.send_meaning)
+        elif msg_type == "result":
+            if message.get("correct"):
+                self.append_text("\n✅ 恭喜你回答正确！\n")
+            elif message.get("grade") == "near":
+                self.append_text(f"\n🟡 拼写接近（差 {message.get('distance')} 处）！正确拼写是: {message.get('correct_answer')}\n")
+            elif message.get("grade") == "wrong":
+                self.append_text(f"\n❌ 回答错误！正确拼写是: {message.get('correct_answer')}\n")
+            else:
+                self.append_text(f"\n❌ 回答错误！正确答案是: {message.get('correct_option')}. {message.get('correct_answer')}\n")
+        elif msg_type == "statistics":
+            self.append_text(f"已答题: {message.get('total_questions', 0)} 题，"
+                             f"正确率: {message.get('accuracy', 0):.1f}%\n")
+        elif msg_type == "loaded":
+            self.append_text(f"已加载 {message.get('name')} 词汇，共 {message.get('total')} 个词汇条目\n")
+        elif msg_type in ("log", "error"):
+            self.append_text(message.get("text", message.get("message", "")) + "\n")
+        elif msg_type == "bye":
             self.clear_options()
             self.question_label.config(text="")
-            self.expect_question_text = True
-            return
-        if self.expect_question_text and t:
-            self.question_label.config(text=t)
-            self.expect_question_text = False
-            return
-        if t.startswith("请输入答案"):
-            return
-        self.last_line = t
 
     def render_options(self):
         self.clear_options()
@@ -1214,12 +1579,29 @@ class VocabularyTestGUI:
         if not self.running or not self.process:
             return
         try:
-            self.process.stdin.write(str(num) + "\n")
-            self.process.stdin.flush()
+            self.protocol_client.send("answer", option=str(num))
             self.append_text(f"> {num}\n")
         except Exception as e:
             self.append_text(f"发送输入错误: {str(e)}\n")
 
+    def send_meaning(self, text):
+        if not self.running or not self.process or not text.strip():
+            return
+        try:
+            self.protocol_client.send("answer", meaning=text.strip())
+            self.append_text(f"> {text.strip()}\n")
+        except Exception as e:
+            self.append_text(f"发送输入错误: {str(e)}\n")
+
+    def send_spelling(self, text):
+        if not self.running or not self.process or not text.strip():
+            return
+        try:
+            self.protocol_client.send("answer", text=text.strip())
+            self.append_text(f"> {text.strip()}\n")
+        except Exception as e:
+            self.append_text(f"发送输入错误: {str(e)}\n")
+
     def open_settings(self):
         win = tk.Toplevel(self.root)
         win.title("设置")
@@ -1234,6 +1616,113 @@ class VocabularyTestGUI:
             win.destroy()
         tk.Button(win, text="应用", command=apply_and_close).pack(fill=tk.X, padx=10, pady=10)
 
+    def open_lookup(self):
+        """打开查词面板：输入单词的前几个字母即时显示补全结果，双击朗读单词"""
+        if self.lookup_window is not None and self.lookup_window.winfo_exists():
+            self.lookup_window.lift()
+            self.lookup_entry.focus_set()
+            return
+        win = self.lookup_window = tk.Toplevel(self.root)
+        win.title("查词")
+        win.geometry("620x440")
+        self.lookup_var = tk.StringVar()
+        self.lookup_entry = tk.Entry(win, textvariable=self.lookup_var, font=self.normal_font,
+                                     bg=self.colors["surface"], relief=tk.FLAT,
+                                     highlightbackground=self.colors["border"],
+                                     highlightcolor=self.colors["focus"], highlightthickness=1)
+        self.lookup_entry.pack(fill=tk.X, padx=10, pady=(10, 4), ipady=4)
+        self.lookup_list = tk.Listbox(win, font=(self.font_family, 12), activestyle="none", relief=tk.FLAT,
+                                      highlightthickness=0)
+        self.lookup_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 4))
+        self.lookup_list.bind("<Double-Button-1>", self.speak_lookup_selection)
+        self.lookup_status = tk.Label(win, text="", font=self.small_font, anchor="w")
+        self.lookup_status.pack(fill=tk.X, padx=10, pady=(0, 8))
+        self.lookup_results = []
+        self.lookup_var.trace_add("write", lambda *args: self.refresh_lookup())
+        self.lookup_entry.focus_set()
+        
+        if self.prefix_index is None:
+            self.lookup_status.config(text="正在加载词典...")
+        # 关闭后重新打开面板时，上一次的加载线程可能还没有结束
+        if self.prefix_index is None and not self.lookup_loading:
+            self.lookup_loading = True
+            def load():
+                try:
+                    load_indexes()
+                finally:
+                    self.lookup_loading = False
+            def load_indexes():
+                from word_lookup import get_prefix_index
+                try:
+                    index = get_prefix_index()
+                except Exception as e:
+                    self.root.after(0, lambda msg=f"加载词典失败: {e}": self.lookup_status.config(text=msg))
+                    return
+                self.root.after(0, lambda: self.on_lookup_loaded(index))
+                # 容错查词的索引较大，在补全可用之后再加载
+                from fuzzy_search import get_fuzzy_searcher
+                try:
+                    searcher = get_fuzzy_searcher().load_all()
+                except Exception:
+                    return
+                self.root.after(0, lambda: self.on_fuzzy_loaded(searcher))
+                # 中译英查词的索引需要解析所有模块，最后加载
+                from gloss_index import get_gloss_index
+                try:
+                    gloss_index = get_gloss_index()
+                except Exception:
+                    return
+                self.root.after(0, lambda: self.on_gloss_loaded(gloss_index))
+            threading.Thread(target=load, daemon=True).start()
+    
+    def on_lookup_loaded(self, index):
+        self.prefix_index = index
+        if self.lookup_window is not None and self.lookup_window.winfo_exists():
+            self.lookup_status.config(text=f"词典共 {len(index)} 个单词")
+            self.refresh_lookup()
+    
+    def on_fuzzy_loaded(self, searcher):
+        self.fuzzy_searcher = searcher
+        if self.lookup_window is not None and self.lookup_window.winfo_exists():
+            self.refresh_lookup()
+    
+    def on_gloss_loaded(self, gloss_index):
+        self.gloss_index = gloss_index
+        if self.lookup_window is not None and self.lookup_window.winfo_exists():
+            self.refresh_lookup()
+    
+    def refresh_lookup(self):
+        """按输入框中的前缀刷新补全结果；输入中文时按释义查英文单词"""
+        if self.prefix_index is None or not self.lookup_window.winfo_exists():
+            return
+        from gloss_index import is_chinese_query
+        query = self.lookup_var.get()
+        if is_chinese_query(query):
+            if self.gloss_index is None:
+                self.lookup_status.config(text="正在加载释义索引...")
+                return
+            self.lookup_results = self.gloss_index.search(query, 50)
+            status = f"释义含有 \"{query.strip()}\" 的单词 {len(self.lookup_results)} 个"
+        else:
+            self.lookup_results = self.prefix_index.complete(query, 50)
+            status = None
+            if not self.lookup_results and query.strip() and self.fuzzy_searcher is not None:
+                self.lookup_results = self.fuzzy_searcher.search(query, k=50)
+                status = f"没有以 \"{query.strip()}\" 开头的单词，拼写相近的单词 {len(self.lookup_results)} 个"
+            elif query.strip():
+                status = f"以 \"{query.strip()}\" 开头的单词共 {self.prefix_index.count(query)} 个"
+        self.lookup_list.delete(0, tk.END)
+        for item in self.lookup_results:
+            names = "、".join(self.get_module_name(m) for m in item["modules"])
+            self.lookup_list.insert(tk.END, f"{item['word']}    {item['definition']}    [{names}]")
+        if status is not None:
+            self.lookup_status.config(text=status)
+    
+    def speak_lookup_selection(self, event=None):
+        selection = self.lookup_list.curselection()
+        if selection:
+            self.speak_text(self.lookup_results[selection[0]]["word"])
+
     def apply_theme(self):
         th = self.themes.get(self.current_theme, {})
         bg = th.get("bg", self.colors["background"]) 
@@ -1313,6 +1802,18 @@ class VocabularyTestGUI:
         # 不要清空control_frame，以保持核心按钮（开始测试、停止测试、退出等）可见
 
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = VocabularyTestGUI(root)
-    root.mainloop()
+    import argparse
+    from metrics import setup_metrics
+    from profiling import profile_session
+
+    parser = argparse.ArgumentParser(description="英语词汇测试系统图形界面")
+    parser.add_argument("--profile", action="store_true",
+                        help="记录本次会话的函数耗时和内存分配到data/profiles（也可设置环境变量VT_PROFILE=1）")
+    parser.add_argument("--metrics", action="store_true",
+                        help="退出时把运行指标写入data/metrics（也可设置环境变量VT_METRICS=1）")
+    args = parser.parse_args()
+    setup_metrics("gui", args.metrics)
+    with profile_session("gui", args.profile):
+        root = tk.Tk()
+        app = VocabularyTestGUI(root)
+        root.mainloop()
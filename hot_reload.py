@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 词汇文件热重载
+
+图形界面运行时编辑json/中的词汇文件不需要重新启动。ModuleWatcher定期检查正在使用的
+模块的词汇文件（只stat文件大小和修改时间，不读取内容），发现变化后在后台线程中
+增量重新加载（见vocab_delta），再回到界面线程替换测试器的词汇数据、更新查词索引:
+
+    watcher = ModuleWatcher()
+    changed = watcher.poll(["4"])             # 每POLL_INTERVAL秒调用一次，每个模块一次stat
+    delta = watcher.reload("4")               # 后台线程
+    tester.replace_module("4", delta.entries) # 界面线程，当前题目和统计不受影响
+
+文件正在被写入时大小和修改时间还会继续变化，因此连续两次检查看到相同的新指纹后才重新加载；
+重新加载失败（例如保存了格式错误的JSON）时继续使用原来的数据，文件再次变化后才重试。
+
+命令行（监视模块的词汇文件并输出每次的变化，Ctrl+C结束）:
+    python hot_reload.py 4 7
+"""
+import argparse
+import sys
+import time
+
+from vocabulary_store import get_shared_bank
+from word_index import file_fingerprint
+
+# 检查词汇文件的间隔（秒）
+POLL_INTERVAL = 1.0
+
+
+class ModuleWatcher:
+    """
+    按文件指纹发现已加载模块的词汇文件变化
+    """
+    def __init__(self, bank=None):
+        """
+        Args:
+            bank: 监视的VocabularyBank，默认为共享实例
+        """
+        self.bank = bank or get_shared_bank()
+        # 模块ID -> 上一次检查时看到的新指纹（再次看到相同的指纹时说明文件已经写完）
+        self._pending = {}
+        # 模块ID -> 重新加载失败时的指纹（文件没有再次变化之前不重试）
+        self._failed = {}
+
+    def poll(self, module_ids):
+        """
+        检查模块的词汇文件
+
+        Args:
+            module_ids: 要检查的模块ID（未加载的模块忽略）
+
+        Returns:
+            list: 文件有变化并且已经写完、需要重新加载的模块ID
+        """
+        changed = []
+        for module_id in module_ids:
+            module_id = str(module_id)
+            loaded = self.bank.module_fingerprint(module_id)
+            fingerprint = file_fingerprint(self.bank.module_path(module_id)) if loaded is not None else None
+            if fingerprint is None or fingerprint == loaded or fingerprint == self._failed.get(module_id):
+                self._pending.pop(module_id, None)
+            elif self._pending.get(module_id) == fingerprint:
+                del self._pending[module_id]
+                changed.append(module_id)
+            else:
+                self._pending[module_id] = fingerprint
+        return changed
+
+    def reload(self, module_id):
+        """
+        增量重新加载模块（可以在后台线程中调用）
+
+        Returns:
+            ModuleDelta: 变化；文件已经与加载的数据一致时返回None
+
+        Raises:
+            OSError / ValueError: 词汇文件无法读取或解析（继续使用原来的数据）
+        """
+        module_id = str(module_id)
+        fingerprint = file_fingerprint(self.bank.module_path(module_id))
+        try:
+            delta = self.bank.reload_module(module_id)
+        except (OSError, ValueError):
+            self._failed[module_id] = fingerprint
+            raise
+        self._failed.pop(module_id, None)
+        return delta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="监视词汇文件，变化时增量重新加载")
+    parser.add_argument("modules", nargs="+", help="模块ID")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help=f"检查间隔（秒，默认{POLL_INTERVAL}）")
+    args = parser.parse_args(argv)
+
+    watcher = ModuleWatcher()
+    for module_id in args.modules:
+        try:
+            print(f"{watcher.bank.module_name(module_id)}: {len(watcher.bank.get_module(module_id))} 个条目")
+        except (KeyError, OSError, ValueError) as e:
+            print(f"无法加载模块 {module_id}: {e}")
+            return 1
+    try:
+        while True:
+            time.sleep(args.interval)
+            for module_id in watcher.poll(args.modules):
+                started = time.perf_counter()
+                try:
+                    delta = watcher.reload(module_id)
+                except (OSError, ValueError) as e:
+                    print(f"{watcher.bank.module_name(module_id)}: 重新加载失败，继续使用原来的数据: {e}")
+                    continue
+                if delta is not None:
+                    print(f"{watcher.bank.module_name(module_id)}: {delta.summary()}，"
+                          f"耗时 {(time.perf_counter() - started) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
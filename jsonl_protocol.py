@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - JSON Lines 机器协议
+
+`python main.py --protocol jsonl` 时使用本模块代替交互式命令行。
+标准输入的每一行是一条JSON命令，标准输出的每一行是一条JSON消息，
+这样图形界面和自动化测试就不需要再用正则表达式解析终端输出。
+
+命令（客户端 -> 测试程序）:
+    {"cmd": "start", "module": "1", "mode": "chinese", "seq": 1}
+    {"cmd": "answer", "option": "2", "seq": 2}
+    {"cmd": "answer", "text": "abandon", "seq": 3}      （拼写模式 "mode": "spelling"）
+    {"cmd": "answer", "meaning": "放弃", "seq": 4}      （英文模式直接输入中文释义，按词义判分）
+    短语模式 "mode": "phrase" 的question消息带有kind（fill为短语填空，match为选择短语的中文意思）
+    {"cmd": "stats"} / {"cmd": "review", "enabled": true}
+    {"cmd": "save_wrong"} / {"cmd": "reset"} / {"cmd": "ping"} / {"cmd": "quit"}
+
+消息（测试程序 -> 客户端）:
+    ready / loaded / question / result / statistics / saved / reset / log / error / pong / bye
+
+每条消息都带有 `ts`（发出时间）；回应某条命令的消息还带有 `reply_to`
+（命令的seq）和 `elapsed_ms`（测试程序处理该命令所用的时间），
+客户端据此计算每条消息的往返延迟。
+"""
+
+import json
+import sys
+import time
+from contextlib import redirect_stdout
+
+from vocabulary_tester import VocabularyTester
+
+PROTOCOL_VERSION = 1
+
+
+def encode_message(message):
+    """
+    将消息字典编码为一行JSON文本（含换行符）
+
+    Args:
+        message: 要编码的字典
+
+    Returns:
+        str: 单行JSON文本
+    """
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':')) + "\n"
+
+
+def decode_message(line):
+    """
+    解码一行JSON文本
+
+    Args:
+        line: 一行文本
+
+    Returns:
+        dict: 解码后的字典；空行或格式错误时返回None
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+class _LogWriter:
+    """
+    把测试器内部的print输出转换为log消息，避免污染协议输出流
+    """
+    def __init__(self, server):
+        self.server = server
+        self.buffer = ""
+
+    def write(self, text):
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            if line.strip():
+                self.server.emit("log", text=line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class JsonlProtocolServer:
+    """
+    JSON Lines 协议服务端
+
+    从输入流逐行读取命令，驱动VocabularyTester，并把题目、结果和统计信息
+    以JSON消息的形式写到输出流。
+    """
+    def __init__(self, tester=None, stdin=None, stdout=None, preload=None):
+        """
+        初始化协议服务端
+
+        Args:
+            tester: VocabularyTester实例，为None时自动创建
+            stdin: 命令输入流，默认为sys.stdin
+            stdout: 消息输出流，默认为sys.stdout
+            preload: 在发出ready消息之前预先加载的模块ID列表
+        """
+        self.tester = tester or VocabularyTester()
+        self.preload = list(preload or [])
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.current_question = None
+        self.question_id = 0
+        self.running = False
+        # 当前正在处理的命令（用于填充reply_to和elapsed_ms）
+        self._reply_to = None
+        self._started_at = None
+        self._log_writer = _LogWriter(self)
+
+        self.handlers = {
+            "start": self.handle_start,
+            "answer": self.handle_answer,
+            "stats": self.handle_stats,
+            "review": self.handle_review,
+            "save_wrong": self.handle_save_wrong,
+            "reset": self.handle_reset,
+            "ping": self.handle_ping,
+            "quit": self.handle_quit
+        }
+
+    def emit(self, msg_type, **fields):
+        """
+        输出一条协议消息
+
+        Args:
+            msg_type: 消息类型
+            **fields: 消息的其他字段
+        """
+        message = {"type": msg_type}
+        message.update(fields)
+        message["ts"] = time.time()
+        if self._reply_to is not None:
+            message["reply_to"] = self._reply_to
+        if self._started_at is not None:
+            message["elapsed_ms"] = round((time.perf_counter() - self._started_at) * 1000, 3)
+        self.stdout.write(encode_message(message))
+        self.stdout.flush()
+
+    def run(self):
+        """
+        运行协议主循环，直到收到quit命令或输入流结束
+        """
+        self.running = True
+        # 预加载模块，使ready之后的第一道题无需再读取词汇文件
+        with redirect_stdout(self._log_writer):
+            for module_id in self.preload:
+                if module_id in self.tester.modules and module_id not in self.tester.vocab_data:
+                    self.tester.load_vocabulary(module_id)
+        self.emit("ready", protocol="jsonl", version=PROTOCOL_VERSION,
+                  modules={k: v["name"] for k, v in self.tester.modules.items()},
+                  loaded=sorted(self.tester.vocab_data.keys()))
+        for line in self.stdin:
+            command = decode_message(line)
+            if command is None:
+                if line.strip():
+                    self.emit("error", message="无法解析的命令")
+                continue
+            self.dispatch(command)
+            if not self.running:
+                break
+        self.running = False
+
+    def dispatch(self, command):
+        """
+        分发并执行一条命令
+
+        Args:
+            command: 命令字典
+        """
+        self._reply_to = command.get("seq")
+        self._started_at = time.perf_counter()
+        try:
+            handler = self.handlers.get(command.get("cmd"))
+            if handler is None:
+                self.emit("error", message=f"未知命令: {command.get('cmd')}")
+                return
+            # 测试器内部的print输出转为log消息
+            with redirect_stdout(self._log_writer):
+                handler(command)
+        except Exception as e:
+            self.emit("error", message=str(e))
+        finally:
+            self._reply_to = None
+            self._started_at = None
+
+    def emit_question(self):
+        """生成下一道题目并输出question消息"""
+        question = self.tester.generate_question()
+        self.current_question = question
+        if not question:
+            self.emit("error", message="无法生成题目，请检查词汇数据")
+            return
+        self.question_id += 1
+        self.emit("question",
+                  id=self.question_id,
+                  mode=self.tester.test_mode,
+                  text=question['question_text'],
+                  options=question['options'],
+                  word=question['correct_item']['word'] if self.tester.test_mode == "english" else None,
+                  kind=question.get('kind'))
+        self.tester.mark_question_shown()
+
+    def emit_statistics(self):
+        """输出当前统计信息"""
+        self.emit("statistics", **self.tester.get_statistics())
+
+    def handle_start(self, command):
+        module_id = str(command.get("module", "1"))
+        mode = command.get("mode", "chinese")
+        if mode not in ("chinese", "english", "spelling", "phrase"):
+            self.emit("error", message=f"无效的测试模式: {mode}")
+            return
+        if module_id not in self.tester.modules:
+            self.emit("error", message=f"无效的模块ID: {module_id}")
+            return
+
+        # 已经加载过的模块直接复用
+        if module_id in self.tester.vocab_data:
+            self.tester.current_module = module_id
+            self.tester.module_total_words = len(self.tester.vocab_data[module_id])
+        elif not self.tester.load_vocabulary(module_id):
+            self.emit("error", message="加载词汇文件失败")
+            return
+
+        self.tester.test_mode = mode
+        if mode == "english":
+            self.tester.prepare_gloss_index()
+        self.tester.total_questions = 0
+        self.tester.correct_answers = 0
+        self.tester.near_misses = 0
+        if not self.tester.review_mode:
+            self.tester.wrong_answers = []
+        self.tester.clear_current_session_wrong_answers()
+
+        self.emit("loaded", module=module_id,
+                  name=self.tester.modules[module_id]["name"],
+                  total=self.tester.module_total_words, mode=mode)
+        self.emit_question()
+
+    def handle_answer(self, command):
+        if not self.current_question:
+            self.emit("error", message="当前没有题目，请先发送start命令")
+            return
+        if self.tester.test_mode == "spelling":
+            text = str(command.get("text", "")).strip()
+            if not text:
+                self.emit("error", message="请输入单词", question_id=self.question_id)
+                return
+            result = self.tester.answer_spelling(self.current_question, text)
+            self.emit("result", question_id=self.question_id, **result)
+            self.emit_statistics()
+            self.emit_question()
+            return
+        if self.tester.test_mode == "english" and "meaning" in command:
+            meaning = str(command.get("meaning", "")).strip()
+            if not self.tester.is_meaning_answer(meaning):
+                self.emit("error", message="请输入中文释义", question_id=self.question_id)
+                return
+            result = self.tester.answer_meaning(self.current_question, meaning)
+            self.emit("result", question_id=self.question_id, **result)
+            self.emit_statistics()
+            self.emit_question()
+            return
+        option = str(command.get("option", "")).strip()
+        if option not in self.current_question['options']:
+            self.emit("error", message="无效的选项", question_id=self.question_id)
+            return
+        result = self.tester.answer_question(self.current_question, option)
+        self.emit("result", question_id=self.question_id, **result)
+        self.emit_statistics()
+        self.emit_question()
+
+    def handle_stats(self, command):
+        self.emit_statistics()
+
+    def handle_review(self, command):
+        self.tester.set_review_mode(bool(command.get("enabled", True)))
+        self.emit("review", enabled=self.tester.review_mode,
+                  wrong_count=len(self.tester.wrong_answers))
+
+    def handle_save_wrong(self, command):
+        saved = self.tester.save_wrong_answers()
+        self.emit("saved", success=bool(saved), wrong_count=len(self.tester.wrong_answers))
+
+    def handle_reset(self, command):
+        """清空会话状态（保留已加载的词汇数据），供进程池回收复用"""
+        self.tester.set_review_mode(False)
+        self.tester.total_questions = 0
+        self.tester.correct_answers = 0
+        self.tester.near_misses = 0
+        self.tester.wrong_answers = []
+        self.tester.clear_current_session_wrong_answers()
+        self.tester.test_mode = None
+        self.current_question = None
+        self.question_id = 0
+        self.emit("reset", loaded=sorted(self.tester.vocab_data.keys()))
+
+    def handle_ping(self, command):
+        self.emit("pong")
+
+    def handle_quit(self, command):
+        self.emit_statistics()
+        self.emit("bye")
+        self.running = False
+
+
+class JsonlProtocolClient:
+    """
+    JSON Lines 协议客户端
+
+    封装与测试子进程之间的管道通信，并为每条回应消息计算往返延迟
+    （写入消息的 `latency_ms` 字段）。
+    """
+    def __init__(self, process):
+        """
+        Args:
+            process: 以文本模式打开stdin/stdout管道的subprocess.Popen对象
+        """
+        self.process = process
+        self.seq = 0
+        self.pending = {}
+        self.latencies = []
+
+    def send(self, cmd, **fields):
+        """
+        发送一条命令
+
+        Args:
+            cmd: 命令名称
+            **fields: 命令参数
+
+        Returns:
+            int: 该命令的序号
+        """
+        self.seq += 1
+        command = {"cmd": cmd, "seq": self.seq}
+        command.update(fields)
+        self.pending[self.seq] = time.perf_counter()
+        # 只保留最近的命令发送时间，避免长时间运行时无限增长
+        self.pending.pop(self.seq - 64, None)
+        self.process.stdin.write(encode_message(command))
+        self.process.stdin.flush()
+        return self.seq
+
+    def read_message(self):
+        """
+        读取下一条消息（阻塞）
+
+        Returns:
+            dict: 消息字典；子进程输出结束时返回None
+        """
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                return None
+            message = decode_message(line)
+            if message is None:
+                continue
+            sent_at = self.pending.get(message.get("reply_to"))
+            if sent_at is not None:
+                message["latency_ms"] = round((time.perf_counter() - sent_at) * 1000, 3)
+                self.latencies.append(message["latency_ms"])
+            return message
+
+    def read_until(self, msg_type):
+        """
+        读取消息直到出现指定类型的消息
+
+        Args:
+            msg_type: 目标消息类型
+
+        Returns:
+            tuple: (目标消息或None, 期间读取到的全部消息列表)
+        """
+        messages = []
+        while True:
+            message = self.read_message()
+            if message is None:
+                return None, messages
+            messages.append(message)
+            if message.get("type") == msg_type:
+                return message, messages
+
+    def close(self):
+        """发送quit命令并关闭管道"""
+        try:
+            if self.process.poll() is None:
+                self.send("quit")
+                self.process.stdin.close()
+        except Exception:
+            pass
+
+
+def run_jsonl_protocol(preload=None):
+    """
+    以JSON Lines协议模式运行测试程序
+
+    Args:
+        preload: 预先加载的模块ID列表
+    """
+    # 协议固定使用UTF-8，避免Windows控制台默认编码导致中文无法输出
+    for stream in (sys.stdin, sys.stdout):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8")
+    JsonlProtocolServer(preload=preload).run()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 测验服务压力测试
+
+模拟N个同时答题的学生，每个学生完成一轮完整的测验
+（创建会话 -> 反复取题、思考、作答 -> 查看统计 -> 结束会话），
+统计每类操作的吞吐量和p50/p95/p99延迟，可输出CSV或JSON以便比较多次运行。
+
+两种目标:
+    HTTP模式（默认）: 对quiz_server.py发起请求；不指定--url时在本进程内启动一个临时服务，
+                     指定--workers时改为启动临时的多进程服务（quiz_cluster.py）
+    直连模式（--direct）: 直接调用QuizSession接口，测量会话层本身的开销（没有close操作）
+
+用法:
+    python load_test.py --clients 500 --questions 20 --think-time 0.05
+    python load_test.py --url http://127.0.0.1:8765 --modules 1:0.7,4:0.3 --json run1.json
+    python load_test.py --direct --clients 2000 --think-time 0 --csv direct.csv
+    python load_test.py --workers 4 --clients 1000 --modules 1,4
+
+--error-rate 是学生提交无效答案（例如选项"5"）的概率，用于覆盖服务的错误处理路径，
+这类请求的4xx响应按预期结果计入，不算作失败。
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from quiz_server import HTTPClient
+from ui_latency import RollingHistogram
+from vocabulary_store import QuizSession, get_shared_bank
+
+OPERATIONS = ("create", "question", "answer", "invalid_answer", "stats", "close")
+
+
+class LoadStats:
+    """按操作类型汇总延迟和错误数"""
+    def __init__(self):
+        self.histograms = OrderedDict((op, RollingHistogram(window=None)) for op in OPERATIONS)
+        self.errors = OrderedDict((op, 0) for op in OPERATIONS)
+        self.sessions_completed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def record(self, op, seconds, ok=True):
+        self.histograms[op].add(seconds * 1000)
+        if not ok:
+            self.errors[op] += 1
+
+    @property
+    def duration(self):
+        return max((self.finished_at or time.perf_counter()) - (self.started_at or 0), 1e-9)
+
+    def rows(self):
+        """
+        Returns:
+            list: 每类操作一行的统计字典
+        """
+        rows = []
+        for op, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            s = histogram.summary()
+            rows.append(OrderedDict([
+                ("operation", op),
+                ("count", s["count"]),
+                ("errors", self.errors[op]),
+                ("throughput", round(s["count"] / self.duration, 1)),
+                ("mean_ms", s["mean"]),
+                ("p50_ms", s["p50"]),
+                ("p95_ms", s["p95"]),
+                ("p99_ms", s["p99"]),
+                ("max_ms", s["max"])
+            ]))
+        return rows
+
+    def format_report(self):
+        lines = [f"{'operation':<16}{'count':>8}{'errors':>8}{'ops/s':>10}"
+                 f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for r in self.rows():
+            lines.append(f"{r['operation']:<16}{r['count']:>8}{r['errors']:>8}{r['throughput']:>10.1f}"
+                         f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}")
+        total = sum(h.count for h in self.histograms.values())
+        lines.append(f"共完成 {self.sessions_completed} 个会话，{total} 个请求，"
+                     f"用时 {self.duration:.2f} 秒，总吞吐量 {total / self.duration:.1f} 请求/秒")
+        return "\n".join(lines)
+
+
+def parse_module_mix(text):
+    """
+    解析模块比例，例如 "1:0.7,4:0.3"
+
+    Returns:
+        tuple: (模块ID列表, 权重列表)
+    """
+    modules, weights = [], []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        module_id, _, weight = part.partition(":")
+        modules.append(module_id.strip())
+        weights.append(float(weight) if weight else 1.0)
+    return modules, weights
+
+
+class LoadTest:
+    """
+    压力测试
+
+    Args:
+        clients: 同时在线的学生数
+        questions: 每个学生回答的题数
+        think_time: 平均思考时间（秒，按指数分布随机）
+        error_rate: 提交无效答案的概率
+        module_mix: (模块ID列表, 权重列表)
+        mode_mix: 可选测试模式列表
+        workers: 启动本地临时服务时使用的工作进程数（大于1时使用多进程服务）
+    """
+    def __init__(self, clients=100, questions=20, think_time=0.0, error_rate=0.0,
+                 module_mix=(("1",), (1.0,)), mode_mix=("chinese", "english"), seed=None, workers=1):
+        self.clients = clients
+        self.questions = questions
+        self.think_time = think_time
+        self.error_rate = error_rate
+        self.modules, self.weights = module_mix
+        self.modes = mode_mix
+        self.random = random.Random(seed)
+        self.workers = workers
+        self.stats = LoadStats()
+
+    async def think(self):
+        if self.think_time > 0:
+            await asyncio.sleep(self.random.expovariate(1.0 / self.think_time))
+
+    def pick_module(self):
+        return self.random.choices(self.modules, self.weights)[0]
+
+    async def timed(self, op, coro, expect_error=False):
+        started = time.perf_counter()
+        try:
+            status, payload = await coro
+            ok = (status >= 400) if expect_error else (status < 400)
+        except Exception:
+            status, payload, ok = 599, {}, False
+        self.stats.record(op, time.perf_counter() - started, ok)
+        return status, payload
+
+    async def run_http_learner(self, host, port):
+        client = HTTPClient(host, port)
+        try:
+            status, created = await self.timed("create", client.request(
+                "POST", "/sessions", {"module": self.pick_module(), "mode": self.random.choice(self.modes)}))
+            if status != 201:
+                return
+            base = f"/sessions/{created['session_id']}"
+            for _ in range(self.questions):
+                status, question = await self.timed("question", client.request("GET", base + "/question"))
+                if status != 200:
+                    return
+                await self.think()
+                if self.random.random() < self.error_rate:
+                    await self.timed("invalid_answer", client.request(
+                        "POST", base + "/answer", {"option": "5"}), expect_error=True)
+                await self.timed("answer", client.request(
+                    "POST", base + "/answer", {"option": self.random.choice(list(question["options"]))}))
+            await self.timed("stats", client.request("GET", base + "/stats"))
+            await self.timed("close", client.request("DELETE", base))
+            self.stats.sessions_completed += 1
+        finally:
+            client.close()
+
+    async def run_direct_learner(self, bank, index):
+        def call(fn, *args):
+            # 直连模式下把同步调用包装成与HTTP模式相同的(状态码, 结果)形式
+            async def wrapper():
+                try:
+                    return 200, fn(*args)
+                except ValueError as e:
+                    return 400, {"error": str(e)}
+            return wrapper()
+
+        module_id = self.pick_module()
+        status, session = await self.timed("create", call(
+            QuizSession, bank, module_id, self.random.choice(self.modes), f"load-{index}"))
+        for _ in range(self.questions):
+            status, question = await self.timed("question", call(session.next_question))
+            await self.think()
+            if self.random.random() < self.error_rate:
+                await self.timed("invalid_answer", call(session.answer, "5"), expect_error=True)
+            await self.timed("answer", call(session.answer, self.random.choice(list(question["options"]))))
+        await self.timed("stats", call(session.statistics))
+        # 会话只是一个普通对象，没有与HTTP模式的DELETE对应的关闭操作，因此不统计close
+        self.stats.sessions_completed += 1
+
+    async def run(self, url=None, direct=False):
+        """
+        执行压力测试
+
+        Args:
+            url: 服务地址，例如 http://127.0.0.1:8765；为None时在本进程内启动临时服务
+            direct: 是否直接调用会话接口
+
+        Returns:
+            LoadStats: 统计结果
+        """
+        server = cluster = None
+        if direct:
+            bank = get_shared_bank()
+            for module_id in self.modules:
+                bank.get_module(module_id)
+            learners = [self.run_direct_learner(bank, i) for i in range(self.clients)]
+        else:
+            if url is None and self.workers > 1:
+                from quiz_cluster import QuizCluster
+                cluster = QuizCluster(self.workers, self.modules)
+                host, port = "127.0.0.1", cluster.start("127.0.0.1", 0)
+                await wait_until_ready(host, port)
+            elif url is None:
+                from quiz_server import QuizServer
+                server = QuizServer()
+                await server.start("127.0.0.1", 0, preload=self.modules)
+                host, port = "127.0.0.1", server.port
+            else:
+                parts = urlsplit(url)
+                host, port = parts.hostname, parts.port or 80
+            learners = [self.run_http_learner(host, port) for _ in range(self.clients)]
+
+        self.stats.started_at = time.perf_counter()
+        try:
+            await asyncio.gather(*learners)
+        finally:
+            self.stats.finished_at = time.perf_counter()
+            if server is not None:
+                await server.close()
+            if cluster is not None:
+                cluster.stop()
+        return self.stats
+
+
+async def wait_until_ready(host, port, timeout=30):
+    """等待服务的/health接口可以访问"""
+    deadline = time.monotonic() + timeout
+    while True:
+        client = HTTPClient(host, port)
+        try:
+            status, _ = await client.request("GET", "/health")
+            if status == 200:
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+        finally:
+            client.close()
+        await asyncio.sleep(0.05)
+
+
+def write_csv(path, stats, meta):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        rows = stats.rows()
+        writer = csv.DictWriter(f, fieldnames=list(meta.keys()) + list(rows[0].keys()) if rows else list(meta.keys()))
+        writer.writeheader()
+        for row in rows:
+            record = OrderedDict(meta)
+            record.update(row)
+            writer.writerow(record)
+
+
+def write_json(path, stats, meta):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"run": meta, "sessions_completed": stats.sessions_completed,
+                   "duration_s": round(stats.duration, 3), "operations": stats.rows()},
+                  f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="英语词汇测验服务压力测试")
+    parser.add_argument("--url", default=None, help="服务地址，例如 http://127.0.0.1:8765（默认启动本地临时服务）")
+    parser.add_argument("--direct", action="store_true", help="直接调用QuizSession接口，不经过HTTP")
+    parser.add_argument("--clients", type=int, default=100, help="同时在线的学生数（默认100）")
+    parser.add_argument("--questions", type=int, default=20, help="每个学生回答的题数（默认20）")
+    parser.add_argument("--think-time", type=float, default=0.0, help="平均思考时间（秒，默认0）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="提交无效答案的概率（默认0）")
+    parser.add_argument("--modules", default="1", help="模块及比例，例如 1:0.7,4:0.3（默认1）")
+    parser.add_argument("--seed", type=int, default=None, help="随机数种子")
+    parser.add_argument("--workers", type=int, default=1, help="本地临时服务的工作进程数（默认1）")
+    parser.add_argument("--csv", default=None, help="把结果写入CSV文件")
+    parser.add_argument("--json", default=None, help="把结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    test = LoadTest(args.clients, args.questions, args.think_time, args.error_rate,
+                    parse_module_mix(args.modules), seed=args.seed, workers=args.workers)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        stats = loop.run_until_complete(test.run(args.url, args.direct))
+    finally:
+        loop.close()
+
+    print(stats.format_report())
+    meta = OrderedDict([
+        ("target", "direct" if args.direct else (args.url or "local")),
+        ("clients", args.clients), ("questions", args.questions),
+        ("think_time", args.think_time), ("error_rate", args.error_rate), ("modules", args.modules),
+        ("workers", args.workers)
+    ])
+    if args.csv:
+        write_csv(args.csv, stats, meta)
+    if args.json:
+        write_json(args.json, stats, meta)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
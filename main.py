@@ -11,15 +11,74 @@
 日期: 2025
 """
 
-from vocabulary_tester import VocabularyTester
+import argparse
+import os
+import sys
 
+from metrics import setup_metrics
+from profiling import profile_session
 
-def main():
+
+def parse_args(argv=None):
+    """
+    解析命令行参数
+    
+    Args:
+        argv: 参数列表，默认使用sys.argv
+        
+    Returns:
+        argparse.Namespace: 解析结果
+    """
+    parser = argparse.ArgumentParser(description="英语词汇测试系统")
+    parser.add_argument("command", nargs="?", choices=["test", "lookup", "export"], default="test",
+                        help="test为词汇测试（默认），lookup为按前缀查词（输入中文时按释义查英文单词），"
+                             "例如 python main.py lookup aban；export为导出词汇，"
+                             "参数见 python main.py export --help")
+    parser.add_argument("words", nargs="*", help="lookup要查询的单词或前缀")
+    parser.add_argument("--protocol", choices=["text", "jsonl"], default="text",
+                        help="交互协议：text为交互式命令行（默认），jsonl为供程序调用的JSON Lines协议")
+    parser.add_argument("--preload", default="",
+                        help="jsonl协议模式下预先加载的模块编号，多个用逗号分隔，例如 1,4")
+    parser.add_argument("--profile", action="store_true",
+                        help="记录本次会话的函数耗时和内存分配到data/profiles（也可设置环境变量VT_PROFILE=1）")
+    parser.add_argument("--metrics", action="store_true",
+                        help="退出时把运行指标写入data/metrics（也可设置环境变量VT_METRICS=1）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     主函数，初始化并运行词汇测试器。
     
     包含错误处理，确保程序在遇到异常时能够优雅地退出。
     """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["export"]:
+        # 导出有自己的参数（格式、输出文件、筛选），交给vocab_export解析
+        from vocab_export import main as export_main
+        return export_main(argv[1:])
+    args = parse_args(argv)
+    if args.command == "lookup":
+        from word_lookup import run_lookup
+        if not args.words:
+            print("请输入要查询的单词或前缀，例如: python main.py lookup aban")
+            return 2
+        return run_lookup(args.words)
+    if args.protocol == "jsonl":
+        # 机器协议模式：不输出欢迎信息，所有输出均为JSON消息
+        from jsonl_protocol import run_jsonl_protocol
+        # 图形界面会同时启动多个协议子进程，指标文件按进程号区分
+        setup_metrics(f"jsonl_{os.getpid()}", args.metrics)
+        try:
+            with profile_session("jsonl", args.profile):
+                run_jsonl_protocol(preload=[m.strip() for m in args.preload.split(",") if m.strip()])
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    setup_metrics("cli", args.metrics)
+    from vocabulary_tester import VocabularyTester
+    
     # 显示欢迎信息
     print("========== 欢迎使用英语词汇测试系统 ==========")
     print("本系统支持多种词汇测试，帮助您提升英语水平")
@@ -27,10 +86,11 @@ def main():
     print("=====================================")
     
     try:
-        # 初始化词汇测试器
-        tester = VocabularyTester()
-        # 开始测试
-        tester.start_test()
+        with profile_session("cli", args.profile):
+            # 初始化词汇测试器
+            tester = VocabularyTester()
+            # 开始测试
+            tester.start_test()
     except KeyboardInterrupt:
         print("\n程序已被用户中断。")
     except Exception as e:
@@ -42,4 +102,4 @@ def main():
 
 if __name__ == "__main__":
     # 当作为主程序运行时，调用主函数
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
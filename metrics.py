@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 运行指标
+
+轻量的指标注册表（计数器、仪表、直方图），记录词汇加载、缓存命中、出题、判分、
+错题本写入和语音合成等行为，可以导出为Prometheus文本格式和JSON快照。
+
+默认关闭：关闭时每个埋点只是一次方法调用加一次布尔判断（预先绑定标签时约40ns）。开启方式:
+    python main.py --metrics        python gui.py --metrics      或设置环境变量 VT_METRICS=1
+开启后程序退出时写入 data/metrics/<会话>.prom 和 data/metrics/<会话>.json。
+
+在代码中使用:
+    from metrics import REGISTRY
+    QUESTIONS = REGISTRY.counter("vocab_questions_generated_total", "生成的题目数", ("mode",))
+    QUESTIONS.inc(mode="review")
+    REVIEW_QUESTIONS = QUESTIONS.labels(mode="review")   # 热点路径上预先绑定标签
+    REVIEW_QUESTIONS.inc()
+    with LOAD_SECONDS.time():
+        ...
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 指标输出目录
+DEFAULT_METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "metrics")
+
+# 开启指标的环境变量
+METRICS_ENV = "VT_METRICS"
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Timer:
+    __slots__ = ('bound', 'started')
+
+    def __init__(self, bound):
+        self.bound = bound
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.bound.observe(time.perf_counter() - self.started)
+        return False
+
+
+class BoundMetric:
+    """
+    绑定了标签值的指标
+
+    热点路径上应在导入时绑定好标签，调用时不再需要构造标签字典:
+        QUESTIONS_NORMAL = QUESTIONS_GENERATED.labels(mode="normal")
+        QUESTIONS_NORMAL.inc()
+    """
+    __slots__ = ('metric', 'key', 'registry')
+
+    def __init__(self, metric, key):
+        self.metric = metric
+        self.key = key
+        self.registry = metric.registry
+
+    def inc(self, amount=1):
+        if self.registry.enabled:
+            self.metric._add(self.key, amount)
+
+    def dec(self, amount=1):
+        if self.registry.enabled:
+            self.metric._add(self.key, -amount)
+
+    def set(self, value):
+        if self.registry.enabled:
+            self.metric._set(self.key, value)
+
+    def observe(self, value):
+        if self.registry.enabled:
+            self.metric._observe(self.key, value)
+
+    def time(self):
+        """返回计时上下文管理器，退出时记录耗时（秒）"""
+        return _Timer(self)
+
+
+class Metric:
+    """指标基类：按标签值保存数据"""
+    kind = "untyped"
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} 需要标签 {self.label_names}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def labels(self, **labels):
+        """
+        Returns:
+            BoundMetric: 绑定了标签值的指标
+        """
+        return BoundMetric(self, self._key(labels))
+
+    def inc(self, amount=1, **labels):
+        if self.registry.enabled:
+            self._add(self._key(labels), amount)
+
+    def _add(self, key, amount):
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def reset(self):
+        with self._lock:
+            self.values.clear()
+
+    def _items(self):
+        # 导出时其他线程可能正在写入，在锁内复制数据
+        with self._lock:
+            return list(self.values.items())
+
+    def samples(self):
+        """
+        Returns:
+            list: (指标名后缀, 标签值元组, 额外标签, 数值)
+        """
+        return [("", key, None, value) for key, value in self._items()]
+
+    def snapshot(self):
+        return [dict(zip(self.label_names, key), value=value) for key, value in self._items()]
+
+
+class Counter(Metric):
+    """只增不减的计数器"""
+    kind = "counter"
+
+
+class Gauge(Metric):
+    """可以任意设置的数值"""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        if self.registry.enabled:
+            self._set(self._key(labels), value)
+
+    def _set(self, key, value):
+        with self._lock:
+            self.values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """按分桶统计观测值的分布（累计计数、总和、次数）"""
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if self.registry.enabled:
+            self._observe(self._key(labels), value)
+
+    def _observe(self, key, value):
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                # 每个分桶的（非累计）计数，最后一个是+Inf；以及总和
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def time(self, **labels):
+        """
+        返回计时上下文管理器，退出时记录耗时（秒）
+        """
+        return _Timer(self.labels(**labels))
+
+    def _items(self):
+        # 分桶计数列表在写入时原地修改，需要连同列表一起复制
+        with self._lock:
+            return [(key, (list(counts), total)) for key, (counts, total) in self.values.items()]
+
+    def samples(self):
+        samples = []
+        for key, (counts, total) in self._items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", key, ("le", _format_value(bound)), cumulative))
+            samples.append(("_sum", key, None, round(total, 9)))
+            samples.append(("_count", key, None, cumulative))
+        return samples
+
+    def snapshot(self):
+        result = []
+        for key, (counts, total) in self._items():
+            count = sum(counts)
+            result.append(dict(zip(self.label_names, key), count=count, sum=round(total, 9),
+                               mean=round(total / count, 9) if count else 0.0,
+                               buckets=OrderedDict((_format_value(b), c) for b, c in
+                                                   zip(self.buckets + (float("inf"),), counts))))
+        return result
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    同名指标只注册一次，重复注册返回已有对象，因此各模块可以在导入时各自声明指标。
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, help_text, labels, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(self, name, help_text, labels, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"指标 {name} 已注册为 {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labels, buckets=buckets)
+
+    def reset(self):
+        """清空所有指标的数据（保留注册）"""
+        for metric in self.metrics.values():
+            metric.reset()
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: Prometheus文本格式
+        """
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, key, extra, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(metric.label_names, key, extra)} "
+                             f"{_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: 指标名 -> {type, help, values}
+        """
+        return OrderedDict((m.name, {"type": m.kind, "help": m.help, "values": m.snapshot()})
+                           for m in self.metrics.values())
+
+    def write(self, name, directory=None):
+        """
+        写入 <name>.prom 和 <name>.json
+
+        Returns:
+            tuple: (Prometheus文件路径, JSON文件路径)
+        """
+        directory = directory or DEFAULT_METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        prom_path = os.path.join(directory, f"{name}.prom")
+        json_path = os.path.join(directory, f"{name}.json")
+        # 先写临时文件再替换，避免采集程序读到写了一半的文件
+        for path, content in ((prom_path, self.to_prometheus()),
+                              (json_path, json.dumps({"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                                                      "metrics": self.snapshot()},
+                                                     ensure_ascii=False, indent=2))):
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        return prom_path, json_path
+
+
+# 进程内共享的注册表
+REGISTRY = MetricsRegistry(enabled=os.environ.get(METRICS_ENV, "").strip().lower() not in ("", "0", "false", "no", "off"))
+
+
+def setup_metrics(name, flag=False, registry=None):
+    """
+    按命令行参数和环境变量开启指标，并在程序退出时写入文件
+
+    Args:
+        name: 会话名称（输出文件名）
+        flag: 是否指定了--metrics
+        registry: 注册表，默认为REGISTRY
+
+    Returns:
+        bool: 是否已开启
+    """
+    registry = registry or REGISTRY
+    if flag:
+        registry.enabled = True
+    if registry.enabled:
+        atexit.register(registry.write, name)
+    return registry.enabled
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 短语模式（短语填空和短语释义）
+
+每个条目最多保存3个短语（VocabEntry.phrases）。PhraseIndex把一个模块中的所有短语
+编号，只保存紧凑的数组，不复制任何字符串:
+
+    owners[p]           短语p所属条目的下标
+    slots[p]            短语p在条目phrases中的位置
+    starts[p], ends[p]  短语中单词出现的位置（含词尾变化，例如 abandon -> abandoned），
+                        没有出现时为-1，这样的短语不用于填空题
+    firsts[e]           条目e的第一个短语的编号（条目e的短语为 firsts[e] .. firsts[e+1]-1）
+
+出题时随机选一个短语编号，干扰项也是随机的其他短语（填空题取它们所属的单词，
+释义题取它们的翻译），与词汇量无关，每道题都是O(1):
+
+    fill    "____ oneself to（沉溺于）" 横线处应填哪个单词？  选项为单词
+    match   "abandon oneself to" 的中文意思是什么？           选项为短语翻译
+
+索引在第一次出短语题时建立，同一份词汇数据（VocabularyBank中的元组）只建立一次。
+"""
+import random
+import threading
+from array import array
+
+from vocabulary_store import NORMAL_QUESTIONS, REVIEW_QUESTIONS, normalize_definition
+
+FILL = "fill"
+MATCH = "match"
+
+BLANK = "____"
+
+# 随机抽取干扰项的最多次数（短语太少或重复太多时用占位干扰项补足）
+MAX_DRAWS = 30
+
+# 已建立的索引：id(词汇元组) -> PhraseIndex（索引引用着元组，因此id在缓存期间不会被复用）
+MAX_CACHED = 16
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def blank_span(word, phrase):
+    """
+    Returns:
+        tuple: 单词在短语中出现的位置 (start, end)，包含紧跟的词尾（abandoned、bears）；
+               没有以单词开头的词时返回None
+    """
+    lower = phrase.lower()
+    target = word.lower()
+    i = lower.find(target)
+    while i >= 0:
+        if i == 0 or not lower[i - 1].isalpha():
+            end = i + len(target)
+            while end < len(phrase) and phrase[end].isalpha():
+                end += 1
+            return i, end
+        i = lower.find(target, i + 1)
+    return None
+
+
+class PhraseIndex:
+    """
+    一个模块中所有短语的索引
+    """
+    def __init__(self, entries):
+        """
+        Args:
+            entries: VocabEntry元组（VocabularyBank.get_module的结果）
+        """
+        self.entries = entries
+        self.owners = array("I")
+        self.slots = array("B")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.firsts = array("I", [0])
+        self.fillable = array("I")
+        self.positions = {}
+        for position, entry in enumerate(entries):
+            self.positions.setdefault(entry['word'], position)
+            for slot, (phrase, translation) in enumerate(getattr(entry, 'phrases', ())):
+                if not phrase or not translation:
+                    continue
+                phrase_id = len(self.owners)
+                self.owners.append(position)
+                self.slots.append(slot)
+                span = blank_span(entry['word'], phrase)
+                if span is None:
+                    self.starts.append(-1)
+                    self.ends.append(-1)
+                else:
+                    self.starts.append(span[0])
+                    self.ends.append(span[1])
+                    self.fillable.append(phrase_id)
+            self.firsts.append(len(self.owners))
+
+    def __len__(self):
+        return len(self.owners)
+
+    def phrase(self, phrase_id):
+        """
+        Returns:
+            tuple: (条目, 短语, 翻译)
+        """
+        entry = self.entries[self.owners[phrase_id]]
+        phrase, translation = entry.phrases[self.slots[phrase_id]]
+        return entry, phrase, translation
+
+    def blanked(self, phrase_id):
+        """
+        Returns:
+            str: 单词处换成横线的短语
+        """
+        _, phrase, _ = self.phrase(phrase_id)
+        return phrase[:self.starts[phrase_id]] + BLANK + phrase[self.ends[phrase_id]:]
+
+    def phrases_of(self, word):
+        """
+        Returns:
+            range: 单词（模块中第一个同名条目）的短语编号
+        """
+        position = self.positions.get(word)
+        if position is None:
+            return range(0)
+        return range(self.firsts[position], self.firsts[position + 1])
+
+    def random_phrase(self, fillable=False):
+        """随机选一个短语编号（fillable为True时只选可以填空的）"""
+        if fillable:
+            return self.fillable[random.randrange(len(self.fillable))]
+        return random.randrange(len(self.owners))
+
+
+def get_phrase_index(entries):
+    """
+    返回词汇数据的短语索引（同一个元组只建立一次）
+
+    Args:
+        entries: VocabEntry元组
+
+    Returns:
+        PhraseIndex
+    """
+    index = _indexes.get(id(entries))
+    if index is not None and index.entries is entries:
+        return index
+    with _indexes_lock:
+        index = _indexes.get(id(entries))
+        if index is None or index.entries is not entries:
+            index = PhraseIndex(entries)
+            while len(_indexes) >= MAX_CACHED:
+                del _indexes[next(iter(_indexes))]
+            _indexes[id(entries)] = index
+    return index
+
+
+def _draw_options(index, correct, value, exclude_owner):
+    # 从随机的其他短语中取3个不同的干扰项（value(短语编号) -> 选项文本）
+    options = [correct]
+    for _ in range(MAX_DRAWS):
+        if len(options) == 4:
+            break
+        phrase_id = random.randrange(len(index))
+        if index.owners[phrase_id] == exclude_owner:
+            continue
+        text = value(phrase_id)
+        if text and text not in options:
+            options.append(text)
+    while len(options) < 4:
+        options.append(f"干扰项_{random.randint(1000, 9999)}")
+    random.shuffle(options)
+    return options
+
+
+def build_phrase_question(index, review_items=None, kind=None):
+    """
+    生成一道短语题
+
+    Args:
+        index: PhraseIndex
+        review_items: 复习模式下作为题目候选的错题列表（优先选这些单词的短语）
+        kind: FILL 或 MATCH，默认随机（没有可填空的短语时总是MATCH）
+
+    Returns:
+        dict: 包含correct_item、options、question_text、kind、phrase、answer（正确选项编号）的题目；
+              没有短语时返回None
+    """
+    if not len(index):
+        return None
+    if kind is None:
+        kind = FILL if index.fillable and random.random() < 0.5 else MATCH
+
+    phrase_id = None
+    if review_items:
+        candidates = index.phrases_of(random.choice(review_items)['word'])
+        if kind == FILL:
+            candidates = [p for p in candidates if index.starts[p] >= 0]
+        if candidates:
+            phrase_id = random.choice(candidates)
+    if phrase_id is None:
+        if kind == FILL and not index.fillable:
+            kind = MATCH
+        phrase_id = index.random_phrase(fillable=kind == FILL)
+    (REVIEW_QUESTIONS if review_items else NORMAL_QUESTIONS).inc()
+
+    entry, phrase, translation = index.phrase(phrase_id)
+    owner = index.owners[phrase_id]
+    translation = normalize_definition(translation) or translation
+    if kind == FILL:
+        correct = entry['word']
+        options = _draw_options(index, correct, lambda p: index.entries[index.owners[p]]['word'], owner)
+        question_text = f"{index.blanked(phrase_id)}（{translation}）"
+    else:
+        correct = translation
+        options = _draw_options(index, correct, lambda p: normalize_definition(index.phrase(p)[2]), owner)
+        question_text = phrase
+    return {
+        'correct_item': entry,
+        'options': {str(i + 1): text for i, text in enumerate(options)},
+        'question_text': question_text,
+        'kind': kind,
+        'phrase': phrase,
+        'answer': str(options.index(correct) + 1)
+    }
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 批量预生成发音音频包
+
+为整个词汇模块预先合成所有单词的发音，写入data/audio下的音频包，
+运行时发音只需从音频包中读取，不再调用语音引擎。
+
+用法:
+    python prerender_audio.py --module 1
+    python prerender_audio.py --all --engine espeak --workers 4
+
+中断后重新运行会跳过已生成的片段，从中断处继续。
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from tts import AudioArchive, DEFAULT_ARCHIVE_DIR, create_engine
+from vocabulary_tester import VocabularyTester
+
+# 每合成多少个片段写一次索引（中断时最多重复合成这么多片段）
+INDEX_FLUSH_INTERVAL = 200
+
+# 工作进程中的语音引擎
+_worker_engine = None
+
+
+def _init_worker(engine_name):
+    global _worker_engine
+    _worker_engine = create_engine(engine_name)
+
+
+def _synthesize(text):
+    try:
+        return text, _worker_engine.synthesize(text), None
+    except Exception as e:
+        return text, None, str(e)
+
+
+def collect_words(tester, module_id):
+    """
+    加载模块并收集需要合成的单词（去重并保持原顺序）
+
+    Args:
+        tester: VocabularyTester实例
+        module_id: 模块ID
+
+    Returns:
+        list: 单词列表；模块加载失败时返回None
+    """
+    if not tester.load_vocabulary(module_id):
+        return None
+    words = []
+    seen = set()
+    for item in tester.vocab_data[str(module_id)]:
+        word = item['word'].strip()
+        if word and word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def archive_path_for(module_id, engine, archive_dir=None):
+    """
+    返回模块音频包的路径
+
+    Args:
+        module_id: 模块ID
+        engine: 语音引擎
+        archive_dir: 音频包目录，默认为data/audio
+
+    Returns:
+        str: .pack文件路径
+    """
+    return os.path.join(archive_dir or DEFAULT_ARCHIVE_DIR, f"{module_id}_{engine.name}.pack")
+
+
+def prerender_module(module_id, engine_name=None, workers=None, archive_dir=None, tester=None):
+    """
+    为一个模块生成音频包
+
+    Args:
+        module_id: 模块ID
+        engine_name: 语音引擎名称，为None时自动选择
+        workers: 工作进程数，默认为CPU核数
+        archive_dir: 音频包目录
+        tester: VocabularyTester实例，为None时自动创建
+
+    Returns:
+        dict: 本次运行的统计信息；模块加载失败时返回None
+    """
+    engine = create_engine(engine_name)
+    if not engine.is_available():
+        print(f"语音引擎 {engine.name} 在当前环境下不可用")
+        return None
+    tester = tester or VocabularyTester()
+    words = collect_words(tester, module_id)
+    if words is None:
+        return None
+
+    pack_path = archive_path_for(module_id, engine, archive_dir)
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+    archive = AudioArchive(pack_path)
+    if archive.engine not in (None, engine.name) or archive.voice not in (None, engine.voice):
+        # 引擎或参数变化后旧的片段不能再用
+        archive.clips = {}
+    archive.engine = engine.name
+    archive.voice = engine.voice
+
+    todo = [w for w in words if engine.cache_key(w) not in archive]
+    skipped = len(words) - len(todo)
+    print(f"模块 {module_id}: 共 {len(words)} 个单词，已生成 {skipped} 个，待生成 {len(todo)} 个")
+
+    stats = {"module": str(module_id), "engine": engine.name, "total": len(words),
+             "skipped": skipped, "rendered": 0, "failed": 0, "bytes": 0, "seconds": 0.0}
+    if not todo:
+        return stats
+
+    # 上次中断时可能在索引之后写入了部分数据，截断到索引记录的末尾
+    with open(pack_path, "ab") as f:
+        f.truncate(archive.data_end())
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    with open(pack_path, "ab") as pack, \
+            multiprocessing.Pool(workers, initializer=_init_worker, initargs=(engine.name,)) as pool:
+        offset = pack.tell()
+        for text, data, error in pool.imap_unordered(_synthesize, todo, chunksize=8):
+            if data is None:
+                stats["failed"] += 1
+                print(f"合成失败: {text} ({error})", file=sys.stderr)
+                continue
+            pack.write(data)
+            archive.clips[engine.cache_key(text)] = (offset, len(data))
+            offset += len(data)
+            stats["rendered"] += 1
+            stats["bytes"] += len(data)
+            if stats["rendered"] % INDEX_FLUSH_INTERVAL == 0:
+                pack.flush()
+                archive.write_index()
+                elapsed = time.perf_counter() - started
+                print(f"  已生成 {stats['rendered']}/{len(todo)}，"
+                      f"{stats['rendered'] / elapsed:.1f} 个/秒")
+        pack.flush()
+        archive.write_index()
+
+    stats["seconds"] = time.perf_counter() - started
+    print(f"完成：生成 {stats['rendered']} 个片段，失败 {stats['failed']} 个，"
+          f"用时 {stats['seconds']:.1f} 秒，"
+          f"{stats['rendered'] / max(stats['seconds'], 1e-9):.1f} 个/秒，"
+          f"{stats['bytes'] / 1024 / 1024 / max(stats['seconds'], 1e-9):.2f} MB/秒")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量预生成词汇模块的发音音频包")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--module", help="模块编号，例如 1")
+    group.add_argument("--all", action="store_true", help="处理json目录中存在的全部模块")
+    parser.add_argument("--engine", default=None, help="语音引擎：sapi / espeak / null（默认自动选择）")
+    parser.add_argument("--workers", type=int, default=None, help="并行合成的进程数（默认为CPU核数）")
+    parser.add_argument("--output", default=None, help="音频包目录（默认为data/audio）")
+    args = parser.parse_args(argv)
+
+    tester = VocabularyTester()
+    if args.all:
+        module_ids = [k for k, v in tester.modules.items()
+                      if os.path.isfile(os.path.join(tester.json_dir, v["file"]))]
+    else:
+        module_ids = [args.module]
+    for module_id in module_ids:
+        prerender_module(module_id, args.engine, args.workers, args.output, tester)
+
+
+if __name__ == "__main__":
+    main()
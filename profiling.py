@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 可选的会话性能剖析
+
+学生反馈"很卡"但无法复现时，让学生用剖析模式启动程序:
+
+    python main.py --profile            或设置环境变量 VT_PROFILE=1
+    python gui.py --profile
+
+整个会话会在cProfile和tracemalloc下运行，结束时在data/profiles/中写入:
+    <会话>_<时间>_<进程号>.prof     cProfile统计（pstats格式）
+    <会话>_<时间>_<进程号>.alloc    tracemalloc快照（tracemalloc.Snapshot.load可读取）
+只保留最近的若干个会话（默认20个，可用 VT_PROFILE_KEEP 修改）。
+
+VT_PROFILE 可以是 1/all（同时记录）、cpu（只记录函数耗时）或 mem（只记录内存分配）。
+图形界面的测试子进程会继承环境变量，因此子进程也会各自生成剖析文件。
+
+汇总收集到的所有会话:
+    python profiling.py report --top 20
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+
+# cProfile、pstats和tracemalloc只在真正剖析或生成报告时才导入，
+# 以免拖慢每次启动（main.py和测试子进程都会导入本模块）
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 剖析文件目录
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_DIR, "data", "profiles")
+
+# 开启剖析的环境变量
+PROFILE_ENV = "VT_PROFILE"
+
+# 默认保留的会话数
+DEFAULT_KEEP = 20
+
+PROFILE_SUFFIX = ".prof"
+ALLOC_SUFFIX = ".alloc"
+
+
+def profile_modes(flag=False, env=None):
+    """
+    根据命令行参数和环境变量确定剖析内容
+
+    Args:
+        flag: 是否指定了--profile
+        env: 环境变量字典，默认为os.environ
+
+    Returns:
+        tuple: (是否记录函数耗时, 是否记录内存分配)
+    """
+    value = (env if env is not None else os.environ).get(PROFILE_ENV, "").strip().lower()
+    if not value or value in ("0", "false", "no", "off"):
+        return (True, True) if flag else (False, False)
+    if value == "cpu":
+        return True, False
+    if value in ("mem", "memory"):
+        return False, True
+    return True, True
+
+
+def profile_keep(env=None):
+    """
+    读取环境变量 VT_PROFILE_KEEP 确定保留的会话数
+
+    Args:
+        env: 环境变量字典，默认为os.environ
+
+    Returns:
+        int: 保留的会话数（至少为1）；未设置或不是整数时为DEFAULT_KEEP
+    """
+    value = (env if env is not None else os.environ).get("VT_PROFILE_KEEP", "").strip()
+    if not value:
+        return DEFAULT_KEEP
+    try:
+        return max(1, int(value))
+    except ValueError:
+        print(f"警告: VT_PROFILE_KEEP={value!r} 不是整数，保留最近 {DEFAULT_KEEP} 个会话", file=sys.stderr)
+        return DEFAULT_KEEP
+
+
+class SessionProfiler:
+    """
+    记录一个会话的函数耗时和内存分配
+
+    用法:
+        profiler = SessionProfiler("cli")
+        profiler.start()
+        ...
+        profiler.stop()     # 写入文件并清理旧会话
+    """
+    def __init__(self, name, directory=None, cpu=True, memory=True, keep=None):
+        """
+        Args:
+            name: 会话名称（文件名前缀），例如cli、gui
+            directory: 输出目录，默认为data/profiles
+            cpu: 是否记录函数耗时
+            memory: 是否记录内存分配
+            keep: 保留的会话数（至少为1），默认读取 VT_PROFILE_KEEP 或为20
+        """
+        self.name = name
+        self.directory = directory or DEFAULT_PROFILE_DIR
+        self.cpu = cpu
+        self.memory = memory
+        self.keep = max(1, keep) if keep is not None else profile_keep()
+        self.profile = None
+        self.started_at = None
+        self._started_tracemalloc = False
+
+    def start(self):
+        import cProfile
+        import tracemalloc
+        self.started_at = time.time()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self.cpu:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self):
+        """
+        停止剖析并写入文件
+
+        Returns:
+            list: 写入的文件路径
+        """
+        import tracemalloc
+        written = []
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.fromtimestamp(self.started_at or time.time()).strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.directory, f"{self.name}_{stamp}_{os.getpid()}")
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(base + PROFILE_SUFFIX)
+            written.append(base + PROFILE_SUFFIX)
+            self.profile = None
+        if self.memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(base + ALLOC_SUFFIX)
+            written.append(base + ALLOC_SUFFIX)
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+        rotate(self.directory, self.keep)
+        return written
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+class _NullProfiler:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+def profile_session(name, flag=False):
+    """
+    按命令行参数和环境变量决定是否剖析会话
+
+    Args:
+        name: 会话名称
+        flag: 是否指定了--profile
+
+    Returns:
+        上下文管理器：未开启剖析时什么也不做
+    """
+    cpu, memory = profile_modes(flag)
+    if not (cpu or memory):
+        return _NullProfiler()
+    return SessionProfiler(name, cpu=cpu, memory=memory)
+
+
+def _sessions(directory):
+    """
+    Returns:
+        dict: 会话文件前缀 -> 文件路径列表
+    """
+    sessions = defaultdict(list)
+    for path in glob.glob(os.path.join(directory, "*")):
+        base, ext = os.path.splitext(path)
+        if ext in (PROFILE_SUFFIX, ALLOC_SUFFIX):
+            sessions[base].append(path)
+    return sessions
+
+
+def rotate(directory, keep):
+    """
+    只保留最近的keep个会话的文件
+
+    Returns:
+        int: 删除的会话数
+    """
+    sessions = _sessions(directory)
+    ordered = sorted(sessions, key=lambda base: max(os.path.getmtime(p) for p in sessions[base]), reverse=True)
+    removed = 0
+    for base in ordered[max(keep, 0):]:
+        for path in sessions[base]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        removed += 1
+    return removed
+
+
+def top_functions(paths, top=20, sort="cumulative"):
+    """
+    汇总多个会话的函数耗时
+
+    Returns:
+        list: (函数, 调用次数, 自身耗时, 累计耗时) 列表
+    """
+    if not paths:
+        return []
+    import pstats
+    stats = pstats.Stats(*paths)
+    rows = []
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        filename, line, name = func
+        label = f"{name} ({os.path.basename(filename)}:{line})" if line else name
+        rows.append((label, nc, tt, ct))
+    key = 3 if sort == "cumulative" else 2
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[:top]
+
+
+def top_allocations(paths, top=20):
+    """
+    汇总多个会话结束时仍未释放的内存分配位置
+
+    Returns:
+        list: (代码位置, 会话数, 平均大小字节, 平均块数) 列表，按平均大小排序
+    """
+    import cProfile
+    import tracemalloc
+    totals = defaultdict(lambda: [0, 0, 0])
+    for path in paths:
+        snapshot = tracemalloc.Snapshot.load(path).filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        for stat in snapshot.statistics("lineno"):
+            frame = stat.traceback[0]
+            filename = frame.filename
+            if filename.startswith(PROJECT_DIR + os.sep):
+                filename = os.path.relpath(filename, PROJECT_DIR)
+            entry = totals[f"{filename}:{frame.lineno}"]
+            entry[0] += 1
+            entry[1] += stat.size
+            entry[2] += stat.count
+    n = max(len(paths), 1)
+    rows = [(site, sessions, size / n, count / n) for site, (sessions, size, count) in totals.items()]
+    rows.sort(key=lambda r: r[2], reverse=True)
+    return rows[:top]
+
+
+def format_report(directory=None, top=20, sort="cumulative", name=None):
+    """
+    生成所有已收集会话的汇总报告
+
+    Args:
+        directory: 剖析文件目录
+        top: 显示的条目数
+        sort: 函数排序方式，cumulative（累计耗时）或 tottime（自身耗时）
+        name: 只统计该名称的会话（例如cli、gui）
+
+    Returns:
+        str: 报告文本
+    """
+    directory = directory or DEFAULT_PROFILE_DIR
+    sessions = _sessions(directory)
+    if name:
+        sessions = {b: p for b, p in sessions.items() if os.path.basename(b).startswith(name + "_")}
+    prof = sorted(p for paths in sessions.values() for p in paths if p.endswith(PROFILE_SUFFIX))
+    alloc = sorted(p for paths in sessions.values() for p in paths if p.endswith(ALLOC_SUFFIX))
+    lines = [f"目录: {directory}", f"会话数: {len(sessions)}（函数耗时 {len(prof)} 个，内存分配 {len(alloc)} 个）"]
+
+    if prof:
+        lines.append(f"\n耗时最多的函数（按{'累计' if sort == 'cumulative' else '自身'}耗时，所有会话合计）:")
+        lines.append(f"{'calls':>10}{'tottime s':>12}{'cumtime s':>12}  function")
+        for label, calls, tottime, cumtime in top_functions(prof, top, sort):
+            lines.append(f"{calls:>10}{tottime:>12.3f}{cumtime:>12.3f}  {label}")
+    if alloc:
+        lines.append("\n会话结束时占用内存最多的分配位置（每个会话的平均值）:")
+        lines.append(f"{'sessions':>9}{'avg KiB':>12}{'avg blocks':>12}  site")
+        for site, count, size, blocks in top_allocations(alloc, top):
+            lines.append(f"{count:>9}{size / 1024:>12.1f}{blocks:>12.0f}  {site}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="汇总会话剖析结果")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="汇总所有已收集会话的函数耗时和内存分配")
+    report.add_argument("--dir", default=None, help="剖析文件目录（默认data/profiles）")
+    report.add_argument("--top", type=int, default=20, help="显示的条目数（默认20）")
+    report.add_argument("--sort", choices=("cumulative", "tottime"), default="cumulative", help="函数排序方式")
+    report.add_argument("--name", default=None, help="只统计该名称的会话，例如cli、gui、jsonl")
+    args = parser.parse_args(argv)
+    print(format_report(args.dir, args.top, args.sort, args.name))
+
+
+if __name__ == "__main__":
+    main()
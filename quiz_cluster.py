@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 多进程测验服务
+
+单个quiz_server.py进程受GIL限制只能用满一个CPU核。本模块以预先创建（pre-fork）
+的方式启动多个工作进程，共同在同一个监听端口上接受连接:
+
+    - 主进程解析一次词汇文件，编译到共享内存（shared_vocab.SharedVocabulary），
+      工作进程直接连接这块内存，不会各自保存一份词汇数据
+    - 会话ID带有所属工作进程的编号（例如 "2-9f3c..."），会话只保存在该进程中
+    - 请求落到其他工作进程时，由它通过本机私有端口转发给会话所属的进程，
+      因此客户端无需关心连接被分配到哪个进程，答题状态始终一致
+    - 工作进程意外退出时主进程会重新启动它（该进程中的会话会丢失）
+
+接口与quiz_server.py相同，/health额外返回worker和forwarded字段。
+
+用法:
+    python quiz_cluster.py --workers 4 --port 8765 --modules 1,4,7
+    python quiz_cluster.py --workers 4 --mmap data/shared_vocab.bin
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import secrets
+import signal
+import socket
+import time
+
+from quiz_server import LISTEN_BACKLOG, SESSION_IDLE_TIMEOUT, HTTPClient, HTTPError, QuizServer
+from shared_vocab import SharedVocabulary, SharedVocabularyBank, compile_vocabulary
+from vocabulary_store import VocabularyBank
+
+# 会话ID中工作进程编号与随机部分之间的分隔符
+SESSION_ID_SEP = "-"
+
+
+class ClusterQuizServer(QuizServer):
+    """
+    多进程服务中的一个工作进程
+
+    在公共端口上接受客户端连接，在私有端口上接受其他工作进程转发的请求。
+    """
+    def __init__(self, bank, worker_index, peer_ports, idle_timeout=SESSION_IDLE_TIMEOUT):
+        """
+        Args:
+            bank: SharedVocabularyBank
+            worker_index: 本进程编号
+            peer_ports: 所有工作进程的私有端口列表（按编号排列）
+            idle_timeout: 会话空闲超时秒数
+        """
+        super().__init__(bank, idle_timeout)
+        self.worker_index = worker_index
+        self.peer_ports = peer_ports
+        # 工作进程编号 -> 空闲的转发连接
+        self.peer_clients = {}
+        self.peer_server = None
+        self.forwarded = 0
+
+    def new_session_id(self):
+        return f"{self.worker_index:x}{SESSION_ID_SEP}{secrets.token_hex(8)}"
+
+    def session_owner(self, session_id):
+        """
+        Returns:
+            int: 会话所属的工作进程编号；ID格式不正确时返回None
+        """
+        prefix, sep, _ = session_id.partition(SESSION_ID_SEP)
+        if not sep:
+            return None
+        try:
+            index = int(prefix, 16)
+        except ValueError:
+            return None
+        return index if 0 <= index < len(self.peer_ports) else None
+
+    async def forward(self, worker_index, method, path, body):
+        """
+        把请求转发给会话所属的工作进程
+
+        Returns:
+            tuple: (状态码, 响应字典)
+        """
+        idle = self.peer_clients.setdefault(worker_index, [])
+        client = idle.pop() if idle else HTTPClient("127.0.0.1", self.peer_ports[worker_index])
+        try:
+            result = await client.request(method, path, body or None)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            client.close()
+            raise HTTPError(502, "会话所在的工作进程不可用")
+        idle.append(client)
+        self.forwarded += 1
+        return result
+
+    async def route(self, method, path, body):
+        parts = [p for p in path.split("?", 1)[0].split("/") if p]
+        if len(parts) >= 2 and parts[0] == "sessions":
+            owner = self.session_owner(parts[1])
+            if owner is not None and owner != self.worker_index:
+                return await self.forward(owner, method, path, body)
+        status, payload = await super().route(method, path, body)
+        if parts == ["health"]:
+            payload["worker"] = self.worker_index
+            payload["forwarded"] = self.forwarded
+        return status, payload
+
+    async def start(self, sock=None, peer_sock=None):
+        """
+        启动工作进程的服务
+
+        Args:
+            sock: 所有工作进程共用的公共监听套接字
+            peer_sock: 本进程的私有监听套接字
+        """
+        await super().start(sock=sock)
+        self.peer_server = await asyncio.start_server(self.handle_client, sock=peer_sock,
+                                                      backlog=LISTEN_BACKLOG)
+        return self.server
+
+    async def close(self):
+        if self.peer_server is not None:
+            self.peer_server.close()
+            await self.peer_server.wait_closed()
+        for clients in self.peer_clients.values():
+            for client in clients:
+                client.close()
+        self.peer_clients.clear()
+        await super().close()
+
+
+def run_worker(worker_index, shared_name, sock, peer_sock, peer_ports, idle_timeout):
+    """工作进程入口"""
+    # Ctrl+C由主进程统一处理
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shared = SharedVocabulary.attach(shared_name)
+    quiz_server = ClusterQuizServer(SharedVocabularyBank(shared), worker_index, peer_ports, idle_timeout)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    if hasattr(signal, "SIGTERM") and os.name != "nt":
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    loop.run_until_complete(quiz_server.start(sock, peer_sock))
+    try:
+        loop.run_forever()
+    finally:
+        loop.run_until_complete(quiz_server.close())
+        loop.close()
+
+
+def _listen(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(LISTEN_BACKLOG)
+    return sock
+
+
+class QuizCluster:
+    """
+    多进程测验服务的主进程
+    """
+    def __init__(self, workers=None, modules=None, idle_timeout=SESSION_IDLE_TIMEOUT, mmap_path=None):
+        """
+        Args:
+            workers: 工作进程数，默认为CPU核数
+            modules: 编译进共享内存的模块ID列表，默认为词汇文件存在的所有模块
+            idle_timeout: 会话空闲超时秒数
+            mmap_path: 提供时用mmap文件代替shared_memory
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.modules = modules
+        self.idle_timeout = idle_timeout
+        self.mmap_path = mmap_path
+        self.shared = None
+        self.sock = None
+        self.peer_socks = []
+        self.processes = []
+
+    def compile(self):
+        """
+        解析词汇文件并放进共享内存
+
+        Returns:
+            SharedVocabulary: 共享词汇数据
+        """
+        # 使用临时的VocabularyBank，编译完成后即可释放，工作进程不会继承解析出的对象
+        bank = VocabularyBank()
+        modules = self.modules
+        if modules is None:
+            modules = [m for m in bank.modules if os.path.exists(bank.module_path(m))]
+        self.shared = SharedVocabulary.create(compile_vocabulary(bank, modules), self.mmap_path)
+        return self.shared
+
+    def start(self, host="127.0.0.1", port=8765):
+        """
+        编译词汇数据并启动所有工作进程
+
+        Returns:
+            int: 实际监听的端口
+        """
+        if self.shared is None:
+            self.compile()
+        self.sock = _listen(host, port)
+        self.peer_socks = [_listen("127.0.0.1", 0) for _ in range(self.workers)]
+        for index in range(self.workers):
+            self.processes.append(self._spawn(index))
+        return self.port
+
+    def _spawn(self, index):
+        peer_ports = [s.getsockname()[1] for s in self.peer_socks]
+        process = multiprocessing.Process(
+            target=run_worker, name=f"quiz-worker-{index}",
+            args=(index, self.shared.name, self.sock, self.peer_socks[index], peer_ports, self.idle_timeout),
+            daemon=True)
+        process.start()
+        return process
+
+    @property
+    def port(self):
+        """公共监听端口"""
+        return self.sock.getsockname()[1] if self.sock else None
+
+    def supervise(self, interval=1.0):
+        """
+        监视工作进程，意外退出的进程会被重新启动（阻塞直到KeyboardInterrupt）
+        """
+        while True:
+            time.sleep(interval)
+            for index, process in enumerate(self.processes):
+                if not process.is_alive():
+                    print(f"工作进程 {index} 已退出（exitcode={process.exitcode}），正在重新启动")
+                    self.processes[index] = self._spawn(index)
+
+    def stop(self, timeout=5):
+        """停止所有工作进程并释放共享内存"""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout)
+        self.processes = []
+        for sock in [self.sock] + self.peer_socks:
+            if sock is not None:
+                sock.close()
+        self.sock = None
+        self.peer_socks = []
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="英语词汇测试多进程HTTP服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认127.0.0.1）")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口（默认8765）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument("--modules", default="", help="加载的模块编号，多个用逗号分隔（默认全部可用模块）")
+    parser.add_argument("--mmap", default=None, help="使用mmap文件代替共享内存，指定文件路径")
+    args = parser.parse_args(argv)
+
+    modules = [m.strip() for m in args.modules.split(",") if m.strip()] or None
+    cluster = QuizCluster(args.workers, modules, mmap_path=args.mmap)
+    shared = cluster.compile()
+    print(f"共享词汇数据: {len(shared.modules)} 个模块，{shared.count} 个条目，"
+          f"{shared.nbytes / 1024 / 1024:.1f} MB")
+    cluster.start(args.host, args.port)
+    print(f"词汇测验服务已启动: http://{args.host}:{cluster.port}（{cluster.workers} 个工作进程）")
+    try:
+        cluster.supervise()
+    except KeyboardInterrupt:
+        print("\n服务已停止")
+    finally:
+        cluster.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 异步HTTP测验服务
+
+基于asyncio标准库实现的HTTP/JSON服务，让一台机器同时为大量学生提供词汇测验。
+所有会话共享同一份只读词汇数据（VocabularyBank），每个会话只是一个几百字节的
+QuizSession；词汇文件在线程池中加载，不会阻塞事件循环。
+
+接口:
+    POST   /sessions                  创建会话，请求体 {"module": "1", "mode": "chinese"}
+    GET    /sessions/<id>/question    获取当前题目（未作答前重复请求返回同一道题）
+    POST   /sessions/<id>/answer      提交答案，请求体 {"option": "2"}
+    GET    /sessions/<id>/stats       获取统计信息
+    DELETE /sessions/<id>             结束会话
+    GET    /health                    服务状态
+
+用法:
+    python quiz_server.py --port 8765 --preload 1,4
+"""
+import argparse
+import asyncio
+import json
+import secrets
+import time
+from urllib.parse import urlsplit
+
+from vocabulary_store import QuizSession, get_shared_bank
+
+# 会话空闲多久后自动清理（秒）
+SESSION_IDLE_TIMEOUT = 30 * 60
+
+# 请求体大小上限（字节）
+MAX_BODY_BYTES = 64 * 1024
+
+# 监听队列长度
+LISTEN_BACKLOG = 2048
+
+HTTP_REASONS = {
+    200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request",
+    404: "Not Found", 405: "Method Not Allowed", 409: "Conflict",
+    413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway"
+}
+
+
+class HTTPError(Exception):
+    """处理请求时返回给客户端的错误"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class QuizServer:
+    """
+    异步HTTP测验服务
+    """
+    def __init__(self, bank=None, idle_timeout=SESSION_IDLE_TIMEOUT):
+        """
+        Args:
+            bank: 共享的VocabularyBank，默认使用进程内共享实例
+            idle_timeout: 会话空闲超时秒数
+        """
+        self.bank = bank or get_shared_bank()
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        # 模块ID -> 正在进行的加载任务，保证同一模块只加载一次
+        self.loading = {}
+        self.server = None
+        self._expire_task = None
+        self.started_at = time.monotonic()
+        self.requests_handled = 0
+
+    # ---------- 词汇数据 ----------
+
+    async def ensure_module(self, module_id):
+        """
+        确保模块已加载（在线程池中读取文件，多个请求共享同一次加载）
+
+        Args:
+            module_id: 模块ID
+
+        Returns:
+            tuple: 模块的共享词汇条目
+        """
+        if self.bank.is_loaded(module_id):
+            return self.bank.get_module(module_id)
+        if module_id not in self.bank.modules:
+            raise HTTPError(400, f"无效的模块ID: {module_id}")
+        task = self.loading.get(module_id)
+        if task is None:
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(None, self.bank.get_module, module_id)
+            self.loading[module_id] = task
+        try:
+            return await task
+        except (OSError, ValueError) as e:
+            raise HTTPError(500, f"加载词汇文件失败: {e}")
+        finally:
+            self.loading.pop(module_id, None)
+
+    # ---------- 会话 ----------
+
+    def new_session_id(self):
+        """生成新的会话ID"""
+        return secrets.token_hex(8)
+
+    def get_session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, "会话不存在或已过期")
+        session.last_active = time.monotonic()
+        return session
+
+    async def create_session(self, body):
+        module_id = str(body.get("module", "1"))
+        mode = body.get("mode", "chinese")
+        if mode not in ("chinese", "english"):
+            raise HTTPError(400, f"无效的测试模式: {mode}")
+        vocab = await self.ensure_module(module_id)
+
+        session_id = self.new_session_id()
+        self.sessions[session_id] = QuizSession(self.bank, module_id, mode, session_id)
+        return 201, {"session_id": session_id, "module": module_id,
+                     "name": self.bank.module_name(module_id),
+                     "mode": mode, "total": len(vocab)}
+
+    def current_question(self, session):
+        question = session.next_question()
+        if question is None:
+            raise HTTPError(500, "无法生成题目，请检查词汇数据")
+        return {"question_id": session.question_id, "mode": session.test_mode,
+                "text": question["question_text"], "options": question["options"]}
+
+    def answer(self, session, body):
+        if session.question is None:
+            raise HTTPError(409, "当前没有待回答的题目")
+        if "question_id" in body and body["question_id"] != session.question_id:
+            raise HTTPError(409, "题目已过期")
+        try:
+            result = session.answer(body.get("option", ""))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        result["question_id"] = session.question_id
+        result["statistics"] = session.statistics()
+        return result
+
+    def expire_sessions(self):
+        """清理空闲超时的会话，返回清理的数量"""
+        deadline = time.monotonic() - self.idle_timeout
+        expired = [sid for sid, s in self.sessions.items() if s.last_active < deadline]
+        for sid in expired:
+            del self.sessions[sid]
+        return len(expired)
+
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(min(60, self.idle_timeout))
+            self.expire_sessions()
+
+    # ---------- 路由 ----------
+
+    async def route(self, method, path, body):
+        """
+        处理一个请求
+
+        Args:
+            method: HTTP方法
+            path: 请求路径
+            body: 解析后的JSON请求体（字典）
+
+        Returns:
+            tuple: (状态码, 响应字典)
+        """
+        parts = [p for p in urlsplit(path).path.split("/") if p]
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok", "sessions": len(self.sessions),
+                         "loaded_modules": self.bank.loaded_modules(),
+                         "requests": self.requests_handled,
+                         "uptime": round(time.monotonic() - self.started_at, 1)}
+        if parts == ["sessions"]:
+            if method != "POST":
+                raise HTTPError(405, "只支持POST")
+            return await self.create_session(body)
+        if len(parts) in (2, 3) and parts[0] == "sessions":
+            session = self.get_session(parts[1])
+            action = parts[2] if len(parts) == 3 else None
+            if len(parts) == 2 and method == "DELETE":
+                del self.sessions[session.session_id]
+                return 200, {"session_id": session.session_id,
+                             "statistics": session.statistics()}
+            if action == "question" and method == "GET":
+                return 200, self.current_question(session)
+            if action == "answer" and method == "POST":
+                return 200, self.answer(session, body)
+            if action == "stats" and method == "GET":
+                return 200, session.statistics()
+        raise HTTPError(404, "接口不存在")
+
+    # ---------- HTTP ----------
+
+    async def handle_client(self, reader, writer):
+        """处理一个HTTP连接（支持keep-alive）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.write_response(writer, 400, {"error": "无效的请求行"}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                status, payload = await self.process_request(method.upper(), path, headers, reader)
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def process_request(self, method, path, headers, reader):
+        self.requests_handled += 1
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+            if length > MAX_BODY_BYTES:
+                raise HTTPError(413, "请求体过大")
+            body = {}
+            if length:
+                raw = await reader.readexactly(length)
+                try:
+                    body = json.loads(raw.decode("utf-8"))
+                except ValueError:
+                    raise HTTPError(400, "请求体不是有效的JSON")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "请求体必须是JSON对象")
+            return await self.route(method, path, body)
+        except HTTPError as e:
+            return e.status, {"error": e.message}
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def write_response(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(self, host="127.0.0.1", port=8765, preload=None, sock=None):
+        """
+        启动服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0表示随机端口）
+            preload: 启动前预加载的模块ID列表
+            sock: 已创建的监听套接字（提供时忽略host和port）
+
+        Returns:
+            asyncio.AbstractServer: 服务对象
+        """
+        for module_id in preload or []:
+            await self.ensure_module(str(module_id))
+        # 大量学生同时连接时默认的监听队列（100）会溢出，导致连接被延迟重试
+        if sock is not None:
+            self.server = await asyncio.start_server(self.handle_client, sock=sock, backlog=LISTEN_BACKLOG)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port, backlog=LISTEN_BACKLOG)
+        self._expire_task = asyncio.ensure_future(self._expire_loop())
+        return self.server
+
+    async def close(self):
+        """停止接受新连接并结束后台清理任务"""
+        if self._expire_task is not None:
+            self._expire_task.cancel()
+            self._expire_task = None
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    @property
+    def port(self):
+        """实际监听的端口"""
+        return self.server.sockets[0].getsockname()[1] if self.server else None
+
+
+class HTTPClient:
+    """使用keep-alive连接的最小异步HTTP/JSON客户端"""
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        """
+        发送请求
+
+        Returns:
+            tuple: (状态码, 响应字典)
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + data)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("服务端关闭了连接")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        payload = await self.reader.readexactly(length) if length else b"{}"
+        return status, json.loads(payload.decode("utf-8"))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="英语词汇测试异步HTTP服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认127.0.0.1）")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口（默认8765）")
+    parser.add_argument("--preload", default="", help="启动时预加载的模块编号，多个用逗号分隔")
+    args = parser.parse_args(argv)
+
+    preload = [m.strip() for m in args.preload.split(",") if m.strip()]
+    quiz_server = QuizServer()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(quiz_server.start(args.host, args.port, preload))
+    print(f"词汇测验服务已启动: http://{args.host}:{quiz_server.port}")
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        print("\n服务已停止")
+    finally:
+        loop.run_until_complete(quiz_server.close())
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 跨进程共享的词汇数据
+
+把VocabularyBank中已解析的模块编译成一块紧凑的二进制数据，放进
+multiprocessing.shared_memory（或写入文件后用mmap映射）。多个工作进程
+直接在这块内存上读取条目，不需要各自解析JSON，也不会各自保存一份副本。
+
+数据布局（只在本机进程间共享，偏移表使用本机字节序）:
+    MAGIC(4字节) | 头部长度(uint32) | JSON头部 | 填充到4字节对齐
+    | 条目偏移表(uint32 × (条目数+1)) | 条目数据
+
+每个条目编码为UTF-8文本: 单词 \\x1f 释义 \\x1f 打包的义项 [\\x1f 短语 \\x1e 翻译]...
+（打包的义项见vocabulary_store.pack_senses，其中的分隔符与这里的不同，可以原样嵌入）
+读取时只解码被访问的条目，解码结果是普通的VocabEntry。
+"""
+import json
+import mmap
+import os
+import struct
+from collections.abc import Sequence
+
+from vocabulary_store import VocabEntry, VocabularyBank
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python 3.8以前没有shared_memory，只能使用mmap文件
+    shared_memory = None
+
+# 条目格式变化时修改，旧格式的数据不会被误读
+MAGIC = b"VTS2"
+FIELD_SEP = "\x1f"
+PHRASE_SEP = "\x1e"
+
+_HEADER = struct.Struct("<4sI")
+
+
+def encode_entry(entry):
+    """把VocabEntry编码为字节串"""
+    fields = [entry.word, entry.definition, entry.packed_senses]
+    fields.extend(f"{phrase}{PHRASE_SEP}{translation}" for phrase, translation in entry.phrases)
+    return FIELD_SEP.join(fields).encode("utf-8")
+
+
+def decode_entry(data):
+    """把encode_entry的结果还原为VocabEntry"""
+    fields = str(data, "utf-8").split(FIELD_SEP)
+    phrases = [tuple(p.split(PHRASE_SEP, 1)) for p in fields[3:]]
+    return VocabEntry(fields[0], fields[1], phrases, packed_senses=fields[2])
+
+
+def compile_vocabulary(bank, module_ids):
+    """
+    把已加载的模块编译成共享内存布局
+
+    Args:
+        bank: VocabularyBank（会按需加载模块）
+        module_ids: 要编译的模块ID列表
+
+    Returns:
+        bytes: 编译后的数据
+    """
+    offsets = [0]
+    chunks = []
+    modules = {}
+    for module_id in module_ids:
+        module_id = str(module_id)
+        entries = bank.get_module(module_id)
+        modules[module_id] = {"name": bank.module_name(module_id),
+                              "start": len(offsets) - 1, "count": len(entries)}
+        for entry in entries:
+            chunk = encode_entry(entry)
+            chunks.append(chunk)
+            offsets.append(offsets[-1] + len(chunk))
+
+    header = json.dumps({"modules": modules, "count": len(chunks)}, ensure_ascii=False).encode("utf-8")
+    prefix = _HEADER.pack(MAGIC, len(header)) + header
+    prefix += b"\0" * (-len(prefix) % 4)
+    return prefix + struct.pack(f"={len(offsets)}I", *offsets) + b"".join(chunks)
+
+
+class SharedModuleView(Sequence):
+    """
+    共享内存中一个模块的只读条目序列
+
+    支持len()、下标访问和迭代，可以直接交给build_question出题；
+    条目在访问时才解码。
+    """
+    __slots__ = ('_offsets', '_data', '_start', '_count')
+
+    def __init__(self, offsets, data, start, count):
+        self._offsets = offsets
+        self._data = data
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("条目下标超出范围")
+        i = self._start + index
+        return decode_entry(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+
+class SharedVocabulary:
+    """
+    共享内存（或mmap文件）中的编译词汇数据
+
+    创建方:
+        shared = SharedVocabulary.create(compile_vocabulary(bank, ["1", "4"]))
+        ... 把shared.name传给工作进程 ...
+        shared.close(); shared.unlink()
+
+    工作进程:
+        shared = SharedVocabulary.attach(name)
+        bank = SharedVocabularyBank(shared)
+    """
+    def __init__(self, buffer, name, shm=None, mapping=None):
+        self.name = name
+        self._shm = shm
+        self._mmap = mapping
+        self._buffer = memoryview(buffer)
+
+        magic, header_len = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("不是有效的共享词汇数据")
+        start = _HEADER.size
+        header = json.loads(bytes(self._buffer[start:start + header_len]).decode("utf-8"))
+        self.modules = header["modules"]
+        self.count = header["count"]
+
+        table_start = start + header_len
+        table_start += -table_start % 4
+        table_end = table_start + (self.count + 1) * 4
+        self._offsets = self._buffer[table_start:table_end].cast("I")
+        self._data = self._buffer[table_end:]
+
+    @classmethod
+    def create(cls, data, path=None):
+        """
+        把编译好的数据放进共享内存
+
+        Args:
+            data: compile_vocabulary的结果
+            path: 提供时写入该文件并用mmap映射（名称为文件路径），否则使用shared_memory
+
+        Returns:
+            SharedVocabulary: 创建方持有的实例
+        """
+        if path is not None or shared_memory is None:
+            path = os.path.abspath(path or os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        "data", "shared_vocab.bin"))
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+            return cls.attach(path)
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        return cls(shm.buf[:len(data)], shm.name, shm=shm)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        连接到已存在的共享词汇数据（不复制）
+
+        Args:
+            name: 共享内存名称，或mmap文件路径
+
+        Returns:
+            SharedVocabulary: 实例
+        """
+        if os.path.sep in name or shared_memory is None:
+            with open(name, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(mapping, name, mapping=mapping)
+        shm = _attach_shared_memory(name)
+        return cls(shm.buf, name, shm=shm)
+
+    @property
+    def nbytes(self):
+        """数据总字节数"""
+        return self._buffer.nbytes
+
+    def module(self, module_id):
+        """
+        Returns:
+            SharedModuleView: 模块的条目序列
+
+        Raises:
+            KeyError: 模块不在共享数据中
+        """
+        info = self.modules[str(module_id)]
+        return SharedModuleView(self._offsets, self._data, info["start"], info["count"])
+
+    def close(self):
+        """释放本进程对共享数据的映射"""
+        self._offsets.release()
+        self._data.release()
+        self._buffer.release()
+        if self._shm is not None:
+            self._shm.close()
+        if self._mmap is not None:
+            self._mmap.close()
+
+    def unlink(self):
+        """删除共享内存（只应由创建方调用）"""
+        if self._shm is not None:
+            self._shm.unlink()
+
+
+def _attach_shared_memory(name):
+    # 3.13起连接方可以不在resource_tracker中登记；更早的版本中，由主进程创建的
+    # 工作进程与主进程共用同一个resource_tracker，重复登记不会导致共享内存被提前删除
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedVocabularyBank(VocabularyBank):
+    """
+    基于共享词汇数据的VocabularyBank
+
+    模块数据来自SharedVocabulary，不读取JSON文件；
+    共享数据中没有的模块会被当作无效模块。
+    """
+    def __init__(self, shared):
+        """
+        Args:
+            shared: SharedVocabulary实例
+        """
+        modules = {module_id: {"name": info["name"]} for module_id, info in shared.modules.items()}
+        super().__init__(modules=modules)
+        self.shared = shared
+        for module_id in modules:
+            self._data[module_id] = shared.module(module_id)
+
+    def module_path(self, module_id):
+        return self.shared.name
+
+    def get_module(self, module_id):
+        module_id = str(module_id)
+        try:
+            return self._data[module_id]
+        except KeyError:
+            raise KeyError(f"无效的模块ID: {module_id}")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 拼写模式（显示中文释义，输入英文单词）
+
+判分分为三档:
+    exact   与单词（或可接受的写法，例如 x-ray / x ray / xray、Mr. / Mr）完全相同，不区分大小写
+    near    拼写接近：编辑距离不超过near_miss_limit(单词)（短词1个字母，长词2个字母），算答错，
+            但在错题本中单独标记
+    wrong   其他答案
+
+编辑距离使用Myers的位并行算法（Hyyrö的全局编辑距离形式）：单词的每个字母对应一个位，
+答案的每个字母只需要常数次整数位运算，并在剩余字母不可能把距离降回上限以内时提前结束，
+因此即使与所有可接受的写法比较，每次判分也只需几微秒。
+"""
+import random
+from functools import lru_cache
+
+from vocabulary_store import NORMAL_QUESTIONS, REVIEW_QUESTIONS, entry_gloss
+from word_index import normalize_word
+
+EXACT = "exact"
+NEAR = "near"
+WRONG = "wrong"
+
+
+def near_miss_limit(word):
+    """
+    Returns:
+        int: 判为拼写接近的最大编辑距离（1-2个字母的单词为0，7个字母以上为2）
+    """
+    n = len(word)
+    if n <= 2:
+        return 0
+    return 1 if n <= 6 else 2
+
+
+@lru_cache(maxsize=4096)
+def accepted_variants(word):
+    """
+    Returns:
+        tuple: 单词可接受的规范化写法（连字符可以换成空格或省略，末尾的句点可以省略）
+    """
+    base = normalize_word(word)
+    variants = {base}
+    if "-" in base:
+        variants.add(base.replace("-", " "))
+        variants.add(base.replace("-", ""))
+    variants |= {v.rstrip(".") for v in variants if v.endswith(".") and v.rstrip(".")}
+    return tuple(sorted(variants))
+
+
+@lru_cache(maxsize=4096)
+def _pattern_masks(pattern):
+    # 每个字母在pattern中出现位置的位掩码
+    masks = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def myers_distance(pattern, text, max_distance=None):
+    """
+    位并行计算pattern与text的编辑距离（插入、删除、替换各算一次）
+
+    Args:
+        pattern: 正确的拼写
+        text: 用户的答案
+        max_distance: 距离上限，超过时提前结束
+
+    Returns:
+        int: 编辑距离；超过max_distance时返回max_distance + 1
+    """
+    m, n = len(pattern), len(text)
+    if max_distance is not None and abs(m - n) > max_distance:
+        return max_distance + 1
+    if not m or not n:
+        distance = m + n
+        return distance if max_distance is None else min(distance, max_distance + 1)
+    masks = _pattern_masks(pattern)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn = full, 0
+    score = m
+    for j, ch in enumerate(text):
+        eq = masks.get(ch, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        # 全局编辑距离：第0行为0, 1, 2, ...，每列移入一个+1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+        # 剩下的每个字母最多把距离减1
+        if max_distance is not None and score - (n - j - 1) > max_distance:
+            return max_distance + 1
+    return score
+
+
+def grade_spelling(answer, variants):
+    """
+    给拼写答案判分
+
+    Args:
+        answer: 用户输入的单词
+        variants: 可接受的规范化写法（accepted_variants的结果）
+
+    Returns:
+        tuple: (EXACT / NEAR / WRONG, 编辑距离)；答错时距离为None
+    """
+    answer = normalize_word(answer)
+    if answer in variants:
+        return EXACT, 0
+    best = None
+    for variant in variants:
+        limit = near_miss_limit(variant)
+        if best is not None:
+            limit = min(limit, best - 1)
+        if limit <= 0:
+            continue
+        distance = myers_distance(variant, answer, limit)
+        if distance <= limit:
+            best = distance
+    if best is None:
+        return WRONG, None
+    return NEAR, best
+
+
+def build_spelling_question(vocab_list, review_items=None):
+    """
+    生成一道拼写题
+
+    Args:
+        vocab_list: 词汇条目序列
+        review_items: 复习模式下作为题目候选的错题列表（含word和definition）
+
+    Returns:
+        dict: 包含correct_item、options（空）、question_text（带词性的完整释义）和variants的题目；词汇为空时返回None
+    """
+    if not vocab_list:
+        return None
+    if review_items:
+        wrong_item = random.choice(review_items)
+        correct_item = {'word': wrong_item['word'], 'definition': wrong_item['definition']}
+        REVIEW_QUESTIONS.inc()
+    else:
+        correct_item = vocab_list[random.randrange(len(vocab_list))]
+        NORMAL_QUESTIONS.inc()
+    return {
+        'correct_item': correct_item,
+        'options': {},
+        'question_text': entry_gloss(correct_item),
+        'variants': accepted_variants(correct_item['word'])
+    }
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证合成词汇生成器和基准测试的退化判断
+"""
+import json
+
+from benchmarks.memory import run_memory
+from benchmarks.run_benchmarks import BENCHMARK_NAMES, compare, run_suite
+from benchmarks.startup import run_startup
+from benchmarks.synthetic_vocab import write_vocabulary_file
+from vocabulary_store import parse_vocabulary
+
+
+def test_synthetic_vocabulary(tmp_path):
+    """测试合成词汇文件与json目录中的文件结构相同，且可重复生成"""
+    first = write_vocabulary_file(str(tmp_path / "a.json"), 300, seed=3)
+    second = write_vocabulary_file(str(tmp_path / "b.json"), 300, seed=3)
+    with open(first, encoding="utf-8") as f:
+        raw = json.load(f)
+    with open(second, encoding="utf-8") as f:
+        assert json.load(f) == raw
+    assert len(raw) == len({item["word"] for item in raw}) == 300
+    assert len(parse_vocabulary(raw)) == 300
+
+
+def test_benchmark_suite(tmp_path):
+    """测试基准测试能完整运行，并按阈值判断退化"""
+    results = run_suite(sizes=[200], repeat=1, cache_dir=str(tmp_path))
+    assert list(results) == [f"{name}@200" for name in BENCHMARK_NAMES]
+    assert all(value["us"] > 0 and value["relative"] > 0 for value in results.values())
+
+    baseline = {key: {"us": value["us"], "relative": value["relative"] * 2} for key, value in results.items()}
+    baseline["load_vocabulary@200"] = {"us": 1.0, "relative": results["load_vocabulary@200"]["relative"] / 2}
+    rows = compare(results, baseline, threshold=0.25)
+    assert [row[0] for row in rows if row[4]] == ["load_vocabulary@200"]
+    assert compare({"new@1": {"us": 1.0, "relative": 0.1}}, {})[0][2:] == (None, None, False)
+
+
+def test_startup_benchmark():
+    """测试启动耗时在新进程中测量"""
+    results = run_startup(repeat=1, names=["import_main"])
+    assert list(results) == ["startup_import_main"]
+    assert results["startup_import_main"]["us"] > 0 and results["startup_import_main"]["relative"] > 0
+
+
+def test_memory_benchmark(tmp_path):
+    """测试打包的条目比每个义项一个字典的布局占用更少内存"""
+    results = run_memory(modules=["1"], sizes=[2000], repeat=1, cache_dir=str(tmp_path))
+    assert list(results) == ["module_1", "synthetic_2000"]
+    for r in results.values():
+        assert r["entries"] > 0 and r["senses"] >= r["entries"]
+        assert 0 < r["bytes_per_entry"] < r["dict_bytes_per_entry"]
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_synthetic_vocabulary(pathlib.Path(tempfile.mkdtemp()))
+    test_benchmark_suite(pathlib.Path(tempfile.mkdtemp()))
+    test_startup_benchmark()
+    test_memory_benchmark(pathlib.Path(tempfile.mkdtemp()))
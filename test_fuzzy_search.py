@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证编辑距离、容错查词的排序和按模块保存的索引
+"""
+import os
+
+from fuzzy_search import FuzzyIndex, FuzzySearcher, edit_distance
+
+
+def build(vocab_files):
+    _, index, prefix_index = vocab_files.indexes()
+    return FuzzySearcher(index, prefix_index, vocab_files.path("fuzzy"))
+
+
+def test_edit_distance():
+    """测试有界编辑距离：相邻字母对调算一次，超过上限时返回上限+1"""
+    assert edit_distance("receive", "receive") == 0
+    assert edit_distance("recieve", "receive") == 1
+    assert edit_distance("abandn", "abandon") == 1
+    assert edit_distance("acomodate", "accommodate") == 2
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("", "ab") == 2 and edit_distance("abc", "") == 3
+    assert edit_distance("ab", "ba", 0) == 1
+
+
+def test_fuzzy_search(vocab_files):
+    """测试容错查词：距离优先，同距离时多模块单词在前，结果带释义"""
+    vocab_files.write("a.json", ["Receive", "relieve", "recipe", "abandon", "band"])
+    vocab_files.write("b.json", ["deceive", "relieve", "test tube"])
+    searcher = build(vocab_files)
+
+    results = searcher.search("recieve")
+    assert [(r["word"], r["distance"]) for r in results] == [
+        ("relieve", 1), ("Receive", 1), ("deceive", 2), ("recipe", 2)]
+    assert results[1]["definition"] == "Receive的释义" and results[0]["modules"] == ["a", "b"]
+    assert [r["word"] for r in searcher.search("recieve", max_distance=1, k=1)] == ["relieve"]
+    assert [r["word"] for r in searcher.search("TEST  TUB")] == ["test tube"]
+    assert [r["word"] for r in searcher.search("recieve", modules=["b"])] == ["relieve", "deceive"]
+    assert searcher.search("xyzzyq") == [] and searcher.search(" ") == []
+
+
+def test_persisted_per_module(vocab_files):
+    """测试每个模块的索引分别保存，词汇文件变化时只重建该模块"""
+    vocab_files.write("a.json", ["abandon", "ability"])
+    vocab_files.write("b.json", ["zebra"])
+    build(vocab_files).load_all()
+    path_a, path_b = vocab_files.path("fuzzy/a.idx"), vocab_files.path("fuzzy/b.idx")
+    saved = FuzzyIndex.load(path_a)
+    assert saved.words == ["abandon", "ability"] and [w for _, w in saved.search("abilty")] == ["ability"]
+    mtime_a = os.stat(path_a).st_mtime_ns
+
+    vocab_files.write("b.json", ["zebra", "zero"], 2)
+    searcher = build(vocab_files)
+    assert [r["word"] for r in searcher.search("zer")] == ["zero", "zebra"]
+    assert os.stat(path_a).st_mtime_ns == mtime_a
+    assert FuzzyIndex.load(path_b).words == ["zebra", "zero"]
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_edit_distance()
+    test_fuzzy_search(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
+    test_persisted_per_module(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
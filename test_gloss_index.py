@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证释义规范化、中译英查词和按词义判分
+"""
+import io
+import os
+
+from conftest import vocab_item
+from jsonl_protocol import JsonlProtocolServer, decode_message
+from gloss_index import GlossIndex, gloss_key
+from tester_io import ScriptedIO
+from vocabulary_store import VocabularyBank, normalize_definition, split_glosses
+from vocabulary_tester import VocabularyTester
+
+
+def build(vocab_files):
+    vocab_files.write("a.json", [
+        vocab_item("discriminate", " 区别， 辨别； 有差别地对待， 歧视", pos="v"),
+        vocab_item("distinguish", "区分，辨别", pos="v"),
+        vocab_item("abandon", "放弃", "（使）放纵", pos="v"),
+    ])
+    vocab_files.write("b.json", [
+        vocab_item("Abandon", "抛弃", pos="v"),
+        vocab_item("discrimination", "歧视；辨别力", pos="v"),
+    ])
+    bank, index, prefix_index = vocab_files.indexes()
+    return GlossIndex.build(index, bank, prefix_index)
+
+
+def test_normalize_definition():
+    """测试释义规范化：去掉空白，分隔符统一为"，"，括号内的分隔符不拆分"""
+    assert normalize_definition(" 区别， 辨别； 有差别地对待， 歧视") == "区别，辨别，有差别地对待，歧视"
+    assert split_glosses("行为;行动, （戏剧，歌剧的）一幕") == ["行为", "行动", "（戏剧，歌剧的）一幕"]
+    assert split_glosses("(美，口）好；；") == ["(美，口）好"]
+    assert gloss_key(" （使） 放纵 ") == "放纵" and gloss_key("（美）") == "（美）"
+
+    bank = VocabularyBank(os.path.dirname(os.path.abspath(__file__)) + "/json")
+    entry = bank.get_module("1")[0]
+    assert entry.definition == normalize_definition(entry.definition)
+
+
+def test_reverse_lookup(vocab_files):
+    """测试中译英查词：词义完全相同的在前，之后是部分匹配；结果合并所有模块"""
+    index = build(vocab_files)
+    results = index.search("歧视")
+    assert [r["word"] for r in results] == ["discriminate", "discrimination"]
+    assert results[0]["definition"] == "v. 区别，辨别，有差别地对待，歧视" and results[0]["gloss"] == "歧视"
+    assert [r["word"] for r in index.search("辨别")][:2] == ["distinguish", "discriminate"]
+    assert [r["word"] for r in index.search("辨别力")] == ["discrimination", "distinguish", "discriminate"]
+    assert [r["word"] for r in index.search("放纵")] == ["abandon"]
+    assert index.search("差别")[0]["word"] == "discriminate"
+    assert [(r["word"], r["gloss"]) for r in index.search("抛")] == [("abandon", "抛弃")]
+    assert index.search("  ") == []
+
+
+def test_gloss_answer(vocab_files):
+    """测试按词义判分：任意一个词义正确即算对，合并所有模块的义项"""
+    index = build(vocab_files)
+    assert index.matches("discriminate", "歧视")
+    assert index.matches("discriminate", "差别；辨别")
+    assert index.matches("ABANDON", "抛弃") and index.matches("abandon", "放纵")
+    assert not index.matches("discriminate", "差别") and not index.matches("unknown", "歧视")
+
+    # 英文模式中直接输入中文释义：第一题答对，第二题答错
+    answers = iter(["right", "wrong", "q"])
+
+    def answer(kind, prompt, context):
+        if kind == "module":
+            return "a"
+        if kind == "mode":
+            return "2"
+        if kind == "save":
+            return "n"
+        choice = next(answers)
+        if choice == "right":
+            return context["correct_item"]["definition"].split("，")[-1]
+        return "完全无关" if choice == "wrong" else choice
+
+    events = []
+    tester = VocabularyTester(bank=vocab_files.bank(), io=ScriptedIO(answer, events=events))
+    tester.start_test()
+    results = [fields for kind, fields in events if kind == "result"]
+    assert [r["correct"] for r in results] == [True, False]
+    assert tester.total_questions == 2 and tester.correct_answers == 1
+    assert tester.wrong_answers[0]["user_answer"] == "完全无关"
+    # 测试器只从自己的词汇数据（当前模块）建立词义索引
+    assert tester.gloss_entries is tester.vocab_data["a"] and len(tester.gloss_index.words) == 3
+    assert not tester.gloss_index.matches("abandon", "抛弃")
+
+
+def test_meaning_protocol(vocab_files):
+    """测试JSON Lines协议中英文模式直接发送中文释义作答；词义索引在开始测试时建立"""
+    build(vocab_files)
+    output = io.StringIO()
+    tester = VocabularyTester(bank=vocab_files.bank())
+    server = JsonlProtocolServer(tester=tester, stdout=output)
+    server.dispatch({"cmd": "start", "module": "a", "mode": "english"})
+    assert tester.gloss_entries is tester.vocab_data["a"]
+
+    server.dispatch({"cmd": "answer", "meaning": server.current_question["correct_item"]["definition"].split("，")[-1]})
+    server.dispatch({"cmd": "answer", "meaning": "abc"})
+    server.dispatch({"cmd": "answer", "meaning": "完全无关"})
+    messages = [decode_message(line) for line in output.getvalue().splitlines()]
+    assert [m["message"] for m in messages if m["type"] == "error"] == ["请输入中文释义"]
+    results = [m for m in messages if m["type"] == "result"]
+    assert [r["correct"] for r in results] == [True, False]
+    assert results[1]["user_answer"] == "完全无关"
+    assert tester.total_questions == 2 and tester.correct_answers == 1
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_normalize_definition()
+    test_reverse_lookup(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
+    test_gloss_answer(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
+    test_meaning_protocol(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
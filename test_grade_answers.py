@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证批量批改答卷
+"""
+import io
+import json
+
+from grade_answers import grade_responses, make_paper, read_responses
+from vocabulary_store import get_shared_bank
+
+
+def test_grade_answers(tmp_path):
+    """测试CSV答卷的批改结果、学生报告格式和全班汇总"""
+    paper = make_paper("1", 8, "chinese", seed=7)
+    questions = paper["questions"]
+    assert len(questions) == 8 and len({q["word"] for q in questions}) == 8
+    # 题目数超过不同单词的个数（模块1中有重复的单词）时每个单词出一题
+    unique = {entry['word'] for entry in get_shared_bank().get_module("1")}
+    paper_all = make_paper("1", len(unique) + 500, "english", seed=1)
+    assert sorted(q["word"] for q in paper_all["questions"]) == sorted(unique)
+
+    letters = {"1": "A", "2": "B", "3": "C", "4": "D"}
+    wrong_first = next(o for o in questions[0]["options"] if o != questions[0]["answer"])
+    rows = [
+        ["perfect"] + [q["answer"] for q in questions],
+        ["letters"] + [letters[q["answer"]].lower() for q in questions],
+        ["blank"] + [""] * len(questions),
+        ["one_wrong", wrong_first] + [q["answer"] for q in questions[1:]],
+    ]
+    path = tmp_path / "answers.csv"
+    path.write_text("\n".join(",".join(r) for r in [["student_id"] + [q["id"] for q in questions]] + rows),
+                    encoding="utf-8")
+
+    for workers in (1, 2):
+        output = io.StringIO()
+        summary = grade_responses(paper, read_responses(str(path)), output,
+                                  report_dir=str(tmp_path / "reports"), workers=workers, batch_size=1)
+        reports = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [r["metadata"]["student_id"] for r in reports] == ["perfect", "letters", "blank", "one_wrong"]
+        assert [r["metadata"]["correct_answers"] for r in reports] == [8, 8, 0, 7]
+        assert reports[2]["wrong_answers"][0]["question_info"]["your_answer"] == "未作答"
+        wrong = reports[3]["wrong_answers"]
+        assert len(wrong) == 1 and wrong[0]["word_info"]["word"] == questions[0]["word"]
+        assert wrong[0]["question_info"]["your_answer"] == questions[0]["options"][wrong_first]
+
+        result = summary.to_dict()
+        assert result["students"] == 4
+        first = next(q for q in result["questions"] if q["id"] == questions[0]["id"])
+        assert first["wrong"] == 2 and first["blank"] == 1 and first["miss_rate"] == 50.0
+        assert result["questions"][0]["id"] == questions[0]["id"]
+    assert (tmp_path / "reports" / "one_wrong.json").exists()
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_grade_answers(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证词汇文件热重载（等待文件写完再重新加载、加载失败时保留原来的数据、
+替换测试器的数据时不影响当前题目和答题统计）
+"""
+import os
+
+from hot_reload import ModuleWatcher
+from vocabulary_tester import VocabularyTester
+
+
+def test_watcher(vocab_files):
+    """测试只检查已加载的模块，指纹连续两次相同才重新加载，格式错误时文件再次变化才重试"""
+    words = [f"w{i}" for i in range(40)]
+    vocab_files.write("a.json", words)
+    vocab_files.write("b.json", ["x"])
+    bank = vocab_files.bank()
+    watcher = ModuleWatcher(bank)
+    old = bank.get_module("a")
+    assert bank.module_fingerprint("a") is not None and bank.module_fingerprint("b") is None
+    assert watcher.poll(["a", "b"]) == []
+
+    vocab_files.write("b.json", ["y"], 2)
+    vocab_files.write("a.json", words + ["new"], 2)
+    assert watcher.poll(["a", "b"]) == []
+    assert watcher.poll(["a", "b"]) == ["a"]
+    delta = watcher.reload("a")
+    assert [delta.entries[j].word for j in delta.added] == ["new"]
+    assert bank.get_module("a") is delta.entries and delta.entries[0] is old[0]
+    assert watcher.poll(["a"]) == [] and watcher.poll(["a"]) == []
+
+    path = vocab_files.path("a.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('[{"word": "broken"')
+    os.utime(path, ns=(3, 3))
+    watcher.poll(["a"])
+    assert watcher.poll(["a"]) == ["a"]
+    try:
+        watcher.reload("a")
+        assert False, "格式错误的词汇文件应当抛出ValueError"
+    except ValueError:
+        pass
+    assert bank.get_module("a") is delta.entries
+    assert watcher.poll(["a"]) == [] and watcher.poll(["a"]) == []
+
+    vocab_files.write("a.json", ["w0"], 4)
+    watcher.poll(["a"])
+    assert watcher.poll(["a"]) == ["a"]
+    assert [e.word for e in watcher.reload("a").entries] == ["w0"]
+    assert watcher.reload("a") is None
+
+
+def test_replace_module(vocab_files):
+    """测试替换测试器的词汇数据：当前题目和统计不变，之后的题目使用新数据"""
+    vocab_files.write("a.json", ["old1", "old2", "old3", "old4"])
+    bank = vocab_files.bank()
+    tester = VocabularyTester(bank)
+    assert tester.load_vocabulary("a")
+    tester.test_mode = "chinese"
+    question = tester.generate_question()
+    tester.total_questions, tester.correct_answers = 3, 2
+    assert not tester.replace_module("b", ())
+
+    vocab_files.write("a.json", ["new1", "new2", "new3", "new4", "new5"], 2)
+    delta = ModuleWatcher(bank).reload("a")
+    assert tester.replace_module("a", delta.entries)
+    assert tester.module_total_words == 5 and tester.get_statistics()["total_questions"] == 3
+    assert tester.evaluate_answer(question['correct_item']['word'], question['correct_item']['word'],
+                                  question['correct_item']['word'], question['correct_item']['definition'])
+    assert tester.generate_question()['correct_item']['word'].startswith("new")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_watcher(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
+    test_replace_module(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
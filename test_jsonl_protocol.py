@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证 main.py --protocol jsonl 机器协议
+"""
+import io
+import os
+import subprocess
+import sys
+
+from jsonl_protocol import JsonlProtocolClient, JsonlProtocolServer, decode_message, encode_message
+
+
+def start_protocol_process():
+    """以JSON Lines协议模式启动main.py"""
+    return subprocess.Popen(
+        [sys.executable, "main.py", "--protocol", "jsonl"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+
+
+def test_jsonl_protocol():
+    """测试题目、作答结果和统计信息均以单条JSON消息返回"""
+    process = start_protocol_process()
+    client = JsonlProtocolClient(process)
+    try:
+        ready = client.read_message()
+        assert ready["type"] == "ready"
+        assert ready["modules"]["1"] == "初中"
+
+        client.send("start", module="1", mode="english")
+        question, _ = client.read_until("question")
+        assert question is not None
+        assert len(question["options"]) == 4
+        assert question["latency_ms"] >= question["elapsed_ms"] >= 0
+
+        correct_count = 0
+        for i in range(5):
+            client.send("answer", option="1")
+            result, _ = client.read_until("result")
+            assert result["question_id"] == question["id"]
+            assert result["correct_option"] in question["options"]
+            correct_count += 1 if result["correct"] else 0
+            statistics, _ = client.read_until("statistics")
+            assert statistics["total_questions"] == i + 1
+            assert statistics["correct_answers"] == correct_count
+            question, _ = client.read_until("question")
+            assert question["id"] == i + 2
+
+        # 无效选项返回错误消息，不计入答题数
+        client.send("answer", option="9")
+        error, _ = client.read_until("error")
+        assert error["reply_to"] == client.seq
+
+        client.send("quit")
+        statistics, _ = client.read_until("statistics")
+        assert statistics["total_questions"] == 5
+        bye, _ = client.read_until("bye")
+        assert bye is not None
+        assert process.wait(timeout=10) == 0
+        assert client.latencies
+        print(f"消息数: {len(client.latencies)}，最大往返延迟: {max(client.latencies):.2f} ms")
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def test_spelling_protocol():
+    """测试拼写模式：题目不带答案，answer命令发送输入的单词"""
+    commands = [{"cmd": "start", "module": "1", "mode": "spelling"}, {"cmd": "answer", "text": " "},
+                {"cmd": "answer", "text": "zzzzzzzzzz"}, {"cmd": "quit"}]
+    output = io.StringIO()
+    JsonlProtocolServer(stdin=io.StringIO("".join(encode_message(c) for c in commands)), stdout=output).run()
+    messages = [decode_message(line) for line in output.getvalue().splitlines()]
+    question = next(m for m in messages if m["type"] == "question")
+    assert question["mode"] == "spelling" and question["options"] == {} and question["word"] is None
+    assert [m["message"] for m in messages if m["type"] == "error"] == ["请输入单词"]
+    result = next(m for m in messages if m["type"] == "result")
+    assert result["grade"] == "wrong" and not result["correct"] and result["correct_answer"]
+
+
+if __name__ == "__main__":
+    test_jsonl_protocol()
+    test_spelling_protocol()
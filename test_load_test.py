@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证压力测试的直连模式和CSV/JSON汇总结果
+"""
+import csv
+import json
+
+from load_test import OPERATIONS, main, parse_module_mix
+
+
+def test_parse_module_mix():
+    """测试模块比例的解析"""
+    assert parse_module_mix("1") == (["1"], [1.0])
+    assert parse_module_mix("1:0.7,4:0.3") == (["1", "4"], [0.7, 0.3])
+
+
+def test_direct_run(tmp_path):
+    """测试直连模式：每类操作的次数、无效答案按预期计入、CSV和JSON中的汇总字段"""
+    csv_path = str(tmp_path / "run.csv")
+    json_path = str(tmp_path / "run.json")
+    stats = main(["--direct", "--clients", "5", "--questions", "4", "--error-rate", "0.5", "--seed", "3",
+                  "--csv", csv_path, "--json", json_path])
+    assert stats.sessions_completed == 5
+    counts = {op: h.count for op, h in stats.histograms.items()}
+    assert (counts["create"], counts["question"], counts["answer"], counts["stats"], counts["close"]) == \
+        (5, 20, 20, 5, 0)
+    assert 0 < counts["invalid_answer"] < 20
+    assert not any(stats.errors.values())
+
+    with open(json_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["run"]["target"] == "direct" and report["run"]["clients"] == 5
+    assert report["sessions_completed"] == 5 and report["duration_s"] > 0
+    operations = {row["operation"]: row for row in report["operations"]}
+    assert list(operations) == [op for op in OPERATIONS if op != "close"]
+    for row in operations.values():
+        assert row["errors"] == 0 and row["throughput"] > 0
+        assert 0 <= row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"] <= row["max_ms"]
+    assert operations["answer"]["count"] == 20
+
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["operation"] for row in rows] == list(operations)
+    assert {row["target"] for row in rows} == {"direct"} and rows[0]["modules"] == "1"
+    assert [int(row["count"]) for row in rows] == [row["count"] for row in operations.values()]
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_parse_module_mix()
+    test_direct_run(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证运行指标的记录、Prometheus/JSON导出和埋点
+"""
+import json
+import os
+import threading
+
+from metrics import REGISTRY, MetricsRegistry
+from vocabulary_store import (ANSWER_SECONDS, ANSWERS_GRADED, MODULE_LOAD_SECONDS, MODULE_RELOAD_SECONDS,
+                              QUESTIONS_GENERATED, build_question)
+from vocabulary_tester import VocabularyTester
+
+
+def test_prometheus_output():
+    """测试计数器、仪表和直方图的文本格式"""
+    registry = MetricsRegistry(enabled=True)
+    requests = registry.counter("requests_total", "请求数", ("result",))
+    requests.inc(result="hit")
+    requests.inc(2, result="hit")
+    requests.labels(result="miss").inc()
+    registry.gauge("entries", "条目数").set(42)
+    latency = registry.histogram("latency_seconds", "耗时", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3)
+
+    text = registry.to_prometheus()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{result="hit"} 3' in text
+    assert 'requests_total{result="miss"} 1' in text
+    assert "entries 42" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_count 3" in text
+    assert "latency_seconds_sum 3.55" in text
+
+    # 重复注册返回同一个对象
+    assert registry.counter("requests_total", "请求数", ("result",)) is requests
+
+
+def test_export_while_recording():
+    """测试其他线程不断写入（包括新的标签值）时导出，每个直方图快照的分桶计数与次数一致"""
+    registry = MetricsRegistry(enabled=True)
+    latency = registry.histogram("latency_seconds", "耗时", ("worker",), buckets=(0.1, 1.0))
+    done = threading.Event()
+
+    def record(worker):
+        for i in range(20000):
+            latency.observe((i % 30) / 10, worker=f"{worker}-{i % 50}")
+        done.set()
+
+    threads = [threading.Thread(target=record, args=(w,)) for w in range(2)]
+    for t in threads:
+        t.start()
+    while not done.is_set():
+        registry.to_prometheus()
+        for value in latency.snapshot():
+            assert sum(value["buckets"].values()) == value["count"]
+    for t in threads:
+        t.join()
+    assert sum(v["count"] for v in latency.snapshot()) == 40000
+
+
+def test_disabled_registry_records_nothing():
+    """测试关闭时不记录任何数据"""
+    registry = MetricsRegistry(enabled=False)
+    counter = registry.counter("c_total", "计数")
+    bound = registry.counter("d_total", "计数", ("k",)).labels(k="v")
+    counter.inc()
+    bound.inc()
+    with registry.histogram("h_seconds", "耗时").time():
+        pass
+    assert all(not metric.values for metric in registry.metrics.values())
+
+
+def test_write_files(tmp_path):
+    """测试写入.prom和.json文件"""
+    registry = MetricsRegistry(enabled=True)
+    registry.counter("c_total", "计数", ("k",)).inc(k="v")
+    prom_path, json_path = registry.write("session", str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["session.json", "session.prom"]
+    with open(prom_path, encoding="utf-8") as f:
+        assert 'c_total{k="v"} 1' in f.read()
+    with open(json_path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["metrics"]["c_total"]["values"] == [{"k": "v", "value": 1}]
+
+
+def test_question_instrumentation():
+    """测试出题时记录题目数"""
+    vocab = [{"word": f"w{i}", "definition": f"释义{i}"} for i in range(6)]
+    enabled = REGISTRY.enabled
+    REGISTRY.enabled = True
+    try:
+        REGISTRY.reset()
+        build_question(vocab, "english")
+        build_question(vocab, "english", review_items=vocab[:1])
+        values = {v["mode"]: v["value"] for v in QUESTIONS_GENERATED.snapshot()}
+        assert values == {"normal": 1, "review": 1}
+    finally:
+        REGISTRY.enabled = enabled
+        REGISTRY.reset()
+
+
+def test_module_reload_timing(vocab_files):
+    """测试首次加载和增量重新加载的耗时分别记录"""
+    vocab_files.write("a.json", ["apple", "banana"])
+    bank = vocab_files.bank()
+    enabled = REGISTRY.enabled
+    REGISTRY.enabled = True
+    try:
+        REGISTRY.reset()
+        bank.get_module("a")
+        vocab_files.write("a.json", ["apple", "cherry"], 2)
+        assert bank.reload_module("a")
+        assert [v["count"] for v in MODULE_LOAD_SECONDS.snapshot()] == [1]
+        assert [v["count"] for v in MODULE_RELOAD_SECONDS.snapshot()] == [1]
+    finally:
+        REGISTRY.enabled = enabled
+        REGISTRY.reset()
+
+
+def test_answer_instrumentation(vocab_files):
+    """测试各个前端共用的作答路径记录判分结果和作答用时（每道显示过的题目记录一次）"""
+    vocab_files.write("a.json", ["apple", "banana", "cherry", "date", "elder"])
+    tester = VocabularyTester(vocab_files.bank())
+    assert tester.load_vocabulary("a")
+    tester.test_mode = "chinese"
+    enabled = REGISTRY.enabled
+    REGISTRY.enabled = True
+    try:
+        REGISTRY.reset()
+        question = tester.generate_question()
+        tester.mark_question_shown()
+        assert tester.answer_question(question, tester.find_correct_option(question))["correct"]
+        result = tester.answer_question(question, None)
+        assert not result["correct"] and result["user_answer"] == "超时"
+        assert {v["result"]: v["value"] for v in ANSWERS_GRADED.snapshot()} == {"correct": 1, "wrong": 1}
+        assert [(v["mode"], v["count"]) for v in ANSWER_SECONDS.snapshot()] == [("chinese", 1)]
+    finally:
+        REGISTRY.enabled = enabled
+        REGISTRY.reset()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证短语索引、短语填空和短语释义题
+"""
+import random
+
+from phrases import FILL, MATCH, PhraseIndex, blank_span, build_phrase_question, get_phrase_index
+from tester_io import ScriptedIO, SimulatedLearner
+from vocabulary_store import VocabEntry, find_correct_option, get_shared_bank, normalize_definition
+from vocabulary_tester import VocabularyTester
+
+ENTRIES = (
+    VocabEntry("abandon", "放弃", [("abandon oneself to", "沉溺于"), ("abandoned child", " 弃儿 ")]),
+    VocabEntry("bear", "忍受", [("bear in mind", "记住；考虑到"), ("polar bears", "北极熊")]),
+    VocabEntry("be", "是", [("let it go", "随它去")]),
+    VocabEntry("cat", "猫"),
+    VocabEntry("dog", "狗", [("hot dog", "热狗")]),
+    VocabEntry("egg", "蛋", [("egg white", "蛋白")]),
+)
+
+
+def test_phrase_index():
+    """测试短语编号、单词在短语中的位置（含词尾变化）和按单词查短语"""
+    assert blank_span("abandon", "abandoned child") == (0, 9)
+    assert blank_span("bear", "polar Bears") == (6, 11)
+    assert blank_span("be", "maybe later") is None and blank_span("be", "let be") == (4, 6)
+
+    index = PhraseIndex(ENTRIES)
+    assert len(index) == 7 and list(index.firsts) == [0, 2, 4, 5, 5, 6, 7]
+    assert index.blanked(1) == "____ child" and index.blanked(3) == "polar ____"
+    assert 4 not in index.fillable and len(index.fillable) == 6
+    assert list(index.phrases_of("bear")) == [2, 3] and list(index.phrases_of("cat")) == []
+    assert get_phrase_index(ENTRIES) is get_phrase_index(ENTRIES)
+
+
+def test_phrase_questions():
+    """测试填空题的选项是单词、释义题的选项是短语翻译，干扰项都来自其他短语"""
+    index = PhraseIndex(ENTRIES)
+    random.seed(1)
+    for _ in range(200):
+        question = build_phrase_question(index, kind=FILL)
+        word = question['correct_item']['word']
+        assert question['kind'] == FILL and "____" in question['question_text']
+        assert question['options'][question['answer']] == word
+        assert len(set(question['options'].values())) == 4 and "cat" not in question['options'].values()
+        assert find_correct_option(question, "phrase") == question['answer']
+
+        question = build_phrase_question(index, kind=MATCH)
+        assert question['kind'] == MATCH and question['question_text'] == question['phrase']
+        translations = {normalize_definition(t) for _, t in question['correct_item'].phrases}
+        assert question['options'][question['answer']] in translations
+        assert "记住，考虑到" in question['options'].values() or question['phrase'] != "bear in mind"
+        assert "弃儿" in question['options'].values() or question['phrase'] != "abandoned child"
+
+    review = build_phrase_question(index, [{'word': 'dog', 'definition': '狗'}], kind=FILL)
+    assert review['question_text'] == "hot ____（热狗）"
+    assert build_phrase_question(PhraseIndex(ENTRIES[3:4])) is None
+
+
+def test_phrase_session():
+    """测试短语模式的交互流程：模拟学生全部答对，错题记录中的题干是短语题"""
+    learner = SimulatedLearner(module="1", mode="phrase", questions=300, accuracy=1.0, seed=3)
+    tester = VocabularyTester(io=ScriptedIO(learner))
+    tester.start_test()
+    assert tester.test_mode == "phrase" and tester.correct_answers == 300 and not tester.wrong_answers
+
+    tester = VocabularyTester(io=ScriptedIO(SimulatedLearner(module="1", mode="phrase", questions=50,
+                                                             accuracy=0.0, seed=3)))
+    tester.start_test()
+    entries = get_shared_bank().get_module("1")
+    phrases = {p for entry in entries for p, _ in entry.phrases}
+    assert len(tester.wrong_answers) == 50
+    assert all(w['question'] in phrases or "____" in w['question'] for w in tester.wrong_answers)
+
+
+if __name__ == "__main__":
+    test_phrase_index()
+    test_phrase_questions()
+    test_phrase_session()
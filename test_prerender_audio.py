@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证批量预生成音频包，以及中断后从索引处继续
+"""
+import os
+
+from prerender_audio import archive_path_for, prerender_module
+from tts import AudioArchive, NullEngine
+from vocabulary_tester import VocabularyTester
+
+WORDS = ["apple", "banana", "cherry", "apple", "date", "elder", "fig"]
+
+
+def test_prerender_and_resume(vocab_files):
+    """测试完整生成、中断（索引之后有未记录的数据）后继续生成，以及没有待生成片段时直接返回"""
+    vocab_files.write("a.json", WORDS)
+    tester = VocabularyTester(vocab_files.bank())
+    archive_dir = vocab_files.path("audio")
+    engine = NullEngine()
+    expected = engine.synthesize("x")
+    unique = list(dict.fromkeys(WORDS))
+
+    stats = prerender_module("a", "null", 1, archive_dir, tester)
+    assert (stats["total"], stats["skipped"], stats["rendered"], stats["failed"]) == (6, 0, 6, 0)
+    pack_path = archive_path_for("a", engine, archive_dir)
+    archive = AudioArchive(pack_path)
+    assert archive.engine == "null" and len(archive) == 6
+    assert os.path.getsize(pack_path) == archive.data_end() == stats["bytes"]
+
+    # 模拟中断：索引只记录了前3个片段，之后的片段和写了一半的数据都在音频包末尾
+    archive.clips = {engine.cache_key(w): archive.clips[engine.cache_key(w)] for w in unique[:3]}
+    archive.write_index()
+    with open(pack_path, "ab") as f:
+        f.write(b"partial")
+    assert os.path.getsize(pack_path) > archive.data_end()
+
+    stats = prerender_module("a", "null", 1, archive_dir, tester)
+    assert (stats["skipped"], stats["rendered"]) == (3, 3)
+    resumed = AudioArchive(pack_path)
+    assert len(resumed) == 6 and os.path.getsize(pack_path) == resumed.data_end()
+    assert all(resumed.read(engine.cache_key(w)) == expected for w in unique)
+    resumed.close()
+
+    assert prerender_module("a", "null", 1, archive_dir, tester)["rendered"] == 0
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_prerender_and_resume(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证会话剖析文件的生成、轮换和汇总报告
+"""
+import os
+
+from profiling import DEFAULT_KEEP, SessionProfiler, format_report, profile_keep, profile_modes
+
+
+def busy_function():
+    return sorted(str(i) for i in range(20000))
+
+
+def test_profile_modes():
+    """测试命令行参数和环境变量的组合"""
+    assert profile_modes(False, {}) == (False, False)
+    assert profile_modes(True, {}) == (True, True)
+    assert profile_modes(False, {"VT_PROFILE": "1"}) == (True, True)
+    assert profile_modes(False, {"VT_PROFILE": "cpu"}) == (True, False)
+    assert profile_modes(True, {"VT_PROFILE": "mem"}) == (False, True)
+
+
+def test_profile_keep(capsys):
+    """测试保留会话数：无效的值回退到默认值并给出警告，至少保留1个会话"""
+    assert profile_keep({}) == DEFAULT_KEEP
+    assert profile_keep({"VT_PROFILE_KEEP": "5"}) == 5
+    assert profile_keep({"VT_PROFILE_KEEP": "0"}) == 1
+    assert profile_keep({"VT_PROFILE_KEEP": "-3"}) == 1
+    assert capsys.readouterr().err == ""
+    assert profile_keep({"VT_PROFILE_KEEP": "abc"}) == DEFAULT_KEEP
+    assert "VT_PROFILE_KEEP" in capsys.readouterr().err
+    assert SessionProfiler("s", keep=0).keep == 1
+
+
+def test_session_profiler(tmp_path):
+    """测试每个会话写入两个文件、只保留最近的会话，并能汇总报告"""
+    directory = str(tmp_path)
+    for i in range(3):
+        with SessionProfiler(f"s{i}", directory, keep=2):
+            busy_function()
+        # 保证各会话的修改时间不同
+        for name in os.listdir(directory):
+            if name.startswith(f"s{i}_"):
+                os.utime(os.path.join(directory, name), (1000 + i, 1000 + i))
+
+    names = sorted(os.listdir(directory))
+    assert len(names) == 4 and not any(n.startswith("s0_") for n in names)
+    assert {os.path.splitext(n)[1] for n in names} == {".prof", ".alloc"}
+
+    report = format_report(directory, top=50)
+    assert "会话数: 2" in report
+    assert "busy_function" in report
+    assert "test_profiling.py" in report
+    assert "busy_function" in format_report(directory, name="s1")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证共享内存词汇数据和多进程测验服务
+"""
+import http.client
+import json
+import time
+
+from quiz_cluster import QuizCluster
+from shared_vocab import SharedVocabulary, SharedVocabularyBank, compile_vocabulary
+from vocabulary_store import VocabularyBank, build_question
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+    finally:
+        conn.close()
+
+
+def test_shared_vocabulary_roundtrip():
+    """测试编译到共享内存后的条目与原始数据一致"""
+    bank = VocabularyBank()
+    entries = bank.get_module("1")
+    shared = SharedVocabulary.create(compile_vocabulary(bank, ["1"]))
+    try:
+        attached = SharedVocabulary.attach(shared.name)
+        view = SharedVocabularyBank(attached).get_module("1")
+        assert len(view) == len(entries)
+        for i in (0, len(entries) // 2, -1):
+            assert view[i].copy() == entries[i].copy()
+            assert view[i].senses == entries[i].senses
+        assert build_question(view, "chinese") is not None
+        attached.close()
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+def test_quiz_cluster_session_affinity():
+    """测试请求落到其他工作进程时会被转发给会话所属的进程"""
+    cluster = QuizCluster(workers=2, modules=["1"])
+    cluster.start("127.0.0.1", 0)
+    try:
+        peer_ports = [s.getsockname()[1] for s in cluster.peer_socks]
+        deadline = time.time() + 30
+        while True:
+            try:
+                if all(request(p, "GET", "/health")[0] == 200 for p in peer_ports):
+                    break
+            except OSError:
+                assert time.time() < deadline
+                time.sleep(0.05)
+
+        status, created = request(peer_ports[0], "POST", "/sessions", {"module": "1"})
+        assert status == 201 and created["session_id"].startswith("0-")
+        sid = created["session_id"]
+
+        status, question = request(peer_ports[1], "GET", f"/sessions/{sid}/question")
+        assert status == 200
+        assert request(peer_ports[0], "GET", f"/sessions/{sid}/question")[1] == question
+        status, result = request(peer_ports[1], "POST", f"/sessions/{sid}/answer", {"option": "1"})
+        assert status == 200 and result["statistics"]["total_questions"] == 1
+        assert request(cluster.port, "GET", f"/sessions/{sid}/stats")[1]["total_questions"] == 1
+        assert request(peer_ports[1], "GET", "/health")[1]["forwarded"] >= 2
+        assert request(peer_ports[1], "GET", "/sessions/1-0000/stats")[0] == 404
+    finally:
+        cluster.stop()
+
+
+if __name__ == "__main__":
+    test_shared_vocabulary_roundtrip()
+    test_quiz_cluster_session_affinity()
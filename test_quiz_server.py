@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证异步HTTP测验服务
+"""
+import asyncio
+import http.client
+import json
+import threading
+
+from quiz_server import QuizServer
+
+
+def start_server_thread():
+    """在后台线程中启动服务，返回(服务对象, 事件循环)"""
+    quiz_server = QuizServer()
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(quiz_server.start("127.0.0.1", 0))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    assert ready.wait(30)
+    return quiz_server, loop
+
+
+def request(conn, method, path, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read().decode("utf-8"))
+
+
+def test_quiz_server_sessions():
+    """测试两个会话共享词汇数据且各自独立计分"""
+    quiz_server, loop = start_server_thread()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", quiz_server.port, timeout=30)
+        status, first = request(conn, "POST", "/sessions", {"module": "1", "mode": "english"})
+        assert status == 201 and first["total"] > 0
+        status, second = request(conn, "POST", "/sessions", {"module": "1", "mode": "chinese"})
+        assert status == 201
+
+        sid = first["session_id"]
+        status, question = request(conn, "GET", f"/sessions/{sid}/question")
+        assert status == 200 and len(question["options"]) == 4
+        # 未作答前重复请求返回同一道题
+        assert request(conn, "GET", f"/sessions/{sid}/question")[1] == question
+
+        status, result = request(conn, "POST", f"/sessions/{sid}/answer", {"option": "1"})
+        assert status == 200 and result["statistics"]["total_questions"] == 1
+        assert request(conn, "POST", f"/sessions/{sid}/answer", {"option": "1"})[0] == 409
+
+        status, stats = request(conn, "GET", f"/sessions/{second['session_id']}/stats")
+        assert status == 200 and stats["total_questions"] == 0
+
+        # 会话共享同一份词汇数据
+        sessions = list(quiz_server.sessions.values())
+        assert sessions[0].vocab is sessions[1].vocab is quiz_server.bank.get_module("1")
+
+        # 多余的路径段不匹配任何接口，也不会删除会话
+        assert request(conn, "DELETE", f"/sessions/{sid}/answer/x")[0] == 404
+        assert request(conn, "GET", f"/sessions/{sid}/stats/x")[0] == 404
+        assert request(conn, "DELETE", f"/sessions/{sid}/stats")[0] == 404
+        assert sid in quiz_server.sessions
+        assert request(conn, "DELETE", f"/sessions/{sid}")[0] == 200
+        assert request(conn, "GET", f"/sessions/{sid}/stats")[0] == 404
+        assert request(conn, "POST", "/sessions", {"module": "99"})[0] == 400
+        conn.close()
+    finally:
+        asyncio.run_coroutine_threadsafe(quiz_server.close(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == "__main__":
+    test_quiz_server_sessions()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证位并行编辑距离、可接受的写法和拼写判分
+"""
+import random
+
+from spelling import (EXACT, NEAR, WRONG, accepted_variants, build_spelling_question, grade_spelling,
+                      myers_distance)
+from vocabulary_store import make_wrong_info, make_wrongbook
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+        previous = current
+    return previous[-1]
+
+
+def test_myers_distance():
+    """测试位并行算法与动态规划的结果相同，超过上限时提前返回上限+1"""
+    rng = random.Random(0)
+    for _ in range(3000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 10)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 10)))
+        expected = levenshtein(a, b)
+        assert myers_distance(a, b) == expected
+        assert myers_distance(a, b, 1) == min(expected, 2)
+    long_word = "pneumonoultramicroscopicsilicovolcanoconiosis" * 2
+    assert myers_distance(long_word, long_word[:-2] + "xy") == 2
+    assert myers_distance("abandon", "xyz", 2) == 3
+
+
+def test_grade_spelling():
+    """测试完全正确（不区分大小写、连字符和句点写法）、拼写接近和答错"""
+    assert accepted_variants("X-ray") == ("x ray", "x-ray", "xray")
+    assert accepted_variants("Mr.") == ("mr", "mr.")
+    assert grade_spelling(" Abandon ", accepted_variants("abandon")) == (EXACT, 0)
+    assert grade_spelling("Xray", accepted_variants("x-ray")) == (EXACT, 0)
+    assert grade_spelling("abandn", accepted_variants("abandon")) == (NEAR, 1)
+    assert grade_spelling("abnadon", accepted_variants("abandon")) == (NEAR, 2)
+    assert grade_spelling("abnadn", accepted_variants("abandon")) == (WRONG, None)
+    assert grade_spelling("cat", accepted_variants("cap")) == (NEAR, 1)
+    assert grade_spelling("cas", accepted_variants("cap")) == (NEAR, 1)
+    assert grade_spelling("ab", accepted_variants("an")) == (WRONG, None)
+    assert grade_spelling("xry", accepted_variants("x-ray")) == (NEAR, 1)
+
+
+def test_spelling_question_and_wrongbook():
+    """测试拼写题和拼写接近的错题记录"""
+    question = build_spelling_question([{"word": "X-ray", "definition": "X光"}])
+    assert question["question_text"] == "X光" and question["options"] == {}
+    assert "xray" in question["variants"]
+    review = build_spelling_question([{"word": "a", "definition": "一"}], [{"word": "cat", "definition": "猫"}])
+    assert review["correct_item"] == {"word": "cat", "definition": "猫"}
+
+    near = make_wrong_info("cat", "猫", "spelling", "cat", "cta", NEAR, 1)
+    plain = make_wrong_info("dog", "狗", "chinese", "dog", "cat")
+    assert "grade" not in plain
+    book = make_wrongbook([near, plain], "1", "spelling")
+    infos = [item["question_info"] for item in book["wrong_answers"]]
+    assert infos[0]["grade"] == NEAR and infos[0]["distance"] == 1 and "grade" not in infos[1]
+
+
+if __name__ == "__main__":
+    test_myers_distance()
+    test_grade_spelling()
+    test_spelling_question_and_wrongbook()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：在进程内用脚本驱动VocabularyTester的交互式测试流程
+"""
+import glob
+import os
+import random
+
+import pytest
+
+from tester_io import ScriptedIO, SimulatedLearner
+from vocabulary_tester import VocabularyTester
+
+
+def test_scripted_session_saves_wrongbook(tmp_path):
+    """测试无效输入的处理、输出文本、结构化事件和错题本保存"""
+    output, events = [], []
+    tester = VocabularyTester(io=ScriptedIO(["9", "1", "5", "2", "x", "1", "1", "1", "quit", "y"],
+                                            output=output, events=events))
+    tester.data_dir = str(tmp_path)
+    tester.start_test()
+
+    assert "无效的选择，请输入1-7之间的数字" in output
+    assert "无效的选择，请输入1、2、3或4" in output
+    assert "无效的输入，请输入 1、2、3 或 4" in output
+    assert tester.test_mode == "english"
+    assert tester.total_questions == 3
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[:2] == ["loaded", "mode"]
+    assert kinds.count("question") == 5 and kinds.count("result") == 3 and kinds.count("invalid") == 1
+    results = [fields for kind, fields in events if kind == "result"]
+    assert sum(not r["correct"] for r in results) == len(tester.wrong_answers)
+
+    finished = next(fields for kind, fields in events if kind == "finished")
+    assert finished["statistics"]["total_questions"] == 3
+    if tester.wrong_answers:
+        saved = next(fields for kind, fields in events if kind == "saved")
+        assert glob.glob(os.path.join(str(tmp_path), "错题本_*.txt")) == [saved["path"]]
+
+
+def test_simulated_learner():
+    """测试在进程内快速模拟大量答题"""
+    learner = SimulatedLearner(module="1", mode="chinese", questions=5000, accuracy=0.8, seed=7)
+    tester = VocabularyTester(io=ScriptedIO(learner))
+    tester.start_test()
+    assert tester.total_questions == 5000
+    assert 0.75 < tester.correct_answers / 5000 < 0.85
+    assert len(tester.wrong_answers) == 5000 - tester.correct_answers
+
+    perfect = VocabularyTester(io=ScriptedIO(SimulatedLearner(module="1", mode="english", questions=200,
+                                                              accuracy=1.0, seed=1)))
+    perfect.start_test()
+    assert perfect.correct_answers == 200 and not perfect.wrong_answers
+
+
+def test_spelling_session(tmp_path):
+    """测试拼写模式：完全正确、拼写接近和答错分别计分，quit可以作为答案，拼写接近单独记入错题本"""
+    events = []
+
+    def answers(kind, prompt, context):
+        if kind == "answer":
+            word = context['correct_item']['word']
+            answers.count += 1
+            return {1: word.upper(), 2: word[:-1] if len(word) > 3 else word + "x", 3: "quit"}.get(answers.count, "q")
+        return {"module": "1", "mode": "3", "save": "y"}[kind]
+    answers.count = 0
+
+    random.seed(5)
+    tester = VocabularyTester(io=ScriptedIO(answers, events=events))
+    tester.data_dir = str(tmp_path)
+    tester.start_test()
+    assert tester.test_mode == "spelling"
+    assert tester.total_questions == 3 and tester.correct_answers == 1 and tester.near_misses == 1
+    grades = [fields["grade"] for kind, fields in events if kind == "result"]
+    assert grades[:2] == ["exact", "near"]
+    assert [w["grade"] for w in tester.wrong_answers] == grades[1:]
+    assert tester.wrong_answers[0]["distance"] == 1
+    saved = next(fields for kind, fields in events if kind == "saved")
+    with open(saved["path"], encoding="utf-8") as f:
+        assert "判定: 拼写接近（编辑距离1）" in f.read()
+
+
+def test_script_exhausted():
+    """测试脚本输入用完时与input()一样抛出EOFError"""
+    tester = VocabularyTester(io=ScriptedIO(["1", "1"]))
+    with pytest.raises(EOFError):
+        tester.start_test()
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_scripted_session_saves_wrongbook(pathlib.Path(tempfile.mkdtemp()))
+    test_simulated_learner()
+    test_spelling_session(pathlib.Path(tempfile.mkdtemp()))
+    test_script_exhausted()
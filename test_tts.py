@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证语音合成缓存与预合成
+"""
+import os
+import tempfile
+
+from tts import AudioArchive, ClipCache, NullEngine, SpeechService
+
+
+def test_prefetch_and_speak_from_cache():
+    """预合成后朗读直接使用缓存片段，不再重复合成"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engine = NullEngine()
+        service = SpeechService(engine=engine, cache=ClipCache(cache_dir))
+        service.prefetch(["apple", "it's \"quoted\""])
+        service.wait_idle()
+        assert engine.synthesized == ["apple", "it's \"quoted\""]
+
+        service.speak("apple")
+        service.wait_idle()
+        assert engine.synthesized == ["apple", "it's \"quoted\""]
+        assert engine.played == [service.cache.path_for(engine.cache_key("apple"))]
+        service.close()
+
+
+def test_clip_cache_lru_eviction():
+    """超过缓存上限时淘汰最久未使用的片段"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ClipCache(cache_dir, max_bytes=250)
+        cache.put("a", b"x" * 100)
+        cache.put("b", b"x" * 100)
+        assert cache.get("a")
+        cache.put("c", b"x" * 100)
+        assert cache.get("b") is None
+        assert cache.get("a") and cache.get("c")
+        assert not os.path.exists(cache.path_for("b"))
+
+        # 重新打开缓存时能恢复已有片段
+        assert set(ClipCache(cache_dir, max_bytes=250).entries) == {"a", "c"}
+
+
+def test_audio_archive_round_trip():
+    """音频包写入后重新打开，按索引读取的片段与写入的相同；朗读时直接使用音频包中的片段"""
+    with tempfile.TemporaryDirectory() as archive_dir:
+        engine = NullEngine()
+        pack_path = os.path.join(archive_dir, "1_null.pack")
+        archive = AudioArchive(pack_path)
+        assert len(archive) == 0 and archive.data_end() == 0
+        clips = {}
+        with open(pack_path, "wb") as pack:
+            for text in ("apple", "banana", "test tube"):
+                data = engine.synthesize(text) + text.encode("utf-8")
+                archive.clips[engine.cache_key(text)] = (pack.tell(), len(data))
+                clips[engine.cache_key(text)] = data
+                pack.write(data)
+        archive.engine, archive.voice = engine.name, engine.voice
+        archive.write_index()
+        assert not os.path.exists(archive.index_path + ".tmp")
+
+        reopened = AudioArchive(pack_path)
+        assert reopened.engine == "null" and len(reopened) == 3
+        assert reopened.data_end() == os.path.getsize(pack_path)
+        assert all(reopened.read(key) == data for key, data in clips.items())
+        assert reopened.read("missing") is None
+        reopened.close()
+
+        # 只打开由同一个引擎（名称和参数）生成的音频包
+        assert len(AudioArchive.open_all(archive_dir, engine)) == 1
+        other = NullEngine()
+        other.voice = "slow"
+        assert AudioArchive.open_all(archive_dir, other) == []
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            service = SpeechService(engine=engine, cache=ClipCache(cache_dir),
+                                    archives=AudioArchive.open_all(archive_dir, engine))
+            synthesized = len(engine.synthesized)
+            service.speak("banana")
+            service.wait_idle()
+            assert engine.played == [clips[engine.cache_key("banana")]]
+            assert len(engine.synthesized) == synthesized
+            service.close()
+
+
+if __name__ == "__main__":
+    test_prefetch_and_speak_from_cache()
+    test_clip_cache_lru_eviction()
+    test_audio_archive_round_trip()
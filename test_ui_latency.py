@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证界面延迟统计的分位数、滚动窗口和输出文件
+"""
+import json
+import os
+import time
+
+from ui_latency import LatencyTracker, RollingHistogram
+
+
+def test_rolling_histogram():
+    """测试最近邻分位数和超过窗口后丢弃最早的样本"""
+    histogram = RollingHistogram(window=100)
+    assert histogram.summary() == {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0,
+                                   "p99": 0.0, "max": 0.0}
+    for value in range(100, 0, -1):
+        histogram.add(float(value))
+    assert histogram.percentile(50) == 50 and histogram.percentile(99) == 99
+    assert histogram.percentile(0) == 1 and histogram.percentile(100) == 100
+    summary = histogram.summary()
+    assert (summary["p90"], summary["p95"], summary["max"], summary["mean"]) == (90, 95, 100, 50.5)
+
+    # 再加入50个样本：窗口中只剩最近的100个（1-50和新加入的1001-1050）
+    for value in range(1001, 1051):
+        histogram.add(float(value))
+    assert histogram.count == 150 and len(histogram.samples) == 100
+    assert histogram.percentile(50) == 50 and histogram.percentile(51) == 1001
+    assert histogram.summary()["max"] == 1050
+
+    single = RollingHistogram(window=None)
+    single.add(2.5)
+    assert single.percentile(1) == single.percentile(99) == 2.5
+
+
+def test_latency_tracker(tmp_path):
+    """测试阶段耗时、总耗时、没有begin时不记录，以及表格和JSON输出"""
+    tracker = LatencyTracker(window=10)
+    tracker.mark("evaluate")
+    tracker.end("ignored")
+    assert not tracker.active and tracker.dump(str(tmp_path)) is None
+
+    for _ in range(3):
+        tracker.begin()
+        assert tracker.active
+        time.sleep(0.002)
+        tracker.mark("evaluate")
+        tracker.mark("render")
+        tracker.end("redraw")
+    summary = tracker.summary()
+    assert list(summary) == ["evaluate", "render", "redraw", "total"]
+    assert all(s["count"] == 3 for s in summary.values())
+    assert summary["evaluate"]["p50"] >= 2 and summary["total"]["max"] >= summary["evaluate"]["max"]
+    table = tracker.format_table().splitlines()
+    assert table[0].split() == ["stage", "count", "p50", "p90", "p99", "max"] and len(table) == 5
+    assert table[4].split()[:2] == ["total", "3"]
+
+    path = tracker.dump(str(tmp_path / "latency"))
+    assert os.path.dirname(path) == str(tmp_path / "latency")
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["unit"] == "ms" and list(data["stages"]) == list(summary)
+    assert data["stages"]["total"] == summary["total"]
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    test_rolling_histogram()
+    test_latency_tracker(pathlib.Path(tempfile.mkdtemp()))
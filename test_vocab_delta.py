@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证词汇文件的增量重新解析，以及把变化应用到各个索引后与重新建立的结果一致
+"""
+import json
+
+from conftest import vocab_item
+from fuzzy_search import FuzzySearcher
+from gloss_index import GlossIndex
+from vocab_delta import apply_delta, entry_key, parse_module, reparse_module
+from word_index import WordIndex
+from word_lookup import PrefixIndex
+
+TYPES = ["n", "v", "adj"]
+
+
+def item(word, i):
+    return vocab_item(word, f"释义{i}，词义{i % 7}", pos=TYPES[i % 3])
+
+
+def original_items():
+    return [item(f"w{i}", i) for i in range(200)]
+
+
+def edited_items():
+    items = original_items()
+    items[5] = vocab_item("w5", "新的释义；放弃", pos="v")
+    moved = items.pop(10)
+    del items[149]                      # 原来的w150
+    items.insert(100, item("newword", 1000))
+    items.append(moved)
+    return items
+
+
+def test_reparse_module(tmp_path):
+    """测试增量解析：变化分类正确，结果与完整解析相同，未变化的条目复用原来的对象"""
+    old_text = json.dumps(original_items(), ensure_ascii=False, indent=1)
+    new_text = json.dumps(edited_items(), ensure_ascii=False, indent=1)
+    old_entries, manifest = parse_module(old_text, [1, 1])
+    delta = reparse_module("a", new_text, old_entries, manifest, [2, 2])
+
+    assert list(map(entry_key, delta.entries)) == list(map(entry_key, parse_module(new_text)[0]))
+    assert [delta.entries[j].word for j in delta.added] == ["newword"]
+    assert [old_entries[i].word for i in delta.removed] == ["w150"]
+    assert [(old_entries[i].word, delta.entries[j].word) for i, j in delta.modified] == [("w5", "w5")]
+    assert delta.changed_words() == {"newword", "w150", "w5"}
+    assert delta.first_change == 5 and delta.fingerprint == [2, 2] and delta.old_fingerprint == [1, 1]
+    # 没有变化的块不重新解码
+    assert delta.decoded < 100
+    for j, entry in enumerate(delta.entries):
+        if entry.word not in ("w5", "newword"):
+            assert entry is old_entries[delta.sources[j]]
+    assert delta.entries[-1] is old_entries[10]
+
+    # 内容相同的文件（只是重新保存）没有变化
+    same = reparse_module("a", old_text, old_entries, manifest, [3, 3])
+    assert not same and same.decoded == 0 and all(a is b for a, b in zip(same.entries, old_entries))
+
+    # 多次增量解析后的清单仍然可以使用
+    again = reparse_module("a", old_text, delta.entries, delta.manifest, [4, 4])
+    assert list(map(entry_key, again.entries)) == list(map(entry_key, old_entries))
+    assert again.changed_words() == {"newword", "w150", "w5"}
+
+
+def test_apply_delta(vocab_files):
+    """测试reload_module + apply_delta之后的各个索引与从新文件重新建立的索引相同"""
+    vocab_files.write("a.json", original_items())
+    vocab_files.write("b.json", [item("w5", 3), item("extra", 4)])
+    bank, index, prefix_index = vocab_files.indexes()
+    searcher = FuzzySearcher(index, prefix_index, vocab_files.path("fuzzy")).load_all()
+    gloss = GlossIndex.build(index, bank, prefix_index)
+    assert bank.reload_module("a") is None
+
+    vocab_files.write("a.json", edited_items(), 2)
+    delta = bank.reload_module("a")
+    assert delta and bank.get_module("a") is delta.entries
+    affected = apply_delta(delta, bank, index, prefix_index, searcher, gloss, save=False)
+    assert sorted(index.decode(affected)) == ["newword", "w150", "w5"]
+    assert bank.reload_module("a") is None
+
+    fresh_bank = vocab_files.bank()
+    fresh = WordIndex()
+    fresh.update(fresh_bank)
+    assert {index.word(w): sorted(p) for w, p in index.postings.items()} == \
+        {fresh.word(w): sorted(p) for w, p in fresh.postings.items()}
+
+    fresh_prefix = PrefixIndex.build(fresh, fresh_bank)
+    assert prefix_index.to_dict() == fresh_prefix.to_dict() and prefix_index.ranks == fresh_prefix.ranks
+    assert prefix_index.lookup("w5")["modules"] == ["a", "b"] and prefix_index.lookup("w150") is None
+
+    fresh_searcher = FuzzySearcher(fresh, fresh_prefix, vocab_files.path("fresh_fuzzy"))
+    for query in ("newwrd", "w150", "w5", "w1O", "xtra"):
+        assert searcher.search(query) == fresh_searcher.search(query)
+
+    fresh_gloss = GlossIndex.build(fresh, fresh_bank, fresh_prefix)
+    for query in ("放弃", "新的释义", "释义150", "释义1000", "词义3", "释义5"):
+        assert gloss.search(query) == fresh_gloss.search(query)
+    assert gloss.matches("w5", "放弃") and not gloss.matches("w150", "释义150")
+
+    # 重新启动后（没有保存更新）：保存的容错索引与文件指纹不一致，按单词集合更新
+    restarted = FuzzySearcher(fresh, fresh_prefix, vocab_files.path("fuzzy"))
+    for query in ("newwrd", "w150"):
+        assert restarted.search(query) == fresh_searcher.search(query)
+    assert restarted.module_index("a").removed
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_reparse_module(pathlib.Path(tempfile.mkdtemp()))
+    test_apply_delta(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证词汇导出（CSV、TSV、JSON Lines、Anki）、gzip压缩和按收藏/错题本筛选
+"""
+import csv
+import gzip
+import json
+import os
+
+from vocab_export import export_vocabulary, load_favorites, load_wrongbook_words, main
+from vocabulary_store import VocabularyBank, make_wrongbook
+
+MODULES = {
+    "a": {"name": "Module A", "file": "a.json"},
+    "b": {"name": "B", "file": "b.json"},
+}
+
+
+def make_bank(vocab_files):
+    modules = {
+        "a.json": [
+            {"word": "abandon", "translations": [{"translation": "放弃， 抛弃", "type": "v"},
+                                                 {"translation": "放纵", "type": "n"}],
+             "phrases": [{"phrase": "abandon oneself to", "translation": "沉溺于"}]},
+            {"word": "tab\tword", "translations": [{"translation": "<b>制表符</b>", "type": ""}]},
+            {"word": "missing"},
+        ],
+        "b.json": [
+            {"word": "Abandon", "translations": [{"translation": "抛弃", "type": "vt"}]},
+            {"word": "cat", "translations": [{"translation": "猫，\"喵\"", "type": "n"}]},
+        ],
+    }
+    for name, items in modules.items():
+        vocab_files.write(name, items)
+    # 模块名中有空格（Anki标签中替换为下划线）
+    return VocabularyBank(str(vocab_files.directory), MODULES)
+
+
+def test_export_formats(tmp_path, vocab_files):
+    """测试四种格式的内容，以及导出时不缓存未加载的模块"""
+    bank = make_bank(vocab_files)
+    path = str(tmp_path / "out.csv")
+    assert export_vocabulary(path, ["a", "b"], "csv", bank) == 4
+    assert not bank.is_loaded("a")
+    with open(path, encoding="utf-8") as f:
+        assert f.read(1) == "﻿"
+        rows = list(csv.reader(f))
+    assert rows[0] == ["word", "pos", "definition", "senses", "examples", "module"]
+    assert rows[1] == ["abandon", "v", "放弃，抛弃", "v. 放弃，抛弃；n. 放纵", "abandon oneself to 沉溺于", "a"]
+    assert rows[4] == ["cat", "n", "猫，\"喵\"", "n. 猫，\"喵\"", "", "b"]
+
+    path = str(tmp_path / "out.tsv")
+    export_vocabulary(path, ["a"], "tsv", bank)
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f, delimiter="\t"))
+    assert rows[2][0] == "tab\tword" and len(rows) == 3
+
+    path = str(tmp_path / "out.jsonl")
+    bank.get_module("a")
+    export_vocabulary(path, ["a"], "jsonl", bank)
+    with open(path, encoding="utf-8") as f:
+        first = json.loads(f.readline())
+    assert first["senses"] == [{"pos": "v", "translation": "放弃，抛弃"}, {"pos": "n", "translation": "放纵"}]
+    assert first["examples"] == [{"phrase": "abandon oneself to", "translation": "沉溺于"}]
+
+    path = str(tmp_path / "deck.txt")
+    export_vocabulary(path, ["a", "b"], "anki", bank)
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[:3] == ["#separator:tab", "#html:true", "#tags column:3"]
+    assert lines[3] == "abandon\tv. 放弃，抛弃；n. 放纵<br><br>abandon oneself to 沉溺于\tModule_A"
+    assert lines[4] == "tab word\t&lt;b&gt;制表符&lt;/b&gt;\tModule_A"
+    assert all(line.count("\t") == 2 for line in lines[3:])
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith(".tmp")]
+
+
+def test_export_filters_and_gzip(tmp_path, vocab_files):
+    """测试按收藏和错题本筛选、同一单词只导出一次以及gzip输出"""
+    bank = make_bank(vocab_files)
+    favorites = tmp_path / "favorites.json"
+    favorites.write_text(json.dumps(["Cat "]), encoding="utf-8")
+    wrongbook = tmp_path / "wrong_book.json"
+    wrongbook.write_text(json.dumps(make_wrongbook([{"word": "abandon", "definition": "放弃"}]),
+                                    ensure_ascii=False), encoding="utf-8")
+    text_book = tmp_path / "错题本_A.txt"
+    text_book.write_text("第1题:\n  单词: cat\n  释义: 猫\n" + "-" * 50 + "\n", encoding="utf-8")
+    assert load_favorites(str(favorites)) == {"cat"}
+    assert load_wrongbook_words(str(wrongbook)) == {"abandon"}
+    assert load_wrongbook_words(str(text_book)) == {"cat"}
+
+    path = str(tmp_path / "wrong.jsonl.gz")
+    assert export_vocabulary(path, ["a", "b"], "jsonl", bank, words={"abandon"}) == 2
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["module"] for line in f] == ["a", "b"]
+    assert export_vocabulary(path, ["a", "b"], "jsonl", bank, words={"abandon"}, unique=True) == 1
+
+    # 命令行：使用项目中的词汇文件，收藏和错题本中的单词合并筛选
+    favorites.write_text(json.dumps(["pharmacy"]), encoding="utf-8")
+    out = str(tmp_path / "mixed.csv")
+    assert main(["7", "-o", out, "--gzip", "--favorites", str(favorites), "--wrongbook", str(wrongbook)]) == 0
+    with gzip.open(out, "rt", encoding="utf-8-sig") as f:
+        rows = list(csv.reader(f))
+    assert {row[0].lower() for row in rows[1:]} == {"pharmacy", "abandon"} and {row[-1] for row in rows[1:]} == {"7"}
+    assert main(["7", "-o", out, "--wrongbook", str(tmp_path / "none.json")]) == 1
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    for test in (test_export_formats, test_export_filters_and_gzip):
+        directory = pathlib.Path(tempfile.mkdtemp())
+        test(directory, VocabFiles(directory))
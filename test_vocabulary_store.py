@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证共享词汇数据与轻量测验会话
+"""
+import copy
+import pickle
+import threading
+import tracemalloc
+
+from vocabulary_store import QuizSession, VocabEntry, build_question, get_shared_bank, parse_entry
+from vocabulary_tester import VocabularyTester
+
+
+def test_bank_is_shared_and_immutable():
+    """多个测试器和线程拿到的是同一份只读词汇数据"""
+    bank = get_shared_bank()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(bank.get_module("1"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(r is results[0] for r in results)
+
+    first, second = VocabularyTester(), VocabularyTester()
+    assert first.load_vocabulary("1") and second.load_vocabulary("1")
+    assert first.vocab_data["1"] is second.vocab_data["1"] is results[0]
+
+    entry = results[0][0]
+    assert isinstance(entry, VocabEntry) and entry["word"] == entry.word
+    try:
+        entry.word = "changed"
+        assert False, "VocabEntry应为只读"
+    except AttributeError:
+        pass
+
+
+def test_session_footprint():
+    """单个会话只占用几百字节内存"""
+    bank = get_shared_bank()
+    bank.get_module("1")
+    session = QuizSession(bank, "1", "english", "abc123")
+    for _ in range(5):
+        session.next_question()
+        session.answer("1")
+    stats = session.statistics()
+    assert stats["total_questions"] == 5
+    assert len(session.wrong_answers()) == stats["wrong_count"]
+    assert session.footprint() < 2048
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [QuizSession(bank, "1", "chinese", f"s{i:06d}") for i in range(10000)]
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / len(sessions)
+    tracemalloc.stop()
+    print(f"每个空会话约占用 {per_session:.0f} 字节")
+    assert per_session < 1000
+
+
+def test_multi_sense_entries():
+    """所有义项和词性都被保留，单义项条目共用同一个词性字符串"""
+    entry = parse_entry({"word": "abandon", "translations": [
+        {"translation": "放弃", "type": "v"}, {"translation": " 放纵 ", "type": "n"}, {"type": "adj"}]})
+    assert entry.definition == "放弃" and entry.pos == "v"
+    assert entry.senses == (("v", "放弃"), ("n", "放纵"))
+    assert entry.gloss() == "v. 放弃；n. 放纵" and entry.gloss(1) == "v. 放弃"
+    assert entry.copy() == {"word": "abandon", "definition": "放弃", "examples": []}
+
+    single = [parse_entry({"word": w, "translations": [{"translation": w + "的释义", "type": "n"}]})
+              for w in ("cat", "dog")]
+    assert single[0].senses == (("n", "cat的释义"),) and single[0].packed_senses is single[1].packed_senses
+
+    untyped = VocabEntry("x-ray", "X光")
+    assert untyped.senses == (("", "X光"),) and untyped.gloss() == "X光"
+    assert VocabEntry("a", "一", senses=[("n", "一"), ("art", "某")]).senses == (("n", "一"), ("art", "某"))
+
+    question = build_question([entry, untyped], "chinese")
+    assert question["question_text"] == question["correct_item"].gloss()
+
+
+def test_entry_pickle_and_copy():
+    """只读条目可以pickle和deepcopy，恢复后的单词、义项和短语不变"""
+    entry = parse_entry({"word": "abandon", "translations": [
+        {"translation": "放弃", "type": "v"}, {"translation": "放纵", "type": "n"}],
+        "phrases": [{"phrase": "abandon oneself to", "translation": "沉溺于"}]})
+    for restored in (pickle.loads(pickle.dumps(entry)), copy.deepcopy(entry), copy.copy(entry)):
+        assert isinstance(restored, VocabEntry) and restored is not entry
+        assert (restored.word, restored.senses, restored.phrases) == (entry.word, entry.senses, entry.phrases)
+        assert restored.packed_senses == entry.packed_senses
+    module = get_shared_bank().get_module("1")[:20]
+    assert [e.gloss() for e in pickle.loads(pickle.dumps(module))] == [e.gloss() for e in module]
+
+
+def test_iter_module(vocab_files):
+    """未加载的模块逐个解码条目返回，与get_module的结果相同且不缓存；格式错误时抛出ValueError"""
+    vocab_files.write("a.json", ["cat", {"word": "dog"}, "test tube"])
+    bank = vocab_files.bank()
+    words = [entry.word for entry in bank.iter_module("a")]
+    assert not bank.is_loaded("a")
+    assert words == [entry.word for entry in bank.get_module("a")] == ["cat", "test tube"]
+    with open(vocab_files.path("b.json"), "w", encoding="utf-8") as f:
+        f.write('[{"word": "x", "translations": [{"translation": "叉"}]}, {"word"')
+    entries = bank.iter_module("b")
+    assert next(entries).word == "x"
+    try:
+        next(entries)
+        assert False, "格式错误的词汇文件应当抛出ValueError"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_bank_is_shared_and_immutable()
+    test_session_footprint()
+    test_multi_sense_entries()
+    test_entry_pickle_and_copy()
+    test_iter_module(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
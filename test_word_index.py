@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证全局单词索引的跨模块查询、持久化和ID稳定性
+"""
+import os
+
+from word_index import WordIndex, load_word_index, normalize_word
+
+
+def test_cross_module_lookup(vocab_files):
+    """测试规范化、跨模块查询和ID编码"""
+    vocab_files.write("a.json", ["Apple", "banana", "apple", "test  tube"])
+    vocab_files.write("b.json", ["apple", "cherry"])
+    index = WordIndex()
+    assert index.update(vocab_files.bank()) == ["a", "b"]
+
+    assert normalize_word("  Test \t Tube ") == "test tube"
+    assert len(index) == 4
+    assert index.word_id("APPLE") == index.word_id("apple") == 0
+    assert index.modules_containing("apple") == ("a", "b")
+    assert index.occurrences("apple") == [("a", 0), ("a", 2), ("b", 0)]
+    assert index.modules_containing("Test Tube") == ("a",)
+    assert index.modules_containing("durian") == ()
+    assert index.encode(["cherry", "durian"]) == [index.word_id("cherry"), None]
+    assert index.decode(index.encode(["banana", "apple"])) == ["banana", "apple"]
+    assert index.stats()["shared_words"] == 1
+
+    # 查询结果被缓存，模块的出现位置变化后重新计算
+    assert index.modules_containing("apple") is index.modules_containing("Apple")
+    index.remove_module("b")
+    assert index.modules_containing("apple") == ("a",) and index.modules_containing("cherry") == ()
+    assert index.occurrences("apple") == [("a", 0), ("a", 2)] and index.stats()["modules"] == {"a": 4}
+    index.index_module("b", [{"word": "cherry"}])
+    assert index.modules_containing("cherry") == ("b",)
+
+
+def test_persistence_keeps_ids_stable(vocab_files):
+    """测试保存后重新索引：未变化的模块不重建，已有单词ID不变，删除的单词保留ID"""
+    path = vocab_files.path("index.json")
+    vocab_files.write("a.json", ["apple", "banana"])
+    vocab_files.write("b.json", ["cherry"])
+    first = load_word_index(path, vocab_files.bank())
+    ids = {w: first.word_id(w) for w in ("apple", "banana", "cherry")}
+
+    assert WordIndex.load(path).update(vocab_files.bank()) == []
+
+    vocab_files.write("b.json", ["durian", "cherry"], 2)
+    os.remove(vocab_files.path("a.json"))
+    second = load_word_index(path, vocab_files.bank())
+    assert {w: second.word_id(w) for w in ids} == ids
+    assert second.word_id("durian") == 3
+    assert second.modules_containing("apple") == ()
+    assert second.occurrences("cherry") == [("b", 1)]
+    assert WordIndex.load(path).to_dict() == second.to_dict()
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_cross_module_lookup(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
+    test_persistence_keeps_ids_stable(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
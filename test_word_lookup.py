@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证前缀查词、补全排序和索引缓存
+"""
+from word_index import WordIndex
+from word_lookup import PrefixIndex, load_prefix_index
+
+
+def build(vocab_files):
+    vocab_files.write("a.json", ["Abandon", "able", "about", "abandonment", "cat"])
+    vocab_files.write("b.json", ["abandon", "abacus", "test tube"])
+    _, _, prefix_index = vocab_files.indexes()
+    return prefix_index
+
+
+def test_complete(vocab_files):
+    """测试前缀补全：大小写无关、完全匹配在前、短词和多模块单词在前"""
+    prefix_index = build(vocab_files)
+    assert len(prefix_index) == 7
+    assert prefix_index.count("AB") == 5
+    words = [r["word"] for r in prefix_index.complete("ab", k=10)]
+    assert words == ["able", "about", "abacus", "Abandon", "abandonment"]
+    assert [r["word"] for r in prefix_index.complete("ab", k=2)] == ["able", "about"]
+    first = prefix_index.complete("abandon")[0]
+    assert first == {"word": "Abandon", "definition": "Abandon的释义", "modules": ["a", "b"]}
+    assert [r["word"] for r in prefix_index.complete("test  T")] == ["test tube"]
+    assert prefix_index.complete("x") == [] and prefix_index.complete("  ") == []
+    assert prefix_index.lookup("CAT")["definition"] == "cat的释义"
+    assert prefix_index.lookup("ca") is None
+
+
+def test_cache(vocab_files):
+    """测试缓存：词汇文件不变时直接读取缓存，变化后重新建立"""
+    first = build(vocab_files)
+    assert PrefixIndex.load(vocab_files.path("prefix.json")).to_dict() == first.to_dict()
+
+    vocab_files.write("b.json", ["zebra"], 2)
+    # 缓存失效时只重新索引变化的模块一次，更新后的单词索引同时写回
+    indexed = []
+    index_module = WordIndex.index_module
+    WordIndex.index_module = lambda self, module_id, *args: (indexed.append(module_id),
+                                                             index_module(self, module_id, *args))
+    try:
+        second = load_prefix_index(vocab_files.path("prefix.json"), vocab_files.bank(),
+                                   vocab_files.path("index.json"))
+    finally:
+        WordIndex.index_module = index_module
+    assert indexed == ["b"]
+    assert WordIndex.load(vocab_files.path("index.json")).modules_containing("zebra") == ("b",)
+    assert second.lookup("zebra")["modules"] == ["b"]
+    assert second.lookup("abandon")["modules"] == ["a"]
+    assert second.lookup("abacus") is None
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    from conftest import VocabFiles
+    test_complete(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
+    test_cache(VocabFiles(pathlib.Path(tempfile.mkdtemp())))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自动化测试脚本：验证预启动测试子进程池
+"""
+import time
+
+from worker_pool import WorkerPool
+
+
+def test_worker_pool():
+    """测试进程池中的进程已预加载模块，并且归还后会被重置复用"""
+    pool = WorkerPool(size=1, preload=["1"])
+    pool.start()
+    try:
+        worker = pool.acquire()
+        assert worker is not None
+        assert "1" in worker.loaded_modules
+
+        started = time.perf_counter()
+        worker.send("start", module="1", mode="chinese")
+        question = worker.wait_for("question", timeout=10)
+        first_question_ms = (time.perf_counter() - started) * 1000
+        assert question is not None and len(question["options"]) == 4
+        print(f"首题就绪耗时: {first_question_ms:.1f} ms")
+
+        worker.send("answer", option="1")
+        assert worker.wait_for("statistics", timeout=10)["total_questions"] == 1
+
+        pid = worker.process.pid
+        pool.release(worker)
+        again = pool.acquire()
+        assert again.process.pid == pid
+        assert again.uses == 2
+
+        # 重置后统计信息从零开始
+        again.send("start", module="1", mode="english")
+        again.wait_for("question", timeout=10)
+        again.send("stats")
+        assert again.wait_for("statistics", timeout=10)["total_questions"] == 0
+        pool.release(again, recycle=False)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_worker_pool()
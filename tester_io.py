@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 交互式测试的输入输出接口
+
+VocabularyTester的交互流程（选择模块、选择模式、答题、保存错题本）不直接调用
+input()和print()，而是通过一个输入输出对象:
+
+    ask(prompt, kind, context=None)   读取一行输入；kind说明在问什么:
+                                      module / mode / answer / save / path，
+                                      answer时context为当前题目
+    show(text="")                     输出一行文本
+    emit(kind, **fields)              发出一条结构化事件（loaded、question、result、
+                                      statistics、invalid、finished、saved等）
+
+默认的ConsoleIO就是原来的交互式命令行。ScriptedIO按脚本或策略函数作答，
+可以丢弃输出、记录事件，因此自动化测试和基准测试可以在进程内模拟成千上万道题:
+
+    io = ScriptedIO(SimulatedLearner(module="1", questions=10000, accuracy=0.8, seed=1))
+    tester = VocabularyTester(io=io)
+    tester.start_test()
+"""
+import random
+
+from vocabulary_store import find_correct_option
+
+
+class ConsoleIO:
+    """标准输入输出（交互式命令行），事件被忽略"""
+
+    def ask(self, prompt, kind, context=None):
+        return input(prompt)
+
+    def show(self, text=""):
+        print(text)
+
+    def emit(self, kind, **fields):
+        pass
+
+
+class ScriptedIO(ConsoleIO):
+    """
+    脚本驱动的输入输出
+
+    输入用完时与input()一样抛出EOFError。
+    """
+    def __init__(self, answers, output=None, events=None):
+        """
+        Args:
+            answers: 按顺序使用的输入字符串序列，
+                     或策略函数 answers(kind, prompt, context) -> str
+            output: 追加输出文本的列表，为None时丢弃输出
+            events: 追加(kind, fields)的列表，或事件回调 events(kind, fields)；为None时忽略事件
+        """
+        if callable(answers):
+            self._answer = answers
+        else:
+            script = iter(answers)
+            self._answer = lambda kind, prompt, context: next(script)
+        self.output = output
+        if events is None or callable(events):
+            self._event = events
+        else:
+            self._event = lambda kind, fields: events.append((kind, fields))
+
+    def ask(self, prompt, kind, context=None):
+        try:
+            return self._answer(kind, prompt, context)
+        except StopIteration:
+            raise EOFError("脚本中的输入已用完") from None
+
+    def show(self, text=""):
+        if self.output is not None:
+            self.output.append(text)
+
+    def emit(self, kind, **fields):
+        if self._event is not None:
+            self._event(kind, fields)
+
+
+class SimulatedLearner:
+    """
+    按给定正确率作答的模拟学生，作为ScriptedIO的策略函数使用
+
+    选择模块和模式，答完指定数量的题目后输入q退出，最后按save决定是否保存错题本。
+    """
+    def __init__(self, module="1", mode="chinese", questions=100, accuracy=0.8, save=False, seed=None):
+        """
+        Args:
+            module: 模块编号
+            mode: 'chinese'、'english'、'spelling' 或 'phrase'
+            questions: 作答的题目数
+            accuracy: 答对的概率（拼写模式中答错的一半是拼写接近的答案）
+            save: 退出时是否保存错题本
+            seed: 随机种子
+        """
+        self.module = str(module)
+        self.mode = mode
+        self.questions = questions
+        self.accuracy = accuracy
+        self.save = save
+        self.random = random.Random(seed)
+        self.answered = 0
+
+    def __call__(self, kind, prompt, context):
+        if kind == "module":
+            return self.module
+        if kind == "mode":
+            return {"chinese": "1", "english": "2", "spelling": "3", "phrase": "4"}[self.mode]
+        if kind == "save":
+            return "y" if self.save else "n"
+        if kind == "answer":
+            if self.answered >= self.questions:
+                return "q"
+            self.answered += 1
+            if self.mode == "spelling":
+                return self.spell(context['correct_item']['word'])
+            correct = find_correct_option(context, self.mode)
+            if self.random.random() < self.accuracy:
+                return correct
+            return self.random.choice([o for o in context['options'] if o != correct] or [correct])
+        raise EOFError(f"模拟学生无法回答: {prompt}")
+
+    def spell(self, word):
+        """拼写模式的答案：正确拼写、漏掉一个字母（拼写接近）或完全错误"""
+        if self.random.random() < self.accuracy:
+            return word
+        if len(word) > 3 and self.random.random() < 0.5:
+            i = self.random.randrange(1, len(word) - 1)
+            return word[:i] + word[i + 1:]
+        return "?" * len(word)
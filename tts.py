@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 语音合成（TTS）
+
+提供可替换的语音合成引擎、按内容寻址的音频片段缓存（LRU淘汰）以及
+带预合成功能的发音服务：
+
+- SapiEngine: Windows系统自带的SAPI语音（通过PowerShell调用System.Speech）
+- EspeakEngine: Linux等平台上的本地espeak / espeak-ng引擎
+- NullEngine: 不发声的空引擎，供测试和没有语音引擎的环境使用
+
+发音服务在后台线程中合成和播放，不会阻塞界面；调用prefetch可以提前合成
+即将出现的单词，题目出现后即可立即开始播放。
+如果data/audio下有prerender_audio.py预先生成的音频包，会优先从音频包读取。
+"""
+import hashlib
+import io
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import wave
+from collections import OrderedDict
+
+from metrics import REGISTRY
+from vocabulary_store import CACHE_REQUESTS
+
+# 缓存目录（位于data目录下）
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tts_cache")
+
+# 缓存默认上限：50MB
+DEFAULT_CACHE_BYTES = 50 * 1024 * 1024
+
+# 预先生成的音频包目录
+DEFAULT_ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "audio")
+
+# 运行指标
+TTS_CALLS = REGISTRY.counter("tts_calls_total", "语音引擎调用次数", ("engine", "op"))
+TTS_SYNTH_SECONDS = REGISTRY.histogram("tts_synthesize_seconds", "语音合成耗时（秒）", ("engine",))
+CLIP_CACHE_HITS = CACHE_REQUESTS.labels(cache="tts_clip", result="hit")
+CLIP_CACHE_MISSES = CACHE_REQUESTS.labels(cache="tts_clip", result="miss")
+
+
+class TTSEngine:
+    """
+    语音合成引擎基类
+
+    子类需要实现synthesize，把文本合成为WAV格式的音频数据。
+    """
+    name = "base"
+    # 引擎参数（语音、语速等），参与缓存键的计算
+    voice = ""
+
+    def is_available(self):
+        """当前环境下引擎是否可用"""
+        return True
+
+    def synthesize(self, text):
+        """
+        合成音频
+
+        Args:
+            text: 要朗读的文本
+
+        Returns:
+            bytes: WAV格式的音频数据
+        """
+        raise NotImplementedError
+
+    def cache_key(self, text):
+        """
+        计算音频片段的缓存键
+
+        Args:
+            text: 要朗读的文本
+
+        Returns:
+            str: 由引擎名称、参数和文本内容决定的哈希值
+        """
+        raw = f"{self.name}\0{self.voice}\0{text}".encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()
+
+    def play(self, path):
+        """
+        播放音频文件（不阻塞）
+
+        Args:
+            path: WAV文件路径
+        """
+        play_wav(path)
+
+    def play_bytes(self, data):
+        """
+        播放内存中的音频数据
+
+        Args:
+            data: WAV格式的音频数据
+        """
+        play_wav_bytes(data)
+
+
+class NullEngine(TTSEngine):
+    """
+    空引擎：合成一小段静音，播放时只记录调用，供测试使用
+    """
+    name = "null"
+
+    def __init__(self):
+        self.synthesized = []
+        self.played = []
+
+    def synthesize(self, text):
+        self.synthesized.append(text)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\0\0" * 80)
+        return buffer.getvalue()
+
+    def play(self, path):
+        self.played.append(path)
+
+    def play_bytes(self, data):
+        self.played.append(data)
+
+
+class EspeakEngine(TTSEngine):
+    """
+    espeak / espeak-ng 本地语音引擎
+
+    文本通过标准输入传给引擎，不经过命令行拼接，因此引号等特殊字符不会出错。
+    """
+    name = "espeak"
+
+    def __init__(self, voice="en", speed=150):
+        self.voice = f"{voice}:{speed}"
+        self.voice_name = voice
+        self.speed = speed
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def is_available(self):
+        return self.executable is not None
+
+    def synthesize(self, text):
+        result = subprocess.run(
+            [self.executable, "-v", self.voice_name, "-s", str(self.speed), "--stdin", "--stdout"],
+            input=text.encode("utf-8"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True
+        )
+        return result.stdout
+
+
+class SapiEngine(TTSEngine):
+    """
+    Windows SAPI语音引擎
+
+    通过PowerShell调用System.Speech把文本合成到WAV文件。
+    文本通过环境变量传入，避免引号等字符破坏PowerShell命令。
+    """
+    name = "sapi"
+
+    SCRIPT = (
+        "Add-Type -AssemblyName System.Speech; "
+        "$s = New-Object System.Speech.Synthesis.SpeechSynthesizer; "
+        "$s.SetOutputToWaveFile($env:VT_TTS_OUTPUT); "
+        "$s.Speak($env:VT_TTS_TEXT); "
+        "$s.Dispose()"
+    )
+
+    def is_available(self):
+        return sys.platform.startswith("win") and shutil.which("powershell") is not None
+
+    def synthesize(self, text):
+        import tempfile
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            env = dict(os.environ, VT_TTS_TEXT=text, VT_TTS_OUTPUT=path)
+            subprocess.run(["powershell", "-NoProfile", "-Command", self.SCRIPT],
+                           env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+ENGINES = {
+    "sapi": SapiEngine,
+    "espeak": EspeakEngine,
+    "null": NullEngine
+}
+
+
+def create_engine(name=None):
+    """
+    按名称创建语音引擎
+
+    Args:
+        name: 引擎名称（sapi / espeak / null），为None时自动选择
+
+    Returns:
+        TTSEngine: 语音引擎实例
+    """
+    if name:
+        if name not in ENGINES:
+            raise ValueError(f"未知的语音引擎: {name}")
+        return ENGINES[name]()
+    return get_default_engine()
+
+
+def get_default_engine():
+    """
+    选择当前环境下可用的语音引擎
+
+    可以通过环境变量VT_TTS_ENGINE（sapi / espeak / null）指定引擎；
+    否则依次尝试SAPI和espeak，都不可用时返回NullEngine。
+
+    Returns:
+        TTSEngine: 语音引擎实例
+    """
+    name = os.environ.get("VT_TTS_ENGINE", "").strip().lower()
+    if name in ENGINES:
+        return ENGINES[name]()
+    for cls in (SapiEngine, EspeakEngine):
+        engine = cls()
+        if engine.is_available():
+            return engine
+    return NullEngine()
+
+
+def play_wav(path):
+    """
+    使用系统播放器异步播放WAV文件
+
+    Args:
+        path: WAV文件路径
+    """
+    try:
+        if sys.platform.startswith("win"):
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            return
+        if sys.platform == "darwin":
+            players = [["afplay", path]]
+        else:
+            players = [["paplay", path], ["aplay", "-q", path]]
+        for command in players:
+            if shutil.which(command[0]):
+                subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                return
+    except Exception:
+        pass
+
+
+def play_wav_bytes(data):
+    """
+    播放内存中的WAV数据
+
+    Windows下直接从内存播放（会阻塞到播放结束，应在后台线程中调用），
+    其他平台通过标准输入交给系统播放器。
+
+    Args:
+        data: WAV格式的音频数据
+    """
+    try:
+        if sys.platform.startswith("win"):
+            import winsound
+            winsound.PlaySound(data, winsound.SND_MEMORY)
+            return
+        if sys.platform == "darwin":
+            # afplay不支持从标准输入读取，写入临时文件后播放
+            import tempfile
+            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+                f.write(data)
+            play_wav(f.name)
+            return
+        for command in (["aplay", "-q", "-"], ["paplay"]):
+            if shutil.which(command[0]):
+                player = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                player.stdin.write(data)
+                player.stdin.close()
+                return
+    except Exception:
+        pass
+
+
+class AudioArchive:
+    """
+    预先生成的音频包
+
+    由两个文件组成：`<名称>.pack` 依次存放所有WAV片段，
+    `<名称>.idx` 是JSON索引，记录每个缓存键对应片段的偏移量和长度。
+    读取片段只需要一次seek和一次read。
+    """
+    def __init__(self, pack_path):
+        """
+        Args:
+            pack_path: .pack文件路径（索引文件路径由其推导）
+        """
+        self.pack_path = pack_path
+        self.index_path = pack_path[:-len(".pack")] + ".idx" if pack_path.endswith(".pack") else pack_path + ".idx"
+        self.engine = None
+        self.voice = None
+        self.clips = {}
+        self.lock = threading.Lock()
+        self._file = None
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            self.engine = index.get("engine")
+            self.voice = index.get("voice")
+            self.clips = {k: tuple(v) for k, v in index.get("clips", {}).items()}
+
+    def __contains__(self, key):
+        return key in self.clips
+
+    def __len__(self):
+        return len(self.clips)
+
+    def read(self, key):
+        """
+        读取片段
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            bytes: WAV数据；音频包中没有该片段时返回None
+        """
+        location = self.clips.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.pack_path, "rb")
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def data_end(self):
+        """索引中记录的最后一个片段的结束位置"""
+        return max((offset + length for offset, length in self.clips.values()), default=0)
+
+    def write_index(self):
+        """原子地写入索引文件"""
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"engine": self.engine, "voice": self.voice,
+                       "clips": {k: list(v) for k, v in self.clips.items()}}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @classmethod
+    def open_all(cls, archive_dir=None, engine=None):
+        """
+        打开目录中的全部音频包
+
+        Args:
+            archive_dir: 音频包目录，默认为data/audio
+            engine: 只返回由该引擎（名称和参数都相同）生成的音频包
+
+        Returns:
+            list: AudioArchive列表
+        """
+        archive_dir = archive_dir or DEFAULT_ARCHIVE_DIR
+        archives = []
+        if not os.path.isdir(archive_dir):
+            return archives
+        for name in sorted(os.listdir(archive_dir)):
+            if not name.endswith(".pack"):
+                continue
+            try:
+                archive = cls(os.path.join(archive_dir, name))
+            except (OSError, ValueError):
+                continue
+            if engine is not None and (archive.engine != engine.name or archive.voice != engine.voice):
+                continue
+            archives.append(archive)
+        return archives
+
+
+class ClipCache:
+    """
+    按内容寻址的音频片段缓存
+
+    每个片段以缓存键命名保存在缓存目录中，总大小超过上限时
+    按最近使用时间淘汰最久未使用的片段（LRU）。
+    """
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            cache_dir: 缓存目录，默认为data/tts_cache
+            max_bytes: 缓存总大小上限（字节）
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # 缓存键 -> 文件大小，按最近使用顺序排列（最久未使用的在前）
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self._scan()
+
+    def _scan(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".wav"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, name[:-4], st.st_size))
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+
+    def path_for(self, key):
+        """返回缓存键对应的文件路径"""
+        return os.path.join(self.cache_dir, key + ".wav")
+
+    def get(self, key):
+        """
+        查找缓存片段，命中时更新其最近使用时间
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            str: 片段文件路径；未命中时返回None
+        """
+        with self.lock:
+            if key not in self.entries:
+                CLIP_CACHE_MISSES.inc()
+                return None
+            self.entries.move_to_end(key)
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self.lock:
+                size = self.entries.pop(key, 0)
+                self.total_bytes -= size
+            CLIP_CACHE_MISSES.inc()
+            return None
+        CLIP_CACHE_HITS.inc()
+        return path
+
+    def put(self, key, data):
+        """
+        写入片段并按需淘汰旧片段
+
+        Args:
+            key: 缓存键
+            data: 音频数据
+
+        Returns:
+            str: 片段文件路径
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.total_bytes -= self.entries.pop(key, 0)
+            self.entries[key] = len(data)
+            self.total_bytes += len(data)
+            evicted = []
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_key, size = self.entries.popitem(last=False)
+                self.total_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self.path_for(old_key))
+            except OSError:
+                pass
+        return path
+
+
+class SpeechService:
+    """
+    发音服务
+
+    在后台线程中按需合成并播放音频；朗读请求优先于预合成请求处理。
+    """
+    # 任务优先级：数字越小越先处理
+    PRIORITY_SPEAK = 0
+    PRIORITY_PREFETCH = 1
+
+    def __init__(self, engine=None, cache=None, archives=None):
+        """
+        Args:
+            engine: TTSEngine实例，默认自动选择
+            cache: ClipCache实例，默认使用data/tts_cache
+            archives: AudioArchive列表，默认打开data/audio中与引擎匹配的音频包
+        """
+        self.engine = engine or get_default_engine()
+        self.cache = cache or ClipCache()
+        self.archives = AudioArchive.open_all(engine=self.engine) if archives is None else archives
+        self.tasks = queue.PriorityQueue()
+        self.seq = 0
+        self.seq_lock = threading.Lock()
+        # 已在队列中等待预合成的文本，避免重复排队
+        self.pending_prefetch = set()
+        self.worker = threading.Thread(target=self._work_loop, daemon=True)
+        self.worker.start()
+
+    def _submit(self, priority, kind, text):
+        with self.seq_lock:
+            self.seq += 1
+            seq = self.seq
+        self.tasks.put((priority, seq, kind, text))
+
+    def speak(self, text):
+        """
+        朗读文本（不阻塞调用者）
+
+        Args:
+            text: 要朗读的文本
+        """
+        if text:
+            self._submit(self.PRIORITY_SPEAK, "speak", text)
+
+    def prefetch(self, texts):
+        """
+        提前合成即将朗读的文本
+
+        Args:
+            texts: 文本列表
+        """
+        for text in texts:
+            if not text or text in self.pending_prefetch:
+                continue
+            key = self.engine.cache_key(text)
+            if self.find_archive(key) or self.cache.get(key):
+                continue
+            self.pending_prefetch.add(text)
+            self._submit(self.PRIORITY_PREFETCH, "prefetch", text)
+
+    def find_archive(self, key):
+        """返回包含该缓存键的音频包，没有时返回None"""
+        for archive in self.archives:
+            if key in archive:
+                return archive
+        return None
+
+    def ensure_clip(self, text):
+        """
+        获取文本对应的音频片段，缓存未命中时立即合成
+
+        Args:
+            text: 文本
+
+        Returns:
+            str: 音频片段文件路径
+        """
+        key = self.engine.cache_key(text)
+        path = self.cache.get(key)
+        if path:
+            return path
+        TTS_CALLS.inc(engine=self.engine.name, op="synthesize")
+        with TTS_SYNTH_SECONDS.time(engine=self.engine.name):
+            data = self.engine.synthesize(text)
+        return self.cache.put(key, data)
+
+    def _work_loop(self):
+        while True:
+            priority, seq, kind, text = self.tasks.get()
+            try:
+                if kind == "stop":
+                    break
+                archive = self.find_archive(self.engine.cache_key(text))
+                CACHE_REQUESTS.inc(cache="tts_archive", result="hit" if archive is not None else "miss")
+                if archive is not None:
+                    # 音频包中已有该片段：无需合成，直接读取播放
+                    if kind == "speak":
+                        TTS_CALLS.inc(engine=self.engine.name, op="play")
+                        self.engine.play_bytes(archive.read(self.engine.cache_key(text)))
+                    continue
+                path = self.ensure_clip(text)
+                if kind == "speak":
+                    TTS_CALLS.inc(engine=self.engine.name, op="play")
+                    self.engine.play(path)
+            except Exception:
+                pass
+            finally:
+                if kind == "prefetch":
+                    self.pending_prefetch.discard(text)
+                self.tasks.task_done()
+
+    def wait_idle(self):
+        """等待当前所有任务处理完毕（供测试使用）"""
+        self.tasks.join()
+
+    def close(self):
+        """停止后台线程"""
+        self._submit(self.PRIORITY_PREFETCH + 1, "stop", "")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 界面响应延迟统计
+
+记录"点击选项 -> 判分 -> 显示统计 -> 生成下一题 -> 渲染选项 -> 发音"
+这条路径上每个阶段的耗时（time.perf_counter），为每个阶段维护一个滚动窗口，
+计算p50/p90/p99等分位数，供图形界面的调试浮层显示，并在退出时写入文件。
+"""
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+# 延迟记录文件目录
+DEFAULT_LATENCY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "latency")
+
+
+class RollingHistogram:
+    """
+    保存最近若干个样本的滚动窗口，用于计算分位数
+    """
+    def __init__(self, window=500):
+        """
+        Args:
+            window: 窗口中保留的样本数，None表示保留全部样本
+        """
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value_ms):
+        """添加一个样本（毫秒）"""
+        self.samples.append(value_ms)
+        self.count += 1
+
+    def percentile(self, p, ordered=None):
+        """
+        计算分位数（最近邻法）
+
+        Args:
+            p: 百分位（0-100）
+            ordered: 已排序的样本，省略时自动排序
+
+        Returns:
+            float: 分位数值；没有样本时返回0.0
+        """
+        ordered = ordered if ordered is not None else sorted(self.samples)
+        if not ordered:
+            return 0.0
+        rank = max(1, int(math.ceil(p / 100.0 * len(ordered))))
+        return ordered[rank - 1]
+
+    def summary(self):
+        """
+        Returns:
+            dict: 样本总数、窗口平均值、p50/p90/p95/p99和最大值（毫秒）
+        """
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+            "p50": round(self.percentile(50, ordered), 3),
+            "p90": round(self.percentile(90, ordered), 3),
+            "p95": round(self.percentile(95, ordered), 3),
+            "p99": round(self.percentile(99, ordered), 3),
+            "max": round(ordered[-1], 3) if ordered else 0.0
+        }
+
+
+class LatencyTracker:
+    """
+    界面操作延迟跟踪器
+
+    用法:
+        tracker.begin()             # 用户点击时
+        tracker.mark("evaluate")    # 每个阶段结束时
+        tracker.end()               # 整个流程结束时
+
+    每次mark记录距上一次mark的阶段耗时，end记录从begin开始的总耗时（"total"）。
+    没有调用begin时，mark和end不做任何事，因此可以放在会被其他路径调用的方法里。
+    """
+    def __init__(self, window=500):
+        """
+        Args:
+            window: 每个阶段滚动窗口的样本数
+        """
+        self.window = window
+        self.histograms = OrderedDict()
+        self._started_at = None
+        self._last_at = None
+
+    def _histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = RollingHistogram(self.window)
+        return histogram
+
+    @property
+    def active(self):
+        """是否正在跟踪一次操作"""
+        return self._started_at is not None
+
+    def begin(self):
+        """开始跟踪一次操作"""
+        self._started_at = self._last_at = time.perf_counter()
+
+    def mark(self, stage):
+        """
+        记录一个阶段的结束
+
+        Args:
+            stage: 阶段名称
+        """
+        if self._started_at is None:
+            return
+        now = time.perf_counter()
+        self._histogram(stage).add((now - self._last_at) * 1000)
+        self._last_at = now
+
+    def end(self, stage=None):
+        """
+        结束本次跟踪并记录总耗时
+
+        Args:
+            stage: 可选，结束前先记录的最后一个阶段名称
+        """
+        if self._started_at is None:
+            return
+        if stage:
+            self.mark(stage)
+        self._histogram("total").add((time.perf_counter() - self._started_at) * 1000)
+        self._started_at = self._last_at = None
+
+    def summary(self):
+        """
+        Returns:
+            OrderedDict: 阶段名称 -> 分位数统计
+        """
+        return OrderedDict((stage, h.summary()) for stage, h in self.histograms.items())
+
+    def format_table(self):
+        """
+        Returns:
+            str: 适合在调试浮层中显示的文本表格
+        """
+        lines = [f"{'stage':<22}{'count':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+        for stage, s in self.summary().items():
+            lines.append(f"{stage:<22}{s['count']:>6}{s['p50']:>9.2f}{s['p90']:>9.2f}"
+                         f"{s['p99']:>9.2f}{s['max']:>9.2f}")
+        return "\n".join(lines)
+
+    def dump(self, directory=None):
+        """
+        把统计结果写入JSON文件
+
+        Args:
+            directory: 输出目录，默认为data/latency
+
+        Returns:
+            str: 写入的文件路径；没有任何样本时返回None
+        """
+        if not self.histograms:
+            return None
+        directory = directory or DEFAULT_LATENCY_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"ui_latency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "unit": "ms",
+                "stages": self.summary()
+            }, f, ensure_ascii=False, indent=2)
+        return path
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 词汇文件的变化检测与增量重新索引
+
+词汇文件被编辑后，不需要重新解析整个文件，也不需要重建由它派生的索引。
+
+加载模块时（VocabularyBank.get_module）逐个扫描JSON数组中的原始条目，每CHUNK_ITEMS个
+组成一个块，记录块的文本长度、文本哈希和块中解析出的条目（ModuleManifest）。
+重新加载时从头扫描新文件：在每个原始条目的起点，用接下来的PREFIX_CHARS个字符查找
+以它开头的旧块，长度和哈希都相同的块直接复用其中已解析的条目；其余位置逐个解码、
+解析，再按内容与未被复用的旧条目配对。编辑一个单词只需要解码它所在的块:
+
+    delta = bank.reload_module("4")       # ModuleDelta：新增、删除、修改的条目
+    apply_delta(delta)                    # 只更新受影响的单词
+
+apply_delta把变化应用到已经建立的索引上:
+    WordIndex      复用未变化条目的单词ID，只改写变化位置之后的出现位置
+    PrefixIndex    重新计算受影响单词的行（原始拼写、释义、所在模块）
+    FuzzyIndex     新增的单词放进附加表，删除的单词标记为已删除（见fuzzy_search）
+    GlossIndex     增删受影响单词的词义
+
+块的哈希使用进程内的字符串哈希，清单只在加载它的进程中有效；重新启动后派生索引
+通过文件指纹发现变化（容错查词索引同样按单词增量更新）。
+
+命令行（比较同一个词汇文件的两个版本）:
+    python vocab_delta.py old.json new.json
+"""
+import argparse
+import sys
+import time
+from json.decoder import WHITESPACE, JSONDecoder
+
+from vocabulary_store import get_shared_bank, parse_entry
+from word_index import file_fingerprint, get_word_index, normalize_word
+
+# 每个块包含的原始条目数
+CHUNK_ITEMS = 32
+
+# 查找旧块时使用的前缀长度（字符）
+PREFIX_CHARS = 48
+
+_decoder = JSONDecoder()
+_skip_space = WHITESPACE.match
+
+
+def scan_items(text):
+    """
+    逐个扫描JSON数组中的元素
+
+    Yields:
+        tuple: (起始位置, 结束位置, 元素)
+
+    Raises:
+        ValueError: 不是JSON数组或格式错误
+    """
+    p = _skip_space(text, 0).end()
+    if not text.startswith("[", p):
+        raise ValueError("词汇文件不是JSON数组")
+    p = _skip_space(text, p + 1).end()
+    if text.startswith("]", p):
+        return
+    raw_decode = _decoder.raw_decode
+    while True:
+        item, end = raw_decode(text, p)
+        yield p, end, item
+        p = _next_item(text, end)
+        if p is None:
+            return
+
+
+def _next_item(text, end):
+    # 跳过元素之后的逗号，返回下一个元素的起始位置；数组结束时返回None
+    p = _skip_space(text, end).end()
+    if text.startswith(",", p):
+        return _skip_space(text, p + 1).end()
+    if text.startswith("]", p):
+        return None
+    raise ValueError(f"词汇文件格式错误（位置 {p}）")
+
+
+def _parse(item):
+    return parse_entry(item) if isinstance(item, dict) else None
+
+
+def entry_key(entry):
+    """按内容比较条目时使用的键"""
+    return entry.word, entry.definition, entry.packed_senses, entry.phrases
+
+
+class ModuleManifest:
+    """
+    一个模块的块清单
+
+    Attributes:
+        fingerprint: 读取时词汇文件的指纹
+        chunks: (文本长度, 文本哈希, 第一个条目的下标, 条目数) 列表
+        by_prefix: 块文本的前PREFIX_CHARS个字符 -> 块下标列表
+    """
+    __slots__ = ('fingerprint', 'chunks', 'by_prefix')
+
+    def __init__(self, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.chunks = []
+        self.by_prefix = {}
+
+    def add(self, text, start, end, first, count):
+        span = text[start:end]
+        self.by_prefix.setdefault(span[:PREFIX_CHARS], []).append(len(self.chunks))
+        self.chunks.append((end - start, hash(span), first, count))
+
+    def match(self, text, p, used):
+        """
+        Returns:
+            int: 在位置p开始、文本完全相同的未使用旧块的下标，没有时返回None
+        """
+        candidates = self.by_prefix.get(text[p:p + PREFIX_CHARS])
+        if not candidates:
+            return None
+        for chunk in candidates:
+            length, digest = self.chunks[chunk][:2]
+            if chunk not in used and hash(text[p:p + length]) == digest:
+                return chunk
+        return None
+
+
+def read_module(path):
+    """
+    Returns:
+        tuple: (文件文本, 读取前的文件指纹)
+    """
+    fingerprint = file_fingerprint(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read(), fingerprint
+
+
+def parse_module(text, fingerprint=None):
+    """
+    解析整个词汇文件并建立块清单
+
+    Returns:
+        tuple: (VocabEntry元组, ModuleManifest)
+    """
+    entries = []
+    manifest = ModuleManifest(fingerprint)
+    count = 0
+    for start, end, item in scan_items(text):
+        if count == 0:
+            chunk_start, first = start, len(entries)
+        entry = _parse(item)
+        if entry is not None:
+            entries.append(entry)
+        count += 1
+        if count == CHUNK_ITEMS:
+            manifest.add(text, chunk_start, end, first, len(entries) - first)
+            count = 0
+    if count:
+        manifest.add(text, chunk_start, end, first, len(entries) - first)
+    return tuple(entries), manifest
+
+
+class ModuleDelta:
+    """
+    一个模块重新加载前后的变化
+
+    Attributes:
+        module_id: 模块ID
+        old_entries, entries: 重新加载前后的条目元组
+        sources: 新条目下标 -> 复用的旧条目下标（新增和修改的条目为-1）
+        added: 新增条目在entries中的下标
+        removed: 删除条目在old_entries中的下标
+        modified: 同一个单词内容有变化的 (旧下标, 新下标) 列表
+        first_change: 第一个下标或内容有变化的新条目下标，没有任何变化时为None
+        decoded: 重新解码的原始条目数
+        old_fingerprint, manifest: 重新加载前的文件指纹、新的块清单
+    """
+    def __init__(self, module_id, old_entries, entries, sources, decoded, old_fingerprint, manifest):
+        self.module_id = module_id
+        self.old_entries = old_entries
+        self.entries = entries
+        self.sources = sources
+        self.decoded = decoded
+        self.old_fingerprint = old_fingerprint
+        self.manifest = manifest
+
+        used = {s for s in sources if s >= 0}
+        removed_by_word = {}
+        for i in range(len(old_entries)):
+            if i not in used:
+                removed_by_word.setdefault(normalize_word(old_entries[i].word), []).append(i)
+        self.added = []
+        self.modified = []
+        for j, source in enumerate(sources):
+            if source >= 0:
+                continue
+            same_word = removed_by_word.get(normalize_word(entries[j].word))
+            if same_word:
+                self.modified.append((same_word.pop(0), j))
+            else:
+                self.added.append(j)
+        self.removed = sorted(i for positions in removed_by_word.values() for i in positions)
+
+        self.first_change = next((j for j, source in enumerate(sources) if source != j), None)
+        if self.first_change is None and len(old_entries) != len(entries):
+            self.first_change = len(entries)
+
+    @property
+    def fingerprint(self):
+        """重新加载后的文件指纹"""
+        return self.manifest.fingerprint
+
+    def __bool__(self):
+        return self.first_change is not None
+
+    def changed_words(self):
+        """
+        Returns:
+            set: 新增、删除或修改的条目的规范化单词（只是位置变化的不算）
+        """
+        words = {normalize_word(self.entries[j].word) for j in self.added}
+        words.update(normalize_word(self.old_entries[i].word) for i in self.removed)
+        for i, j in self.modified:
+            words.add(normalize_word(self.old_entries[i].word))
+            words.add(normalize_word(self.entries[j].word))
+        return words
+
+    def changed_old_entries(self):
+        """被删除或修改的旧条目"""
+        return [self.old_entries[i] for i in self.removed] + [self.old_entries[i] for i, _ in self.modified]
+
+    def summary(self):
+        return (f"新增 {len(self.added)}，删除 {len(self.removed)}，修改 {len(self.modified)}"
+                f"（重新解码 {self.decoded} 个原始条目）")
+
+
+def reparse_module(module_id, text, old_entries, old_manifest, fingerprint=None):
+    """
+    根据旧的块清单增量解析新的文件文本
+
+    Args:
+        module_id: 模块ID
+        text: 新的文件文本
+        old_entries: 旧清单对应的条目元组
+        old_manifest: 旧的ModuleManifest
+        fingerprint: 新文件的指纹
+
+    Returns:
+        ModuleDelta: 变化（其中entries为新的条目元组，manifest为新的块清单）
+
+    Raises:
+        ValueError: 文件格式错误
+    """
+    entries = []
+    sources = []
+    manifest = ModuleManifest(fingerprint)
+    used = set()
+    decoded = 0
+    run = 0
+
+    p = _skip_space(text, 0).end()
+    if not text.startswith("[", p):
+        raise ValueError("词汇文件不是JSON数组")
+    p = _skip_space(text, p + 1).end()
+    if text.startswith("]", p):
+        p = None
+    raw_decode = _decoder.raw_decode
+    while p is not None:
+        chunk = old_manifest.match(text, p, used)
+        if chunk is not None:
+            length, digest, first, count = old_manifest.chunks[chunk]
+            end = p + length
+            try:
+                next_p = _next_item(text, end)
+            except ValueError:
+                chunk = None
+        if chunk is not None:
+            if run:
+                manifest.add(text, run_start, run_end, run_first, len(entries) - run_first)
+                run = 0
+            used.add(chunk)
+            manifest.by_prefix.setdefault(text[p:p + PREFIX_CHARS], []).append(len(manifest.chunks))
+            manifest.chunks.append((length, digest, len(entries), count))
+            entries.extend(old_entries[first:first + count])
+            sources.extend(range(first, first + count))
+            p = next_p
+            continue
+
+        # 没有可以复用的块：解码一个原始条目，连续解码的条目也按CHUNK_ITEMS组成新块
+        item, end = raw_decode(text, p)
+        decoded += 1
+        if run == 0:
+            run_start, run_first = p, len(entries)
+        entry = _parse(item)
+        if entry is not None:
+            entries.append(entry)
+            sources.append(-1)
+        run += 1
+        run_end = end
+        if run == CHUNK_ITEMS:
+            manifest.add(text, run_start, run_end, run_first, len(entries) - run_first)
+            run = 0
+        p = _next_item(text, end)
+    if run:
+        manifest.add(text, run_start, run_end, run_first, len(entries) - run_first)
+
+    # 重新解码的条目按内容与未复用的旧条目配对（块被编辑时，块中其余条目仍然复用）
+    pool = {}
+    for chunk, (_, _, first, count) in enumerate(old_manifest.chunks):
+        if chunk not in used:
+            for i in range(first, first + count):
+                pool.setdefault(entry_key(old_entries[i]), []).append(i)
+    if pool:
+        for j, source in enumerate(sources):
+            if source < 0:
+                same = pool.get(entry_key(entries[j]))
+                if same:
+                    sources[j] = same.pop(0)
+                    entries[j] = old_entries[sources[j]]
+    return ModuleDelta(module_id, old_entries, tuple(entries), sources, decoded,
+                       old_manifest.fingerprint, manifest)
+
+
+def shared_indexes():
+    """
+    进程内已经建立的共享索引（不为了更新而建立索引）
+
+    Returns:
+        tuple: (WordIndex, PrefixIndex, FuzzySearcher, GlossIndex)，尚未建立的为None
+    """
+    # 派生索引的模块在需要时才导入（加载词汇时不需要它们）
+    import fuzzy_search
+    import gloss_index
+    import word_index
+    import word_lookup
+
+    searcher = fuzzy_search._shared_searcher
+    return ((searcher.word_index if searcher is not None else None) or word_index._shared_index,
+            word_lookup._shared_prefix, searcher, gloss_index._shared_gloss)
+
+
+def apply_delta(delta, bank=None, word_index=None, prefix_index=None, searcher=None, gloss_index=None,
+                save=True):
+    """
+    把模块的变化应用到派生的索引上（默认为进程内已经建立的共享索引）
+
+    Args:
+        delta: VocabularyBank.reload_module的结果
+        bank: 重新加载了模块的VocabularyBank，默认为共享实例
+        word_index, prefix_index, searcher, gloss_index: 要更新的索引
+        save: 是否把更新后的索引写回缓存文件
+
+    Returns:
+        set: 受影响的单词ID
+    """
+    bank = bank or get_shared_bank()
+    shared = shared_indexes()
+    searcher = searcher or shared[2]
+    word_index = word_index or (searcher.word_index if searcher is not None else None) or shared[0]
+    prefix_index = prefix_index or shared[1]
+    gloss_index = gloss_index or shared[3]
+    if word_index is None:
+        if prefix_index is None and searcher is None and gloss_index is None:
+            return set()
+        word_index = get_word_index()
+
+    affected = word_index.apply_delta(delta)
+    if prefix_index is not None:
+        prefix_index.apply(word_index, affected, bank)
+    if searcher is not None:
+        searcher.apply(delta.module_id, affected)
+    if gloss_index is not None:
+        gloss_index.apply(word_index, affected, bank, delta.changed_old_entries())
+    if save:
+        save_indexes(delta.module_id, word_index, prefix_index, searcher)
+    return affected
+
+
+def save_indexes(module_id, word_index=None, prefix_index=None, searcher=None):
+    """
+    把apply_delta更新后的索引写回缓存文件（词义索引只在内存中，不需要保存）
+
+    Args:
+        module_id: 变化的模块（容错查词索引只保存这个模块的）
+        word_index, prefix_index, searcher: 要保存的索引，都不指定时为进程内的共享索引
+
+    Returns:
+        bool: 全部写入成功时返回True
+    """
+    if word_index is None and prefix_index is None and searcher is None:
+        word_index, prefix_index, searcher, _ = shared_indexes()
+    try:
+        if word_index is not None:
+            word_index.save()
+        if prefix_index is not None:
+            prefix_index.save()
+        if searcher is not None:
+            searcher.save(module_id)
+    except OSError:
+        return False
+    return True
+
+
+def refresh_module(module_id, bank=None, save=True):
+    """
+    词汇文件有变化时增量重新加载模块并更新所有已建立的索引
+
+    Returns:
+        ModuleDelta: 变化；模块未加载或文件没有变化时返回None
+    """
+    bank = bank or get_shared_bank()
+    delta = bank.reload_module(module_id)
+    if delta:
+        apply_delta(delta, bank, save=save)
+    return delta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="比较同一个词汇文件的两个版本（增量解析）")
+    parser.add_argument("old", help="旧版本的词汇文件")
+    parser.add_argument("new", help="新版本的词汇文件")
+    args = parser.parse_args(argv)
+
+    text, fingerprint = read_module(args.old)
+    started = time.perf_counter()
+    old_entries, manifest = parse_module(text, fingerprint)
+    parse_ms = (time.perf_counter() - started) * 1000
+    text, fingerprint = read_module(args.new)
+    started = time.perf_counter()
+    delta = reparse_module("file", text, old_entries, manifest, fingerprint)
+    reparse_ms = (time.perf_counter() - started) * 1000
+
+    for j in delta.added:
+        print(f"+ {delta.entries[j].word}  {delta.entries[j].definition}")
+    for i in delta.removed:
+        print(f"- {delta.old_entries[i].word}  {delta.old_entries[i].definition}")
+    for i, j in delta.modified:
+        old, new = delta.old_entries[i], delta.entries[j]
+        print(f"~ {new.word}  {old.definition} -> {new.definition}" if old.definition != new.definition
+              else f"~ {new.word}")
+    print(delta.summary())
+    print(f"完整解析 {parse_ms:.1f} ms，增量解析 {reparse_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 词汇导出（CSV、TSV、JSON Lines、Anki文本牌组）
+
+导出的是处理后的词汇（规范化的释义、所有义项和词性、例句短语），可以导出整个模块，
+也可以只导出收藏的单词或错题本中的单词。条目从加载器逐条取出（见
+VocabularyBank.iter_module），每条转换后立即写出，不在内存中拼出整个输出:
+
+    with open_output("cet6.csv.gz", "csv") as out:
+        export_entries(out, iter_export(["4"]), "csv")
+
+格式:
+    csv     带表头，UTF-8 BOM（Excel可以直接打开中文）
+    tsv     带表头，制表符分隔
+    jsonl   每行一个JSON对象，义项和例句为列表
+    anki    Anki的"导入文件"文本格式：正面为单词，背面为HTML格式的释义和例句，
+            第三列为标签（模块名称）
+
+输出文件名以.gz结尾（或使用--gzip）时写出gzip压缩文件；先写入临时文件，完成后再替换目标文件。
+
+命令行:
+    python main.py export 4 --format csv -o cet6.csv
+    python vocab_export.py all --format anki --favorites -o favorites.txt
+    python vocab_export.py 1 4 --format jsonl --wrongbook data/wrong_book.json -o wrong.jsonl.gz
+"""
+import argparse
+import contextlib
+import csv
+import gzip
+import html
+import io
+import json
+import os
+import sys
+
+from vocabulary_store import MODULES, entry_gloss, get_shared_bank
+from word_index import normalize_word
+
+FORMATS = ("csv", "tsv", "jsonl", "anki")
+
+# csv/tsv的列
+COLUMNS = ("word", "pos", "definition", "senses", "examples", "module")
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FAVORITES = os.path.join(PROJECT_DIR, "data", "favorites.json")
+DEFAULT_WRONGBOOK = os.path.join(PROJECT_DIR, "data", "wrong_book.json")
+
+# 每次写入文件的行数与文件缓冲区大小
+CHUNK_ROWS = 1000
+BUFFER_SIZE = 1 << 20
+
+# gzip压缩级别：1比默认的9快5倍左右，压缩后只大约10%，压缩不会成为导出的瓶颈
+GZIP_LEVEL = 1
+
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+# 例句之间、短语与翻译之间的分隔符
+EXAMPLE_SEP = "；"
+
+
+def load_favorites(path=DEFAULT_FAVORITES):
+    """
+    Returns:
+        set: 收藏的单词（规范化后），文件为图形界面保存的单词列表
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return {normalize_word(w) for w in json.load(f) if isinstance(w, str)}
+
+
+def load_wrongbook_words(path=DEFAULT_WRONGBOOK):
+    """
+    读取错题本中的单词
+
+    支持图形界面导出的JSON错题本（make_wrongbook的格式，或错题记录列表）
+    和命令行保存的文本错题本（错题本_*.txt）。
+
+    Returns:
+        set: 错题本中的单词（规范化后）
+    """
+    words = set()
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            items = data.get("wrong_answers", []) if isinstance(data, dict) else data
+            for item in items:
+                if isinstance(item, dict):
+                    word = item.get("word_info", {}).get("word") if "word_info" in item else item.get("word")
+                    if isinstance(word, str):
+                        words.add(normalize_word(word))
+        else:
+            for line in f:
+                line = line.strip()
+                if line.startswith("单词:"):
+                    words.add(normalize_word(line[len("单词:"):]))
+    return words
+
+
+def iter_export(module_ids, bank=None, words=None, unique=False):
+    """
+    按模块顺序逐条返回要导出的条目
+
+    Args:
+        module_ids: 模块ID列表
+        bank: VocabularyBank，默认为共享实例
+        words: 只导出这些单词（规范化后的集合），默认全部
+        unique: 多个模块中的同一个单词只导出第一次出现的条目
+
+    Yields:
+        tuple: (模块ID, VocabEntry)
+    """
+    bank = bank or get_shared_bank()
+    seen = set()
+    for module_id in module_ids:
+        for entry in bank.iter_module(module_id):
+            if words is not None or unique:
+                key = normalize_word(entry.word)
+                if words is not None and key not in words:
+                    continue
+                if unique:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            yield module_id, entry
+
+
+def format_examples(entry):
+    """例句短语的文本形式，例如 "abandon oneself to 沉溺于；abandoned child 弃儿" """
+    return EXAMPLE_SEP.join(f"{p} {t.strip()}".strip() for p, t in entry.phrases)
+
+
+def to_row(module_id, entry):
+    """csv/tsv的一行（与COLUMNS对应）"""
+    return (entry.word, entry.pos, entry.definition, entry_gloss(entry), format_examples(entry), module_id)
+
+
+def to_json(module_id, entry):
+    """jsonl的一行（不含换行）"""
+    return _JSON_ENCODER.encode({
+        "word": entry.word,
+        "pos": entry.pos,
+        "definition": entry.definition,
+        "senses": [{"pos": pos, "translation": text} for pos, text in entry.senses],
+        "examples": [{"phrase": p, "translation": t.strip()} for p, t in entry.phrases],
+        "module": module_id,
+    })
+
+
+def _anki_field(text):
+    # 字段中不能出现制表符和换行
+    return html.escape(text).replace("\t", " ").replace("\n", "<br>")
+
+
+def to_anki(module_id, entry, tag):
+    """anki的一行（不含换行）：单词、HTML释义和例句、标签"""
+    back = _anki_field(entry_gloss(entry))
+    if entry.phrases:
+        back += "<br><br>" + "<br>".join(f"{_anki_field(p)} {_anki_field(t.strip())}" for p, t in entry.phrases)
+    return f"{_anki_field(entry.word)}\t{back}\t{tag}"
+
+
+def anki_tag(name):
+    """模块名称作为Anki标签（标签中不能有空格）"""
+    return "_".join(name.split()) or "vocabulary"
+
+
+def export_entries(out, items, fmt, bank=None):
+    """
+    把条目写入已打开的文本文件
+
+    Args:
+        out: 文本文件对象（newline=""打开）
+        items: iter_export返回的 (模块ID, 条目) 序列
+        fmt: FORMATS中的一种
+        bank: 提供模块名称（Anki标签）的VocabularyBank，默认为共享实例
+
+    Returns:
+        int: 导出的条目数
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    count = 0
+    if fmt in ("csv", "tsv"):
+        writer = csv.writer(out, delimiter="," if fmt == "csv" else "\t", lineterminator="\n")
+        writer.writerow(COLUMNS)
+        for module_id, entry in items:
+            writer.writerow(to_row(module_id, entry))
+            count += 1
+        return count
+
+    bank = bank or get_shared_bank()
+    if fmt == "anki":
+        out.write("#separator:tab\n#html:true\n#tags column:3\n")
+        tags = {}
+
+        def line(module_id, entry):
+            tag = tags.get(module_id)
+            if tag is None:
+                tag = tags[module_id] = anki_tag(bank.module_name(module_id))
+            return to_anki(module_id, entry, tag)
+    else:
+        line = to_json
+    # 按块拼接后写入，减少write调用
+    chunk = []
+    for module_id, entry in items:
+        chunk.append(line(module_id, entry))
+        if len(chunk) >= CHUNK_ROWS:
+            out.write("\n".join(chunk) + "\n")
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        out.write("\n".join(chunk) + "\n")
+        count += len(chunk)
+    return count
+
+
+@contextlib.contextmanager
+def open_output(path, fmt, compress=None):
+    """
+    打开导出文件（"-"为标准输出）；正常结束时临时文件才替换目标文件
+
+    Args:
+        path: 输出路径
+        fmt: 导出格式（csv使用带BOM的UTF-8）
+        compress: 是否gzip压缩，默认由文件名是否以.gz结尾决定
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"
+    if path == "-":
+        if compress:
+            with gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb", compresslevel=GZIP_LEVEL) as raw:
+                with io.TextIOWrapper(raw, encoding=encoding, newline="") as out:
+                    yield out
+        else:
+            yield sys.stdout
+        return
+
+    tmp = path + ".tmp"
+    try:
+        if compress:
+            with gzip.open(tmp, "wt", encoding=encoding, newline="", compresslevel=GZIP_LEVEL) as out:
+                yield out
+        else:
+            with open(tmp, "w", encoding=encoding, newline="", buffering=BUFFER_SIZE) as out:
+                yield out
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def export_vocabulary(path, module_ids, fmt="csv", bank=None, words=None, unique=False, compress=None):
+    """
+    导出词汇到文件
+
+    Args:
+        path: 输出路径（"-"为标准输出）
+        module_ids: 模块ID列表
+        fmt: FORMATS中的一种
+        bank: VocabularyBank，默认为共享实例
+        words: 只导出这些单词（规范化后的集合），默认全部
+        unique: 同一个单词只导出一次
+        compress: 是否gzip压缩，默认由文件名决定
+
+    Returns:
+        int: 导出的条目数
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    bank = bank or get_shared_bank()
+    with open_output(path, fmt, compress) as out:
+        return export_entries(out, iter_export(module_ids, bank, words, unique), fmt, bank)
+
+
+def guess_format(path):
+    """根据文件扩展名推断格式（忽略.gz），无法推断时返回None"""
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower().lstrip(".")
+    if ext in FORMATS:
+        return ext
+    return "anki" if ext == "txt" else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="导出词汇（CSV、TSV、JSON Lines或Anki文本牌组）")
+    parser.add_argument("modules", nargs="+", help="模块编号，all为所有模块，例如 1 4")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="导出格式，默认根据输出文件的扩展名推断（.txt为anki），无法推断时为csv")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认为标准输出；以.gz结尾时压缩")
+    parser.add_argument("--gzip", action="store_true", help="gzip压缩输出")
+    parser.add_argument("--favorites", nargs="?", const=DEFAULT_FAVORITES, metavar="PATH",
+                        help="只导出收藏的单词（默认读取data/favorites.json）")
+    parser.add_argument("--wrongbook", nargs="?", const=DEFAULT_WRONGBOOK, metavar="PATH",
+                        help="只导出错题本中的单词（默认读取data/wrong_book.json，也可以是错题本_*.txt）")
+    parser.add_argument("--unique", action="store_true", help="多个模块中的同一个单词只导出一次")
+    args = parser.parse_args(argv)
+
+    bank = get_shared_bank()
+    module_ids = list(bank.modules) if "all" in args.modules else args.modules
+    unknown = [m for m in module_ids if m not in bank.modules]
+    if unknown:
+        parser.error(f"无效的模块编号: {', '.join(unknown)}（可选: {', '.join(MODULES)}）")
+    # all时跳过没有词汇文件的模块；明确指定的模块缺少文件时报错
+    module_ids = [m for m in module_ids if m in args.modules or os.path.isfile(bank.module_path(m))]
+
+    words = None
+    try:
+        if args.favorites:
+            words = load_favorites(args.favorites)
+        if args.wrongbook:
+            words = (words or set()) | load_wrongbook_words(args.wrongbook)
+    except (OSError, ValueError) as e:
+        print(f"读取筛选单词时出错: {e}", file=sys.stderr)
+        return 1
+
+    fmt = args.format or guess_format(args.output) or "csv"
+    try:
+        count = export_vocabulary(args.output, module_ids, fmt, bank, words, args.unique,
+                                  True if args.gzip else None)
+    except BrokenPipeError:
+        # 输出到head等提前退出的管道时不报错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"导出时出错: {e}", file=sys.stderr)
+        return 1
+    if args.output != "-":
+        print(f"已导出 {count} 个单词到 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,825 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 共享词汇数据与轻量测验会话
+
+VocabularyBank 保存所有模块的词汇数据：每个模块只从文件解析一次，
+解析结果是由不可变 VocabEntry 组成的元组，可以被任意多个测验会话
+（以及多个线程）同时读取。
+
+每个条目保存词汇文件中的所有义项和词性，但只占一个字符串：只有一个义项的条目
+（绝大多数）只保存共享的词性字符串，其余义项打包在同一个字符串中，访问时才解码。
+解析时释义会被规范化（见normalize_definition）：去掉多余的空白，分隔符统一为"，"。
+
+QuizSession 只保存一个用户的答题状态（模式、计分、错题、当前题目），
+通过引用共享的 VocabularyBank 出题，本身只占用几百字节内存。
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+
+from metrics import REGISTRY
+
+# 模块配置
+MODULES = {
+    "1": {"name": "初中", "file": "1-初中-顺序.json"},
+    "2": {"name": "高中", "file": "2-高中-顺序.json"},
+    "3": {"name": "CET4", "file": "3-CET4-顺序.json"},
+    "4": {"name": "CET6", "file": "4-CET6-顺序.json"},
+    "5": {"name": "考研", "file": "5-考研-顺序.json"},
+    "6": {"name": "托福", "file": "6-托福-顺序.json"},
+    "7": {"name": "SAT", "file": "7-SAT-顺序.json"}
+}
+
+# 词汇文件目录（相对路径，指向项目中的json文件夹）
+DEFAULT_JSON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "json")
+
+# 打包义项时使用的分隔符（与shared_vocab的字段分隔符不同，打包结果可以原样嵌入）
+SENSE_SEP = "\x1d"
+POS_SEP = "\x1c"
+
+# 释义中的分隔符（括号内的除外）和括号
+GLOSS_SEPARATORS = "，；,;"
+GLOSS_SEP = "，"
+_SEPARATOR_RE = re.compile(r"\s*[，；,;]\s*")
+_OPEN_BRACKETS = "（([〔【"
+_CLOSE_BRACKETS = "）)]〕】"
+_OPEN_BRACKET_RE = re.compile("[（(\\[〔【]")
+
+# 运行指标
+MODULE_LOADS = REGISTRY.counter("vocab_module_loads_total", "从文件加载词汇模块的次数", ("module",))
+MODULE_RELOADS = REGISTRY.counter("vocab_module_reloads_total", "词汇文件变化后增量重新加载模块的次数", ("module",))
+MODULE_LOAD_SECONDS = REGISTRY.histogram("vocab_module_load_seconds", "读取并解析词汇模块的耗时（秒）")
+MODULE_RELOAD_SECONDS = REGISTRY.histogram("vocab_module_reload_seconds", "词汇文件变化后增量重新加载模块的耗时（秒）")
+LOADED_ENTRIES = REGISTRY.gauge("vocab_loaded_entries", "已加载的词汇条目数")
+CACHE_REQUESTS = REGISTRY.counter("cache_requests_total", "缓存查询次数", ("cache", "result"))
+QUESTIONS_GENERATED = REGISTRY.counter("vocab_questions_generated_total", "生成的题目数", ("mode",))
+ANSWERS_GRADED = REGISTRY.counter("vocab_answers_graded_total", "判分的答案数", ("result",))
+ANSWER_SECONDS = REGISTRY.histogram("vocab_answer_seconds", "从显示题目到作答的用时（秒）", ("mode",),
+                                    buckets=(0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0))
+WRONGBOOK_WRITES = REGISTRY.counter("vocab_wrongbook_writes_total", "错题本写入次数", ("format",))
+WRONGBOOK_WRITE_SECONDS = REGISTRY.histogram("vocab_wrongbook_write_seconds", "错题本写入耗时（秒）", ("format",))
+# 每道题都会经过的埋点预先绑定标签
+VOCAB_CACHE_HITS = CACHE_REQUESTS.labels(cache="vocab", result="hit")
+VOCAB_CACHE_MISSES = CACHE_REQUESTS.labels(cache="vocab", result="miss")
+NORMAL_QUESTIONS = QUESTIONS_GENERATED.labels(mode="normal")
+REVIEW_QUESTIONS = QUESTIONS_GENERATED.labels(mode="review")
+CORRECT_ANSWERS = ANSWERS_GRADED.labels(result="correct")
+WRONG_ANSWERS = ANSWERS_GRADED.labels(result="wrong")
+NEAR_ANSWERS = ANSWERS_GRADED.labels(result="near")
+
+
+class VocabEntry:
+    """
+    不可变的词汇条目
+
+    为了兼容原来的字典格式，支持 entry['word']、entry.get('definition') 和 copy()。
+    examples以(短语, 翻译)元组的形式保存，按字典格式访问时才转换为字典列表。
+    所有义项以打包字符串的形式保存（见pack_senses），通过senses、pos和gloss()按需解码。
+    """
+    __slots__ = ('word', 'definition', 'phrases', '_senses')
+
+    def __init__(self, word, definition, phrases=(), senses=(), packed_senses=None):
+        """
+        Args:
+            word: 单词
+            definition: 主要释义（第一个义项）
+            phrases: (短语, 翻译) 序列
+            senses: (词性, 释义) 序列，第一个通常就是definition
+            packed_senses: 已经打包的义项（pack_senses的结果），提供时忽略senses
+        """
+        object.__setattr__(self, 'word', word)
+        object.__setattr__(self, 'definition', definition)
+        object.__setattr__(self, 'phrases', tuple(phrases))
+        if packed_senses is None:
+            packed_senses = pack_senses(senses, definition)
+        object.__setattr__(self, '_senses', packed_senses)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("VocabEntry是只读的")
+
+    def __reduce__(self):
+        # pickle和copy.deepcopy默认逐个setattr恢复槽位，会被__setattr__拒绝
+        return (VocabEntry, (self.word, self.definition, self.phrases, (), self._senses))
+
+    @property
+    def senses(self):
+        """
+        Returns:
+            tuple: (词性, 释义) 元组，第一个是definition；词性未知时为空字符串
+        """
+        packed = self._senses
+        if SENSE_SEP not in packed:
+            return ((packed, self.definition),)
+        fields = packed.split(SENSE_SEP)
+        return ((fields[0], self.definition),) + tuple(tuple(f.split(POS_SEP, 1)) for f in fields[1:])
+
+    @property
+    def pos(self):
+        """主要释义的词性，未知时为空字符串"""
+        return self._senses.split(SENSE_SEP, 1)[0]
+
+    @property
+    def packed_senses(self):
+        """打包的义项字符串（供shared_vocab等序列化使用）"""
+        return self._senses
+
+    def gloss(self, limit=None):
+        """
+        带词性的完整释义，例如 "n. 放弃；vt. 抛弃"
+
+        Args:
+            limit: 最多包含的义项数，默认全部
+        """
+        return "；".join(f"{pos}. {text.strip()}" if pos else text.strip()
+                        for pos, text in self.senses[:limit])
+
+    @property
+    def examples(self):
+        """例句短语列表（与原字典格式相同）"""
+        return [{'phrase': p, 'translation': t} for p, t in self.phrases]
+
+    def __getitem__(self, key):
+        if key in ('word', 'definition', 'examples'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in ('word', 'definition', 'examples')
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ('word', 'definition', 'examples')
+
+    def copy(self):
+        """返回等价的可修改字典"""
+        return {'word': self.word, 'definition': self.definition, 'examples': self.examples}
+
+    to_dict = copy
+
+    def __repr__(self):
+        return f"VocabEntry({self.word!r}, {self.definition!r})"
+
+
+def pack_senses(senses, definition):
+    """
+    把义项打包为一个字符串
+
+    第一个字段是definition的词性，之后每个字段是"词性\\x1c释义"；只有一个义项时
+    结果就是词性本身（经过sys.intern，所有条目共用同一个字符串对象）。
+
+    Args:
+        senses: (词性, 释义) 序列
+        definition: 主要释义；与第一个义项相同时不重复保存
+
+    Returns:
+        str: 打包后的字符串
+    """
+    senses = [(pos or "", text) for pos, text in senses]
+    first_pos = ""
+    if senses and senses[0][1] == definition:
+        first_pos = senses.pop(0)[0]
+    if not senses:
+        return sys.intern(first_pos)
+    return SENSE_SEP.join([first_pos] + [f"{pos}{POS_SEP}{text}" for pos, text in senses])
+
+
+def split_glosses(text):
+    """
+    把释义拆分为单个词义，例如 " 区别， 辨别； 有差别地对待" -> ["区别", "辨别", "有差别地对待"]
+
+    括号内的分隔符不拆分（"（戏剧，歌剧的）一幕" 是一个词义）；去掉每个词义两端的空白和空的词义。
+
+    Returns:
+        list: 词义列表
+    """
+    if _OPEN_BRACKET_RE.search(text) is None:
+        parts = _SEPARATOR_RE.split(text)
+    else:
+        # 中英文括号经常混用，例如 "(美）"，因此只计算括号的层数
+        parts = []
+        depth = 0
+        start = 0
+        for i, ch in enumerate(text):
+            if ch in _OPEN_BRACKETS:
+                depth += 1
+            elif ch in _CLOSE_BRACKETS:
+                depth = max(depth - 1, 0)
+            elif not depth and ch in GLOSS_SEPARATORS:
+                parts.append(text[start:i])
+                start = i + 1
+        parts.append(text[start:])
+    return [p for p in (p.strip() for p in parts) if p]
+
+
+def normalize_definition(text):
+    """
+    Returns:
+        str: 规范化的释义（词义两端没有空白，分隔符统一为"，"）
+    """
+    return GLOSS_SEP.join(split_glosses(text))
+
+
+def entry_gloss(item):
+    """
+    Returns:
+        str: 条目带词性的完整释义；错题记录等没有义项信息的字典返回其definition
+    """
+    gloss = getattr(item, 'gloss', None)
+    return gloss() if gloss is not None else item['definition']
+
+
+def parse_vocabulary(all_vocab):
+    """
+    把词汇文件中的原始条目转换为VocabEntry元组
+
+    释义取第一个translation，没有时退而取第一个短语的翻译；所有translation及其词性(type)
+    作为义项保存，释义都经过normalize_definition规范化；
+    最多保留3个短语作为例句；缺少单词或释义的条目会被跳过。
+
+    Args:
+        all_vocab: json.load得到的原始条目列表
+
+    Returns:
+        tuple: VocabEntry元组
+    """
+    processed_vocab = []
+    for item in all_vocab:
+        entry = parse_entry(item)
+        if entry is not None:
+            processed_vocab.append(entry)
+    return tuple(processed_vocab)
+
+
+def parse_entry(item):
+    """
+    转换单个原始条目
+
+    Args:
+        item: 原始条目字典
+
+    Returns:
+        VocabEntry: 转换后的条目；缺少单词或释义时返回None
+    """
+    word = item.get('word', '')
+    definition = ""
+    packed = ""
+
+    # 尝试从translations获取释义（增强兼容性）
+    translations = item.get('translations', [])
+    if isinstance(translations, list) and translations:
+        # 确保第一个translation条目有translation字段
+        if isinstance(translations[0], dict) and 'translation' in translations[0]:
+            definition = translations[0].get('translation', '')
+            if isinstance(definition, str):
+                definition = normalize_definition(definition)
+            # 大多数条目只有一个义项，直接保存（共享的）词性；其余义项直接拼接，不经过pack_senses
+            packed = sys.intern((translations[0].get('type') or '').strip())
+            if len(translations) > 1 and definition:
+                rest = [f"{(t.get('type') or '').strip()}{POS_SEP}{normalize_definition(t['translation'])}"
+                        for t in translations[1:]
+                        if isinstance(t, dict) and isinstance(t.get('translation'), str) and t['translation'].strip()]
+                if rest:
+                    packed = SENSE_SEP.join([packed] + rest)
+        if not definition:
+            packed = pack_senses([((t.get('type') or '').strip(), normalize_definition(t['translation']))
+                                  for t in translations
+                                  if isinstance(t, dict) and isinstance(t.get('translation'), str)
+                                  and t['translation'].strip()], definition)
+
+    # 如果没有找到释义，尝试从phrases获取（增强兼容性）
+    phrases = item.get('phrases', [])
+    if not isinstance(phrases, list):
+        phrases = []
+    if not definition and phrases and isinstance(phrases[0], dict):
+        definition = phrases[0].get('translation', '')
+        if isinstance(definition, str):
+            definition = normalize_definition(definition)
+
+    # 只取前3个短语作为例句
+    examples = []
+    for ph in phrases[:3]:
+        # 确保ph是字典类型并有需要的字段
+        if isinstance(ph, dict):
+            p_text = ph.get('phrase', '')
+            p_tr = ph.get('translation', '')
+            if p_text or p_tr:
+                examples.append((p_text, p_tr))
+
+    # 只有当word和definition都有值时才保留
+    if word and definition:
+        return VocabEntry(word, definition, examples, packed_senses=packed)
+    return None
+
+
+class VocabularyBank:
+    """
+    共享的词汇数据
+
+    每个模块在第一次被请求时加载并缓存，之后所有调用者拿到的都是同一个元组。
+    加载过程由锁保护，多个线程同时请求同一模块时只会读取一次文件。
+    """
+    def __init__(self, json_dir=None, modules=None):
+        """
+        Args:
+            json_dir: 词汇文件目录，默认为项目中的json文件夹
+            modules: 模块配置，默认为MODULES
+        """
+        self.json_dir = json_dir or DEFAULT_JSON_DIR
+        self.modules = modules if modules is not None else MODULES
+        self._data = {}
+        # 模块ID -> 加载时的块清单（见vocab_delta），用于增量重新加载
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def module_name(self, module_id):
+        """返回模块名称，未知模块返回模块ID本身"""
+        return self.modules.get(str(module_id), {}).get("name", str(module_id))
+
+    def module_path(self, module_id):
+        """返回模块词汇文件的路径"""
+        return os.path.join(self.json_dir, self.modules[str(module_id)]['file'])
+
+    def is_loaded(self, module_id):
+        """模块是否已经加载"""
+        return str(module_id) in self._data
+
+    def loaded_modules(self):
+        """已加载的模块ID列表"""
+        return sorted(self._data.keys())
+
+    def module_fingerprint(self, module_id):
+        """
+        Returns:
+            list: 已加载模块在读取时的文件指纹 [大小, 修改时间(ns)]；未加载时返回None
+        """
+        manifest = self._manifests.get(str(module_id))
+        return manifest.fingerprint if manifest is not None else None
+
+    def get_module(self, module_id):
+        """
+        获取模块的词汇数据（必要时从文件加载）
+
+        Args:
+            module_id: 模块ID（字符串或整数）
+
+        Returns:
+            tuple: VocabEntry元组
+
+        Raises:
+            KeyError: 模块ID无效
+            OSError / ValueError: 词汇文件无法读取或解析
+        """
+        module_id = str(module_id)
+        entries = self._data.get(module_id)
+        if entries is not None:
+            VOCAB_CACHE_HITS.inc()
+            return entries
+        if module_id not in self.modules:
+            raise KeyError(f"无效的模块ID: {module_id}")
+        with self._lock:
+            entries = self._data.get(module_id)
+            if entries is None:
+                VOCAB_CACHE_MISSES.inc()
+                from vocab_delta import parse_module, read_module
+                with MODULE_LOAD_SECONDS.time():
+                    entries, self._manifests[module_id] = parse_module(*read_module(self.module_path(module_id)))
+                self._data[module_id] = entries
+                MODULE_LOADS.inc(module=module_id)
+                LOADED_ENTRIES.inc(len(entries))
+        return entries
+
+    def reload_module(self, module_id):
+        """
+        词汇文件有变化时增量重新加载已加载的模块
+
+        只重新解析文件中有变化的部分（见vocab_delta），未变化的条目复用原来的对象。
+        新的条目元组整体替换旧元组，已经拿到旧元组的调用者不受影响。
+
+        Args:
+            module_id: 模块ID（字符串或整数）
+
+        Returns:
+            ModuleDelta: 变化；模块未加载、文件不存在或没有变化时返回None
+
+        Raises:
+            OSError / ValueError: 词汇文件无法读取或解析（此时保留原来的数据）
+        """
+        from vocab_delta import file_fingerprint, read_module, reparse_module
+        module_id = str(module_id)
+        with self._lock:
+            entries = self._data.get(module_id)
+            manifest = self._manifests.get(module_id)
+            if entries is None or manifest is None:
+                return None
+            path = self.module_path(module_id)
+            fingerprint = file_fingerprint(path)
+            if fingerprint is None or fingerprint == manifest.fingerprint:
+                return None
+            with MODULE_RELOAD_SECONDS.time():
+                text, fingerprint = read_module(path)
+                delta = reparse_module(module_id, text, entries, manifest, fingerprint)
+            self._manifests[module_id] = delta.manifest
+            self._data[module_id] = delta.entries
+            MODULE_RELOADS.inc(module=module_id)
+            LOADED_ENTRIES.inc(len(delta.entries) - len(entries))
+        return delta
+
+    def iter_module(self, module_id):
+        """
+        逐条返回模块的词汇条目（导出等一次性遍历使用）
+
+        模块已加载时直接遍历缓存的元组；否则读入词汇文件的文本后逐个解码数组元素
+        （见vocab_delta.scan_items），边解析边返回，不建立整个文件的原始字典列表，
+        也不建立、不缓存整个模块的条目元组。
+
+        Args:
+            module_id: 模块ID（字符串或整数）
+
+        Yields:
+            VocabEntry: 与get_module相同顺序的条目
+
+        Raises:
+            KeyError: 模块ID无效
+            OSError / ValueError: 词汇文件无法读取或解析
+        """
+        module_id = str(module_id)
+        entries = self._data.get(module_id)
+        if entries is not None:
+            yield from entries
+            return
+        if module_id not in self.modules:
+            raise KeyError(f"无效的模块ID: {module_id}")
+        from vocab_delta import read_module, scan_items
+        text, _ = read_module(self.module_path(module_id))
+        for _, _, item in scan_items(text):
+            entry = parse_entry(item)
+            if entry is not None:
+                yield entry
+
+
+_shared_bank = None
+_shared_bank_lock = threading.Lock()
+
+
+def get_shared_bank():
+    """
+    返回进程内共享的默认VocabularyBank
+
+    Returns:
+        VocabularyBank: 共享实例
+    """
+    global _shared_bank
+    if _shared_bank is None:
+        with _shared_bank_lock:
+            if _shared_bank is None:
+                _shared_bank = VocabularyBank()
+    return _shared_bank
+
+
+def build_question(vocab_list, test_mode, review_items=None):
+    """
+    从词汇列表生成一道四选一题目
+
+    Args:
+        vocab_list: 词汇条目序列
+        test_mode: 'chinese'（显示释义选单词）或 'english'（显示单词选释义）
+        review_items: 复习模式下作为正确答案候选的错题列表（含word和definition）
+
+    Returns:
+        dict: 包含correct_item、options和question_text（中文模式为带词性的完整释义）的题目；
+              词汇为空时返回None
+    """
+    if not vocab_list:
+        return None
+
+    # 复习模式：优先从错题中生成题目
+    if review_items:
+        # 从错题中随机选择一个作为正确答案
+        wrong_item = random.choice(review_items)
+        correct_item = {
+            'word': wrong_item['word'],
+            'definition': wrong_item['definition']
+        }
+        # 从词汇列表中排除正确答案对应的单词
+        other_items = [item for item in vocab_list if item['word'] != correct_item['word']]
+        if not other_items:
+            # 如果词汇列表中只有一个词，创建一些不同的干扰项
+            distractors = [{'word': f"干扰词_{random.randint(1000, 9999)}",
+                            'definition': f"干扰释义_{random.randint(1000, 9999)}"} for _ in range(3)]
+        else:
+            distractors = _pick_distractors(other_items)
+    else:
+        # 正常模式：通过随机下标选择正确答案和干扰项，不需要复制整个词汇列表
+        n = len(vocab_list)
+        if n >= 4:
+            indexes = random.sample(range(n), 4)
+            correct_item = vocab_list[indexes[0]]
+            distractors = [vocab_list[i] for i in indexes[1:]]
+        else:
+            correct_item = random.choice(vocab_list)
+            other_items = [item for item in vocab_list if item is not correct_item]
+            if other_items:
+                distractors = _pick_distractors(other_items)
+            else:
+                # 如果词汇列表中只有一个词，使用这个词作为所有选项
+                distractors = [correct_item.copy() for _ in range(3)]
+
+    # 组合正确答案和干扰项并随机排列
+    all_items = [correct_item] + distractors
+    random.shuffle(all_items)
+
+    # 中文模式：选项是英文单词；英文模式：选项是中文释义
+    key = 'word' if test_mode == "chinese" else 'definition'
+    options = {str(i + 1): item[key] for i, item in enumerate(all_items)}
+    (REVIEW_QUESTIONS if review_items else NORMAL_QUESTIONS).inc()
+
+    return {
+        'correct_item': correct_item,
+        'options': options,
+        'question_text': entry_gloss(correct_item) if test_mode == "chinese" else correct_item['word']
+    }
+
+
+def _pick_distractors(other_items):
+    # 有足够多其他词汇时随机选3个，否则允许重复凑够3个
+    if len(other_items) >= 3:
+        return random.sample(other_items, 3)
+    distractors = list(other_items)
+    while len(distractors) < 3:
+        distractors.append(random.choice(other_items))
+    return distractors
+
+
+def find_correct_option(question, test_mode):
+    """
+    找出题目中正确答案对应的选项编号
+
+    Args:
+        question: build_question返回的题目（短语题自带answer）
+        test_mode: 测试模式
+
+    Returns:
+        str: 正确选项编号，找不到时返回None
+    """
+    if 'answer' in question:
+        return question['answer']
+    key = 'word' if test_mode == "chinese" else 'definition'
+    target = question['correct_item'][key]
+    correct_option = None
+    for option, content in question['options'].items():
+        if content == target:
+            correct_option = option
+    return correct_option
+
+
+def make_wrong_info(word, definition, test_mode, correct_answer, user_answer, grade=None, distance=None,
+                    question=None):
+    """
+    构建错题记录（与VocabularyTester.wrong_answers中的格式相同）
+
+    Args:
+        grade: 拼写模式的判分（'near' 表示拼写接近，'wrong' 表示答错），选择题为None
+        distance: 拼写接近时与正确拼写的编辑距离
+        question: 题干（短语题传入题目文本），默认中文模式为单词、其他模式为释义
+
+    Returns:
+        dict: 错题信息
+    """
+    info = {
+        'word': word,
+        'definition': definition,
+        'question': question if question is not None else word if test_mode == 'chinese' else definition,
+        'correct_answer': correct_answer,
+        'user_answer': user_answer,
+        'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
+    }
+    if grade is not None:
+        info['grade'] = grade
+        if distance is not None:
+            info['distance'] = distance
+    return info
+
+
+def make_wrongbook(wrong_answers, module=None, test_mode=None, timestamp=None, **metadata):
+    """
+    构建错题本（data/wrong_book.json的格式），按单词去重
+
+    Args:
+        wrong_answers: 错题记录字典列表（make_wrong_info的格式）
+        module: 模块ID
+        test_mode: 测试模式
+        timestamp: 导出时间，默认为当前时间
+        **metadata: 附加到metadata中的其他字段
+
+    Returns:
+        dict: 包含metadata和wrong_answers的错题本
+    """
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    unique_wrong_answers = []
+    seen_words = set()
+    for item in wrong_answers:
+        # 使用单词作为去重的唯一标识符
+        if item.get('word') in seen_words:
+            continue
+        seen_words.add(item.get('word'))
+        question_info = {
+            "question": item.get('question', '未知问题'),
+            "your_answer": item.get('user_answer', '未作答'),
+            "correct_answer": item.get('correct_answer', '未知正确答案')
+        }
+        # 拼写模式区分拼写接近和答错
+        if 'grade' in item:
+            question_info["grade"] = item['grade']
+            if 'distance' in item:
+                question_info["distance"] = item['distance']
+        unique_wrong_answers.append({
+            "time": timestamp,
+            "word_info": {
+                "word": item.get('word', '未知单词'),
+                "definition": item.get('definition', '无定义')
+            },
+            "question_info": question_info
+        })
+    info = {
+        "export_time": timestamp,
+        "total_wrong_items": len(unique_wrong_answers),
+        "module": module if module is not None else '未知模块',
+        "test_mode": test_mode if test_mode is not None else '未知模式'
+    }
+    info.update(metadata)
+    return {"metadata": info, "wrong_answers": unique_wrong_answers}
+
+
+def compute_statistics(total, correct, module_total_words):
+    """
+    计算统计信息
+
+    Args:
+        total: 已答题数
+        correct: 正确数
+        module_total_words: 模块总词汇量
+
+    Returns:
+        dict: 包含答题数、正确数、错误数、正确率和认识率估计的字典
+    """
+    accuracy = (correct / total) * 100 if total > 0 else 0.0
+
+    # 估算词汇认识率（基于正确率和模块总词汇数）
+    if module_total_words > 0 and total > 0:
+        estimated_knowledge_rate = min(100, accuracy)
+        estimated_known_words = int(module_total_words * (estimated_knowledge_rate / 100))
+    else:
+        estimated_knowledge_rate = 0
+        estimated_known_words = 0
+
+    return {
+        'total_questions': total,
+        'correct_answers': correct,
+        'wrong_count': total - correct,
+        'accuracy': accuracy,
+        'module_total_words': module_total_words,
+        'estimated_knowledge_rate': estimated_knowledge_rate,
+        'estimated_known_words': estimated_known_words
+    }
+
+
+class QuizSession:
+    """
+    轻量的测验会话
+
+    只保存一个用户的答题状态，词汇数据通过共享的VocabularyBank读取。
+    错题以(条目, 用户答案, 时间戳)元组保存，需要时再展开为字典。
+    """
+    __slots__ = ('bank', 'session_id', 'module_id', 'test_mode', 'review_mode',
+                 'total_questions', 'correct_answers', 'wrong', 'question',
+                 'question_id', 'last_active')
+
+    def __init__(self, bank, module_id, test_mode="chinese", session_id=None):
+        """
+        Args:
+            bank: 共享的VocabularyBank（模块必须已加载）
+            module_id: 模块ID
+            test_mode: 'chinese' 或 'english'
+            session_id: 会话标识
+        """
+        self.bank = bank
+        self.session_id = session_id
+        self.module_id = str(module_id)
+        self.test_mode = test_mode
+        self.review_mode = False
+        self.total_questions = 0
+        self.correct_answers = 0
+        # 错题在第一次答错时才创建列表
+        self.wrong = None
+        self.question = None
+        self.question_id = 0
+        self.last_active = time.monotonic()
+
+    @property
+    def vocab(self):
+        """当前模块的共享词汇元组"""
+        return self.bank.get_module(self.module_id)
+
+    def next_question(self):
+        """
+        返回当前待回答的题目，没有时生成一道新题
+
+        Returns:
+            dict: 题目；无法生成时返回None
+        """
+        if self.question is None:
+            review_items = None
+            if self.review_mode and self.wrong:
+                review_items = [entry for entry, _, _ in self.wrong]
+            self.question = build_question(self.vocab, self.test_mode, review_items)
+            if self.question is not None:
+                self.question_id += 1
+        return self.question
+
+    def answer(self, option):
+        """
+        回答当前题目
+
+        Args:
+            option: 选项编号
+
+        Returns:
+            dict: 包含correct、correct_option、correct_answer和user_answer的结果
+
+        Raises:
+            ValueError: 当前没有题目或选项无效
+        """
+        question = self.question
+        if question is None:
+            raise ValueError("当前没有待回答的题目")
+        option = str(option).strip()
+        if option not in question['options']:
+            raise ValueError("无效的选项")
+
+        self.total_questions += 1
+        correct_option = find_correct_option(question, self.test_mode)
+        user_answer = question['options'][option]
+        correct_answer = question['options'].get(correct_option, '未知')
+        correct = user_answer.lower() == correct_answer.lower()
+        (CORRECT_ANSWERS if correct else WRONG_ANSWERS).inc()
+        if correct:
+            self.correct_answers += 1
+        else:
+            if self.wrong is None:
+                self.wrong = []
+            self.wrong.append((question['correct_item'], user_answer, time.time()))
+        self.question = None
+        return {
+            'correct': correct,
+            'correct_option': correct_option,
+            'correct_answer': correct_answer,
+            'user_answer': user_answer
+        }
+
+    def statistics(self):
+        """返回当前统计信息（格式与VocabularyTester.get_statistics相同）"""
+        return compute_statistics(self.total_questions, self.correct_answers, len(self.vocab))
+
+    def wrong_answers(self):
+        """
+        Returns:
+            list: 错题记录字典列表（与VocabularyTester.wrong_answers格式相同）
+        """
+        records = []
+        key = 'word' if self.test_mode == "chinese" else 'definition'
+        for entry, user_answer, ts in self.wrong or ():
+            info = make_wrong_info(entry['word'], entry['definition'], self.test_mode,
+                                   entry[key], user_answer)
+            info['timestamp'] = datetime.fromtimestamp(ts).strftime("%Y%m%d_%H%M%S")
+            records.append(info)
+        return records
+
+    def footprint(self):
+        """
+        估算会话自身占用的内存（字节），不含共享词汇数据
+
+        Returns:
+            int: 字节数
+        """
+        size = sys.getsizeof(self)
+        for name in ('session_id', 'module_id', 'test_mode', 'total_questions',
+                     'correct_answers', 'question_id', 'last_active'):
+            value = getattr(self, name)
+            if value is not None:
+                size += sys.getsizeof(value)
+        if self.wrong:
+            size += sys.getsizeof(self.wrong)
+            size += sum(sys.getsizeof(w) + sys.getsizeof(w[1]) + sys.getsizeof(w[2]) for w in self.wrong)
+        if self.question is not None:
+            size += sys.getsizeof(self.question) + sys.getsizeof(self.question['options'])
+        return size
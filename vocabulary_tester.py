@@ -1,30 +1,47 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import json
-import random
 import os
+import time
 from datetime import datetime
 
+from phrases import FILL, build_phrase_question, get_phrase_index
+from spelling import EXACT, NEAR, accepted_variants, build_spelling_question, grade_spelling
+from tester_io import ConsoleIO
+from vocabulary_store import (ANSWER_SECONDS, CORRECT_ANSWERS, NEAR_ANSWERS, WRONG_ANSWERS, WRONGBOOK_WRITE_SECONDS,
+                              WRONGBOOK_WRITES, build_question, compute_statistics, find_correct_option,
+                              get_shared_bank, make_wrong_info)
+
 class VocabularyTester:
     """
     英语词汇测试器类
     
     提供词汇测试的核心功能，包括词汇数据加载、测试题目生成、测试执行和结果统计等。
+    词汇数据由共享的VocabularyBank加载和缓存，多个测试器之间不会重复占用内存。
     """
-    def __init__(self):
+    def __init__(self, bank=None, io=None):
         """
         初始化词汇测试器
         
         设置初始状态，包括词汇数据存储、统计信息和模块配置等。
+        
+        Args:
+            bank: 共享的VocabularyBank，默认使用进程内共享实例
+            io: 交互流程使用的输入输出对象（见tester_io），默认为标准输入输出
         """
-        # 存储词汇数据
+        # 共享词汇数据
+        self.bank = bank or get_shared_bank()
+        
+        # 输入输出（选择模块、模式、答题和所有提示信息都经过它）
+        self.io = io or ConsoleIO()
+        
+        # 存储词汇数据（模块ID -> 共享的词汇条目元组）
         self.vocab_data = {}
         
         # 当前选择的模块
         self.current_module = None
         
-        # 测试模式：'chinese'（中文模式）或 'english'（英文模式）
+        # 测试模式：'chinese'（中文模式）、'english'（英文模式）、'spelling'（拼写模式）或 'phrase'（短语模式）
         self.test_mode = None
         
         # 是否处于错题复习模式
@@ -33,26 +50,30 @@ class VocabularyTester:
         # 统计变量
         self.total_questions = 0
         self.correct_answers = 0
+        # 拼写模式中拼写接近的题数（计入答错）
+        self.near_misses = 0
         self.wrong_answers = []
         # 本次测试新产生的错题
         self.current_session_wrong_answers = []
+        # 当前题目显示给用户的时间（见mark_question_shown）
+        self.question_shown_at = None
         
-        # 模块配置
-        self.modules = {
-            "1": {"name": "初中", "file": "1-初中-顺序.json"},
-            "2": {"name": "高中", "file": "2-高中-顺序.json"},
-            "3": {"name": "CET4", "file": "3-CET4-顺序.json"},
-            "4": {"name": "CET6", "file": "4-CET6-顺序.json"},
-            "5": {"name": "考研", "file": "5-考研-顺序.json"},
-            "6": {"name": "托福", "file": "6-托福-顺序.json"},
-            "7": {"name": "SAT", "file": "7-SAT-顺序.json"}
-        }
+        # 英文模式中直接输入中文释义时用于判分的词义索引（英文模式的测试开始时只从当前模块的词汇建立）
+        self.gloss_index = None
+        # 建立词义索引时使用的词汇条目（模块切换或重新加载后重新建立）
+        self.gloss_entries = None
+        
+        # 模块配置（与共享词汇数据使用同一份配置）
+        self.modules = self.bank.modules
         
         # 词汇文件目录（相对路径，指向项目中的json文件夹）
-        self.json_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "json")
+        self.json_dir = self.bank.json_dir
         
         # 模块词汇总数（用于估算认识率）
         self.module_total_words = 0
+        
+        # 错题本保存目录
+        self.data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
     
     def load_vocabulary(self, module_id):
         """
@@ -69,108 +90,100 @@ class VocabularyTester:
             module_id_str = str(module_id)
             module_info = self.modules.get(module_id_str)
             if not module_info:
-                print("无效的模块ID")
+                self.io.show("无效的模块ID")
                 return False
             
-            file_path = os.path.join(self.json_dir, module_info['file'])
+            self.io.show(f"正在加载 {module_info['name']} 词汇数据...")
+            # 从共享词汇数据获取（已加载过的模块不会重复读取文件）
+            processed_vocab = self.bank.get_module(module_id_str)
+            
+            # 保存处理后的词汇数据
+            self.vocab_data[module_id_str] = processed_vocab
+            self.current_module = module_id_str
+            self.module_total_words = len(processed_vocab)
+            
+            self.io.show(f"成功加载 {module_info['name']} 词汇，共 {len(processed_vocab)} 个词汇条目")
+            self.io.emit("loaded", module=module_id_str, name=module_info['name'], total=len(processed_vocab))
+            return True
             
-            print(f"正在加载 {module_info['name']} 词汇数据...")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                # 加载词汇数据
-                all_vocab = json.load(f)
-                
-                # 处理词汇数据，转换为我们需要的格式
-                processed_vocab = []
-                for item in all_vocab:
-                    word = item.get('word', '')
-                    definition = ""
-                    
-                    # 尝试从translations获取释义（增强兼容性）
-                    translations = item.get('translations', [])
-                    if isinstance(translations, list) and translations:
-                        # 确保第一个translation条目有translation字段
-                        if 'translation' in translations[0]:
-                            definition = translations[0].get('translation', '')
-                    
-                    # 如果没有找到释义，尝试从phrases获取（增强兼容性）
-                    if not definition:
-                        # 安全地检查phrases字段是否存在
-                        if 'phrases' in item:
-                            phrases = item.get('phrases', [])
-                            if isinstance(phrases, list) and phrases:
-                                if 'translation' in phrases[0]:
-                                    definition = phrases[0].get('translation', '')
-                    
-                    # 初始化examples列表
-                    examples = []
-                    
-                    # 安全地处理phrases字段（增强兼容性）
-                    if 'phrases' in item:
-                        phrases_list = item.get('phrases', [])
-                        if isinstance(phrases_list, list):
-                            for ph in phrases_list[:3]:  # 只取前3个短语
-                                # 确保ph是字典类型并有需要的字段
-                                if isinstance(ph, dict):
-                                    p_text = ph.get('phrase', '')
-                                    p_tr = ph.get('translation', '')
-                                    if p_text or p_tr:
-                                        examples.append({'phrase': p_text, 'translation': p_tr})
-                    
-                    # 只有当word和definition都有值时才添加到处理列表
-                    if word and definition:
-                        processed_vocab.append({'word': word, 'definition': definition, 'examples': examples})
-                
-                # 保存处理后的词汇数据
-                self.vocab_data[module_id_str] = processed_vocab
-                self.current_module = module_id_str
-                self.module_total_words = len(processed_vocab)
-                
-                print(f"成功加载 {module_info['name']} 词汇，共 {len(processed_vocab)} 个词汇条目")
-                return True
-                
         except Exception as e:
-            print(f"加载词汇文件失败: {e}")
+            self.io.show(f"加载词汇文件失败: {e}")
+            return False
+    
+    def replace_module(self, module_id, entries):
+        """
+        词汇文件重新加载后替换已加载模块的词汇数据（见hot_reload）
+        
+        只替换数据本身：当前题目、错题和答题统计保持不变，之后出的题使用新数据。
+        
+        Args:
+            module_id: 模块ID（字符串或整数）
+            entries: 新的词汇条目元组
+            
+        Returns:
+            bool: 模块已加载并被替换时返回True
+        """
+        module_id = str(module_id)
+        if module_id not in self.vocab_data:
             return False
+        self.vocab_data[module_id] = entries
+        if module_id == self.current_module:
+            self.module_total_words = len(entries)
+        return True
     
     def select_module(self):
         """让用户选择词汇模块"""
-        print("\n请选择词汇模块：")
-        print("=" * 50)
+        self.io.show("\n请选择词汇模块：")
+        self.io.show("=" * 50)
         for key, module in self.modules.items():
-            print(f"{key}. {module['name']}")
-        print("=" * 50)
+            self.io.show(f"{key}. {module['name']}")
+        self.io.show("=" * 50)
         
         while True:
-            choice = input("请输入模块编号 (1-7): ").strip()
+            choice = self.io.ask("请输入模块编号 (1-7): ", "module").strip()
             if choice in self.modules:
                 # 加载选择的模块
                 if self.load_vocabulary(choice):
                     return choice
                 else:
-                    print("请重新选择模块")
+                    self.io.show("请重新选择模块")
             else:
-                print("无效的选择，请输入1-7之间的数字")
+                self.io.show("无效的选择，请输入1-7之间的数字")
     
     def select_test_mode(self):
         """让用户选择测试模式"""
-        print("\n请选择测试模式：")
-        print("=" * 50)
-        print("1. 中文模式（显示中文释义，选择英文单词）")
-        print("2. 英文模式（显示英文单词，选择中文释义）")
-        print("=" * 50)
+        self.io.show("\n请选择测试模式：")
+        self.io.show("=" * 50)
+        self.io.show("1. 中文模式（显示中文释义，选择英文单词）")
+        self.io.show("2. 英文模式（显示英文单词，选择中文释义）")
+        self.io.show("3. 拼写模式（显示中文释义，输入英文单词）")
+        self.io.show("4. 短语模式（短语填空、选择短语的中文意思）")
+        self.io.show("=" * 50)
         
         while True:
-            choice = input("请输入模式编号 (1-2): ").strip()
+            choice = self.io.ask("请输入模式编号 (1-4): ", "mode").strip()
             if choice == "1":
                 self.test_mode = "chinese"
-                print("\n已选择：中文模式")
+                self.io.show("\n已选择：中文模式")
+                self.io.emit("mode", mode="chinese")
                 return "chinese"
             elif choice == "2":
                 self.test_mode = "english"
-                print("\n已选择：英文模式")
+                self.io.show("\n已选择：英文模式")
+                self.io.emit("mode", mode="english")
                 return "english"
+            elif choice == "3":
+                self.test_mode = "spelling"
+                self.io.show("\n已选择：拼写模式")
+                self.io.emit("mode", mode="spelling")
+                return "spelling"
+            elif choice == "4":
+                self.test_mode = "phrase"
+                self.io.show("\n已选择：短语模式")
+                self.io.emit("mode", mode="phrase")
+                return "phrase"
             else:
-                print("无效的选择，请输入1或2")
+                self.io.show("无效的选择，请输入1、2、3或4")
     
     def generate_question(self):
         """生成测试题目"""
@@ -178,123 +191,52 @@ class VocabularyTester:
             return None
         
         vocab_list = self.vocab_data[self.current_module]
-        if not vocab_list:
-            return None
         
         # 复习模式：优先从错题中生成题目
-        if hasattr(self, 'review_mode') and self.review_mode and self.wrong_answers:
-            # 从错题中随机选择一个作为正确答案
-            wrong_item = random.choice(self.wrong_answers)
-            
-            # 构建正确答案项
-            correct_item = {
-                'word': wrong_item['word'],
-                'definition': wrong_item['definition']
-            }
-            
-            # 生成干扰项 - 确保干扰项来自词汇列表
-            distractors = []
-            
-            # 从词汇列表中排除正确答案对应的单词
-            other_items = [item for item in vocab_list if item['word'] != correct_item['word']]
-            
-            # 确保有足够的干扰项
-            if len(other_items) >= 3:
-                distractors = random.sample(other_items, 3)
-            elif other_items:
-                distractors = other_items.copy()
-                while len(distractors) < 3:
-                    distractors.append(random.choice(other_items))
-            else:
-                # 如果词汇列表中只有一个词，创建一些不同的干扰项
-                for _ in range(3):
-                    dummy_item = {'word': f"干扰词_{random.randint(1000, 9999)}",
-                                  'definition': f"干扰释义_{random.randint(1000, 9999)}"}
-                    distractors.append(dummy_item)
-        else:
-            # 正常模式：从词汇列表生成题目
-            # 随机选择一个正确答案
-            correct_item = random.choice(vocab_list)
-            
-            # 生成干扰项
-            distractors = []
-            
-            # 从词汇列表中排除正确答案，然后随机选择
-            other_items = [item for item in vocab_list if item != correct_item]
-            
-            # 确保有足够的干扰项
-            if len(other_items) >= 3:
-                # 当有足够多其他词汇时，随机选择3个作为干扰项
-                distractors = random.sample(other_items, 3)
-            elif other_items:
-                # 如果其他词汇数量不足但大于0，使用所有可用词汇作为干扰项
-                # 然后复制一些来凑够3个（如果需要）
-                distractors = other_items.copy()
-                while len(distractors) < 3:
-                    # 从其他词汇中随机选择一个添加到干扰项中（允许重复）
-                    distractors.append(random.choice(other_items))
-            else:
-                # 如果词汇列表中只有一个词，使用这个词作为所有选项
-                for _ in range(3):
-                    # 创建一个新的字典副本，以避免引用同一对象
-                    distractors.append(correct_item.copy())
-        
-        # 组合正确答案和干扰项
-        all_items = [correct_item] + distractors
-        # 随机排列
-        random.shuffle(all_items)
-        
-        # 准备选项
-        options = {}
-        for i, item in enumerate(all_items):
-            option_number = str(i + 1)  # 1, 2, 3, 4
-            if self.test_mode == "chinese":
-                # 中文模式：选项是英文单词
-                options[option_number] = item['word']
-            else:
-                # 英文模式：选项是中文释义
-                options[option_number] = item['definition']
+        review_items = self.wrong_answers if self.review_mode and self.wrong_answers else None
+        if self.test_mode == "spelling":
+            return build_spelling_question(vocab_list, review_items)
+        if self.test_mode == "phrase":
+            return build_phrase_question(get_phrase_index(vocab_list), review_items)
+        return build_question(vocab_list, self.test_mode, review_items)
+    
+    def get_statistics(self):
+        """
+        计算当前的统计信息
         
-        return {
-            'correct_item': correct_item,
-            'options': options,
-            'question_text': correct_item['definition'] if self.test_mode == "chinese" else correct_item['word']
-        }
+        Returns:
+            dict: 包含答题数、正确数、错误数、正确率和认识率估计的字典
+        """
+        return compute_statistics(self.total_questions, self.correct_answers, self.module_total_words)
     
     def display_statistics(self):
         """显示统计信息，包括正确率和估计的词汇认识率"""
         if self.total_questions == 0:
-            print("还没有答题记录")
+            self.io.show("还没有答题记录")
             return
         
-        accuracy = (self.correct_answers / self.total_questions) * 100
-        wrong_count = self.total_questions - self.correct_answers
+        stats = self.get_statistics()
+        self.io.emit("statistics", **stats)
         
-        # 估算词汇认识率（基于正确率和模块总词汇数）
-        if self.module_total_words > 0:
-            estimated_knowledge_rate = min(100, accuracy)
-            estimated_known_words = int(self.module_total_words * (estimated_knowledge_rate / 100))
-        else:
-            estimated_knowledge_rate = 0
-            estimated_known_words = 0
-        
-        print("\n=== 统计信息 ===")
-        print(f"已答题: {self.total_questions} 题")
-        print(f"正确数: {self.correct_answers} 题")
-        print(f"错误数: {wrong_count} 题")
-        print(f"正确率: {accuracy:.1f}%")
+        self.io.show("\n=== 统计信息 ===")
+        self.io.show(f"已答题: {stats['total_questions']} 题")
+        self.io.show(f"正确数: {stats['correct_answers']} 题")
+        self.io.show(f"错误数: {stats['wrong_count']} 题")
+        if self.test_mode == "spelling":
+            self.io.show(f"拼写接近: {self.near_misses} 题（计入错误数）")
+        self.io.show(f"正确率: {stats['accuracy']:.1f}%")
         
         if self.module_total_words > 0:
-            print(f"\n=== 词汇认识率估计 ===")
-            print(f"当前模块总词汇量: {self.module_total_words} 个")
-            print(f"估计认识率: {estimated_knowledge_rate:.1f}%")
-            print(f"估计已掌握词汇: {estimated_known_words} 个")
-        print("=" * 30)
+            self.io.show(f"\n=== 词汇认识率估计 ===")
+            self.io.show(f"当前模块总词汇量: {self.module_total_words} 个")
+            self.io.show(f"估计认识率: {stats['estimated_knowledge_rate']:.1f}%")
+            self.io.show(f"估计已掌握词汇: {stats['estimated_known_words']} 个")
+        self.io.show("=" * 30)
     
     def save_wrong_answers(self):
         """将错题本保存为文本文件"""
         if not self.wrong_answers:
-            print("没有错题记录")
+            self.io.show("没有错题记录")
             return False
         
         try:
@@ -302,9 +244,7 @@ class VocabularyTester:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             module_name = self.modules.get(self.current_module, {}).get("name", "未知")
             
-            # 获取当前文件所在目录，构建data目录路径
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            data_dir = os.path.join(current_dir, "data")
+            data_dir = self.data_dir
             
             # 确保data目录存在
             if not os.path.exists(data_dir):
@@ -315,6 +255,7 @@ class VocabularyTester:
             filepath = os.path.join(data_dir, filename)
             
             # 写入错题信息
+            started = time.perf_counter()
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(f"=== 英语词汇错题本 ===\n")
                 f.write(f"模块: {module_name}\n")
@@ -329,15 +270,20 @@ class VocabularyTester:
                     f.write(f"  正确答案: {wrong['correct_answer']}\n")
                     f.write(f"  单词: {wrong['word']}\n")
                     f.write(f"  释义: {wrong['definition']}\n")
+                    if wrong.get('grade') == NEAR:
+                        f.write(f"  判定: 拼写接近（编辑距离{wrong.get('distance', '?')}）\n")
                     if 'timestamp' in wrong:
                         f.write(f"  时间: {wrong['timestamp']}\n")
                     f.write("-" * 50 + "\n")
+            WRONGBOOK_WRITES.inc(format="txt")
+            WRONGBOOK_WRITE_SECONDS.observe(time.perf_counter() - started, format="txt")
             
-            print(f"错题本已保存为: {filename}")
-            print(f"保存路径: {filepath}")
+            self.io.emit("saved", path=filepath, count=len(self.wrong_answers))
+            self.io.show(f"错题本已保存为: {filename}")
+            self.io.show(f"保存路径: {filepath}")
             return True
         except Exception as e:
-            print(f"保存错题本时出错: {str(e)}")
+            self.io.show(f"保存错题本时出错: {str(e)}")
             return False
     
     def import_wrong_answers_from_file(self, file_path=None):
@@ -352,10 +298,10 @@ class VocabularyTester:
         """
         try:
             if file_path is None:
-                file_path = input("请输入错题本文件路径: ").strip()
+                file_path = self.io.ask("请输入错题本文件路径: ", "path").strip()
             
             if not os.path.exists(file_path):
-                print(f"文件不存在: {file_path}")
+                self.io.show(f"文件不存在: {file_path}")
                 return False
             
             imported_wrong_answers = []
@@ -392,19 +338,19 @@ class VocabularyTester:
                 # 导入错题
                 success = self.import_previous_session_wrong_answers(imported_wrong_answers)
                 if success:
-                    print(f"成功导入 {len(imported_wrong_answers)} 道错题")
+                    self.io.show(f"成功导入 {len(imported_wrong_answers)} 道错题")
                     return True
             else:
-                print("文件中没有找到有效错题")
+                self.io.show("文件中没有找到有效错题")
                 return False
                 
         except Exception as e:
-            print(f"导入错题时出错: {str(e)}")
+            self.io.show(f"导入错题时出错: {str(e)}")
             return False
         
         return False
             
-    def evaluate_answer(self, user_answer, correct_answer, word, definition):
+    def evaluate_answer(self, user_answer, correct_answer, word, definition, question_text=None):
         """
         评估用户答案的正确性
         
@@ -413,23 +359,20 @@ class VocabularyTester:
             correct_answer: 正确的答案
             word: 单词
             definition: 释义
+            question_text: 错题记录中的题干，默认由测试模式决定（短语模式传入短语题的题目）
             
         Returns:
             bool: 用户答案是否正确
         """
         if user_answer.lower() == correct_answer.lower():
             self.correct_answers += 1
+            CORRECT_ANSWERS.inc()
             return True
         else:
+            WRONG_ANSWERS.inc()
             # 构建错题信息
-            wrong_info = {
-                'word': word,
-                'definition': definition,
-                'question': word if self.test_mode == 'chinese' else definition,
-                'correct_answer': correct_answer,
-                'user_answer': user_answer,
-                'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
-            }
+            wrong_info = make_wrong_info(word, definition, self.test_mode, correct_answer, user_answer,
+                                         question=question_text)
             # 记录错题到总错题列表
             self.wrong_answers.append(wrong_info)
             # 记录到本次测试错题列表
@@ -437,6 +380,153 @@ class VocabularyTester:
                 self.current_session_wrong_answers.append(wrong_info)
             return False
         
+    def mark_question_shown(self):
+        """记录题目显示给用户的时间，作答时记录从显示到作答的用时（各个前端显示题目后调用）"""
+        self.question_shown_at = time.perf_counter()
+    
+    def record_answer_time(self):
+        """作答时记录用时（每道题只记录一次）"""
+        if self.question_shown_at is not None:
+            ANSWER_SECONDS.observe(time.perf_counter() - self.question_shown_at, mode=self.test_mode)
+            self.question_shown_at = None
+    
+    def find_correct_option(self, question):
+        """
+        找出题目中正确答案对应的选项编号
+        
+        Args:
+            question: generate_question返回的题目字典
+            
+        Returns:
+            str: 正确选项编号，找不到时返回None
+        """
+        return find_correct_option(question, self.test_mode)
+    
+    def answer_question(self, question, user_input):
+        """
+        对一道选择题作答：更新答题数并评估答案
+        
+        Args:
+            question: generate_question返回的题目字典
+            user_input: 用户选择的选项编号，None表示超时
+            
+        Returns:
+            dict: 包含correct、correct_option、correct_answer和user_answer的结果
+        """
+        self.total_questions += 1
+        self.record_answer_time()
+        
+        correct_option = self.find_correct_option(question)
+        user_answer = '超时' if user_input is None else question['options'].get(user_input, '未知')
+        correct_answer = question['options'].get(correct_option, '未知')
+        
+        correct = self.evaluate_answer(user_answer, correct_answer,
+                                       question['correct_item']['word'],
+                                       question['correct_item']['definition'],
+                                       question['question_text'] if self.test_mode == "phrase" else None)
+        return {
+            'correct': correct,
+            'correct_option': correct_option,
+            'correct_answer': correct_answer,
+            'user_answer': user_answer
+        }
+    
+    def answer_spelling(self, question, user_input):
+        """
+        对一道拼写题作答：更新答题数并按完全正确、拼写接近、答错判分
+        
+        拼写接近计入答错，但在错题记录中标记为'near'并记录编辑距离。
+        
+        Args:
+            question: generate_question返回的拼写题
+            user_input: 用户输入的单词
+            
+        Returns:
+            dict: 包含correct、grade、distance、correct_answer和user_answer的结果
+        """
+        self.total_questions += 1
+        self.record_answer_time()
+        word = question['correct_item']['word']
+        definition = question['correct_item']['definition']
+        grade, distance = grade_spelling(user_input, question.get('variants') or accepted_variants(word))
+        
+        if grade == EXACT:
+            self.correct_answers += 1
+            CORRECT_ANSWERS.inc()
+        else:
+            if grade == NEAR:
+                self.near_misses += 1
+                NEAR_ANSWERS.inc()
+            else:
+                WRONG_ANSWERS.inc()
+            wrong_info = make_wrong_info(word, definition, self.test_mode, word, user_input, grade, distance)
+            self.wrong_answers.append(wrong_info)
+            if not self.review_mode:
+                self.current_session_wrong_answers.append(wrong_info)
+        return {
+            'correct': grade == EXACT,
+            'grade': grade,
+            'distance': distance,
+            'correct_answer': word,
+            'user_answer': user_input
+        }
+    
+    def is_meaning_answer(self, user_input):
+        """输入中含有汉字时视为直接输入的中文释义"""
+        from gloss_index import is_chinese_query
+        return is_chinese_query(user_input)
+    
+    def prepare_gloss_index(self):
+        """
+        为当前模块建立词义索引（已建立且模块数据未变时不重复建立）
+        
+        各个前端在英文模式的测试开始时调用，使第一次输入释义作答时不必等待建立索引。
+        """
+        entries = self.vocab_data.get(self.current_module, ())
+        if self.gloss_index is None or self.gloss_entries is not entries:
+            from gloss_index import GlossIndex
+            self.gloss_index = GlossIndex.from_entries(entries)
+            self.gloss_entries = entries
+    
+    def answer_meaning(self, question, user_input):
+        """
+        英文模式中直接输入中文释义作答：输入的任意一个词义是该单词的词义时算对
+        
+        判分只查当前模块的词义索引（见gloss_index），不逐条比较释义字符串。
+        
+        Args:
+            question: generate_question返回的题目字典
+            user_input: 用户输入的中文释义
+            
+        Returns:
+            dict: 包含correct、correct_option、correct_answer和user_answer的结果
+        """
+        self.prepare_gloss_index()
+        self.total_questions += 1
+        self.record_answer_time()
+        
+        item = question['correct_item']
+        correct_option = self.find_correct_option(question)
+        correct_answer = question['options'].get(correct_option, item['definition'])
+        correct = self.gloss_index.matches(item['word'], user_input)
+        
+        if correct:
+            self.correct_answers += 1
+            CORRECT_ANSWERS.inc()
+        else:
+            WRONG_ANSWERS.inc()
+            wrong_info = make_wrong_info(item['word'], item['definition'], self.test_mode,
+                                         correct_answer, user_input)
+            self.wrong_answers.append(wrong_info)
+            if not self.review_mode:
+                self.current_session_wrong_answers.append(wrong_info)
+        return {
+            'correct': correct,
+            'correct_option': correct_option,
+            'correct_answer': correct_answer,
+            'user_answer': user_input
+        }
+    
     def get_current_session_wrong_answers(self):
         """
         获取本次测试会话中产生的错题
@@ -481,8 +571,18 @@ class VocabularyTester:
         # 选择测试模式
         self.select_test_mode()
         
-        print("\n测试开始！输入 'quit' 或 'q' 随时退出测试。")
-        print("=" * 50)
+        if self.test_mode == "english":
+            self.prepare_gloss_index()
+        
+        spelling = self.test_mode == "spelling"
+        if spelling:
+            # 拼写模式中quit可能就是答案，只用q退出
+            quit_commands = ['q']
+            self.io.show("\n测试开始！输入 'q' 随时退出测试。")
+        else:
+            quit_commands = ['quit', 'q']
+            self.io.show("\n测试开始！输入 'quit' 或 'q' 随时退出测试。")
+        self.io.show("=" * 50)
         
         while True:
             # 显示当前统计信息
@@ -491,74 +591,108 @@ class VocabularyTester:
             # 生成题目
             question = self.generate_question()
             if not question:
-                print("无法生成题目，请检查词汇数据")
+                self.io.show("无法生成题目，请检查词汇数据")
                 break
             
+            self.io.emit("question", number=self.total_questions + 1, question=question)
+            self.mark_question_shown()
+            
             # 显示题目
-            print("\n问题:")
-            if self.test_mode == "chinese":
-                print(f"  '{question['question_text']}' 的英文单词是什么？")
+            self.io.show("\n问题:")
+            if spelling:
+                self.io.show(f"  '{question['question_text']}' 的英文单词怎么拼写？")
+                user_input = self.io.ask("\n请输入单词或输入 'q' 退出: ", "answer", question).strip()
             else:
-                print(f"  '{question['question_text']}' 的中文释义是什么？")
-            
-            # 显示选项
-            print("\n选项:")
-            for option, content in question['options'].items():
-                print(f"  {option}. {content}")
-            
-            # 获取用户输入
-            user_input = input("\n请输入答案 (1/2/3/4) 或输入 'quit'/'q' 退出: ").strip()
+                if self.test_mode == "chinese":
+                    self.io.show(f"  '{question['question_text']}' 的英文单词是什么？")
+                elif self.test_mode == "phrase" and question['kind'] == FILL:
+                    self.io.show(f"  '{question['question_text']}' 横线处应填哪个单词？")
+                elif self.test_mode == "phrase":
+                    self.io.show(f"  '{question['question_text']}' 的中文意思是什么？")
+                else:
+                    self.io.show(f"  '{question['question_text']}' 的中文释义是什么？")
+                
+                # 显示选项
+                self.io.show("\n选项:")
+                for option, content in question['options'].items():
+                    self.io.show(f"  {option}. {content}")
+                
+                # 获取用户输入（英文模式也可以直接输入中文释义）
+                if self.test_mode == "english":
+                    prompt = "\n请输入答案 (1/2/3/4) 或中文释义，输入 'quit'/'q' 退出: "
+                else:
+                    prompt = "\n请输入答案 (1/2/3/4) 或输入 'quit'/'q' 退出: "
+                user_input = self.io.ask(prompt, "answer", question).strip()
             
             # 检查是否退出
-            if user_input.lower() in ['quit', 'q']:
-                print("\n测试已停止")
+            if user_input.lower() in quit_commands:
+                self.io.emit("finished", statistics=self.get_statistics(), wrong_answers=list(self.wrong_answers))
+                self.io.show("\n测试已停止")
                 
                 # 显示最终统计
-                print("\n=== 最终测试结果 ===")
+                self.io.show("\n=== 最终测试结果 ===")
                 self.display_statistics()
                 
                 # 显示错题本
                 if self.wrong_answers:
-                    print(f"\n你在本次测试中有 {len(self.wrong_answers)} 道错题")
-                    print("\n错题详情:")
+                    self.io.show(f"\n你在本次测试中有 {len(self.wrong_answers)} 道错题")
+                    self.io.show("\n错题详情:")
                     for i, wrong in enumerate(self.wrong_answers, 1):
-                        print(f"{i}. 单词: {wrong['word']} - 释义: {wrong['definition']}")
-                        print(f"   你的答案: {wrong['user_answer']} - 正确答案: {wrong['correct_answer']}")
-                        print()
+                        self.io.show(f"{i}. 单词: {wrong['word']} - 释义: {wrong['definition']}")
+                        note = "（拼写接近）" if wrong.get('grade') == NEAR else ""
+                        self.io.show(f"   你的答案: {wrong['user_answer']} - 正确答案: {wrong['correct_answer']}{note}")
+                        self.io.show()
                     
                     # 询问是否保存错题本
-                    save_choice = input("\n是否保存错题本？(y/n): ").strip().lower()
+                    save_choice = self.io.ask("\n是否保存错题本？(y/n): ", "save").strip().lower()
                     if save_choice == 'y':
                         self.save_wrong_answers()
                 else:
-                    print("\n恭喜！你没有答错任何题目！")
+                    self.io.show("\n恭喜！你没有答错任何题目！")
                 
                 break
             
-            # 检查答案是否有效
-            if user_input not in question['options']:
-                print("无效的输入，请输入 1、2、3 或 4")
+            if spelling:
+                if not user_input:
+                    self.io.emit("invalid", input=user_input)
+                    self.io.show("请输入单词")
+                    continue
+                result = self.answer_spelling(question, user_input)
+                self.io.emit("result", **result)
+                if result['correct']:
+                    self.io.show("\n恭喜你拼写正确！")
+                elif result['grade'] == NEAR:
+                    self.io.show(f"\n拼写接近（差 {result['distance']} 处）！正确拼写是: {result['correct_answer']}")
+                else:
+                    self.io.show(f"\n回答错误！正确拼写是: {result['correct_answer']}")
+                self.io.show("=" * 50)
                 continue
             
-            # 更新统计信息
-            self.total_questions += 1
-            
-            # 判断答案是否正确
-            correct_option = None
-            for option, content in question['options'].items():
-                if self.test_mode == "chinese":
-                    if content == question['correct_item']['word']:
-                        correct_option = option
+            # 英文模式中输入的中文释义按词义判分
+            if self.test_mode == "english" and user_input not in question['options'] and \
+                    self.is_meaning_answer(user_input):
+                result = self.answer_meaning(question, user_input)
+                self.io.emit("result", **result)
+                if result['correct']:
+                    self.io.show("\n恭喜你回答正确！")
                 else:
-                    if content == question['correct_item']['definition']:
-                        correct_option = option
+                    self.io.show(f"\n回答错误！正确答案是: {result['correct_option']}. {result['correct_answer']}")
+                self.io.show("=" * 50)
+                continue
+            
+            # 检查答案是否有效
+            if user_input not in question['options']:
+                self.io.emit("invalid", input=user_input)
+                self.io.show("无效的输入，请输入 1、2、3 或 4")
+                continue
             
-            user_answer = question['options'].get(user_input, '未知')
-            correct_answer = question['options'].get(correct_option, '未知')
+            # 判断答案是否正确并更新统计信息
+            result = self.answer_question(question, user_input)
+            self.io.emit("result", **result)
             
-            if self.evaluate_answer(user_answer, correct_answer, question['correct_item']['word'], question['correct_item']['definition']):
-                print("\n恭喜你回答正确！")
+            if result['correct']:
+                self.io.show("\n恭喜你回答正确！")
             else:
-                print(f"\n回答错误！正确答案是: {correct_option}. {correct_answer}")
+                self.io.show(f"\n回答错误！正确答案是: {result['correct_option']}. {result['correct_answer']}")
             
-            print("=" * 50)
\ No newline at end of file
+            self.io.show("=" * 50)
\ No newline at end of file
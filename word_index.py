@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 全局单词索引
+
+初中、CET6、SAT等模块之间有大量重复的单词。WordIndex为所有模块中的单词
+（规范化之后）分配稳定的整数ID，并记录每个单词出现在哪些模块的哪些条目中:
+
+    index = get_word_index()
+    index.word_id("Abandon")            # -> 17（同一个单词在所有模块中ID相同）
+    index.modules_containing("abandon") # -> ("1", "4", "7")，同一个单词再次查询时为O(1)
+    index.occurrences("abandon")        # -> [("1", 5), ("4", 120), ...]（模块ID, 条目下标）
+    index.encode(["abandon", "able"])   # 持久化时可以只保存ID
+    index.decode([17, 18])
+
+索引保存在data/word_index.json中。ID只增不减：重建时已有单词保持原来的ID，
+新单词追加在末尾，从词汇文件中删除的单词保留ID（只是不再有出现位置），
+因此按ID保存的数据在词汇文件更新后仍然有效。
+词汇文件的大小或修改时间变化时，只重新索引该模块。
+
+命令行:
+    python word_index.py build [--rebuild]
+    python word_index.py stats
+    python word_index.py modules abandon ability
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import unicodedata
+
+from vocabulary_store import get_shared_bank
+
+# 索引文件
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "word_index.json")
+
+INDEX_VERSION = 1
+
+
+def normalize_word(word):
+    """
+    规范化单词：Unicode NFKC、转小写、去掉首尾空白并合并中间的连续空白
+
+    Returns:
+        str: 规范化后的单词
+    """
+    return " ".join(unicodedata.normalize("NFKC", word).lower().split())
+
+
+def file_fingerprint(path):
+    """
+    Returns:
+        list: [文件大小, 修改时间(ns)]；文件不存在时返回None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class WordIndex:
+    """
+    单词 <-> 整数ID，以及ID -> 出现位置
+
+    Attributes:
+        words: ID -> 规范化单词
+        ids: 规范化单词 -> ID
+        modules: 模块ID -> {"fingerprint": 文件指纹, "ids": 每个条目的单词ID列表}
+    """
+    def __init__(self, words=(), modules=None):
+        self.words = list(words)
+        self.ids = {word: word_id for word_id, word in enumerate(self.words)}
+        self.modules = {}
+        # 单词ID -> [(模块ID, 条目下标), ...]
+        self.postings = {}
+        # 单词ID -> 包含它的模块ID元组（第一次查询时从postings计算，出现位置变化时删除）
+        self._containing = {}
+        for module_id, info in (modules or {}).items():
+            self._add_module(module_id, info["fingerprint"], info["ids"])
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return normalize_word(word) in self.ids
+
+    def intern(self, word):
+        """
+        返回单词的ID，新单词分配新的ID
+
+        Returns:
+            int: 单词ID
+        """
+        word = normalize_word(word)
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.words)
+            self.words.append(word)
+        return word_id
+
+    def word_id(self, word):
+        """
+        Returns:
+            int: 单词ID；不在索引中时返回None
+        """
+        return self.ids.get(normalize_word(word))
+
+    def word(self, word_id):
+        """
+        Returns:
+            str: ID对应的规范化单词
+
+        Raises:
+            IndexError: ID不存在
+        """
+        if word_id < 0:
+            raise IndexError(word_id)
+        return self.words[word_id]
+
+    def occurrences(self, word):
+        """
+        Returns:
+            list: (模块ID, 条目下标) 列表；单词不存在时为空列表
+        """
+        return list(self.postings.get(self.word_id(word), ()))
+
+    def modules_containing(self, word):
+        """
+        Returns:
+            tuple: 包含该单词的模块ID（按模块ID排序，不重复）；同一个单词再次查询时直接返回缓存的元组
+        """
+        word_id = self.word_id(word)
+        found = self._containing.get(word_id)
+        if found is None:
+            found = tuple(sorted({module_id for module_id, _ in self.postings.get(word_id, ())}))
+            if word_id is not None:
+                self._containing[word_id] = found
+        return found
+
+    def encode(self, words):
+        """
+        把单词列表转换为ID列表（不在索引中的单词为None）
+        """
+        return [self.word_id(word) for word in words]
+
+    def decode(self, word_ids):
+        """
+        把ID列表转换为单词列表
+        """
+        return [self.word(word_id) for word_id in word_ids]
+
+    def _add_module(self, module_id, fingerprint, word_ids):
+        self.modules[module_id] = {"fingerprint": fingerprint, "ids": word_ids}
+        for position, word_id in enumerate(word_ids):
+            self.postings.setdefault(word_id, []).append((module_id, position))
+            self._containing.pop(word_id, None)
+
+    def remove_module(self, module_id):
+        """删除模块的出现位置（单词ID保留）；只处理该模块中的单词"""
+        info = self.modules.pop(module_id, None)
+        if info is None:
+            return
+        for word_id in set(info["ids"]):
+            self._containing.pop(word_id, None)
+            kept = [p for p in self.postings.get(word_id, ()) if p[0] != module_id]
+            if kept:
+                self.postings[word_id] = kept
+            else:
+                self.postings.pop(word_id, None)
+
+    def index_module(self, module_id, entries, fingerprint=None):
+        """
+        (重新)索引一个模块
+
+        Args:
+            module_id: 模块ID
+            entries: 模块的词汇条目序列
+            fingerprint: 词汇文件的指纹
+        """
+        self.remove_module(module_id)
+        self._add_module(module_id, fingerprint, [self.intern(entry['word']) for entry in entries])
+
+    def apply_delta(self, delta):
+        """
+        把模块的变化（vocab_delta.ModuleDelta）应用到索引上
+
+        未变化的条目复用原来的单词ID，只改写第一个变化位置之后的出现位置。
+        索引与变化前的数据不一致时（例如模块没有索引过）重新索引整个模块。
+
+        Returns:
+            set: 新增、删除或修改的条目的单词ID（只是位置变化的不算）
+        """
+        module_id = delta.module_id
+        info = self.modules.get(module_id)
+        affected = {self.intern(word) for word in delta.changed_words()}
+        if info is not None and info["fingerprint"] == delta.fingerprint:
+            return affected
+        if info is None or info["fingerprint"] != delta.old_fingerprint or \
+                len(info["ids"]) != len(delta.old_entries):
+            self.index_module(module_id, delta.entries, delta.fingerprint)
+            return affected
+
+        old_ids = info["ids"]
+        new_ids = [old_ids[source] if source >= 0 else self.intern(entry['word'])
+                   for source, entry in zip(delta.sources, delta.entries)]
+        start = delta.first_change
+        if start is not None:
+            # 只有条目变化的位置（包括因插入、删除而移动的位置）需要改写
+            sources = delta.sources
+            lost = {}
+            gained = {}
+            for position in range(start, max(len(old_ids), len(new_ids))):
+                if position < len(sources) and sources[position] == position:
+                    continue
+                if position < len(old_ids):
+                    lost.setdefault(old_ids[position], set()).add(position)
+                if position < len(new_ids):
+                    gained.setdefault(new_ids[position], []).append((module_id, position))
+            for word_id in lost.keys() | gained.keys():
+                self._containing.pop(word_id, None)
+                dropped = lost.get(word_id, ())
+                places = [p for p in self.postings.get(word_id, ()) if p[0] != module_id or p[1] not in dropped]
+                places.extend(gained.get(word_id, ()))
+                if places:
+                    self.postings[word_id] = places
+                else:
+                    self.postings.pop(word_id, None)
+        self.modules[module_id] = {"fingerprint": delta.fingerprint, "ids": new_ids}
+        return affected
+
+    def update(self, bank=None, modules=None):
+        """
+        重新索引词汇文件有变化的模块，删除词汇文件已不存在的模块
+
+        Args:
+            bank: VocabularyBank，默认为共享实例
+            modules: 要索引的模块ID列表，默认为所有模块
+
+        Returns:
+            list: 重新索引的模块ID
+        """
+        bank = bank or get_shared_bank()
+        changed = []
+        for module_id in (modules if modules is not None else list(bank.modules)):
+            module_id = str(module_id)
+            fingerprint = file_fingerprint(bank.module_path(module_id))
+            if fingerprint is None:
+                if module_id in self.modules:
+                    self.remove_module(module_id)
+                    changed.append(module_id)
+                continue
+            if self.modules.get(module_id, {}).get("fingerprint") != fingerprint:
+                self.index_module(module_id, bank.get_module(module_id), fingerprint)
+                changed.append(module_id)
+        return changed
+
+    def stats(self):
+        """
+        Returns:
+            dict: 单词数、有出现位置的单词数、出现在多个模块中的单词数、各模块条目数
+        """
+        shared = sum(1 for places in self.postings.values() if len({m for m, _ in places}) > 1)
+        return {
+            "words": len(self.words),
+            "indexed_words": len(self.postings),
+            "shared_words": shared,
+            "modules": {module_id: len(info["ids"]) for module_id, info in self.modules.items()},
+        }
+
+    def to_dict(self):
+        return {"version": INDEX_VERSION, "words": self.words, "modules": self.modules}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"不支持的单词索引版本: {data.get('version')}")
+        return cls(data["words"], data["modules"])
+
+    def save(self, path=None):
+        """
+        写入索引文件（先写临时文件再替换）
+
+        Returns:
+            str: 文件路径
+        """
+        path = path or DEFAULT_INDEX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        读取索引文件
+
+        Returns:
+            WordIndex: 文件不存在或无法读取时返回空索引
+        """
+        path = path or DEFAULT_INDEX_PATH
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+
+
+def load_word_index(path=None, bank=None, modules=None):
+    """
+    读取保存的索引，重新索引有变化的模块，有变化时写回文件
+
+    Returns:
+        WordIndex: 最新的索引
+    """
+    index = WordIndex.load(path)
+    if index.update(bank, modules):
+        try:
+            index.save(path)
+        except OSError:
+            pass
+    return index
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_word_index():
+    """
+    返回进程内共享的单词索引（第一次调用时读取或建立）
+
+    Returns:
+        WordIndex: 共享实例
+    """
+    global _shared_index
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                _shared_index = load_word_index()
+    return _shared_index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="全局单词索引")
+    parser.add_argument("--index", default=None, help="索引文件（默认data/word_index.json）")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="建立或更新索引")
+    build.add_argument("--rebuild", action="store_true", help="丢弃已有索引重新建立（单词ID会改变）")
+    commands.add_parser("stats", help="显示索引统计")
+    modules = commands.add_parser("modules", help="查询单词出现在哪些模块中")
+    modules.add_argument("words", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = WordIndex() if args.rebuild else WordIndex.load(args.index)
+        changed = index.update()
+        print(f"已索引 {len(changed)} 个模块: {', '.join(changed) or '无变化'}")
+        print(f"索引文件: {index.save(args.index)}")
+        return 0
+
+    index = load_word_index(args.index)
+    if args.command == "stats":
+        stats = index.stats()
+        bank = get_shared_bank()
+        print(f"单词数: {stats['words']}（当前出现在词汇文件中的 {stats['indexed_words']} 个，"
+              f"出现在多个模块中的 {stats['shared_words']} 个）")
+        for module_id, count in stats["modules"].items():
+            print(f"  {module_id}. {bank.module_name(module_id)}: {count} 个条目")
+    else:
+        bank = get_shared_bank()
+        for word in args.words:
+            found = index.modules_containing(word)
+            names = "、".join(bank.module_name(m) for m in found) or "未找到"
+            print(f"{word} (ID {index.word_id(word)}): {names}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
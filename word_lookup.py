@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 前缀查词与自动补全
+
+把所有模块中的单词（见word_index）按规范化形式排序保存在数组中，
+输入前缀时用二分查找定位所有以该前缀开头的单词，再按
+（长度、所在模块数、字母顺序）取前k个，每次按键的查询在1毫秒以内:
+
+    lookup = get_prefix_index()
+    lookup.complete("aban", k=5)
+    # -> [{"word": "abandon", "definition": "...", "modules": ["4", "7"]}, ...]
+
+索引在第一次使用时建立，并缓存在data/prefix_index.json中（带有各模块词汇文件的指纹），
+之后启动时直接读取缓存，不需要解析词汇文件。
+
+命令行:
+    python main.py lookup aban
+    python word_lookup.py aban --top 20
+    python word_lookup.py 歧视           # 中译英，见gloss_index
+"""
+import argparse
+import bisect
+import heapq
+import json
+import os
+import sys
+import threading
+
+from vocabulary_store import entry_gloss, get_shared_bank
+from word_index import WordIndex, normalize_word
+
+# 索引缓存文件
+DEFAULT_PREFIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prefix_index.json")
+
+PREFIX_VERSION = 3
+
+# 默认返回的补全数
+DEFAULT_TOP = 10
+
+
+class PrefixIndex:
+    """
+    按规范化单词排序的数组，支持前缀查询
+
+    Attributes:
+        keys: 排好序的规范化单词
+        words: 与keys对应的原始拼写（第一次出现时的拼写）
+        definitions: 与keys对应的带词性的完整释义（第一次出现时的条目）
+        modules: 与keys对应的模块ID列表
+    """
+    def __init__(self, keys=(), words=(), definitions=(), modules=(), fingerprints=None):
+        self.keys = list(keys)
+        self.words = list(words)
+        self.definitions = list(definitions)
+        self.modules = [list(m) for m in modules]
+        self.fingerprints = fingerprints or {}
+        # 排序用的键：短的、出现在更多模块中的（更常用的）单词排在前面
+        self.ranks = [(len(key), -len(mods), key) for key, mods in zip(self.keys, self.modules)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, index, bank=None):
+        """
+        从单词索引建立前缀索引
+
+        Args:
+            index: WordIndex
+            bank: 读取原始拼写和释义的VocabularyBank，默认为共享实例
+        """
+        bank = bank or get_shared_bank()
+        rows = []
+        for word_id, places in index.postings.items():
+            module_id, position = min(places)
+            entry = bank.get_module(module_id)[position]
+            rows.append((index.word(word_id), entry['word'], entry_gloss(entry),
+                         sorted({m for m, _ in places})))
+        rows.sort()
+        fingerprints = {m: info["fingerprint"] for m, info in index.modules.items()}
+        return cls(*zip(*rows), fingerprints=fingerprints) if rows else cls(fingerprints=fingerprints)
+
+    def apply(self, index, word_ids, bank=None):
+        """
+        重新计算受影响单词的行（词汇文件增量更新后使用，见vocab_delta）
+
+        Args:
+            index: 已经应用了变化的WordIndex
+            word_ids: 新增、删除或修改的单词ID
+            bank: 读取原始拼写和释义的VocabularyBank，默认为共享实例
+        """
+        bank = bank or get_shared_bank()
+        for word_id in word_ids:
+            key = index.word(word_id)
+            i = self.position(key)
+            places = index.postings.get(word_id)
+            if not places:
+                if i is not None:
+                    for column in (self.keys, self.words, self.definitions, self.modules, self.ranks):
+                        del column[i]
+                continue
+            module_id, position = min(places)
+            entry = bank.get_module(module_id)[position]
+            modules = sorted({m for m, _ in places})
+            if i is None:
+                i = bisect.bisect_left(self.keys, key)
+                for column in (self.keys, self.words, self.definitions, self.modules, self.ranks):
+                    column.insert(i, None)
+            self.keys[i] = key
+            self.words[i] = entry['word']
+            self.definitions[i] = entry_gloss(entry)
+            self.modules[i] = modules
+            self.ranks[i] = (len(key), -len(modules), key)
+        self.fingerprints = {m: info["fingerprint"] for m, info in index.modules.items()}
+
+    def range(self, prefix):
+        """
+        Returns:
+            tuple: 以prefix开头的单词在keys中的下标范围 [lo, hi)
+        """
+        prefix = normalize_word(prefix)
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def count(self, prefix):
+        """以prefix开头的单词数"""
+        lo, hi = self.range(prefix)
+        return hi - lo
+
+    def complete(self, prefix, k=DEFAULT_TOP):
+        """
+        自动补全
+
+        Args:
+            prefix: 已输入的前缀（大小写、多余空白不影响结果）
+            k: 最多返回的条数
+
+        Returns:
+            list: {"word", "definition", "modules"} 字典列表，完全匹配的单词排在最前面
+        """
+        if not prefix.strip():
+            return []
+        lo, hi = self.range(prefix)
+        if hi - lo > k:
+            positions = heapq.nsmallest(k, range(lo, hi), key=self.ranks.__getitem__)
+        else:
+            positions = sorted(range(lo, hi), key=self.ranks.__getitem__)
+        return [self.result(i) for i in positions]
+
+    def position(self, key):
+        """
+        Returns:
+            int: 规范化单词在keys中的下标，不存在时返回None
+        """
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def lookup(self, word):
+        """
+        精确查词
+
+        Returns:
+            dict: 查不到时返回None
+        """
+        i = self.position(normalize_word(word))
+        return self.result(i) if i is not None else None
+
+    def result(self, i):
+        return {"word": self.words[i], "definition": self.definitions[i], "modules": list(self.modules[i])}
+
+    def to_dict(self):
+        return {"version": PREFIX_VERSION, "fingerprints": self.fingerprints, "keys": self.keys,
+                "words": self.words, "definitions": self.definitions, "modules": self.modules}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != PREFIX_VERSION:
+            raise ValueError(f"不支持的前缀索引版本: {data.get('version')}")
+        return cls(data["keys"], data["words"], data["definitions"], data["modules"], data["fingerprints"])
+
+    def save(self, path=None):
+        """写入缓存文件（先写临时文件再替换）"""
+        path = path or DEFAULT_PREFIX_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Returns:
+            PrefixIndex: 缓存不存在或无法读取时返回None
+        """
+        try:
+            with open(path or DEFAULT_PREFIX_PATH, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+def load_prefix_index(path=None, bank=None, index_path=None):
+    """
+    读取缓存的前缀索引；词汇文件有变化或没有缓存时重新建立并写回
+
+    Returns:
+        PrefixIndex
+    """
+    bank = bank or get_shared_bank()
+    cached = PrefixIndex.load(path)
+    index = WordIndex.load(index_path)
+    if index.update(bank):
+        try:
+            index.save(index_path)
+        except OSError:
+            pass
+    # 缓存与更新后的单词索引指纹一致时直接使用缓存，否则用这个单词索引重新建立
+    if cached is not None and \
+            cached.fingerprints == {m: info["fingerprint"] for m, info in index.modules.items()}:
+        return cached
+    prefix_index = PrefixIndex.build(index, bank)
+    try:
+        prefix_index.save(path)
+    except OSError:
+        pass
+    return prefix_index
+
+
+_shared_prefix = None
+_shared_prefix_lock = threading.Lock()
+
+
+def get_prefix_index():
+    """
+    返回进程内共享的前缀索引（第一次调用时读取缓存或建立）
+
+    Returns:
+        PrefixIndex: 共享实例
+    """
+    global _shared_prefix
+    if _shared_prefix is None:
+        with _shared_prefix_lock:
+            if _shared_prefix is None:
+                _shared_prefix = load_prefix_index()
+    return _shared_prefix
+
+
+def format_results(results, bank=None):
+    """
+    Returns:
+        str: 查词结果文本（每个单词一行：单词、释义和所在模块）
+    """
+    bank = bank or get_shared_bank()
+    lines = []
+    for item in results:
+        names = "、".join(bank.module_name(m) for m in item["modules"])
+        lines.append(f"{item['word']:<20} {item['definition']}  [{names}]")
+    return "\n".join(lines)
+
+
+def run_lookup(words, top=DEFAULT_TOP):
+    """
+    命令行查词：每个参数作为前缀输出补全结果，没有以它开头的单词时输出拼写相近的单词；
+    含有汉字的参数按中文释义查英文单词
+
+    Returns:
+        int: 全部都有结果时返回0，否则返回1
+    """
+    prefix_index = get_prefix_index()
+    status = 0
+    for word in words:
+        if len(words) > 1:
+            print(f"== {word} ==")
+        from gloss_index import get_gloss_index, is_chinese_query
+        if is_chinese_query(word):
+            results = get_gloss_index().search(word, top)
+            if results:
+                print(format_results(results))
+            else:
+                print(f"没有释义含有 {word} 的单词")
+                status = 1
+            continue
+        results = prefix_index.complete(word, top)
+        if results:
+            print(format_results(results))
+            continue
+        from fuzzy_search import get_fuzzy_searcher
+        results = get_fuzzy_searcher().search(word, k=top)
+        if results:
+            print(f"没有以 {word} 开头的单词，拼写相近的单词:")
+            print(format_results(results))
+        else:
+            print(f"没有以 {word} 开头的单词")
+            status = 1
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按前缀查词（所有词汇模块）")
+    parser.add_argument("words", nargs="+", help="单词或前缀；中文释义（按释义查英文单词）")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"最多显示的条数（默认{DEFAULT_TOP}）")
+    args = parser.parse_args(argv)
+    return run_lookup(args.words, args.top)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+英语词汇测试系统 - 预启动的测试子进程池
+
+图形界面的子进程模式每次启动测试都要重新创建 `python main.py`，
+需要付出解释器启动、模块导入和加载词汇文件的时间。
+本模块预先启动若干个 `main.py --protocol jsonl --preload ...` 工作进程，
+开始测试时直接取出一个已就绪的进程，停止测试时将其重置后放回池中，
+或者在进程异常、使用次数过多时丢弃并在后台补充新的进程。
+"""
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from jsonl_protocol import JsonlProtocolClient
+
+
+class ProtocolWorker:
+    """
+    一个以JSON Lines协议运行的测试子进程
+
+    由专门的读取线程把子进程输出的消息放入messages队列，
+    这样进程在池中等待、被GUI使用和被回收时都只有一个读取者。
+    """
+    def __init__(self, process):
+        """
+        Args:
+            process: 以JSON Lines协议运行main.py的subprocess.Popen对象
+        """
+        self.process = process
+        self.client = JsonlProtocolClient(process)
+        self.messages = queue.Queue()
+        self.uses = 0
+        self.loaded_modules = []
+        self.started_at = time.perf_counter()
+        self.ready_at = None
+        self.reader_thread = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader_thread.start()
+
+    def _read_loop(self):
+        try:
+            while True:
+                message = self.client.read_message()
+                if message is None:
+                    break
+                self.messages.put(message)
+        except Exception:
+            pass
+        finally:
+            # None表示子进程输出已结束
+            self.messages.put(None)
+
+    def send(self, cmd, **fields):
+        """向子进程发送一条命令，返回命令序号"""
+        return self.client.send(cmd, **fields)
+
+    def get_message(self, timeout=None):
+        """
+        获取下一条消息
+
+        Args:
+            timeout: 等待秒数，None表示一直等待
+
+        Returns:
+            dict: 消息字典；超时时抛出queue.Empty，子进程结束时返回None
+        """
+        return self.messages.get(timeout=timeout)
+
+    def wait_for(self, msg_type, timeout=None):
+        """
+        丢弃其他消息，直到收到指定类型的消息
+
+        Args:
+            msg_type: 目标消息类型
+            timeout: 总等待秒数
+
+        Returns:
+            dict: 目标消息；子进程结束或超时时返回None
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                message = self.get_message(timeout=remaining)
+            except queue.Empty:
+                return None
+            if message is None:
+                return None
+            if message.get("type") == msg_type:
+                return message
+
+    def is_alive(self):
+        """子进程是否仍在运行"""
+        return self.process.poll() is None
+
+    def terminate(self):
+        """结束子进程"""
+        try:
+            self.client.close()
+            self.process.wait(timeout=1)
+        except Exception:
+            pass
+        if self.process.poll() is None:
+            try:
+                self.process.kill()
+            except Exception:
+                pass
+
+
+class WorkerPool:
+    """
+    预启动的测试子进程池
+
+    用法:
+        pool = WorkerPool(size=2, preload=["1"])
+        pool.start()
+        worker = pool.acquire()
+        ...
+        pool.release(worker)
+        pool.shutdown()
+    """
+    def __init__(self, size=2, preload=None, max_uses=20, ready_timeout=30):
+        """
+        初始化进程池
+
+        Args:
+            size: 保持就绪的进程数量
+            preload: 每个进程预先加载的模块ID列表
+            max_uses: 一个进程最多被复用的次数，超过后丢弃并补充新进程
+            ready_timeout: 等待进程就绪的最长秒数
+        """
+        self.size = max(1, int(size))
+        self.preload = [str(m) for m in (preload or [])]
+        self.max_uses = max_uses
+        self.ready_timeout = ready_timeout
+        self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        # 正在启动中的进程数量
+        self.spawning = 0
+        self.closed = False
+
+    def _spawn_process(self):
+        command = [sys.executable, os.path.join(self.script_dir, "main.py"), "--protocol", "jsonl"]
+        if self.preload:
+            command += ["--preload", ",".join(self.preload)]
+        return subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            cwd=self.script_dir
+        )
+
+    def _spawn_worker(self):
+        """启动一个进程并等待它发出ready消息；失败时返回None"""
+        try:
+            worker = ProtocolWorker(self._spawn_process())
+        except Exception:
+            return None
+        ready = worker.wait_for("ready", timeout=self.ready_timeout)
+        if ready is None:
+            worker.terminate()
+            return None
+        worker.ready_at = time.perf_counter()
+        worker.loaded_modules = ready.get("loaded", [])
+        return worker
+
+    def _replenish_one(self):
+        try:
+            worker = self._spawn_worker()
+            if worker is None:
+                return
+            if self.closed:
+                worker.terminate()
+            else:
+                self.idle.put(worker)
+        finally:
+            with self.lock:
+                self.spawning -= 1
+
+    def replenish(self):
+        """在后台补充进程，使就绪和启动中的进程总数达到size"""
+        with self.lock:
+            if self.closed:
+                return
+            missing = self.size - self.idle.qsize() - self.spawning
+            self.spawning += max(0, missing)
+        for _ in range(max(0, missing)):
+            threading.Thread(target=self._replenish_one, daemon=True).start()
+
+    def start(self):
+        """启动进程池（后台预启动进程，不阻塞调用者）"""
+        self.replenish()
+
+    def acquire(self, timeout=None):
+        """
+        取出一个已就绪的进程
+
+        池中有空闲进程时立即返回；否则等待后台启动的进程就绪，
+        等待超时后同步启动一个新进程。
+
+        Args:
+            timeout: 等待空闲进程的秒数，默认为ready_timeout
+
+        Returns:
+            ProtocolWorker: 已就绪的进程；无法启动时返回None
+        """
+        if timeout is None:
+            timeout = self.ready_timeout
+        deadline = time.perf_counter() + timeout
+        worker = None
+        while worker is None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                worker = self.idle.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if not worker.is_alive():
+                worker = None
+                self.replenish()
+        if worker is None:
+            worker = self._spawn_worker()
+        if worker is not None:
+            worker.uses += 1
+        # 被取走的位置由后台补充
+        self.replenish()
+        return worker
+
+    def _recycle(self, worker):
+        worker.send("reset")
+        if worker.wait_for("reset", timeout=5) is not None and not self.closed:
+            self.idle.put(worker)
+        else:
+            worker.terminate()
+        with self.lock:
+            self.spawning -= 1
+        self.replenish()
+
+    def release(self, worker, recycle=True):
+        """
+        归还进程
+
+        进程仍在运行且未超过复用次数时，在后台发送reset命令后放回池中；
+        否则结束该进程并补充新的进程。
+
+        Args:
+            worker: acquire返回的进程
+            recycle: 是否尝试复用该进程
+        """
+        if worker is None:
+            return
+        if recycle and not self.closed and worker.is_alive() and worker.uses < self.max_uses:
+            # 回收期间把它计入启动中的数量，避免replenish多启动进程
+            with self.lock:
+                self.spawning += 1
+            threading.Thread(target=self._recycle, args=(worker,), daemon=True).start()
+        else:
+            threading.Thread(target=worker.terminate, daemon=True).start()
+            self.replenish()
+
+    def shutdown(self):
+        """关闭进程池并结束所有空闲进程"""
+        self.closed = True
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.terminate()